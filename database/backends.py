@@ -0,0 +1,152 @@
+"""
+Storage backends for MindboggleDB
+
+A backend stores the nodes and relationships of the mbdb domain model
+(Database, Project, Subject, Sulcus, Fundus, Pit, ... in base.py) and answers
+the queries in query.py.  Nodes are identified by their key, their path from
+the database node (see batch.UploadBatch), and have an element_type, a name,
+and other properties; "contained_in" relationships link each node to the
+node that contains it.
+
+    Backend - the interface
+    SQLiteBackend - an embedded backend in a local file (or in memory),
+                    using the standard library's sqlite3 module
+    batch.GremlinBackend - a remote graph server (Rexster, through bulbs)
+"""
+import json
+from abc import ABCMeta, abstractmethod
+
+
+class Backend(object):
+    """
+    Backend is the interface to MindboggleDB storage (an abstract class:
+    subclasses implement all of its methods)
+    """
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def send(self, nodes, edges):
+        """
+        Store nodes, a list of (key, properties) tuples, and edges, a list of
+        (key, label, key) tuples, in one transaction.  Nodes that exist are
+        updated and relationships that exist are kept, not duplicated.
+        """
+
+    @abstractmethod
+    def get(self, key):
+        """
+        Return the properties of the node with this key (or None)
+        """
+
+    @abstractmethod
+    def find(self, element_type=None, subject=None, label=None):
+        """
+        Return the properties of all nodes of an element_type, contained
+        (directly or not) in a subject's node (given by its key), and/or
+        with a label property, ordered by key
+        """
+
+    @abstractmethod
+    def contents(self, key, element_type=None):
+        """
+        Return the properties of the nodes directly contained in a node
+        (of an element_type), ordered by key
+        """
+
+
+class SQLiteBackend(Backend):
+    """
+    SQLiteBackend stores MindboggleDB in an SQLite database
+
+    path - name of the database file (':memory:' for a temporary database)
+
+    Nodes are indexed by the key of the subject that contains them and by
+    label, so per-subject and per-label queries across a cohort do not scan
+    the whole database.
+    """
+    schema = """
+        CREATE TABLE IF NOT EXISTS nodes (
+            key TEXT PRIMARY KEY,
+            element_type TEXT,
+            name TEXT,
+            subject TEXT,
+            label TEXT,
+            properties TEXT);
+        CREATE TABLE IF NOT EXISTS edges (
+            out_key TEXT,
+            label TEXT,
+            in_key TEXT,
+            PRIMARY KEY (out_key, label, in_key));
+        CREATE INDEX IF NOT EXISTS nodes_subject ON nodes (subject, label);
+        CREATE INDEX IF NOT EXISTS nodes_label ON nodes (label);
+        CREATE INDEX IF NOT EXISTS nodes_element_type ON nodes (element_type);
+        CREATE INDEX IF NOT EXISTS edges_in ON edges (in_key, label);
+        """
+
+    def __init__(self, path=':memory:'):
+        import sqlite3
+
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(self.schema)
+
+    def send(self, nodes, edges):
+        with self.connection:
+            cursor = self.connection.cursor()
+            for key, properties in nodes:
+                row = cursor.execute('SELECT properties, subject FROM nodes '
+                                     'WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    stored, subject = {}, None
+                else:
+                    stored, subject = json.loads(row[0]), row[1]
+                stored.update(properties)
+                if stored.get('element_type') == 'subject':
+                    subject = key
+                cursor.execute('INSERT OR REPLACE INTO nodes '
+                               'VALUES (?, ?, ?, ?, ?, ?)',
+                               (key, stored.get('element_type'),
+                                stored.get('name'), subject,
+                                stored.get('label'), json.dumps(stored)))
+            for out_key, label, in_key in edges:
+                cursor.execute('INSERT OR IGNORE INTO edges VALUES (?, ?, ?)',
+                               (out_key, label, in_key))
+                if label == 'contained_in':
+                    cursor.execute("""
+                        UPDATE nodes SET subject = (
+                            SELECT CASE WHEN element_type = 'subject'
+                                        THEN key ELSE subject END
+                            FROM nodes WHERE key = ?)
+                        WHERE key = ? AND element_type != 'subject'""",
+                                   (in_key, out_key))
+
+    def get(self, key):
+        row = self.connection.execute('SELECT properties FROM nodes '
+                                      'WHERE key = ?', (key,)).fetchone()
+        if row is not None:
+            return json.loads(row[0])
+
+    def find(self, element_type=None, subject=None, label=None):
+        conditions = []
+        values = []
+        for column, value in [('element_type', element_type),
+                              ('subject', subject), ('label', label)]:
+            if value is not None:
+                conditions.append(column + ' = ?')
+                values.append(value)
+        sql = 'SELECT properties FROM nodes'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        rows = self.connection.execute(sql + ' ORDER BY key', values)
+        return [json.loads(row[0]) for row in rows]
+
+    def contents(self, key, element_type=None):
+        sql = """
+            SELECT nodes.properties FROM edges
+            JOIN nodes ON nodes.key = edges.out_key
+            WHERE edges.in_key = ? AND edges.label = 'contained_in'"""
+        values = [key]
+        if element_type is not None:
+            sql += ' AND nodes.element_type = ?'
+            values.append(element_type)
+        rows = self.connection.execute(sql + ' ORDER BY nodes.key', values)
+        return [json.loads(row[0]) for row in rows]
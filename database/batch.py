@@ -0,0 +1,208 @@
+"""
+Batched uploads to MindboggleDB
+
+upload.py saves every node, relationship and statistic with its own REST
+call.  Here nodes and their "contained_in" relationships are first collected
+in an UploadBatch, then sent to the graph server in chunks: one request
+(and one transaction) per chunk, retried with exponential backoff.
+
+Every node carries a unique key, its path from the database node
+(e.g. "MindBoggleDB/MDD/subject1/subject1-3"), and the server only creates
+nodes and relationships that do not exist yet.  Sending a chunk twice, or
+re-running an upload that stopped part way, therefore does not create
+duplicates, so a partial upload is resumed by simply uploading again.
+
+    batch = UploadBatch()
+    db = batch.add_node('database', 'MindBoggleDB')
+    project = batch.add_node('project', 'MDD', db)
+    subject = batch.add_node('subject', 'subject1', project)
+    add_fundus_stats(batch, subject, read_stats('subject1_fundi.csv'))
+    upload_batch(batch, GremlinBackend(graph))
+"""
+import sys
+import time
+
+from .backends import Backend
+
+
+class UploadBatch(object):
+    """
+    UploadBatch collects nodes and relationships to upload together
+
+    nodes - list of (key, properties) tuples, parents before children
+    edges - list of (key, label, key) tuples: the first node is contained
+            in the second
+    """
+    def __init__(self):
+        self.nodes = []
+        self.edges = []
+        self.keys = set()
+
+    def add_node(self, element_type, name, parent=None, **properties):
+        """
+        Add a node (contained in the parent node's key, if any)
+
+        Returns the node's key.  Adding a key a second time only adds the
+        new properties to the upload (the node is updated, not duplicated).
+        """
+        if parent is None:
+            key = name
+        else:
+            key = parent + '/' + name
+        properties.update({'element_type': element_type, 'name': name,
+                           'key': key})
+        self.nodes.append((key, properties))
+        if key not in self.keys:
+            self.keys.add(key)
+            if parent is not None:
+                self.edges.append((key, 'contained_in', parent))
+        return key
+
+    def chunks(self, chunk_size):
+        """
+        Split the batch into (nodes, edges) chunks of at most chunk_size
+        elements each, all nodes first, so that every relationship is sent
+        after both of its nodes.
+        """
+        elements = [('node', node) for node in self.nodes] + \
+                   [('edge', edge) for edge in self.edges]
+        for start in range(0, len(elements), chunk_size):
+            chunk = elements[start:start + chunk_size]
+            yield ([element for kind, element in chunk if kind == 'node'],
+                   [element for kind, element in chunk if kind == 'edge'])
+
+
+class GremlinBackend(Backend):
+    """
+    GremlinBackend sends chunks to a Rexster server as Gremlin scripts
+
+    graph - a bulbs graph connected to MindboggleDB, e.g.:
+        from bulbs.rexster import Graph, Config
+        graph = Graph(Config('http://localhost:8182/graphs/mindboggle'))
+
+    Rexster runs each script request in one transaction, so a chunk is
+    either stored completely or not at all.
+    """
+    script = """
+        def index = g.idx('mbdb_keys')
+        if (index == null) { index = g.createIndex('mbdb_keys', Vertex.class) }
+        def lookup = { key ->
+            def hits = index.get('key', key)
+            hits.hasNext() ? hits.next() : null
+        }
+        nodes.each { node ->
+            def vertex = lookup(node[0])
+            if (vertex == null) {
+                vertex = g.addVertex(null)
+                index.put('key', node[0], vertex)
+            }
+            node[1].each { name, value -> vertex.setProperty(name, value) }
+        }
+        edges.each { edge ->
+            def outVertex = lookup(edge[0])
+            def inVertex = lookup(edge[2])
+            if (!outVertex.out(edge[1]).filter{it.id == inVertex.id}.hasNext()) {
+                g.addEdge(outVertex, inVertex, edge[1])
+            }
+        }
+        nodes.size() + edges.size()
+        """
+
+    lookup = """
+        def hits = g.idx('mbdb_keys').get('key', key)
+        """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def execute(self, script, params):
+        return self.graph.gremlin.execute(script, params).content['results']
+
+    def send(self, nodes, edges):
+        params = {'nodes': [list(node) for node in nodes],
+                  'edges': [list(edge) for edge in edges]}
+        return self.execute(self.script, params)
+
+    def get(self, key):
+        results = self.execute(self.lookup +
+                               "hits.hasNext() ? hits.next().map() : null",
+                               {'key': key})
+        if results:
+            return results[0]
+
+    def find(self, element_type=None, subject=None, label=None):
+        script = """
+            g.V.filter{
+                (element_type == null || it.element_type == element_type) &&
+                (subject == null || it.key == subject ||
+                 (it.key != null && it.key.startsWith(subject + '/'))) &&
+                (label == null || it.label == label)
+            }.map.toList().sort{it.key}
+            """
+        return self.execute(script, {'element_type': element_type,
+                                     'subject': subject, 'label': label})
+
+    def contents(self, key, element_type=None):
+        script = self.lookup + """
+            hits.hasNext() ? hits.next().in('contained_in').filter{
+                element_type == null || it.element_type == element_type
+            }.map.toList().sort{it.key} : []
+            """
+        return self.execute(script, {'key': key,
+                                     'element_type': element_type})
+
+
+def add_fundus_stats(batch, subject, stats):
+    """
+    add_fundus_stats is the batched version of upload.set_fundus_stats
+
+    input: an UploadBatch, a subject's key, and a list of tuples
+           (curvature, convexity, depth, thickness, length) for each fundus
+    output: list of the fundus nodes' keys
+    """
+    name = subject.split('/')[-1]
+    fundi = []
+    for featureVector in range(len(stats)):
+        curvature, convexity, depth, thickness, length = \
+            stats[featureVector][0:5]
+        fundi.append(batch.add_node('fundus',
+                                    name + '-' + str(featureVector),
+                                    subject,
+                                    curvature=curvature,
+                                    convexity=convexity,
+                                    depth=depth,
+                                    thickness=thickness,
+                                    length=length))
+    return fundi
+
+
+def upload_batch(batch, backend, chunk_size=1000, max_retries=5, delay=1.0):
+    """
+    upload_batch sends an UploadBatch to a backend in chunks
+
+    input: an UploadBatch, a backend (GremlinBackend, or any
+           backends.Backend such as SQLiteBackend), the number of nodes
+           and relationships per request, how often to retry a failed
+           request, and the wait (in seconds) before the first retry,
+           doubled after each retry
+    output: number of chunks sent
+    """
+    nchunks = 0
+    for nodes, edges in batch.chunks(chunk_size):
+        for retry in range(max_retries + 1):
+            try:
+                backend.send(nodes, edges)
+                break
+            except Exception as error:
+                if retry == max_retries:
+                    sys.exit('Upload stopped after chunk {0} ({1}); run it '
+                             'again to resume.'.format(nchunks, error))
+                wait = delay * 2 ** retry
+                print('Chunk {0} failed ({1}); retrying in {2} seconds...'.
+                      format(nchunks + 1, error, wait))
+                time.sleep(wait)
+        nchunks += 1
+        print('Uploaded chunk {0}: {1} nodes, {2} relationships'.
+              format(nchunks, len(nodes), len(edges)))
+
+    return nchunks
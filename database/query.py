@@ -1,35 +1,57 @@
 """Utilities to query the MindboggleDB
+
+Every function takes a storage backend (see backends.py), for example
+a local database:
+    backend = SQLiteBackend('mindboggle.db')
+or a graph server:
+    backend = GremlinBackend(Graph(Config('http://localhost:8182/graphs/mindboggle')))
 """
+from .batch import UploadBatch, upload_batch
+
+# key of the root node
+root = 'MindboggleDB'
+
+
+# create a project node (and the root node)
+def create_project(backend, project):
+    batch = UploadBatch()
+    db = batch.add_node('database', root)
+    key = batch.add_node('project', project, db, label='Project')
+    upload_batch(batch, backend)
+    return key
+
+
+# create a subject node in a project
+def create_subject(backend, subject, project):
+    batch = UploadBatch()
+    key = batch.add_node('subject', subject, root + '/' + project,
+                         label='Subject')
+    upload_batch(batch, backend)
+    return key
 
-### currently all below is using generic bulbs framework 
 
-from bulbs.graph import Graph
-from bulbs.model import Model
+# create a basins node with a basin node for each basin name
+def create_basins(backend, subject, basins):
+    batch = UploadBatch()
+    key = batch.add_node('basins', 'Basins', subject, label='Basins')
+    for basin in basins:
+        batch.add_node('basin', basin, key, label='Basin')
+    upload_batch(batch, backend)
+    return key
 
-# connect to mbdb
-g = Graph(db_url="http://localhost:8182/graphs/mindboggle")
 
-# create root node
-mb = g.vertices.create({'name':'MindboggleDB',
-                        'url':"http://localhost:8182/graphs/mindboggle"})
+# all projects
+def get_projects(backend):
+    return backend.contents(root, 'project')
 
-# create a project node
-def create_project(project):
-    g.vertices.create({'name':project,
-                       'label':'Project'})
-    g.edges.create(mb,"has_project",proj)
 
-# create a subject node
-subj = g.vertices.create({'name':'Subject1',
-                          'label':'Subject'})
-g.edges.create(proj,"has_subject", subj)
+# all subjects in a project
+def get_subjects(backend, project):
+    return backend.contents(root + '/' + project, 'subject')
 
-# create a basins node
-basins = g.vertices.create({'name':'Basins',
-                           'label':'Basins'})
-g.edges.create(subj,'has_basins',basins)
 
-# create a basin node
-basin = g.vertices.create({'name':'Basin',
-                           'label':'Basin1'})
-g.edges.create(basins,'has_basin',basin)
+# features (e.g., element_type 'fundus' or 'basin') of a subject
+# (given by its key) and/or with a label, across subjects
+def get_features(backend, subject=None, element_type=None, label=None):
+    return backend.find(element_type=element_type, subject=subject,
+                        label=label)
@@ -0,0 +1,69 @@
+"""
+Tests of the embedded SQLite backend
+"""
+import os
+import tempfile
+
+from ..backends import Backend, SQLiteBackend
+from ..batch import UploadBatch, add_fundus_stats, upload_batch
+from .. import query
+
+
+def test_sqlite_backend():
+    backend = SQLiteBackend()
+    batch = UploadBatch()
+    db = batch.add_node('database', 'MindboggleDB')
+    project = batch.add_node('project', 'MDD', db)
+    subject = batch.add_node('subject', 'subject1', project, age=30)
+    add_fundus_stats(batch, subject, [(0.1, 0.2, 0.3, 2.5, 10.0),
+                                      (0.4, 0.5, 0.6, 2.7, 20.0)])
+    batch.add_node('sulcus', 'sulcus1', subject, label=28)
+    upload_batch(batch, backend, chunk_size=3)
+    upload_batch(batch, backend, chunk_size=4)
+
+    assert backend.get('MindboggleDB/MDD/subject1')['age'] == 30
+    assert backend.get('MindboggleDB/MDD/subject2') is None
+    fundi = backend.find(element_type='fundus', subject=subject)
+    assert [fundus['name'] for fundus in fundi] == ['subject1-0', 'subject1-1']
+    assert fundi[1]['length'] == 20.0
+    assert [node['name'] for node in backend.find(subject=subject)] == \
+        ['subject1', 'subject1-0', 'subject1-1', 'sulcus1']
+    assert [node['key'] for node in backend.find(label=28)] == \
+        ['MindboggleDB/MDD/subject1/sulcus1']
+    assert len(backend.contents(subject)) == 3
+    assert len(backend.contents(subject, 'fundus')) == 2
+
+    plan = backend.connection.execute(
+        'EXPLAIN QUERY PLAN SELECT * FROM nodes WHERE subject = ? '
+        'AND label = ?', (subject, 28)).fetchall()
+    assert 'nodes_subject' in str(plan)
+
+
+def test_sqlite_queries():
+    path = os.path.join(tempfile.mkdtemp(), 'mindboggle.db')
+    backend = SQLiteBackend(path)
+    query.create_project(backend, 'MDD')
+    subject = query.create_subject(backend, 'subject1', 'MDD')
+    query.create_basins(backend, subject, ['basin1', 'basin2'])
+
+    backend = SQLiteBackend(path)
+    assert [node['name'] for node in query.get_projects(backend)] == ['MDD']
+    assert [node['key'] for node in query.get_subjects(backend, 'MDD')] == \
+        [subject]
+    basins = query.get_features(backend, subject, 'basin')
+    assert [basin['name'] for basin in basins] == ['basin1', 'basin2']
+    assert len(query.get_features(backend, label='Basin')) == 2
+
+
+def test_abstract_backend():
+    class PartialBackend(Backend):
+        def send(self, nodes, edges):
+            pass
+
+    for backend_class in [Backend, PartialBackend]:
+        try:
+            backend_class()
+        except TypeError:
+            pass
+        else:
+            assert False, backend_class
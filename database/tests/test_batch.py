@@ -0,0 +1,78 @@
+"""
+Tests of batched uploads against an in-process stand-in for the graph server
+"""
+from ..batch import UploadBatch, add_fundus_stats, upload_batch
+
+
+class FakeGraphBackend(object):
+    """
+    Stores chunks in memory the way GremlinBackend's script stores them,
+    failing the first `failures` requests without storing anything
+    """
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.requests = 0
+        self.nodes = {}
+        self.edges = set()
+
+    def send(self, nodes, edges):
+        self.requests += 1
+        if self.failures:
+            self.failures -= 1
+            raise IOError('connection refused')
+        for key, properties in nodes:
+            self.nodes.setdefault(key, {}).update(properties)
+        for out_key, label, in_key in edges:
+            assert out_key in self.nodes and in_key in self.nodes
+            self.edges.add((out_key, label, in_key))
+
+
+def cohort_batch():
+    batch = UploadBatch()
+    db = batch.add_node('database', 'MindBoggleDB')
+    project = batch.add_node('project', 'MDD', db)
+    for subject_name in ['subject1', 'subject2']:
+        subject = batch.add_node('subject', subject_name, project)
+        stats = [(0.1 * i, 0.2, 0.3, 2.5, 10.0 + i) for i in range(7)]
+        add_fundus_stats(batch, subject, stats)
+    return batch
+
+
+def test_upload_batch():
+    backend = FakeGraphBackend()
+    nchunks = upload_batch(cohort_batch(), backend, chunk_size=5)
+
+    assert len(backend.nodes) == 18
+    assert len(backend.edges) == 17
+    assert nchunks == backend.requests == 7
+    fundus = backend.nodes['MindBoggleDB/MDD/subject2/subject2-3']
+    assert fundus['element_type'] == 'fundus'
+    assert fundus['length'] == 13.0
+    assert ('MindBoggleDB/MDD/subject2/subject2-3', 'contained_in',
+            'MindBoggleDB/MDD/subject2') in backend.edges
+
+
+def test_upload_batch_retries():
+    backend = FakeGraphBackend(failures=2)
+    upload_batch(cohort_batch(), backend, chunk_size=5, delay=0)
+
+    assert backend.requests == 9
+    assert len(backend.nodes) == 18
+
+
+def test_upload_batch_resumes():
+    backend = FakeGraphBackend(failures=3)
+    try:
+        upload_batch(cohort_batch(), backend, chunk_size=5, max_retries=2,
+                     delay=0)
+    except SystemExit:
+        pass
+    else:
+        assert False, 'upload should have stopped'
+    assert backend.nodes == {}
+
+    upload_batch(cohort_batch(), backend, chunk_size=5)
+    upload_batch(cohort_batch(), backend, chunk_size=5)
+
+    assert len(backend.nodes) == 18
+    assert len(backend.edges) == 17
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Benchmarks of segmentation and feature extraction functions.
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+from mindboggle.testing.fixtures import synthetic_surface, \
+    synthetic_surface_files
+
+
+class Segment(object):
+    params = [3, 4, 5]
+    param_names = ['level']
+    timeout = 300
+
+    def setup(self, level):
+        import numpy as np
+        surface = synthetic_surface('sphere', level)
+        self.neighbor_lists = surface['neighbor_lists']
+        self.deep = np.where(surface['depths'] > 0.3)[0].tolist()
+        self.npoints = surface['npoints']
+
+    def time_segment(self, level):
+        from mindboggle.utils.segment import segment
+        segment(self.deep, self.neighbor_lists, 1)
+
+
+class Watershed(object):
+    params = [3, 4, 5]
+    param_names = ['level']
+    timeout = 300
+
+    def setup(self, level):
+        import numpy as np
+        surface = synthetic_surface('sphere', level)
+        self.surface = surface
+        self.indices = np.where(surface['depths'] > 0.3)[0].tolist()
+        self.npoints = surface['npoints']
+
+    def time_watershed(self, level):
+        from mindboggle.utils.segment import watershed
+        watershed(self.surface['depths'], self.surface['points'],
+                  self.indices, self.surface['neighbor_lists'], min_size=1)
+
+
+class ExtractFolds(object):
+    params = [5, 6]  # extract_folds() expects > 10000 vertices
+    param_names = ['level']
+    timeout = 300
+
+    def setup(self, level):
+        files = synthetic_surface_files('sphere', level)
+        self.depth_file = files['depth_file']
+        self.npoints = synthetic_surface('sphere', level)['npoints']
+
+    def time_extract_folds(self, level):
+        from mindboggle.features.folds import extract_folds
+        extract_folds(self.depth_file, 50, 0.001, False)
+
+
+class ExtractSulci(object):
+    params = [5, 6]  # extract_folds() expects > 10000 vertices
+    param_names = ['level']
+    timeout = 300
+
+    def setup(self, level):
+        from mindboggle.features.folds import extract_folds
+        from mindboggle.labels.protocol import dkt_protocol
+        self.files = synthetic_surface_files('sphere', level)
+        self.npoints = synthetic_surface('sphere', level)['npoints']
+        self.folds = extract_folds(self.files['depth_file'], 50, 0.001,
+                                   False)[0]
+        self.sulcus_names, self.sulcus_label_pair_lists, \
+            self.unique_sulcus_label_pairs = dkt_protocol('DKT31')[0:3]
+
+    def time_extract_sulci(self, level):
+        from mindboggle.features.sulci import extract_sulci
+        extract_sulci(self.files['labels_file'], self.folds, 'lh',
+                      self.sulcus_label_pair_lists,
+                      self.unique_sulcus_label_pairs, 1, self.sulcus_names)
+
+
+class ExtractFundi(object):
+    params = [5, 6]  # extract_folds() expects > 10000 vertices
+    param_names = ['level']
+    timeout = 600
+
+    def setup(self, level):
+        import numpy as np
+        from mindboggle.features.folds import extract_folds
+        self.files = synthetic_surface_files('sphere', level)
+        self.npoints = synthetic_surface('sphere', level)['npoints']
+        self.folds = np.array(extract_folds(self.files['depth_file'], 50,
+                                            0.001, False)[0])
+
+    def time_extract_fundi(self, level):
+        from mindboggle.features.fundi import extract_fundi
+        extract_fundi(self.folds, self.folds, self.files['curvature_file'],
+                      self.files['depth_file'], 10, 0.1, 10, False)
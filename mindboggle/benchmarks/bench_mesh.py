@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Benchmarks of mesh and VTK input/output functions.
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+from mindboggle.testing.fixtures import synthetic_surface, \
+    synthetic_surface_files
+
+
+class FindNeighbors(object):
+    params = (['sphere', 'torus'], [4, 5, 6, 7])
+    param_names = ['shape', 'level']
+
+    def setup(self, shape, level):
+        surface = synthetic_surface(shape, level)
+        self.faces = surface['faces'].tolist()
+        self.npoints = surface['npoints']
+
+    def time_find_neighbors(self, shape, level):
+        from mindboggle.utils.mesh import find_neighbors
+        find_neighbors(self.faces, self.npoints)
+
+
+class ReadVTK(object):
+    params = (['sphere', 'torus'], [4, 5, 6])
+    param_names = ['shape', 'level']
+
+    def setup(self, shape, level):
+        self.depth_file = synthetic_surface_files(shape, level)['depth_file']
+        self.npoints = synthetic_surface(shape, level)['npoints']
+
+    def time_read_vtk(self, shape, level):
+        from mindboggle.utils.io_vtk import read_vtk
+        read_vtk(self.depth_file, True, True)
+
+
+class WriteVTK(object):
+    params = (['sphere', 'torus'], [4, 5, 6])
+    param_names = ['shape', 'level']
+
+    def setup(self, shape, level):
+        import os
+        import tempfile
+        surface = synthetic_surface(shape, level)
+        self.points = surface['points'].tolist()
+        self.faces = surface['faces'].tolist()
+        self.depths = surface['depths'].tolist()
+        self.npoints = surface['npoints']
+        self.output_vtk = os.path.join(tempfile.mkdtemp(), 'depth.vtk')
+
+    def time_write_vtk(self, shape, level):
+        from mindboggle.utils.io_vtk import write_vtk
+        write_vtk(self.output_vtk, self.points, [], [], self.faces,
+                  [self.depths], ['depth'])
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Benchmarks of shape measures.
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+from mindboggle.testing.fixtures import synthetic_surface
+
+
+class ComputeAB(object):
+    params = (['sphere', 'torus'], [3, 4, 5, 6])
+    param_names = ['shape', 'level']
+
+    def setup(self, shape, level):
+        surface = synthetic_surface(shape, level)
+        self.points = surface['points']
+        self.faces = surface['faces']
+        self.npoints = surface['npoints']
+
+    def time_computeAB(self, shape, level):
+        from mindboggle.shapes.laplace_beltrami import computeAB
+        computeAB(self.points, self.faces)
+
+
+class FemLaplacian(object):
+    params = (['sphere', 'torus'], [3, 4, 5, 6])
+    param_names = ['shape', 'level']
+    timeout = 300
+
+    def setup(self, shape, level):
+        surface = synthetic_surface(shape, level)
+        self.points = surface['points'].tolist()
+        self.faces = surface['faces'].tolist()
+        self.npoints = surface['npoints']
+
+    def time_fem_laplacian(self, shape, level):
+        from mindboggle.shapes.laplace_beltrami import fem_laplacian
+        fem_laplacian(self.points, self.faces, 6)
+
+
+class StatsPerLabel(object):
+    params = [4, 5, 6]
+    param_names = ['level']
+
+    def setup(self, level):
+        surface = synthetic_surface('sphere', level)
+        self.depths = surface['depths']
+        self.labels = surface['labels']
+        self.npoints = surface['npoints']
+
+    def time_stats_per_label(self, level):
+        from mindboggle.shapes.measure import stats_per_label
+        stats_per_label(self.depths, self.labels, [-1])
+
+
+class ZernikeMoments(object):
+    params = (['sphere', 'torus'], [1, 2, 3])
+    param_names = ['shape', 'level']
+    timeout = 300
+
+    def setup(self, shape, level):
+        surface = synthetic_surface(shape, level)
+        self.points = surface['points'].tolist()
+        self.faces = surface['faces'].tolist()
+        self.npoints = surface['npoints']
+
+    def time_zernike_moments(self, shape, level):
+        from mindboggle.shapes.zernike.zernike import zernike_moments
+        zernike_moments(self.points, self.faces, 6)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+Run the benchmarks without asv and report how their times scale
+with the number of vertices.
+
+The benchmark modules (bench_*.py) follow asv's conventions (classes with
+params, param_names, setup() and time_*() methods), so they also run with
+asv (http://asv.readthedocs.org), which tracks results across commits:
+
+    asv run
+
+Without asv:
+
+    python -m mindboggle.benchmarks.scaling [match] [max_level]
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+
+# Benchmark modules:
+benchmark_modules = ['mindboggle.benchmarks.bench_mesh',
+                     'mindboggle.benchmarks.bench_features',
+                     'mindboggle.benchmarks.bench_shapes']
+
+
+def run_benchmarks(match='', max_level=None, repeat=3, output_file=''):
+    """
+    Run benchmarks at all sizes and estimate their scaling.
+
+    The scaling exponent of a benchmark is the slope of a line fit to
+    log(time) vs. log(number of vertices): 1 for linear time,
+    2 for quadratic time, etc.
+
+    Parameters
+    ----------
+    match : string
+        only run benchmarks whose names contain this string
+    max_level : integer
+        skip sizes (levels) above this (None for all sizes)
+    repeat : integer
+        number of times to run each benchmark (the fastest time is kept)
+    output_file : string
+        output table (comma-separated values) with a row per benchmark run
+
+    Returns
+    -------
+    results : list of lists
+        benchmark name, parameters, number of vertices, seconds
+    exponents : dictionary
+        scaling exponent for each benchmark name and parameters
+        (other than level)
+
+    Examples
+    --------
+    >>> from mindboggle.benchmarks.scaling import run_benchmarks
+    >>> results, exponents = run_benchmarks('find_neighbors', max_level=6)
+
+    """
+    import time
+    import itertools
+    import numpy as np
+
+    results = []
+    for module_name in benchmark_modules:
+        module = __import__(module_name, fromlist=['*'])
+        for class_name in sorted(dir(module)):
+            benchmark_class = getattr(module, class_name)
+            if not hasattr(benchmark_class, 'params'):
+                continue
+            params = benchmark_class.params
+            if not isinstance(params, tuple):
+                params = (params,)
+            methods = [x for x in sorted(dir(benchmark_class))
+                       if x.startswith('time_') and match in x]
+            for method, param in itertools.product(methods,
+                                                   itertools.product(*params)):
+                if max_level is not None and param[-1] > max_level:
+                    continue
+                benchmark = benchmark_class()
+                benchmark.setup(*param)
+                seconds = []
+                for irepeat in range(repeat):
+                    t0 = time.time()
+                    getattr(benchmark, method)(*param)
+                    seconds.append(time.time() - t0)
+                results.append([method[5:], param, benchmark.npoints,
+                                min(seconds)])
+                print('{0} {1}: {2} vertices, {3:.4f} seconds'.format(
+                      method[5:], param, benchmark.npoints, min(seconds)))
+
+    #-------------------------------------------------------------------------
+    # Scaling curves:
+    #-------------------------------------------------------------------------
+    exponents = {}
+    print('\nScaling exponents (time ~ vertices^exponent):')
+    for key, group in itertools.groupby(results, lambda x: (x[0], x[1][:-1])):
+        group = list(group)
+        if len(group) > 1:
+            npoints = np.log([x[2] for x in group])
+            seconds = np.log([max(x[3], 1e-6) for x in group])
+            exponents[key] = np.polyfit(npoints, seconds, 1)[0]
+            print('    {0} {1}: {2:.2f}  ({3})'.format(key[0],
+                  ' '.join([str(x) for x in key[1]]), exponents[key],
+                  ', '.join(['{0}: {1:.3g} s'.format(x[2], x[3])
+                             for x in group])))
+
+    if output_file:
+        f = open(output_file, 'w')
+        f.write('benchmark,parameters,vertices,seconds\n')
+        for name, param, npoints, seconds in results:
+            f.write('{0},{1},{2},{3}\n'.format(name,
+                    ' '.join([str(x) for x in param]), npoints, seconds))
+        f.close()
+
+    return results, exponents
+
+
+if __name__ == '__main__':
+    import sys
+
+    match = ''
+    max_level = None
+    if len(sys.argv) > 1:
+        match = sys.argv[1]
+    if len(sys.argv) > 2:
+        max_level = int(sys.argv[2])
+    run_benchmarks(match, max_level)
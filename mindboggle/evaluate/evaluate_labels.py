@@ -34,19 +34,19 @@ def measure_surface_overlap(command, labels_file1, labels_file2):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.evaluate.evaluate_labels import measure_surface_overlap
-    >>> from mindboggle.data import hashes_url
-    >>> from mindboggle.utils.io_uri import retrieve_data
-    >>> hashes, url, cache_env, cache = hashes_url()
-    >>> ccode_path = os.environ['MINDBOGGLE_TOOLS']
-    >>> command = os.path.join(ccode_path, 'surface_overlap', 'SurfaceOverlapMain')
-    >>> label_file1 = 'lh.labels.DKT25.manual.vtk'
-    >>> label_file2 = 'lh.labels.DKT31.manual.vtk'
-    >>> file1 = retrieve_data(label_file1, url, hashes, cache_env, cache)
-    >>> file2 = retrieve_data(label_file2, url, hashes, cache_env, cache)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.evaluate.evaluate_labels import measure_surface_overlap  # doctest: +SKIP
+    >>> from mindboggle.data import hashes_url  # doctest: +SKIP
+    >>> from mindboggle.utils.io_uri import retrieve_data  # doctest: +SKIP
+    >>> hashes, url, cache_env, cache = hashes_url()  # doctest: +SKIP
+    >>> ccode_path = os.environ['MINDBOGGLE_TOOLS']  # doctest: +SKIP
+    >>> command = os.path.join(ccode_path, 'surface_overlap', 'SurfaceOverlapMain')  # doctest: +SKIP
+    >>> label_file1 = 'lh.labels.DKT25.manual.vtk'  # doctest: +SKIP
+    >>> label_file2 = 'lh.labels.DKT31.manual.vtk'  # doctest: +SKIP
+    >>> file1 = retrieve_data(label_file1, url, hashes, cache_env, cache)  # doctest: +SKIP
+    >>> file2 = retrieve_data(label_file2, url, hashes, cache_env, cache)  # doctest: +SKIP
     >>> #
-    >>> measure_surface_overlap(command, file1, file2)
+    >>> measure_surface_overlap(command, file1, file2)  # doctest: +SKIP
 
     """
     import os
@@ -83,18 +83,18 @@ def measure_volume_overlap(labels, file1, file2):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.evaluate.evaluate_labels import measure_volume_overlap
-    >>> from mindboggle.utils.io_table import read_columns
-    >>> from mindboggle.labels.protocol import dkt_protocol
-    >>> path = os.path.join(os.environ['MINDBOGGLE_DATA'])
-    >>> file1 = os.path.join(path, 'arno', 'labels', 'labels.DKT25.manual.nii.gz')
-    >>> file2 = os.path.join(path, 'arno', 'labels', 'labels.DKT31.manual.nii.gz')
-    >>> protocol = 'DKT31'
-    >>> sulcus_names, sulcus_label_pair_lists, unique_sulcus_label_pairs,
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.evaluate.evaluate_labels import measure_volume_overlap  # doctest: +SKIP
+    >>> from mindboggle.utils.io_table import read_columns  # doctest: +SKIP
+    >>> from mindboggle.labels.protocol import dkt_protocol  # doctest: +SKIP
+    >>> path = os.path.join(os.environ['MINDBOGGLE_DATA'])  # doctest: +SKIP
+    >>> file1 = os.path.join(path, 'arno', 'labels', 'labels.DKT25.manual.nii.gz')  # doctest: +SKIP
+    >>> file2 = os.path.join(path, 'arno', 'labels', 'labels.DKT31.manual.nii.gz')  # doctest: +SKIP
+    >>> protocol = 'DKT31'  # doctest: +SKIP
+    >>> sulcus_names, sulcus_label_pair_lists, unique_sulcus_label_pairs,  # doctest: +SKIP
     ...    label_names, label_numbers, cortex_names, cortex_numbers,
     ...    noncortex_names, noncortex_numbers = dkt_protocol(protocol)
-    >>> measure_volume_overlap(label_numbers, file1, file2)
+    >>> measure_volume_overlap(label_numbers, file1, file2)  # doctest: +SKIP
 
     """
     import os
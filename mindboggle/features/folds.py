@@ -66,36 +66,36 @@ def extract_folds(depth_file, min_fold_size=50, tiny_depth=0.001, save_file=Fals
 
     Examples
     --------
-    >>> import os
-    >>> import numpy as np
-    >>> import pylab
-    >>> from scipy.ndimage.filters import gaussian_filter1d
-    >>> from mindboggle.utils.io_vtk import read_scalars
-    >>> from mindboggle.utils.mesh import find_neighbors_from_file
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> from mindboggle.features.folds import extract_folds
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')
-    >>> neighbor_lists = find_neighbors_from_file(depth_file)
-    >>> min_fold_size = 50
-    >>> tiny_depth = 0.001
-    >>> save_file = True
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> import pylab  # doctest: +SKIP
+    >>> from scipy.ndimage.filters import gaussian_filter1d  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors_from_file  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> from mindboggle.features.folds import extract_folds  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors_from_file(depth_file)  # doctest: +SKIP
+    >>> min_fold_size = 50  # doctest: +SKIP
+    >>> tiny_depth = 0.001  # doctest: +SKIP
+    >>> save_file = True  # doctest: +SKIP
     >>> #
-    >>> folds, n_folds, thr, bins, bin_edges, folds_file = extract_folds(depth_file,
-    >>>     min_fold_size, tiny_depth, save_file)
+    >>> folds, n_folds, thr, bins, bin_edges, folds_file = extract_folds(depth_file,  # doctest: +SKIP
+    >>>     min_fold_size, tiny_depth, save_file)  # doctest: +SKIP
     >>> #
     >>> # View folds:
-    >>> plot_vtk('folds.vtk')
+    >>> plot_vtk('folds.vtk')  # doctest: +SKIP
     >>> # Plot histogram and depth threshold:
-    >>> depths, name = read_scalars(depth_file)
-    >>> nbins = np.round(len(depths) / 100.0)
-    >>> a,b,c = pylab.hist(depths, bins=nbins)
-    >>> pylab.plot(thr*np.ones((100,1)), np.linspace(0, max(bins), 100), 'r.')
-    >>> pylab.show()
+    >>> depths, name = read_scalars(depth_file)  # doctest: +SKIP
+    >>> nbins = np.round(len(depths) / 100.0)  # doctest: +SKIP
+    >>> a,b,c = pylab.hist(depths, bins=nbins)  # doctest: +SKIP
+    >>> pylab.plot(thr*np.ones((100,1)), np.linspace(0, max(bins), 100), 'r.')  # doctest: +SKIP
+    >>> pylab.show()  # doctest: +SKIP
     >>> # Plot smoothed histogram:
-    >>> bins_smooth = gaussian_filter1d(bins.tolist(), 5)
-    >>> pylab.plot(range(len(bins)), bins, '.', range(len(bins)), bins_smooth,'-')
-    >>> pylab.show()
+    >>> bins_smooth = gaussian_filter1d(bins.tolist(), 5)  # doctest: +SKIP
+    >>> pylab.plot(range(len(bins)), bins, '.', range(len(bins)), bins_smooth,'-')  # doctest: +SKIP
+    >>> pylab.show()  # doctest: +SKIP
 
     """
     import os
@@ -107,10 +107,12 @@ def extract_folds(depth_file, min_fold_size=50, tiny_depth=0.001, save_file=Fals
     from mindboggle.utils.mesh import find_neighbors
     from mindboggle.utils.morph import fill_holes
     from mindboggle.utils.segment import segment
+    from mindboggle.utils.logs import get_logger, log_progress
 
+    logger = get_logger('mindboggle.features.folds')
     do_fill_holes = True
 
-    print("Extract folds in surface mesh")
+    logger.info("Extract folds in surface mesh")
     t0 = time()
 
     #-------------------------------------------------------------------------
@@ -159,20 +161,25 @@ def extract_folds(depth_file, min_fold_size=50, tiny_depth=0.001, save_file=Fals
         #---------------------------------------------------------------------
         # Segment deep vertices as an initial set of folds
         #---------------------------------------------------------------------
-        print("  Segment vertices deeper than {0:.2f} as folds".format(depth_threshold))
+        logger.info("  Segment vertices deeper than {0:.2f} as folds".
+                    format(depth_threshold))
         t1 = time()
         folds = segment(indices_deep, neighbor_lists)
         # Slightly slower alternative -- fill boundaries:
         #regions = -1 * np.ones(len(points))
         #regions[indices_deep] = 1
         #folds = segment_by_filling_borders(regions, neighbor_lists)
-        print('  ...Segmented folds ({0:.2f} seconds)'.format(time() - t1))
+        logger.info('  ...Segmented folds ({0:.2f} seconds)'.format(time() - t1))
+        log_progress(logger, 'extract_folds', step='segment',
+                     n_vertices=npoints, n_deep=len(indices_deep),
+                     depth_threshold=depth_threshold,
+                     elapsed=round(time() - t0, 3))
 
         #---------------------------------------------------------------------
         # Remove small folds
         #---------------------------------------------------------------------
         if min_fold_size > 1:
-            print('  Remove folds smaller than {0}'.format(min_fold_size))
+            logger.info('  Remove folds smaller than {0}'.format(min_fold_size))
             unique_folds = [x for x in np.unique(folds) if x > -1]
             for nfold in unique_folds:
                 indices_fold = [i for i,x in enumerate(folds) if x == nfold]
@@ -185,7 +192,7 @@ def extract_folds(depth_file, min_fold_size=50, tiny_depth=0.001, save_file=Fals
         #       so exclude_range includes outer surface values close to zero.
         #---------------------------------------------------------------------
         if do_fill_holes:
-            print("  Find and fill holes in the folds")
+            logger.info("  Find and fill holes in the folds")
             folds = fill_holes(folds, neighbor_lists, values=depths,
                                exclude_range=[0, tiny_depth])
 
@@ -200,11 +207,13 @@ def extract_folds(depth_file, min_fold_size=50, tiny_depth=0.001, save_file=Fals
         folds = renumber_folds
         n_folds = i_fold + 1
 
-        # Print statement
-        print('  ...Extracted {0} folds ({1:.2f} seconds)'.
-              format(n_folds, time() - t0))
+        # Log statement
+        logger.info('  ...Extracted {0} folds ({1:.2f} seconds)'.
+                    format(n_folds, time() - t0))
+        log_progress(logger, 'extract_folds', step='done', n_folds=n_folds,
+                     elapsed=round(time() - t0, 3))
     else:
-        print('  No deep vertices')
+        logger.warning('  No deep vertices')
 
     #-------------------------------------------------------------------------
     # Return folds, number of folds, file name
@@ -280,26 +289,26 @@ def extract_subfolds(depth_file, folds, min_size=10, depth_factor=0.25,
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
-    >>> from mindboggle.utils.mesh import find_neighbors_from_file
-    >>> from mindboggle.features.folds import extract_subfolds
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds, name = read_scalars(folds_file)
-    >>> min_size = 10
-    >>> depth_factor = 0.5
-    >>> depth_ratio = 0.1
-    >>> tolerance = 0.01
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors_from_file  # doctest: +SKIP
+    >>> from mindboggle.features.folds import extract_subfolds  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')  # doctest: +SKIP
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file)  # doctest: +SKIP
+    >>> min_size = 10  # doctest: +SKIP
+    >>> depth_factor = 0.5  # doctest: +SKIP
+    >>> depth_ratio = 0.1  # doctest: +SKIP
+    >>> tolerance = 0.01  # doctest: +SKIP
     >>> #
-    >>> subfolds, n_subfolds, subfolds_file = extract_subfolds(depth_file,
-    >>>     folds, min_size, depth_factor, depth_ratio, tolerance, True)
+    >>> subfolds, n_subfolds, subfolds_file = extract_subfolds(depth_file,  # doctest: +SKIP
+    >>>     folds, min_size, depth_factor, depth_ratio, tolerance, True)  # doctest: +SKIP
     >>> #
     >>> # View:
-    >>> rewrite_scalars(depth_file, 'subfolds.vtk', subfolds, 'subfolds', subfolds)
-    >>> plot_vtk('subfolds.vtk')
+    >>> rewrite_scalars(depth_file, 'subfolds.vtk', subfolds, 'subfolds', subfolds)  # doctest: +SKIP
+    >>> plot_vtk('subfolds.vtk')  # doctest: +SKIP
 
     """
     import os
@@ -308,8 +317,11 @@ def extract_subfolds(depth_file, folds, min_size=10, depth_factor=0.25,
     from mindboggle.utils.io_vtk import rewrite_scalars, read_vtk
     from mindboggle.utils.mesh import find_neighbors
     from mindboggle.utils.segment import segment, propagate, watershed
+    from mindboggle.utils.logs import get_logger, log_progress
 
-    print("Segment folds into subfolds")
+    logger = get_logger('mindboggle.features.folds')
+
+    logger.info("Segment folds into subfolds")
     t0 = time()
 
     #-------------------------------------------------------------------------
@@ -331,10 +343,12 @@ def extract_subfolds(depth_file, folds, min_size=10, depth_factor=0.25,
                                  neighbor_lists, min_size, depth_factor=0.25,
                                  depth_ratio=0.1, tolerance=0.01, regrow=True)
 
-    # Print statement
+    # Log the number of subfolds:
     n_subfolds = len([x for x in np.unique(subfolds) if x != -1])
-    print('  ...Extracted {0} subfolds ({1:.2f} seconds)'.
-          format(n_subfolds, time() - t0))
+    logger.info('  ...Extracted {0} subfolds ({1:.2f} seconds)'.
+                format(n_subfolds, time() - t0))
+    log_progress(logger, 'extract_subfolds', step='done',
+                 n_subfolds=n_subfolds, elapsed=round(time() - t0, 3))
 
     #-------------------------------------------------------------------------
     # Return subfolds, number of subfolds, file name
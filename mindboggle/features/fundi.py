@@ -13,7 +13,8 @@ Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
 # Extract fundi
 #=============================================================================
 def extract_fundi(folds, sulci, curv_file, depth_file, min_separation=10,
-                  erode_ratio=0.1, erode_min_size=1, save_file=False):
+                  erode_ratio=0.1, erode_min_size=1, save_file=False,
+                  n_processes=1, memory_budget=0):
     """
     Extract fundi from folds.
 
@@ -27,6 +28,15 @@ def extract_fundi(folds, sulci, curv_file, depth_file, min_separation=10,
         4. Segment fundi by sulcus definitions.
         Possible postprocessing step: smooth with smooth_skeleton().
 
+    Steps 1-3 are run independently for each fold on a surface mesh patch
+    around the fold (see extract_fundus_from_fold()), optionally over
+    a pool of processes; the fundi do not depend on the number of processes.
+
+    With a memory budget (for high-resolution surfaces), the surface is
+    kept in memory-mapped arrays instead of lists, and the folds are
+    processed in batches of patches that fit in the budget; the fundi
+    are the same as without a budget.
+
     Parameters
     ----------
     folds : list of integers
@@ -46,6 +56,13 @@ def extract_fundi(folds, sulci, curv_file, depth_file, min_separation=10,
         in connect_points_erosion()
     save_file : Boolean
         save output VTK file?
+    n_processes : integer
+        number of processes to extract fundi from folds in parallel
+    memory_budget : integer
+        approximate memory (megabytes) for fold patches processed at once
+        (0 for no limit); this bounds only the fold patches: the whole
+        surface is in memory-mapped arrays, but its neighbor lists
+        (about 240 bytes per vertex) are built in memory regardless
 
     Returns
     -------
@@ -59,120 +76,232 @@ def extract_fundi(folds, sulci, curv_file, depth_file, min_separation=10,
     Examples
     --------
     >>> # Extract fundus from one or more folds:
-    >>> single_fold = True
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import read_scalars
-    >>> from mindboggle.features.fundi import extract_fundi
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> sulci_file = os.path.join(path, 'arno', 'features', 'sulci.vtk')
-    >>> sulci, name = read_scalars(sulci_file, True, True)
-    >>> curv_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')
-    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'travel_depth_rescaled.vtk')
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds, name = read_scalars(folds_file, True, True)
-    >>> if single_fold:
-    >>>     fold_number = 2 #11
-    >>>     folds[folds != fold_number] = -1
-    >>> min_separation = 10
-    >>> erode_ratio = 0.10
-    >>> erode_min_size = 10
-    >>> save_file = True
-    >>> fundi, n_fundi, fundi_file = extract_fundi(folds, sulci, curv_file,
-    >>>     depth_file, min_separation, erode_ratio, erode_min_size, save_file)
+    >>> single_fold = True  # doctest: +SKIP
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars  # doctest: +SKIP
+    >>> from mindboggle.features.fundi import extract_fundi  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> sulci_file = os.path.join(path, 'arno', 'features', 'sulci.vtk')  # doctest: +SKIP
+    >>> sulci, name = read_scalars(sulci_file, True, True)  # doctest: +SKIP
+    >>> curv_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')  # doctest: +SKIP
+    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'travel_depth_rescaled.vtk')  # doctest: +SKIP
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file, True, True)  # doctest: +SKIP
+    >>> if single_fold:  # doctest: +SKIP
+    >>>     fold_number = 2 #11  # doctest: +SKIP
+    >>>     folds[folds != fold_number] = -1  # doctest: +SKIP
+    >>> min_separation = 10  # doctest: +SKIP
+    >>> erode_ratio = 0.10  # doctest: +SKIP
+    >>> erode_min_size = 10  # doctest: +SKIP
+    >>> save_file = True  # doctest: +SKIP
+    >>> fundi, n_fundi, fundi_file = extract_fundi(folds, sulci, curv_file,  # doctest: +SKIP
+    >>>     depth_file, min_separation, erode_ratio, erode_min_size, save_file)  # doctest: +SKIP
     >>> #
     >>> # View:
-    >>> plot_vtk(fundi_file)
+    >>> plot_vtk(fundi_file)  # doctest: +SKIP
 
     """
 
     # Extract a skeleton to connect endpoints in a fold:
     import os
+    import shutil
+    import tempfile
     import numpy as np
     from time import time
 
-    from mindboggle.utils.io_vtk import read_scalars, read_vtk, rewrite_scalars
+    from mindboggle.utils.io_vtk import read_scalars, read_vtk, \
+        read_arrays, rewrite_scalars
     from mindboggle.utils.compute import median_abs_dev
     from mindboggle.utils.paths import find_max_values
-    from mindboggle.utils.mesh import find_neighbors_from_file
-    from mindboggle.utils.paths import find_outer_anchors, connect_points_erosion
+    from mindboggle.utils.mesh import find_neighbors, extract_submesh
+    from mindboggle.utils.utils import run_task_batches
+    from mindboggle.utils.logs import get_logger, log_progress
+    from mindboggle.features.fundi import extract_fundus_from_fold
 
-    # Load values, threshold, and neighbors:
-    u1,u2,u3, points, npoints, curvs, u4,u5 = read_vtk(curv_file, True,True)
-    depths, name = read_scalars(depth_file, True, True)
-    values = curvs * depths
-    values0 = [x for x in values if x > 0]
-    thr = np.median(values0) + 2 * median_abs_dev(values0)
-    neighbor_lists = find_neighbors_from_file(curv_file)
+    logger = get_logger('mindboggle.features.fundi')
 
-    #-------------------------------------------------------------------------
-    # Loop through folds:
-    #-------------------------------------------------------------------------
-    t1 = time()
-    skeletons = []
-    unique_fold_IDs = [x for x in np.unique(folds) if x != -1]
-
-    if len(unique_fold_IDs) == 1:
-        print("Extract a fundus from 1 fold...")
-    else:
-        print("Extract a fundus from each of {0} folds...".
-              format(len(unique_fold_IDs)))
-
-    for fold_ID in unique_fold_IDs:
-        indices_fold = [i for i,x in enumerate(folds) if x == fold_ID]
-        if indices_fold:
-            print('  Fold {0}:'.format(int(fold_ID)))
-
-            #-----------------------------------------------------------------
-            # Find outer anchor points on the boundary of the surface region,
-            # to serve as fundus endpoints :
-            #-----------------------------------------------------------------
-            outer_anchors, tracks = find_outer_anchors(indices_fold,
-                neighbor_lists, values, depths, min_separation)
-
-            #-----------------------------------------------------------------
-            # Find inner anchor points:
-            #-----------------------------------------------------------------
-            inner_anchors = find_max_values(points, values, min_separation, thr)
-
-            #-----------------------------------------------------------------
-            # Connect endpoints to create skeleton:
-            #-----------------------------------------------------------------
-            B = -1 * np.ones(npoints)
-            B[indices_fold] = 1
-            skeleton = connect_points_erosion(B, neighbor_lists,
-                outer_anchors, inner_anchors, values,
-                erode_ratio, erode_min_size, save_steps=[], save_vtk='')
+    # Memory per patch vertex of a task, measured (as Python object sizes)
+    # on the synthetic surfaces of mindboggle/testing/fixtures.py with
+    # 10,242 and 40,962 vertices: a task (faces, values, depths and fold
+    # indices) takes 255-275 bytes, and the patch's neighbor lists built
+    # in extract_fundus_from_fold() take 165 bytes:
+    bytes_per_vertex = 450
+
+    # Load values, threshold, and neighbors
+    # (as memory-mapped arrays with a memory budget):
+    memmap_path = ''
+    if memory_budget:
+        memmap_path = tempfile.mkdtemp(dir=os.getcwd())
+    try:
+        if memory_budget:
+            faces, points, npoints, curvs, name = read_arrays(curv_file,
+                                                              memmap_path)
+        else:
+            faces, u1,u2, points, npoints, curvs, u3,u4 = read_vtk(curv_file,
+                                                                   True,True)
+            faces = np.asarray(faces)
+        depths, name = read_scalars(depth_file, True, True)
+        values = curvs * depths
+        values0 = [x for x in values if x > 0]
+        thr = np.median(values0) + 2 * median_abs_dev(values0)
+        neighbor_lists = find_neighbors(faces, npoints)
+        fold_array = np.asarray(folds)
+
+        #---------------------------------------------------------------------
+        # Find inner anchor points (the same for all folds):
+        #---------------------------------------------------------------------
+        t1 = time()
+        inner_anchors = find_max_values(points, values, min_separation, thr)
+        is_inner_anchor = np.zeros(npoints, dtype=bool)
+        is_inner_anchor[inner_anchors] = True
+        log_progress(logger, 'extract_fundi', step='inner_anchors',
+                     n_inner_anchors=len(inner_anchors),
+                     elapsed=round(time() - t1, 3))
+
+        #---------------------------------------------------------------------
+        # Construct a task for each fold from a surface mesh patch
+        # extending min_separation edges beyond the fold
+        # (far enough for find_outer_anchors() to separate endpoints):
+        #---------------------------------------------------------------------
+        unique_fold_IDs = [x for x in np.unique(fold_array) if x != -1]
+
+        if len(unique_fold_IDs) == 1:
+            logger.info("Extract a fundus from 1 fold...")
+        else:
+            logger.info("Extract a fundus from each of {0} folds...".
+                        format(len(unique_fold_IDs)))
+
+        patches = []
+
+        def fold_tasks():
+            for fold_ID in unique_fold_IDs:
+                indices_fold = np.where(fold_array == fold_ID)[0].tolist()
+                if indices_fold:
+                    sub_faces, u1, sub_indices = extract_submesh(indices_fold,
+                        faces, neighbor_lists, nedges=min_separation + 1)
+                    sub_indices = np.array(sub_indices, dtype=int)
+                    in_fold = fold_array[sub_indices] == fold_ID
+                    local = np.where(in_fold)[0].tolist()
+                    local_inner_anchors = np.where(
+                        is_inner_anchor[sub_indices] & in_fold)[0]
+                    patches.append(sub_indices)
+                    yield ((fold_ID, local, sub_faces, values[sub_indices],
+                            depths[sub_indices], local_inner_anchors.tolist(),
+                            min_separation, erode_ratio, erode_min_size),
+                           len(sub_indices))
+
+        #---------------------------------------------------------------------
+        # Extract a skeleton from each fold (in batches with a memory budget):
+        #---------------------------------------------------------------------
+        skeletons = []
+        max_vertices = memory_budget * 2**20 / bytes_per_vertex
+        local_skeletons = run_task_batches(extract_fundus_from_fold,
+                                           fold_tasks(), n_processes,
+                                           max_vertices)
+        for sub_indices, skeleton in zip(patches, local_skeletons):
             if skeleton:
-                skeletons.extend(skeleton)
+                skeletons.extend(sub_indices[skeleton].tolist())
+
+        #---------------------------------------------------------------------
+        # Create fundi by segmenting skeletons with overlapping sulcus labels:
+        #---------------------------------------------------------------------
+        fundi = -1 * np.ones(npoints)
+        indices = [x for x in skeletons if sulci[x] != -1]
+        fundi[indices] = sulci[indices]
+
+        n_fundi = len([x for x in np.unique(fundi) if x != -1])
+        if n_fundi == 1:
+            sdum = 'fundus'
+        else:
+            sdum = 'fundi'
+        logger.info('  ...Extracted {0} {1} ({2:.2f} seconds)'.
+                    format(n_fundi, sdum, time() - t1))
+        log_progress(logger, 'extract_fundi', step='done',
+                     n_folds=len(unique_fold_IDs), n_fundi=n_fundi,
+                     elapsed=round(time() - t1, 3))
+
+        #---------------------------------------------------------------------
+        # Return fundi, number of fundi, and file name:
+        #---------------------------------------------------------------------
+        fundi = fundi.tolist()
+
+        if save_file:
+            fundi_file = os.path.join(os.getcwd(), 'fundi.vtk')
+            rewrite_scalars(curv_file, fundi_file, fundi, 'fundi', folds)
+        else:
+            fundi_file = None
+    finally:
+        if memmap_path:
+            shutil.rmtree(memmap_path)
+
+    return fundi, n_fundi, fundi_file
+
+
+#=============================================================================
+# Extract a fundus from a single fold
+#=============================================================================
+def extract_fundus_from_fold(fold_task):
+    """
+    Extract a fundus skeleton from a single fold (a task of extract_fundi()).
+
+    Parameters
+    ----------
+    fold_task : tuple
+        (fold_ID, indices_fold, faces, values, depths, inner_anchors,
+        min_separation, erode_ratio, erode_min_size), with indices_fold,
+        faces and inner_anchors indexing the vertices of a surface mesh patch
+        containing the fold, and values and depths for all patch vertices
+        (see extract_fundi() for a description of the other parameters)
+
+    Returns
+    -------
+    skeleton : list of integers
+        indices to skeleton vertices of the patch
+
+    Examples
+    --------
+    >>> from mindboggle.features.fundi import extract_fundus_from_fold
+    >>> # See extract_fundi()
+
+    """
+    import numpy as np
+    from time import time
+    from mindboggle.utils.mesh import find_neighbors
+    from mindboggle.utils.paths import find_outer_anchors, connect_points_erosion
+    from mindboggle.utils.logs import get_logger, log_progress
+
+    logger = get_logger('mindboggle.features.fundi')
+    t0 = time()
+
+    fold_ID, indices_fold, faces, values, depths, inner_anchors, \
+        min_separation, erode_ratio, erode_min_size = fold_task
+    npoints = len(values)
+    neighbor_lists = find_neighbors(faces, npoints)
+
+    logger.info('  Fold {0}:'.format(int(fold_ID)))
 
     #-------------------------------------------------------------------------
-    # Create fundi by segmenting skeletons with overlapping sulcus labels:
+    # Find outer anchor points on the boundary of the surface region,
+    # to serve as fundus endpoints :
     #-------------------------------------------------------------------------
-    fundi = -1 * np.ones(npoints)
-    indices = [x for x in skeletons if sulci[x] != -1]
-    fundi[indices] = sulci[indices]
-
-    n_fundi = len([x for x in np.unique(fundi) if x != -1])
-    if n_fundi == 1:
-        sdum = 'fundus'
-    else:
-        sdum = 'fundi'
-    print('  ...Extracted {0} {1} ({2:.2f} seconds)'.
-          format(n_fundi, sdum, time() - t1))
+    outer_anchors, tracks = find_outer_anchors(indices_fold,
+        neighbor_lists, values, depths, min_separation)
 
     #-------------------------------------------------------------------------
-    # Return fundi, number of fundi, and file name:
+    # Connect endpoints to create skeleton:
     #-------------------------------------------------------------------------
-    fundi = fundi.tolist()
+    B = -1 * np.ones(npoints)
+    B[indices_fold] = 1
+    skeleton = connect_points_erosion(B, neighbor_lists,
+        outer_anchors, inner_anchors, values,
+        erode_ratio, erode_min_size, save_steps=[], save_vtk='')
 
-    if save_file:
-        fundi_file = os.path.join(os.getcwd(), 'fundi.vtk')
-        rewrite_scalars(curv_file, fundi_file, fundi, 'fundi', folds)
-    else:
-        fundi_file = None
+    log_progress(logger, 'extract_fundus_from_fold', fold=int(fold_ID),
+                 n_vertices=len(indices_fold), n_skeleton=len(skeleton),
+                 elapsed=round(time() - t0, 3))
 
-    return fundi, n_fundi, fundi_file
+    return skeleton
 
 
 # Example
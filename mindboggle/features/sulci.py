@@ -13,7 +13,8 @@ Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
 # Extract sulci
 #=============================================================================
 def extract_sulci(labels_file, folds_or_file, hemi, sulcus_label_pair_lists,
-                  unique_sulcus_label_pairs, min_boundary=1, sulcus_names=[]):
+                  unique_sulcus_label_pairs, min_boundary=1, sulcus_names=[],
+                  n_processes=1, memory_budget=0):
     """
     Identify sulci from folds in a brain surface according to a labeling
     protocol that includes a list of label pairs defining each sulcus.
@@ -29,6 +30,15 @@ def extract_sulci(labels_file, folds_or_file, hemi, sulcus_label_pair_lists,
         4. If there are remaining vertices, segment into sets of vertices
            connected to label boundaries, and assign a unique ID to each segment.
 
+    Folds are processed independently on surface mesh patches around them
+    (see extract_sulci_from_fold()), optionally over a pool of processes;
+    the sulci do not depend on the number of processes.
+
+    With a memory budget (for high-resolution surfaces), the surface is
+    kept in memory-mapped arrays instead of lists, and the folds are
+    processed in batches of patches that fit in the budget; the sulci
+    are the same as without a budget.
+
     Parameters
     ----------
     labels_file : string
@@ -46,6 +56,13 @@ def extract_sulci(labels_file, folds_or_file, hemi, sulcus_label_pair_lists,
         minimum number of vertices for a sulcus label boundary segment
     sulcus_names : list of strings
         names of sulci
+    n_processes : integer
+        number of processes to extract sulci from folds in parallel
+    memory_budget : integer
+        approximate memory (megabytes) for fold patches processed at once
+        (0 for no limit); this bounds only the fold patches: the whole
+        surface is in memory-mapped arrays, but its neighbor lists
+        (about 240 bytes per vertex) are built in memory regardless
 
     Returns
     -------
@@ -58,37 +75,50 @@ def extract_sulci(labels_file, folds_or_file, hemi, sulcus_label_pair_lists,
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
-    >>> from mindboggle.labels.protocol import dkt_protocol
-    >>> from mindboggle.features.sulci import extract_sulci
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.labels.protocol import dkt_protocol  # doctest: +SKIP
+    >>> from mindboggle.features.sulci import extract_sulci  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
     >>> # Load labels, folds, neighbor lists, and sulcus names and label pairs
-    >>> labels_file = os.path.join(path, 'arno', 'labels', 'relabeled_lh.DKTatlas40.gcs.vtk')
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds_or_file, name = read_scalars(folds_file)
-    >>> protocol = 'DKT31'
-    >>> hemi = 'lh'
-    >>> sulcus_names, sulcus_label_pair_lists, unique_sulcus_label_pairs,
+    >>> labels_file = os.path.join(path, 'arno', 'labels', 'relabeled_lh.DKTatlas40.gcs.vtk')  # doctest: +SKIP
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> folds_or_file, name = read_scalars(folds_file)  # doctest: +SKIP
+    >>> protocol = 'DKT31'  # doctest: +SKIP
+    >>> hemi = 'lh'  # doctest: +SKIP
+    >>> sulcus_names, sulcus_label_pair_lists, unique_sulcus_label_pairs,  # doctest: +SKIP
     ...    label_names, label_numbers, cortex_names, cortex_numbers,
     ...    noncortex_names, noncortex_numbers = dkt_protocol(protocol)
-    >>> min_boundary = 10
+    >>> min_boundary = 10  # doctest: +SKIP
     >>> #
-    >>> sulci, n_sulci, sulci_file = extract_sulci(labels_file, folds_or_file,
-    >>>     hemi, sulcus_label_pair_lists, unique_sulcus_label_pairs,
-    >>>     min_boundary, sulcus_names)
+    >>> sulci, n_sulci, sulci_file = extract_sulci(labels_file, folds_or_file,  # doctest: +SKIP
+    >>>     hemi, sulcus_label_pair_lists, unique_sulcus_label_pairs,  # doctest: +SKIP
+    >>>     min_boundary, sulcus_names)  # doctest: +SKIP
     >>> # View:
-    >>> plot_vtk('sulci.vtk')
+    >>> plot_vtk('sulci.vtk')  # doctest: +SKIP
 
     """
     import os
+    import shutil
+    import tempfile
     from time import time
     import numpy as np
-    from mindboggle.utils.io_vtk import read_scalars, read_vtk, rewrite_scalars
-    from mindboggle.utils.mesh import find_neighbors
-    from mindboggle.labels.labels import extract_borders
-    from mindboggle.utils.segment import propagate, segment
+    from mindboggle.utils.io_vtk import read_scalars, read_vtk, \
+        read_arrays, rewrite_scalars
+    from mindboggle.utils.mesh import find_neighbors, extract_submesh
+    from mindboggle.utils.utils import run_task_batches
+    from mindboggle.utils.logs import get_logger, log_progress
+    from mindboggle.features.sulci import extract_sulci_from_fold
+
+    logger = get_logger('mindboggle.features.sulci')
+
+    # Memory per patch vertex of a task, measured (as Python object sizes)
+    # on the synthetic surfaces of mindboggle/testing/fixtures.py with
+    # 10,242 and 40,962 vertices: a task (faces, points, labels and fold
+    # indices) takes 470-580 bytes, and the patch's neighbor lists built
+    # in extract_sulci_from_fold() take 165 bytes:
+    bytes_per_vertex = 750
 
 
     # Load fold numbers if folds_or_file is a string
@@ -102,236 +132,326 @@ def extract_sulci(labels_file, folds_or_file, hemi, sulcus_label_pair_lists,
     elif hemi == 'rh':
         sulcus_label_pair_lists = sulcus_label_pair_lists[1]
     else:
-        print("Warning: hemisphere not properly specified ('lh' or 'rh').")
+        logger.warning("Hemisphere not properly specified ('lh' or 'rh').")
 
     # Load points, faces, and neighbors
-    faces, foo1, foo2, points, npoints, labels, foo3, foo4 = read_vtk(labels_file)
-    neighbor_lists = find_neighbors(faces, npoints)
+    # (as memory-mapped arrays with a memory budget):
+    memmap_path = ''
+    if memory_budget:
+        memmap_path = tempfile.mkdtemp(dir=os.getcwd())
+    try:
+        if memory_budget:
+            faces, points, npoints, labels, name = read_arrays(labels_file,
+                                                               memmap_path)
+        else:
+            faces, foo1, foo2, points, npoints, labels, foo3, foo4 = \
+                read_vtk(labels_file)
+            faces = np.asarray(faces)
+            points = np.asarray(points)
+        neighbor_lists = find_neighbors(faces, npoints)
+        labels = np.asarray(labels)
+        fold_array = np.asarray(folds)
+
+        # Array of sulcus IDs for fold vertices, initialized as -1.
+        # Since we do not touch gyral vertices and vertices whose labels
+        # are not in the label list, or vertices having only one label,
+        # their sulcus IDs will remain -1.
+        sulci = -1 * np.ones(npoints)
+
+        #---------------------------------------------------------------------
+        # Construct a task for each fold from a surface mesh patch
+        # extending one edge beyond the fold (to include its label borders):
+        #---------------------------------------------------------------------
+        fold_numbers = [int(x) for x in np.unique(fold_array) if x > -1]
+        n_folds = len(fold_numbers)
+        logger.info("Extract sulci from {0} folds...".format(n_folds))
+        t0 = time()
+        patches = []
+
+        def fold_tasks():
+            for n_fold in fold_numbers:
+                fold = np.where(fold_array == n_fold)[0].tolist()
+                sub_faces, u1, sub_indices = extract_submesh(fold, faces,
+                    neighbor_lists, nedges=1)
+                sub_indices = np.array(sub_indices, dtype=int)
+                sub_points = points[sub_indices].tolist()
+                local_fold = np.where(
+                    fold_array[sub_indices] == n_fold)[0].tolist()
+                patches.append(sub_indices)
+                yield ((n_fold, local_fold, sub_faces, sub_points,
+                        labels[sub_indices].tolist(), sulcus_label_pair_lists,
+                        unique_sulcus_label_pairs, min_boundary, sulcus_names),
+                       len(sub_indices))
+
+        #---------------------------------------------------------------------
+        # Extract sulci from each fold (in batches with a memory budget):
+        #---------------------------------------------------------------------
+        max_vertices = memory_budget * 2**20 / bytes_per_vertex
+        fold_sulci = run_task_batches(extract_sulci_from_fold, fold_tasks(),
+                                      n_processes, max_vertices)
+        for sub_indices, sulci_patch in zip(patches, fold_sulci):
+            assigned = sulci_patch > -1
+            sulci[sub_indices[assigned]] = sulci_patch[assigned]
+
+        #---------------------------------------------------------------------
+        # Log assigned and unresolved sulci
+        # (each list as one message, so that parallel processes do not
+        # interleave their lines):
+        #---------------------------------------------------------------------
+        def sulcus_list(numbers):
+            if len(sulcus_names):
+                return '\n'.join(["  {0}: {1}".format(x, sulcus_names[x])
+                                  for x in numbers])
+            else:
+                return "  " + ", ".join([str(x) for x in numbers])
+
+        sulcus_numbers = [int(x) for x in np.unique(sulci) if x > -1]
+        n_sulci = len(sulcus_numbers)
+        logger.info("Extracted {0} sulci from {1} folds ({2:.1f}s):\n{3}".
+                    format(n_sulci, n_folds, time()-t0,
+                           sulcus_list(sulcus_numbers)))
+
+        unresolved = [i for i in range(len(sulcus_label_pair_lists))
+                      if i not in sulcus_numbers]
+        if len(unresolved) == 1:
+            logger.info("The following sulcus is unaccounted for:\n{0}".
+                        format(sulcus_list(unresolved)))
+        else:
+            logger.info("The following {0} sulci are unaccounted for:\n{1}".
+                        format(len(unresolved), sulcus_list(unresolved)))
+        log_progress(logger, 'extract_sulci', n_folds=n_folds,
+                     n_sulci=n_sulci, n_unresolved=len(unresolved),
+                     elapsed=round(time() - t0, 3))
+
+        #---------------------------------------------------------------------
+        # Return sulci, number of sulci, and file name
+        #---------------------------------------------------------------------
+        sulci_file = os.path.join(os.getcwd(), 'sulci.vtk')
+        rewrite_scalars(labels_file, sulci_file, sulci, 'sulci', sulci)
+        sulci = sulci.tolist()
+    finally:
+        if memmap_path:
+            shutil.rmtree(memmap_path)
+
+    return sulci, n_sulci, sulci_file
+
+
+#=============================================================================
+# Extract sulci from a single fold
+#=============================================================================
+def extract_sulci_from_fold(fold_task):
+    """
+    Identify sulci in a single fold (a task of extract_sulci()).
+
+    Parameters
+    ----------
+    fold_task : tuple
+        (n_fold, fold, faces, points, labels, sulcus_label_pair_lists,
+        unique_sulcus_label_pairs, min_boundary, sulcus_names),
+        with fold and faces indexing the vertices of a surface mesh patch
+        containing the fold, points and labels for all patch vertices,
+        and sulcus_label_pair_lists for a single hemisphere
+        (see extract_sulci() for a description of the other parameters)
+
+    Returns
+    -------
+    sulci : numpy array of integers
+        sulcus numbers for all patch vertices (-1 for non-sulcus vertices)
+
+    Examples
+    --------
+    >>> from mindboggle.features.sulci import extract_sulci_from_fold
+    >>> # See extract_sulci()
+
+    """
+    import numpy as np
+    from mindboggle.utils.mesh import find_neighbors
+    from mindboggle.labels.labels import extract_borders
+    from mindboggle.utils.segment import propagate, segment
+    from mindboggle.utils.logs import get_logger
 
-    # Array of sulcus IDs for fold vertices, initialized as -1.
-    # Since we do not touch gyral vertices and vertices whose labels
-    # are not in the label list, or vertices having only one label,
-    # their sulcus IDs will remain -1.
+    logger = get_logger('mindboggle.features.sulci')
+
+    n_fold, fold, faces, points, labels, sulcus_label_pair_lists, \
+        unique_sulcus_label_pairs, min_boundary, sulcus_names = fold_task
+    npoints = len(points)
+    neighbor_lists = find_neighbors(faces, npoints)
     sulci = -1 * np.ones(npoints)
 
+    len_fold = len(fold)
+    # List the labels in this fold (greater than zero)
+    fold_labels = [labels[x] for x in fold]
+    unique_fold_labels = [int(x) for x in np.unique(fold_labels) if x > 0]
+
     #-------------------------------------------------------------------------
-    # Loop through folds
+    # NO MATCH -- fold has fewer than two labels
     #-------------------------------------------------------------------------
-    fold_numbers = [int(x) for x in np.unique(folds) if x > -1]
-    n_folds = len(fold_numbers)
-    print("Extract sulci from {0} folds...".format(n_folds))
-    t0 = time()
-    for n_fold in fold_numbers:
-        fold = [i for i,x in enumerate(folds) if x == n_fold]
-        len_fold = len(fold)
-        # List the labels in this fold (greater than zero)
-        fold_labels = [labels[x] for x in fold]
-        unique_fold_labels = [int(x) for x in np.unique(fold_labels) if x > 0]
+    if len(unique_fold_labels) < 2:
+        # Ignore: sulci already initialized with -1 values
+        if not unique_fold_labels:
+            logger.debug("  Fold {0} ({1} vertices): NO MATCH -- fold has no labels".
+                         format(n_fold, len_fold))
+        else:
+            logger.debug("  Fold {0} ({1} vertices): "
+                         "NO MATCH -- fold has only one label ({2})".
+                         format(n_fold, len_fold, unique_fold_labels[0]))
+        # Ignore: sulci already initialized with -1 values
 
+    else:
+        # Find all label boundary pairs within the fold
+        indices_fold_pairs, fold_pairs, unique_fold_pairs = extract_borders(
+            fold, labels, neighbor_lists, ignore_values=[],
+            return_label_pairs=True)
+
+        # Find fold label pairs in the protocol (pairs are already sorted)
+        fold_pairs_in_protocol = [x for x in unique_fold_pairs
+                                  if x in unique_sulcus_label_pairs]
+
+        if unique_fold_labels:
+            logger.debug("  Fold {0} labels: {1} ({2} vertices)".format(n_fold,
+                         ', '.join([str(x) for x in unique_fold_labels]), len_fold))
         #---------------------------------------------------------------------
-        # NO MATCH -- fold has fewer than two labels
+        # NO MATCH -- fold has no sulcus label pair
         #---------------------------------------------------------------------
-        if len(unique_fold_labels) < 2:
-            # Ignore: sulci already initialized with -1 values
-            if not unique_fold_labels:
-                print("  Fold {0} ({1} vertices): NO MATCH -- fold has no labels".
-                      format(n_fold, len_fold))
-            else:
-                print("  Fold {0} ({1} vertices): "
-                  "NO MATCH -- fold has only one label ({2})".
-                  format(n_fold, len_fold, unique_fold_labels[0]))
-            # Ignore: sulci already initialized with -1 values
+        if not fold_pairs_in_protocol:
+            logger.debug("  Fold {0}: NO MATCH -- fold has no sulcus label pair".
+                         format(n_fold, len_fold))
 
+        #---------------------------------------------------------------------
+        # Possible matches
+        #---------------------------------------------------------------------
         else:
-            # Find all label boundary pairs within the fold
-            indices_fold_pairs, fold_pairs, unique_fold_pairs = extract_borders(
-                fold, labels, neighbor_lists, ignore_values=[],
-                return_label_pairs=True)
-
-            # Find fold label pairs in the protocol (pairs are already sorted)
-            fold_pairs_in_protocol = [x for x in unique_fold_pairs
-                                      if x in unique_sulcus_label_pairs]
-
-            if unique_fold_labels:
-                print("  Fold {0} labels: {1} ({2} vertices)".format(n_fold,
-                      ', '.join([str(x) for x in unique_fold_labels]), len_fold))
-            #-----------------------------------------------------------------
-            # NO MATCH -- fold has no sulcus label pair
-            #-----------------------------------------------------------------
-            if not fold_pairs_in_protocol:
-                print("  Fold {0}: NO MATCH -- fold has no sulcus label pair".
-                      format(n_fold, len_fold))
+            logger.debug("  Fold {0} label pairs in protocol: {1}".format(n_fold,
+                         ', '.join([str(x) for x in fold_pairs_in_protocol])))
+
+            # Labels in the protocol (includes repeats across label pairs)
+            labels_in_pairs = [x for lst in fold_pairs_in_protocol for x in lst]
+
+            # Labels that appear in one or more than one sulcus label boundary
+            unique_labels = []
+            nonunique_labels = []
+            for label in np.unique(labels_in_pairs):
+                if len([x for x in labels_in_pairs if x == label]) == 1:
+                    unique_labels.append(label)
+                else:
+                    nonunique_labels.append(label)
 
             #-----------------------------------------------------------------
-            # Possible matches
+            # Vertices whose labels are in only one sulcus label pair
             #-----------------------------------------------------------------
-            else:
-                print("  Fold {0} label pairs in protocol: {1}".format(n_fold,
-                      ', '.join([str(x) for x in fold_pairs_in_protocol])))
-
-                # Labels in the protocol (includes repeats across label pairs)
-                labels_in_pairs = [x for lst in fold_pairs_in_protocol for x in lst]
-
-                # Labels that appear in one or more than one sulcus label boundary
-                unique_labels = []
-                nonunique_labels = []
-                for label in np.unique(labels_in_pairs):
-                    if len([x for x in labels_in_pairs if x == label]) == 1:
-                        unique_labels.append(label)
-                    else:
-                        nonunique_labels.append(label)
-
-                #-------------------------------------------------------------
-                # Vertices whose labels are in only one sulcus label pair
-                #-------------------------------------------------------------
-                # Find vertices with a label that is in only one of the fold's
-                # label pairs (the other label in the pair can exist
-                # in other pairs). Assign the vertices the sulcus with the label
-                # pair if they are connected to the label boundary for that pair.
-                #-------------------------------------------------------------
-                if len(unique_labels):
-
-                    for pair in fold_pairs_in_protocol:
-                        # If one or both labels in label pair is/are unique
-                        unique_labels_in_pair = [x for x in pair if x in unique_labels]
-                        n_unique = len(unique_labels_in_pair)
-                        if n_unique:
-
-                            ID = [i for i,x in enumerate(sulcus_label_pair_lists)
-                                  if pair in x][0]
-
-                            # Construct seeds from label boundary vertices
-                            # (fold_pairs and pair already sorted)
-                            indices_pair = [x for i,x in enumerate(indices_fold_pairs)
-                                            if fold_pairs[i] == pair]
-
-                            # Identify vertices with unique label(s) in pair
-                            indices_unique_labels = [fold[i]
-                                                     for i,x in enumerate(fold_labels)
-                                                     if x in unique_sulcus_label_pairs]
-
-                            # Propagate from seeds to labels in label pair
-                            sulci2 = segment(indices_unique_labels, neighbor_lists,
-                                             min_region_size=1,
-                                             seed_lists=[indices_pair],
-                                             keep_seeding=False,
-                                             spread_within_labels=True,
-                                             labels=labels)
-                            sulci[sulci2 > -1] = ID
-
-                            # Print statement
-                            if n_unique == 1:
-                                ps1 = '1 label'
-                            else:
-                                ps1 = 'Both labels'
-                            if len(sulcus_names):
-                                ps2 = sulcus_names[ID]
-                            else:
-                                ps2 = ''
-                            print("    {0} unique to one fold pair: {1} {2}".
-                                  format(ps1, ps2, unique_labels_in_pair))
-
-                #-------------------------------------------------------------
-                # Vertex labels shared by multiple label pairs
-                #-------------------------------------------------------------
-                # Propagate labels from label borders to vertices with labels
-                # that are shared by multiple label pairs in the fold.
-                #-------------------------------------------------------------
-                if len(nonunique_labels):
-                    # For each label shared by different label pairs
-                    for label in nonunique_labels:
-                        # Print statement
-                        print("    Propagate sulcus label borders with label {0}".
-                              format(int(label)))
+            # Find vertices with a label that is in only one of the fold's
+            # label pairs (the other label in the pair can exist
+            # in other pairs). Assign the vertices the sulcus with the label
+            # pair if they are connected to the label boundary for that pair.
+            #-----------------------------------------------------------------
+            if len(unique_labels):
 
-                        # Construct seeds from label boundary vertices
-                        seeds = -1 * np.ones(len(points))
-                        for ID, label_pair_list in enumerate(sulcus_label_pair_lists):
-                            label_pairs = [x for x in label_pair_list if label in x]
-                            for label_pair in label_pairs:
-                                indices_pair = [x for i,x in enumerate(indices_fold_pairs)
-                                    if np.sort(fold_pairs[i]).tolist() == label_pair]
-                                if indices_pair:
-
-                                    # Do not include short boundary segments
-                                    if min_boundary > 1:
-                                        indices_pair2 = []
-                                        seeds2 = segment(indices_pair, neighbor_lists)
-                                        for seed2 in range(int(max(seeds2))+1):
-                                            iseed2 = [i for i,x in enumerate(seeds2)
-                                                      if x == seed2]
-                                            if len(iseed2) >= min_boundary:
-                                                indices_pair2.extend(iseed2)
-                                            else:
-                                                if len(iseed2) == 1:
-                                                    print("    Remove assignment "
-                                                          "of ID {0} from 1 vertex".
-                                                          format(seed2))
-                                                else:
-                                                    print("    Remove assignment "
-                                                          "of ID {0} from {1} vertices".
-                                                          format(seed2, len(iseed2)))
-                                        indices_pair = indices_pair2
-
-                                    # Assign sulcus IDs to seeds
-                                    seeds[indices_pair] = ID
-
-                        # Identify vertices with the label
-                        label_array = -1 * np.ones(len(points))
-                        indices_label = [fold[i] for i,x in enumerate(fold_labels)
-                                         if x == label]
-                        if len(indices_label):
-                            label_array[indices_label] = 1
-
-                            # Propagate from seeds to vertices with label
-                            #indices_seeds = []
-                            #for seed in range(int(max(seeds))+1):
-                            #    indices_seeds.append([i for i,x in enumerate(seeds)
-                            #                          if x == seed])
-                            #sulci2 = segment(indices_label, neighbor_lists,
-                            #                 50, indices_seeds, False, True, labels)
-                            sulci2 = propagate(points, faces,
-                                               label_array, seeds, sulci,
-                                               max_iters=10000,
-                                               tol=0.001, sigma=5)
-                            sulci[sulci2 > -1] = sulci2[sulci2 > -1]
+                for pair in fold_pairs_in_protocol:
+                    # If one or both labels in label pair is/are unique
+                    unique_labels_in_pair = [x for x in pair if x in unique_labels]
+                    n_unique = len(unique_labels_in_pair)
+                    if n_unique:
 
-    #-------------------------------------------------------------------------
-    # Print out assigned sulci
-    #-------------------------------------------------------------------------
-    sulcus_numbers = [int(x) for x in np.unique(sulci) if x > -1]
-    n_sulci = len(sulcus_numbers)
-    print("Extracted {0} sulci from {1} folds ({2:.1f}s):".
-          format(n_sulci, n_folds, time()-t0))
-    if len(sulcus_names):
-        for sulcus_number in sulcus_numbers:
-            print("  {0}: {1}".format(sulcus_number, sulcus_names[sulcus_number]))
-    else:
-        print("  " + ", ".join([str(x) for x in sulcus_numbers]))
+                        ID = [i for i,x in enumerate(sulcus_label_pair_lists)
+                              if pair in x][0]
 
-    #-------------------------------------------------------------------------
-    # Print out unresolved sulci
-    #-------------------------------------------------------------------------
-    unresolved = [i for i in range(len(sulcus_label_pair_lists))
-                  if i not in sulcus_numbers]
-    if len(unresolved) == 1:
-        print("The following sulcus is unaccounted for:")
-    else:
-        print("The following {0} sulci are unaccounted for:".format(len(unresolved)))
-    if len(sulcus_names):
-        for sulcus_number in unresolved:
-            print("  {0}: {1}".format(sulcus_number, sulcus_names[sulcus_number]))
-    else:
-        print("  " + ", ".join([str(x) for x in unresolved]))
+                        # Construct seeds from label boundary vertices
+                        # (fold_pairs and pair already sorted)
+                        indices_pair = [x for i,x in enumerate(indices_fold_pairs)
+                                        if fold_pairs[i] == pair]
+
+                        # Identify vertices with unique label(s) in pair
+                        indices_unique_labels = [fold[i]
+                                                 for i,x in enumerate(fold_labels)
+                                                 if x in unique_sulcus_label_pairs]
+
+                        # Propagate from seeds to labels in label pair
+                        sulci2 = segment(indices_unique_labels, neighbor_lists,
+                                         min_region_size=1,
+                                         seed_lists=[indices_pair],
+                                         keep_seeding=False,
+                                         spread_within_labels=True,
+                                         labels=labels)
+                        sulci[sulci2 > -1] = ID
 
-    #-------------------------------------------------------------------------
-    # Return sulci, number of sulci, and file name
-    #-------------------------------------------------------------------------
-    sulci_file = os.path.join(os.getcwd(), 'sulci.vtk')
-    rewrite_scalars(labels_file, sulci_file, sulci, 'sulci', sulci)
-    sulci.tolist()
+                        # Print statement
+                        if n_unique == 1:
+                            ps1 = '1 label'
+                        else:
+                            ps1 = 'Both labels'
+                        if len(sulcus_names):
+                            ps2 = sulcus_names[ID]
+                        else:
+                            ps2 = ''
+                        logger.debug("    {0} unique to one fold pair: {1} {2}".
+                                     format(ps1, ps2, unique_labels_in_pair))
 
-    return sulci, n_sulci, sulci_file
+            #-----------------------------------------------------------------
+            # Vertex labels shared by multiple label pairs
+            #-----------------------------------------------------------------
+            # Propagate labels from label borders to vertices with labels
+            # that are shared by multiple label pairs in the fold.
+            #-----------------------------------------------------------------
+            if len(nonunique_labels):
+                # For each label shared by different label pairs
+                for label in nonunique_labels:
+                    # Log statement
+                    logger.debug("    Propagate sulcus label borders with label {0}".
+                                 format(int(label)))
+
+                    # Construct seeds from label boundary vertices
+                    seeds = -1 * np.ones(len(points))
+                    for ID, label_pair_list in enumerate(sulcus_label_pair_lists):
+                        label_pairs = [x for x in label_pair_list if label in x]
+                        for label_pair in label_pairs:
+                            indices_pair = [x for i,x in enumerate(indices_fold_pairs)
+                                if np.sort(fold_pairs[i]).tolist() == label_pair]
+                            if indices_pair:
+
+                                # Do not include short boundary segments
+                                if min_boundary > 1:
+                                    indices_pair2 = []
+                                    seeds2 = segment(indices_pair, neighbor_lists)
+                                    for seed2 in range(int(max(seeds2))+1):
+                                        iseed2 = [i for i,x in enumerate(seeds2)
+                                                  if x == seed2]
+                                        if len(iseed2) >= min_boundary:
+                                            indices_pair2.extend(iseed2)
+                                        else:
+                                            if len(iseed2) == 1:
+                                                logger.debug("    Remove assignment "
+                                                             "of ID {0} from 1 vertex".
+                                                             format(seed2))
+                                            else:
+                                                logger.debug("    Remove assignment "
+                                                             "of ID {0} from {1} vertices".
+                                                             format(seed2, len(iseed2)))
+                                    indices_pair = indices_pair2
+
+                                # Assign sulcus IDs to seeds
+                                seeds[indices_pair] = ID
+
+                    # Identify vertices with the label
+                    label_array = -1 * np.ones(len(points))
+                    indices_label = [fold[i] for i,x in enumerate(fold_labels)
+                                     if x == label]
+                    if len(indices_label):
+                        label_array[indices_label] = 1
+
+                        # Propagate from seeds to vertices with label
+                        #indices_seeds = []
+                        #for seed in range(int(max(seeds))+1):
+                        #    indices_seeds.append([i for i,x in enumerate(seeds)
+                        #                          if x == seed])
+                        #sulci2 = segment(indices_label, neighbor_lists,
+                        #                 50, indices_seeds, False, True, labels)
+                        sulci2 = propagate(points, faces,
+                                           label_array, seeds, sulci,
+                                           max_iters=10000,
+                                           tol=0.001, sigma=5)
+                        sulci[sulci2 > -1] = sulci2[sulci2 > -1]
+
+    return sulci
 
 
 #if __name__ == "__main__":
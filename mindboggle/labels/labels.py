@@ -44,37 +44,37 @@ def extract_borders(indices, labels, neighbor_lists,
     Examples
     --------
     >>> # Small example:
-    >>> from mindboggle.labels.labels import extract_borders
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> indices = [0,1,2,4,5,8,9]
-    >>> labels = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100, -1, -1]
-    >>> neighbor_lists = [[1,2,3], [1,2], [2,3], [2], [4,7], [3,2,3]]
-    >>> extract_borders(indices, labels, neighbor_lists, [], True)
+    >>> from mindboggle.labels.labels import extract_borders  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> indices = [0,1,2,4,5,8,9]  # doctest: +SKIP
+    >>> labels = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100, -1, -1]  # doctest: +SKIP
+    >>> neighbor_lists = [[1,2,3], [1,2], [2,3], [2], [4,7], [3,2,3]]  # doctest: +SKIP
+    >>> extract_borders(indices, labels, neighbor_lists, [], True)  # doctest: +SKIP
         ([1, 2, 4, 5],
          [[20, 30], [30, 40], [50, 80], [30, 40]],
          [[20, 30], [30, 40], [50, 80]])
     >>> # Real example -- extract sulcus label boundaries:
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.mesh import find_neighbors
-    >>> from mindboggle.labels.labels import extract_borders
-    >>> from mindboggle.utils.io_vtk import read_vtk, rewrite_scalars
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> labels_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> faces, lines, indices, points, npoints, labels, name, input_vtk = read_vtk(labels_file,
-    >>>     return_first=True, return_array=True)
-    >>> neighbor_lists = find_neighbors(faces, npoints)
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors  # doctest: +SKIP
+    >>> from mindboggle.labels.labels import extract_borders  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_vtk, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> labels_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> faces, lines, indices, points, npoints, labels, name, input_vtk = read_vtk(labels_file,  # doctest: +SKIP
+    >>>     return_first=True, return_array=True)  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors(faces, npoints)  # doctest: +SKIP
     >>> #
-    >>> indices_borders, label_pairs, foo = extract_borders(range(npoints),
-    >>>     labels, neighbor_lists)
+    >>> indices_borders, label_pairs, foo = extract_borders(range(npoints),  # doctest: +SKIP
+    >>>     labels, neighbor_lists)  # doctest: +SKIP
     >>> #
     >>> # Write results to vtk file and view:
-    >>> IDs = -1 * np.ones(npoints)
-    >>> IDs[indices_borders] = 1
-    >>> rewrite_scalars(labels_file, 'extract_borders.vtk',
-    >>>                 IDs, 'borders', IDs)
-    >>> plot_vtk('extract_borders.vtk')
+    >>> IDs = -1 * np.ones(npoints)  # doctest: +SKIP
+    >>> IDs[indices_borders] = 1  # doctest: +SKIP
+    >>> rewrite_scalars(labels_file, 'extract_borders.vtk',  # doctest: +SKIP
+    >>>                 IDs, 'borders', IDs)  # doctest: +SKIP
+    >>> plot_vtk('extract_borders.vtk')  # doctest: +SKIP
 
     """
     import numpy as np
@@ -144,17 +144,17 @@ def extract_borders_2nd_surface(labels_file, mask_file='', values_file=''):
     Examples
     --------
     >>> # Extract depth values along label borders in sulci (mask):
-    >>> import os
-    >>> from mindboggle.labels.labels import extract_borders_2nd_surface
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> labels_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> mask_file = os.path.join(path, 'arno', 'features', 'sulci.vtk')
-    >>> values_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.labels.labels import extract_borders_2nd_surface  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> labels_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> mask_file = os.path.join(path, 'arno', 'features', 'sulci.vtk')  # doctest: +SKIP
+    >>> values_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')  # doctest: +SKIP
     >>> #
-    >>> border_file, border_values = extract_borders_2nd_surface(labels_file, mask_file, values_file)
+    >>> border_file, border_values = extract_borders_2nd_surface(labels_file, mask_file, values_file)  # doctest: +SKIP
     >>> #
-    >>> plot_vtk(border_file)
+    >>> plot_vtk(border_file)  # doctest: +SKIP
 
     """
     import os
@@ -126,7 +126,6 @@ Authors:
 Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
 
 """
-import numpy as np
 
 #=============================================================================
 # DKT protocol
@@ -17,10 +17,8 @@ Arno Klein, 2012-2013  .  arno@mindboggle.info  .  www.binarybottle.com
 import os
 import numpy as np
 from time import time
-from scipy.sparse import csr_matrix, lil_matrix
 
 from mindboggle.utils.io_vtk import write_vtk
-import mindboggle.utils.graph as go
 import mindboggle.utils.kernels as kernels
 
 #-----------------------------------------------------------------------------
@@ -72,33 +70,37 @@ class Bounds:
 #@        - consensus:  TO DO!
 
         """
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
+
         self.seed_labels = np.zeros(self.num_points)
 
         # To initialize with vertices flanking polylines,
         # find all vertices that are part of a triangle that includes
         # at least one polyline vertex, and store a 1 in the array self.seed_labels
         if init in ['flanks','lines_flanks']:
-            print('Initializing seed labels with polyline-flanking vertices...')
+            logger.info('Initializing seed labels with polyline-flanking vertices...')
             self.seed_labels[self.find_polylines_flanks()] = 1
 
         # To initialize with polylines, find all vertices that are part of a
         # polyline, and store a 1 in the array self.seed_labels
         if init in ['lines','lines_flanks']:
-            print('Initializing seed labels with polyline vertices...')
+            logger.info('Initializing seed labels with polyline vertices...')
             self.seed_labels[self.polyline_elements] = 1
 #@
         # To initialize with label boundaries, call find_label_boundary()
         if init == 'label_boundary':
-            print('Initializing seed labels with vertices of the label boundaries')
+            logger.info('Initializing seed labels with vertices of the label boundaries')
             self.find_label_boundary(output_filename=output_filename)
             self.seed_labels[self.label_boundary] = 1
 
         # To initialize with a fraction of random vertices,
         # init every 1/fraction label
         if init == 'random':
-            print('Initializing seed labels with random vertices...')
+            logger.info('Initializing seed labels with random vertices...')
             if fraction > 1:
-                print('Please enter a fractional number less than or equal to 1.')
+                logger.warning('Please enter a fractional number less than or equal to 1.')
                 return
             randoms = np.array([np.mod(i, int(1.0/fraction))
                                 for i in range(self.num_points)])
@@ -111,7 +113,7 @@ class Bounds:
         self.num_seed_labels = len(self.seed_labels[self.seed_labels>0])
         self.percent_seed_labels = (self.num_seed_labels+0.0) / self.num_points * 100
 
-        print('Percentage of seed labels: {0}'.format(self.percent_seed_labels))
+        logger.debug('Percentage of seed labels: {0}'.format(self.percent_seed_labels))
 
         return self.seed_labels
 
@@ -180,13 +182,17 @@ class Bounds:
                                        that vertex has a given label)
         """
         import sys
+        import mindboggle.utils.graph as go
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
 
         # Step 1. Construct affinity matrix - compute edge weights
         if self.Points.shape and self.Indices.shape and self.Faces.shape:
             self.affinity_matrix = go.weight_graph(self.Points, self.Indices,
                 self.Faces, kernel=kernel, sigma=sigma, add_to_graph=False)
         else:
-            print("  Missing data!")
+            logger.error("  Missing data!")
             sys.exit()
 
         # Step 2. Transform column of labels into n x C matrix, one column per label
@@ -197,12 +203,12 @@ class Bounds:
 
         # Step 3. Propagate Labels!
         if method == "propagate_labels":
-            print('Perform weighted average algorithm (max_iters={0})'.format(
-                  max_iters))
+            logger.info('Perform weighted average algorithm (max_iters={0})'.format(
+                        max_iters))
             # Construct self.learned_matrix matrix within method
             self.propagate_labels(realign, max_iters, tol, vis=vis)
         else:
-            print('That algorithm is not available.')
+            logger.warning('That algorithm is not available.')
 
     # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     #-------------------------------------------------------------------------
@@ -226,12 +232,16 @@ class Bounds:
 
         """
 
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
+
         # Go row by row (one vertex at a time),
         # and find the column with the maximum value
         try:
             max_col = np.argmax(self.learned_matrix, axis=1)
         except:
-            print('First call graph_based_learning().')
+            logger.warning('First call graph_based_learning().')
             return
 
         # Define an array called max_prob_label to store the final values
@@ -280,6 +290,12 @@ class Bounds:
         From the affinity matrix, one may construct the diagonal degree matrix,
         which is a measure of the total weight (or number of edges) attached to a vertex."""
 
+        from scipy.sparse import csr_matrix
+        import mindboggle.utils.graph as go
+        from mindboggle.utils.logs import get_logger, log_progress
+
+        logger = get_logger('mindboggle.labels.rebound')
+
         self.DDM = go.diagonal_degree_matrix(self.affinity_matrix, inverse=True)
 
         """ Next, we must initialize a vector to represent the results of the label
@@ -289,7 +305,8 @@ class Bounds:
         We will just check to make sure this has been accomplished."""
 
         if isinstance(self.seed_labels,int):
-            print('Please initialize the labels by calling self.initialize_seed_labels()')
+            logger.warning('Please initialize the labels by calling '
+                           'self.initialize_seed_labels()')
             return
 
         """ Now, we can actually proceed to perform the iterative algorithm.
@@ -338,8 +355,8 @@ class Bounds:
         for column in self.learned_matrix.T:
 
             t0 = time()
-            print('Number of initial members for label {0}: {1}'.format(
-                  i, np.nonzero(column==1)[0].size))
+            logger.info('Number of initial members for label {0}: {1}'.format(
+                        i, np.nonzero(column==1)[0].size))
 
             # Set up indices and values to be clamped during propagation
             if not realign:
@@ -400,20 +417,27 @@ class Bounds:
                 # reset
                 Y_hat_next[restore_indices, 0] = restore_values
                 # check convergence
-                converged = (np.sum(np.abs(Y_hat_now.todense() - Y_hat_next)) < tol)
-                # print('Iteration number {0}, convergence = {1}'.format(counter,np.sum(np.abs(column.todense() - tmp)))
+                change = np.sum(np.abs(Y_hat_now.todense() - Y_hat_next))
+                converged = change < tol
                 Y_hat_now = csr_matrix(Y_hat_next)
                 counter += 1
+                log_progress(logger, 'propagate_labels', interval=10,
+                             label=i, iteration=counter, change=change,
+                             tol=tol, elapsed=round(time() - t0, 3))
 
-            # Print out the number of iterations, so that we get a sense for future runs.
+            # Log the number of iterations, so that we get a sense for future runs.
             # It is also an indication of whether the algorithm converged.
 
-            if counter == max_iters:
-                print('Done in {0:.2f} seconds (the algorithm did not converge)'.
-                      format(time()-t0))
+            if not converged:
+                logger.warning('Done in {0:.2f} seconds (the algorithm did '
+                               'not converge)'.format(time()-t0))
             else:
-                print('Done in {0:.2f} seconds ({1} iterations)'.
-                      format(time()-t0, counter))
+                logger.info('Done in {0:.2f} seconds ({1} iterations)'.
+                            format(time()-t0, counter))
+            log_progress(logger, 'propagate_labels', step='done', label=i,
+                         iterations=counter, converged=bool(converged),
+                         max_iters=max_iters, tol=tol,
+                         elapsed=round(time() - t0, 3))
 
             self.learned_matrix[:,i] = Y_hat_now.todense().flatten()
 
@@ -470,6 +494,10 @@ class Bounds:
         self.Rlabel_boundary_file: string (VTK file name containing highlighted realigned label boundary)
 
         """
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
+
         if not realigned_labels:
             self.label_boundary = np.zeros(self.num_points)
         else:
@@ -512,7 +540,7 @@ class Bounds:
         else:
             self.Rlabel_boundary = np.nonzero(self.Rlabel_boundary==1)[0]
 
-        print('The label boundary array is: {0}'.format(self.label_boundary))
+        logger.debug('The label boundary array is: {0}'.format(self.label_boundary))
 
         if not realigned_labels:
             return self.label_boundary, self.label_boundary_file
@@ -570,6 +598,10 @@ class Bounds:
         self.highlighted_segment_file: string (VTK file with boundary segments highlighted according to label)
 
         """
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
+
         self.find_label_boundary_per_label()
 
         # Initialize dictionary for later ease of use
@@ -581,7 +613,7 @@ class Bounds:
 
         # Populate the dictionary with vertices
         for Class in self.set_manual_labels:
-            print Class
+            logger.debug('Label {0}'.format(Class))
             for vertex in self.label_boundary_per_label[Class]:
                 neighbors = self.neighbors(vertex)
                 A = set(self.Labels[neighbors])
@@ -597,7 +629,7 @@ class Bounds:
 
         # Print results
         for key in self.label_boundary_segments.keys():
-            print('For labels: {0} {1}'.format(key, self.label_boundary_segments[key]))
+            logger.debug('For labels: {0} {1}'.format(key, self.label_boundary_segments[key]))
 
         # Output the results to a VTK file
         self.highlighted_segment_file = 'highlighted_segments.vtk'
@@ -630,7 +662,11 @@ class Bounds:
 
         """
 
-        print('Finding intersection of segment with polylines...')
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
+
+        logger.debug('Finding intersection of segment with polylines...')
         intersection = [0,0]
 
         for i in range(2):
@@ -644,7 +680,7 @@ class Bounds:
 
                 if not neighbors:
                     pointer = -1
-                    print('No neighbors left to explore.')
+                    logger.debug('No neighbors left to explore.')
                     break
 
                 pointer = neighbors.pop()
@@ -652,10 +688,10 @@ class Bounds:
 
             intersection[i] = pointer
 
-        print('The intersection points are: {0}'.format(intersection))
+        logger.debug('The intersection points are: {0}'.format(intersection))
 
         if np.product(intersection) < 0:
-            print segment
+            logger.debug('Segment: {0}'.format(segment))
             labels = np.zeros(self.Labels.shape)
             labels[segment] = 100
             labels[endpoint] = 200
@@ -699,6 +735,10 @@ class Bounds:
 
         """
 
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
+
         # Step 0. Find number of segments
         self.num_segments = len(self.label_boundary_segments)
 
@@ -714,7 +754,7 @@ class Bounds:
             self.label_segment_matrix[value,label] = 1
             label += 1
 
-        print('Mapping is: {0}'.format(self.realignment_mapping))
+        logger.debug('Mapping is: {0}'.format(self.realignment_mapping))
 
         self.determine_appropriate_segments()
 
@@ -772,27 +812,31 @@ class Bounds:
         And the polylines should run somewhat parallel to the label boundary.
         """
 
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
+
         # Step 0. Construct num_polylines_vertices x num_label_boundary_vertices np array of distances:
-        print('Beginning determine_appropriate_segments()...')
+        logger.debug('Beginning determine_appropriate_segments()...')
         t0 = time()
 
-        print self.polyline_elements.shape
-        print self.label_boundary.shape
+        logger.debug('Polyline elements: {0}'.format(self.polyline_elements.shape))
+        logger.debug('Label boundary: {0}'.format(self.label_boundary.shape))
 
         distance_matrix = np.asarray([np.linalg.norm(self.Points[x1] - self.Points[x2])
                                           for x1 in self.polyline_elements
                                           for x2 in self.label_boundary]).reshape((self.polyline_elements.size, -1))
 
-        print('Distance Matrix has been constructed in {0}. Bounds is {1}.'.format(time() - t0, distance_matrix.shape))
+        logger.debug('Distance Matrix has been constructed in {0}. Bounds is {1}.'.format(time() - t0, distance_matrix.shape))
 
         # Step 1. For each fundus vertex, find the closest and second closest label boundary vertices,
 
         sorted_distances = np.argsort(distance_matrix)
-        print('Got sorted distances. Bounds is {0}'.format(sorted_distances.shape))
+        logger.debug('Got sorted distances. Bounds is {0}'.format(sorted_distances.shape))
 
         closest_label_boundary = sorted_distances[:,0]
-        print('Got closest label boundary. Bounds is {0}. First few values are {1}'.format(
-              closest_label_boundary.shape, closest_label_boundary[:10]))
+        logger.debug('Got closest label boundary. Bounds is {0}. First few values are {1}'.format(
+                     closest_label_boundary.shape, closest_label_boundary[:10]))
 
         dir = os.getcwd()
         self.highlight_vtk_vertices(self.label_boundary[closest_label_boundary], dir + '/close_vertices.vtk')
@@ -800,13 +844,13 @@ class Bounds:
         closest_polylines = np.argsort(distance_matrix, 0)[0,:]
 
         closest_distances = np.amin(distance_matrix, 1)
-        print('Got closest_distances. Bounds is {0}. First few values are {1}'.format(
-              closest_distances.shape, closest_distances[:10]))
+        logger.debug('Got closest_distances. Bounds is {0}. First few values are {1}'.format(
+                     closest_distances.shape, closest_distances[:10]))
 
         second_closest_distances = np.asarray([distance_matrix[i,sorted_distances[i,1]]
                                                for i in range(self.polyline_elements.size)])
-        print('Got second closest distances. Bounds is {0}. First few values are {1}'.format(
-              second_closest_distances.shape, second_closest_distances[:10]))
+        logger.debug('Got second closest distances. Bounds is {0}. First few values are {1}'.format(
+                     second_closest_distances.shape, second_closest_distances[:10]))
 
         # Let's try using a dictionary to express the mapping relationship.
         # We will have one which maps polylines vertices to nearest label boundary vertices.
@@ -820,21 +864,21 @@ class Bounds:
                              (self.polyline_elements[closest_polylines[i]],
                               distance_matrix[closest_polylines[i],i])) for i in range(self.label_boundary.size))
 
-        print('The polylines to label boundary mapping is: {0}'.format(polylines_lb))
-        print('The label boundary to polylines mapping is: {0}'.format(lb_polylines))
+        logger.debug('The polylines to label boundary mapping is: {0}'.format(polylines_lb))
+        logger.debug('The label boundary to polylines mapping is: {0}'.format(lb_polylines))
 
         # Step 2. Determine which obey proper proportions and distances, using parameters
         within_distance = (closest_distances < dist_threshold)
-        print('Got within distance. Num satisfy is {0}. First few are {1}'.format(
-              within_distance.nonzero()[0].size, within_distance[:10]))
+        logger.debug('Got within distance. Num satisfy is {0}. First few are {1}'.format(
+                     within_distance.nonzero()[0].size, within_distance[:10]))
 
         self.highlight_vtk_vertices(self.label_boundary[closest_label_boundary[within_distance==1]],
                                 dir + '/close_distance.vtk')
 
         within_proportion = np.bitwise_or((closest_distances / second_closest_distances > proportion),
                                           (second_closest_distances / (closest_distances+eps) > proportion))
-        print('Got within proportion. Num satisfy is {0}. First few are {1}'.format(
-              within_proportion.nonzero()[0].size, within_proportion[:10]))
+        logger.debug('Got within proportion. Num satisfy is {0}. First few are {1}'.format(
+                     within_proportion.nonzero()[0].size, within_proportion[:10]))
 
         self.highlight_vtk_vertices([self.label_boundary[closest_label_boundary[within_proportion==1]]],
                                 dir + '/good_proportion.vtk')
@@ -842,11 +886,11 @@ class Bounds:
         # The following array stores the indices of the label boundary vertices which satisfy the above properties.
         satisfy_distances = self.label_boundary[closest_label_boundary[np.nonzero(np.bitwise_and(within_distance,
                                                                                                  within_proportion))]]
-        print('Got satisfy distances. Bounds is {0}. They are {1}'.format(satisfy_distances.shape, satisfy_distances))
+        logger.debug('Got satisfy distances. Bounds is {0}. They are {1}'.format(satisfy_distances.shape, satisfy_distances))
 
         self.highlight_vtk_vertices(satisfy_distances, dir + '/satisfy_distance.vtk')
 
-        print('Currently, {0} vertices satisfy the distance requirement'.format(satisfy_distances.size))
+        logger.debug('Currently, {0} vertices satisfy the distance requirement'.format(satisfy_distances.size))
 
         # Ok, now here comes the critical step.
         # We have the array satisfy_distances. It stores the indices of the elite vertices, those which satisfy the first two properties.
@@ -870,13 +914,13 @@ class Bounds:
             spread = np.max(spread_matrix)
             if spread > spread_tol:
                 satisfy_distances = np.delete(satisfy_distances,np.nonzero(satisfy_distances == lbvertex))
-                print('deleted vertex: {0}'.format(lbvertex))
+                logger.debug('deleted vertex: {0}'.format(lbvertex))
 
                 #### AH! I'm changing that over which I'm iterating! Fix.
 
         self.highlight_vtk_vertices(satisfy_distances, dir + '/satisfy_distance_pruned.vtk')
 
-        print('After pruning, {0} vertices satisfy the distance requirement'.format(satisfy_distances.size))
+        logger.debug('After pruning, {0} vertices satisfy the distance requirement'.format(satisfy_distances.size))
 
         # Augmenting...
         for lbvertex in self.label_boundary:
@@ -885,10 +929,10 @@ class Bounds:
                 mapped_lbvertex = polylines_lb[fundus_vertex][0]
                 if mapped_lbvertex in satisfy_distances and self.same_boundary(mapped_lbvertex,lbvertex):
                     satisfy_distances = np.append(satisfy_distances,lbvertex)
-                    print('added vertex: {0}'.format(lbvertex))
+                    logger.debug('added vertex: {0}'.format(lbvertex))
 
         self.highlight_vtk_vertices(satisfy_distances, dir + '/satisfy_distance_pruned_augmented.vtk')
-        print('After augmenting, {0} vertices satisfy the distance requirement'.format(satisfy_distances.size))
+        logger.debug('After augmenting, {0} vertices satisfy the distance requirement'.format(satisfy_distances.size))
 
         # Now we will see how many vertices from each label boundary segment satisfy the properties.
         # If a segment only contains a few vertices, then we won't bother propagating labels from it.
@@ -901,12 +945,12 @@ class Bounds:
         for key, value in self.label_boundary_segments.items():
             # num_intersections = np.intersect1d(satisfy_distances, value).size + np.intersect1d(satisfy_distances, self.label_boundary_segments[key[::-1]]).size
             num_intersections = np.intersect1d(satisfy_distances, value).size
-            print('Number of intersections is: {0}'.format(num_intersections))
+            logger.debug('Number of intersections is: {0}'.format(num_intersections))
             if (num_intersections < num_good_vertices):
                 self.label_segment_matrix[:,reverse_mapping[key]] = 0
             else:
                 vertices_to_highlight[value] = 1
-                print('______________Preserving Label Boundary Segment_____________')
+                logger.debug('______________Preserving Label Boundary Segment_____________')
 
         write_vtk(dir + '/propagating_regions.vtk',self.Points,
                   self.Vertices, [], self.Faces, [vertices_to_highlight])
@@ -931,6 +975,10 @@ class Bounds:
 
         """
 
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
+
         try:
             self.label_boundary_segments
         except AttributeError:
@@ -947,33 +995,33 @@ class Bounds:
                     # part of the same fundus.
 
                     pointer = intersection[0] # This is the first intersection point.
-                    print('First pointer is: {0}'.format(pointer))
+                    logger.debug('First pointer is: {0}'.format(pointer))
                     row_avoid = [] # This will be an array of rows in self.Polylines to avoid
                     vertex_avoid = [pointer] # This will be an array of vertices to avoid
 
                     rows = list(np.nonzero([pointer in row for row in self.Polylines])[0]) # This is a list of rows to explore
-                    print('And the list of rows to explore is: {0}'.format(rows))
+                    logger.debug('And the list of rows to explore is: {0}'.format(rows))
 
                     while rows:
                         path_to_follow = rows.pop(0)
 
-                        print('Following path: {0}'.format(path_to_follow))
+                        logger.debug('Following path: {0}'.format(path_to_follow))
 
                         row_avoid.append(path_to_follow)
 
                         tmp = list(self.Polylines[path_to_follow])
                         pointer = set.difference(set(tmp), set(vertex_avoid)).pop()
                         vertex_avoid.append(pointer)
-                        print('pointer is now: {0}'.format(pointer))
+                        logger.debug('pointer is now: {0}'.format(pointer))
 
                         if pointer == intersection[1]:
                             # Bingo!
-                            print('Bingo! Both intersections are part of the same fundus!')
+                            logger.debug('Bingo! Both intersections are part of the same fundus!')
                             self.same_fundus = True
                             break
 
                         rows = rows + list(set.difference(set(np.nonzero([pointer in row for row in self.Polylines])[0]),set(row_avoid)))
-                        print('Rows is now: {0}'.format(rows))
+                        logger.debug('Rows is now: {0}'.format(rows))
 
                 self.label_boundary_segments[key] = np.append(segment,int(self.same_fundus))
 
@@ -984,10 +1032,15 @@ class Bounds:
         Take a vertex as input and return an array of the vertex's neighbors,
         as defined by self.Faces.
         """
+        from scipy.sparse import lil_matrix
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
+
         # First check to see if the neighbors matrix was constructed.
         if not self.found_neighbors:
 
-            print('Constructing neighborhood function.')
+            logger.debug('Constructing neighborhood function.')
 
             self.Neighbors = lil_matrix((self.num_points, self.num_points))
 
@@ -1030,10 +1083,14 @@ class Bounds:
                                         label boundaries)
 
         """
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
+
         t0 = time()
         self.load_vtk_surface(surface_file)
         self.load_vtk_polylines(polylines_file)
-        print('Imported Data in: {0}'.format(time() - t0))
+        logger.debug('Imported Data in: {0}'.format(time() - t0))
 
         self.initialize_seed_labels(init='label_boundary',
                                     output_filename = label_boundary_filename)
@@ -1074,11 +1131,15 @@ class Bounds:
 
         """
 
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
+
         # First check that the label propagation algorithm has been called
         try:
             a = self.learned_matrix[0]
         except:
-            print('First call graph_based_learning().')
+            logger.warning('First call graph_based_learning().')
             return
 
         self.RLabels = self.Labels.copy()
@@ -1099,14 +1160,14 @@ class Bounds:
             # self.RLabels[vertices_to_change] = self.realignment_mapping[counter][1]
             counter += 1
 
-        print('There are {0} regions to be relabeled.'.format(
-              len(vertices_to_change)))
+        logger.debug('There are {0} regions to be relabeled.'.format(
+                     len(vertices_to_change)))
 
         # Run check_for_polylines
         vertices_to_change = self.check_for_polylines(vertices_to_change)
 
-        print('After further checks, {0} regions are going to be relabeled.'.format(
-              len(vertices_to_change)))
+        logger.debug('After further checks, {0} regions are going to be relabeled.'.format(
+                     len(vertices_to_change)))
 
         # Resolve label ambiguities
         # vertices_to_change = self.resolve_label_ambiguity(vertices_to_change)
@@ -1121,7 +1182,7 @@ class Bounds:
         # {} regions are to be relabeled:'.format(len(vertices_to_change))
 
         for key, value in vertices_to_change.items():
-            print('For key {0}, the following vertices will be changed: {1}'.format(self.realignment_mapping[key],value))
+            logger.debug('For key {0}, the following vertices will be changed: {1}'.format(self.realignment_mapping[key],value))
 
         # For vertices that have passed all checks and are to be relabeled,
         # select the second (relabel) entry in the corresponding dictionary tuple
@@ -1164,9 +1225,13 @@ class Bounds:
             value:  list of vertices to be reassigned to the label
 
         """
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
+
         self.find_polylines_flanks()
 
-        print self.polylines_flanks_indices
+        logger.debug('Polyline flanks: {0}'.format(self.polylines_flanks_indices))
 
         for key, value in dict_of_vertices.items():
             if len(np.intersect1d(value,self.polylines_flanks_indices)) < threshold:
@@ -1227,13 +1292,17 @@ class Bounds:
 
         """
 
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
+
         # First we need an efficient procedure to identify the overlaps.
         # Create a num_keys x num_keys matrix indicating whether there is overlap,
         # and if so, which array is larger.
 
         # As a proxy for whether a fundus runs along a label boundary,
         # we could simply see which label boundary segment relabels more vertices
-        print('We made it here! So far so good.')
+        logger.debug('We made it here! So far so good.')
 
         num_keys = len(dict_of_vertices)
         overlap = np.zeros((num_keys, num_keys))
@@ -1243,10 +1312,10 @@ class Bounds:
                 if key1 != key2:
                     overlap_problem = np.intersect1d(value1,value2).any()
                     if overlap_problem:
-                        print('The keys are: {0} {1}'.format(key1, key2))
+                        logger.debug('The keys are: {0} {1}'.format(key1, key2))
                         # 1 indicates value1 is larger, 2 if value2 is larger.
                         overlap[key1,key2] = (len(value2) > len(value1)) + 1
-                        print('The value of overlap is: {0}'.format(overlap[key1,key2]))
+                        logger.debug('The value of overlap is: {0}'.format(overlap[key1,key2]))
 
                         # For NOW, let us disregard the matrix overlap and simply resolve the issue right here.
                         # In the future, this matrix may be desirable.
@@ -1305,12 +1374,16 @@ class Bounds:
 
         """
 
+        from mindboggle.utils.logs import get_logger
+
+        logger = get_logger('mindboggle.labels.rebound')
+
         for key1, value1 in dict_of_vertices.items():
             for key2, value2 in dict_of_vertices.items():
                 if key1 != key2:
                     # If thay are co-segments...
                     if len(np.intersect1d(self.realignment_mapping[key1], self.realignment_mapping[key2])) == 2:
-                        print('Found co-segments.')
+                        logger.debug('Found co-segments.')
                         # Find which array contains more polylines border vertices...
                         border1 = len(np.intersect1d(value1,self.polylines_flanks_indices))
                         border2 = len(np.intersect1d(value2,self.polylines_flanks_indices))
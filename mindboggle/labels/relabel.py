@@ -26,13 +26,13 @@ def relabel_volume(input_file, old_labels, new_labels):
     Examples
     --------
     >>> # Convert DKT31 to DKT25 labels
-    >>> import os
-    >>> from mindboggle.labels.relabel import relabel_volume
-    >>> data_path = os.environ['MINDBOGGLE_DATA']
-    >>> input_file = os.path.join(data_path, 'arno', 'labels', 'labels.DKT31.manual.nii.gz')
-    >>> old_labels = [1010,1023,1026,1027,1019,1020,2010,2023,2026,2027,2019,2020]
-    >>> new_labels = [1002,1002,1002,1003,1018,1018,2002,2002,2002,2003,2018,2018]
-    >>> relabel_volume(input_file, old_labels, new_labels)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.labels.relabel import relabel_volume  # doctest: +SKIP
+    >>> data_path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> input_file = os.path.join(data_path, 'arno', 'labels', 'labels.DKT31.manual.nii.gz')  # doctest: +SKIP
+    >>> old_labels = [1010,1023,1026,1027,1019,1020,2010,2023,2026,2027,2019,2020]  # doctest: +SKIP
+    >>> new_labels = [1002,1002,1002,1003,1018,1018,2002,2002,2002,2003,2018,2018]  # doctest: +SKIP
+    >>> relabel_volume(input_file, old_labels, new_labels)  # doctest: +SKIP
 
     """
     import os
@@ -80,13 +80,13 @@ def remove_volume_labels(input_file, labels_to_remove):
     Examples
     --------
     >>> # Remove subcortical labels
-    >>> import os
-    >>> from mindboggle.labels.relabel import remove_volume_labels
-    >>> data_path = os.environ['MINDBOGGLE_DATA']
-    >>> input_file = os.path.join(data_path, 'arno', 'labels', 'labels.DKT31.manual.nii.gz')
-    >>> labels_to_remove = range(1,300) # Remove noncortical (+aseg) labels
-    >>> labels_to_remove.extend([1000,1001,2000,2001])
-    >>> remove_volume_labels(input_file, labels_to_remove)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.labels.relabel import remove_volume_labels  # doctest: +SKIP
+    >>> data_path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> input_file = os.path.join(data_path, 'arno', 'labels', 'labels.DKT31.manual.nii.gz')  # doctest: +SKIP
+    >>> labels_to_remove = range(1,300) # Remove noncortical (+aseg) labels  # doctest: +SKIP
+    >>> labels_to_remove.extend([1000,1001,2000,2001])  # doctest: +SKIP
+    >>> remove_volume_labels(input_file, labels_to_remove)  # doctest: +SKIP
 
     """
     import os
@@ -142,19 +142,19 @@ def relabel_surface(vtk_file, hemi='', old_labels=[], new_labels=[],
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.labels.relabel import relabel_surface
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> vtk_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> hemi = 'lh'
-    >>> old_labels = []
-    >>> new_labels = []
-    >>> output_file = ''
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.labels.relabel import relabel_surface  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> hemi = 'lh'  # doctest: +SKIP
+    >>> old_labels = []  # doctest: +SKIP
+    >>> new_labels = []  # doctest: +SKIP
+    >>> output_file = ''  # doctest: +SKIP
     >>> #
-    >>> relabel_surface(vtk_file, hemi, old_labels, new_labels, output_file)
+    >>> relabel_surface(vtk_file, hemi, old_labels, new_labels, output_file)  # doctest: +SKIP
     >>> # View
-    >>> plot_vtk('relabeled_lh.labels.DKT25.manual.vtk')
+    >>> plot_vtk('relabeled_lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
 
     """
     import os
@@ -250,17 +250,17 @@ def overwrite_volume_labels(source, target, output_file='', ignore_labels=[0]):
     Examples
     --------
     >>> # Overwrite DKT25 with DKT31 labels
-    >>> import os
-    >>> from mindboggle.labels.relabel import overwrite_volume_labels
-    >>> from mindboggle.utils.plots import plot_volumes
-    >>> data_path = os.environ['MINDBOGGLE_DATA']
-    >>> source = os.path.join(data_path, 'arno', 'labels', 'labels.DKT31.manual.nii.gz')
-    >>> target = os.path.join(data_path, 'arno', 'labels', 'labels.DKT25.manual.nii.gz')
-    >>> output_file = ''
-    >>> ignore_labels = [0]
-    >>> output_file = overwrite_volume_labels(source, target, output_file, ignore_labels)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.labels.relabel import overwrite_volume_labels  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_volumes  # doctest: +SKIP
+    >>> data_path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> source = os.path.join(data_path, 'arno', 'labels', 'labels.DKT31.manual.nii.gz')  # doctest: +SKIP
+    >>> target = os.path.join(data_path, 'arno', 'labels', 'labels.DKT25.manual.nii.gz')  # doctest: +SKIP
+    >>> output_file = ''  # doctest: +SKIP
+    >>> ignore_labels = [0]  # doctest: +SKIP
+    >>> output_file = overwrite_volume_labels(source, target, output_file, ignore_labels)  # doctest: +SKIP
     >>> # View
-    >>> plot_volumes(output_file)
+    >>> plot_volumes(output_file)  # doctest: +SKIP
 
     """
     import os
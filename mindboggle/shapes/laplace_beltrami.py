@@ -340,25 +340,25 @@ def fem_laplacian(points, faces, n_eigenvalues=6, normalization=None):
 
     Examples
     --------
-    >>> from mindboggle.shapes.laplace_beltrami import fem_laplacian
+    >>> from mindboggle.shapes.laplace_beltrami import fem_laplacian  # doctest: +SKIP
     >>> # Define a cube:
-    >>> points = [[0,0,0], [0,1,0], [1,1,0], [1,0,0],
-    >>>           [0,0,1], [0,1,1], [1,1,1], [1,0,1]]
-    >>> faces = [[0,1,2], [2,3,0], [4,5,6], [6,7,4], [0,4,7], [7,3,0],
-    >>>          [0,4,5], [5,1,0], [1,5,6], [6,2,1], [3,7,6], [6,2,3]]
-    >>> fem_laplacian(points, faces, n_eigenvalues=3, normalization=None)
+    >>> points = [[0,0,0], [0,1,0], [1,1,0], [1,0,0],  # doctest: +SKIP
+    >>>           [0,0,1], [0,1,1], [1,1,1], [1,0,1]]  # doctest: +SKIP
+    >>> faces = [[0,1,2], [2,3,0], [4,5,6], [6,7,4], [0,4,7], [7,3,0],  # doctest: +SKIP
+    >>>          [0,4,5], [5,1,0], [1,5,6], [6,2,1], [3,7,6], [6,2,3]]  # doctest: +SKIP
+    >>> fem_laplacian(points, faces, n_eigenvalues=3, normalization=None)  # doctest: +SKIP
         [7.401486830834377e-17, 4.58359213500127, 4.799999999999998]
-    >>> fem_laplacian(points, faces, n_eigenvalues=3, normalization="area")
+    >>> fem_laplacian(points, faces, n_eigenvalues=3, normalization="area")  # doctest: +SKIP
         [1.2335811384723967e-17, 0.76393202250021175, 0.79999999999999949]
     >>> # Spectrum for entire left hemisphere of Twins-2-1:
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import read_faces_points
-    >>> from mindboggle.shapes.laplace_beltrami import fem_laplacian
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> vtk_file = os.path.join(path, 'arno', 'labels',
-    >>>                         'lh.labels.DKT25.manual.vtk')
-    >>> faces, points, npoints = read_faces_points(vtk_file)
-    >>> fem_laplacian(points, faces, n_eigenvalues=6, normalization=None)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_faces_points  # doctest: +SKIP
+    >>> from mindboggle.shapes.laplace_beltrami import fem_laplacian  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'labels',  # doctest: +SKIP
+    >>>                         'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> faces, points, npoints = read_faces_points(vtk_file)  # doctest: +SKIP
+    >>> fem_laplacian(points, faces, n_eigenvalues=6, normalization=None)  # doctest: +SKIP
         [4.829758648026223e-18,
          0.00012841730024671904,
          0.00027151815722727406,
@@ -366,14 +366,14 @@ def fem_laplacian(points, faces, n_eigenvalues=6, normalization=None):
          0.0004701628070486449,
          0.0005768904023010303]
     >>> # Spectrum for Twins-2-1 left hemisphere postcentral (label 22):
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import read_faces_points
-    >>> from mindboggle.shapes.laplace_beltrami import fem_laplacian
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> label_file = os.path.join(path, 'arno', 'labels', 'label22.vtk')
-    >>> faces, points, npoints = read_faces_points(label_file)
-    >>> print("{0}".format(fem_laplacian(points, faces, n_eigenvalues=6,
-    >>>                                  normalization=None)))
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_faces_points  # doctest: +SKIP
+    >>> from mindboggle.shapes.laplace_beltrami import fem_laplacian  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> label_file = os.path.join(path, 'arno', 'labels', 'label22.vtk')  # doctest: +SKIP
+    >>> faces, points, npoints = read_faces_points(label_file)  # doctest: +SKIP
+    >>> print("{0}".format(fem_laplacian(points, faces, n_eigenvalues=6,  # doctest: +SKIP
+    >>>                                  normalization=None)))  # doctest: +SKIP
         [6.346951301043029e-18,
          0.0005178862383467465,
          0.0017434911095630787,
@@ -381,8 +381,8 @@ def fem_laplacian(points, faces, n_eigenvalues=6, normalization=None):
          0.005429017880363785,
          0.006309346984678927]
     >>> # Area-normalized spectrum for a single label (postcentral):
-    >>> print("{0}".format(fem_laplacian(points, faces, n_eigenvalues=6,
-    >>>                                  normalization="area")))
+    >>> print("{0}".format(fem_laplacian(points, faces, n_eigenvalues=6,  # doctest: +SKIP
+    >>>                                  normalization="area")))  # doctest: +SKIP
         [1.1410192787181146e-21,
          9.310268097367214e-08,
          3.1343504525679715e-07,
@@ -391,13 +391,13 @@ def fem_laplacian(points, faces, n_eigenvalues=6, normalization=None):
          1.1342589857996225e-06]
          
     >>> # testing LBO on previously failed folds 
-    >>> import subprocess
-    >>> cmd = ["find", "/media/USBDATA/data/Mindboggle_MRI/MB101/results/features/", "-name", "fold_*.vtk"]
-    >>> process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    >>> out, err = process.communicate()
-    >>> pblm_vtks = out.split()
-    >>> import mindboggle.shapes.laplace_beltrami
-    >>> for vtk_file in pblm_vtks:
+    >>> import subprocess  # doctest: +SKIP
+    >>> cmd = ["find", "/media/USBDATA/data/Mindboggle_MRI/MB101/results/features/", "-name", "fold_*.vtk"]  # doctest: +SKIP
+    >>> process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)  # doctest: +SKIP
+    >>> out, err = process.communicate()  # doctest: +SKIP
+    >>> pblm_vtks = out.split()  # doctest: +SKIP
+    >>> import mindboggle.shapes.laplace_beltrami  # doctest: +SKIP
+    >>> for vtk_file in pblm_vtks:  # doctest: +SKIP
         mindboggle.shapes.laplace_beltrami.spectrum_from_file(vtk_file)
 
     """
@@ -492,36 +492,36 @@ def spectrum_of_largest(points, faces, n_eigenvalues=6, exclude_labels=[-1],
     Examples
     --------
     >>> # Spectrum for one label (artificial composite), two fragments:
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.io_vtk import read_scalars, read_vtk, write_vtk
-    >>> from mindboggle.utils.mesh import remove_faces
-    >>> from mindboggle.shapes.laplace_beltrami import spectrum_of_largest
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> label_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> area_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.area.vtk')
-    >>> n_eigenvalues = 6
-    >>> exclude_labels = [0]  #[-1]
-    >>> normalization = None
-    >>> faces, lines, indices, points, foo1, labels, foo2, foo3 = read_vtk(label_file,
-    >>>      return_first=True, return_array=True)
-    >>> I2 = [i for i,x in enumerate(labels) if x==2] # cingulate
-    >>> I22 = [i for i,x in enumerate(labels) if x==22] # postcentral
-    >>> I2.extend(I22)
-    >>> faces = remove_faces(faces, I2)
-    >>> areas, u1 = read_scalars(area_file, True, True)
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, read_vtk, write_vtk  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import remove_faces  # doctest: +SKIP
+    >>> from mindboggle.shapes.laplace_beltrami import spectrum_of_largest  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> label_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> area_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.area.vtk')  # doctest: +SKIP
+    >>> n_eigenvalues = 6  # doctest: +SKIP
+    >>> exclude_labels = [0]  #[-1]  # doctest: +SKIP
+    >>> normalization = None  # doctest: +SKIP
+    >>> faces, lines, indices, points, foo1, labels, foo2, foo3 = read_vtk(label_file,  # doctest: +SKIP
+    >>>      return_first=True, return_array=True)  # doctest: +SKIP
+    >>> I2 = [i for i,x in enumerate(labels) if x==2] # cingulate  # doctest: +SKIP
+    >>> I22 = [i for i,x in enumerate(labels) if x==22] # postcentral  # doctest: +SKIP
+    >>> I2.extend(I22)  # doctest: +SKIP
+    >>> faces = remove_faces(faces, I2)  # doctest: +SKIP
+    >>> areas, u1 = read_scalars(area_file, True, True)  # doctest: +SKIP
     >>> #
-    >>> spectrum_of_largest(points, faces, n_eigenvalues, exclude_labels,
-    >>>                     normalization, areas)
+    >>> spectrum_of_largest(points, faces, n_eigenvalues, exclude_labels,  # doctest: +SKIP
+    >>>                     normalization, areas)  # doctest: +SKIP
     >>> #
     >>> # View:
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> scalars = np.zeros(np.shape(labels))
-    >>> scalars[I2] = 1
-    >>> vtk_file = 'test_two_labels.vtk'
-    >>> write_vtk(vtk_file, points, indices, lines, faces,
-    >>>           scalars, scalar_names='scalars')
-    >>> plot_vtk(vtk_file)
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> scalars = np.zeros(np.shape(labels))  # doctest: +SKIP
+    >>> scalars[I2] = 1  # doctest: +SKIP
+    >>> vtk_file = 'test_two_labels.vtk'  # doctest: +SKIP
+    >>> write_vtk(vtk_file, points, indices, lines, faces,  # doctest: +SKIP
+    >>>           scalars, scalar_names='scalars')  # doctest: +SKIP
+    >>> plot_vtk(vtk_file)  # doctest: +SKIP
         Load "Labels" scalars from lh.labels.DKT25.manual.vtk
         Reduced 290134 to 29728 triangular faces
         Load "scalars" scalars from lh.pial.area.vtk
@@ -656,15 +656,15 @@ def spectrum_per_label(vtk_file, n_eigenvalues=3, exclude_labels=[-1],
     Examples
     --------
     >>> # Spectrum for label 22 (postcentral) in Twins-2-1:
-    >>> import os
-    >>> from mindboggle.shapes.laplace_beltrami import laplacian_per_label
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> vtk_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> area_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.area.vtk')
-    >>> n_eigenvalues = 6
-    >>> exclude_labels = [0]  #[-1]
-    >>> laplacian_per_label(vtk_file, n_eigenvalues, exclude_labels,
-    >>>                           normalization=None, area_file=area_file)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.shapes.laplace_beltrami import laplacian_per_label  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> area_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.area.vtk')  # doctest: +SKIP
+    >>> n_eigenvalues = 6  # doctest: +SKIP
+    >>> exclude_labels = [0]  #[-1]  # doctest: +SKIP
+    >>> laplacian_per_label(vtk_file, n_eigenvalues, exclude_labels,  # doctest: +SKIP
+    >>>                           normalization=None, area_file=area_file)  # doctest: +SKIP
         Load "Labels" scalars from lh.labels.DKT25.manual.vtk
         Load "scalars" scalars from lh.pial.area.vtk
         7819 vertices for label 22
@@ -746,11 +746,11 @@ def spectrum_from_file(vtk_file, n_eigenvalues=6, exclude_labels=[-1],
     Examples
     --------
     >>> # Spectrum for entire left hemisphere of Twins-2-1:
-    >>> import os
-    >>> from mindboggle.shapes.laplace_beltrami import spectrum_from_file
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> vtk_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> spectrum_from_file(vtk_file, n_eigenvalues=6)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.shapes.laplace_beltrami import spectrum_from_file  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> spectrum_from_file(vtk_file, n_eigenvalues=6)  # doctest: +SKIP
         Load "Labels" scalars from lh.labels.DKT25.manual.vtk
         Linear FEM Laplace-Beltrami spectrum:
         [4.829758648026221e-18,
@@ -760,11 +760,11 @@ def spectrum_from_file(vtk_file, n_eigenvalues=6, exclude_labels=[-1],
          0.0004701628070486447,
          0.0005768904023010338]
     >>> # Spectrum for label 22 (postcentral) (after running explode_scalars()):
-    >>> import os
-    >>> from mindboggle.shapes.laplace_beltrami import spectrum_from_file
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> vtk_file = os.path.join(path, 'arno', 'labels', 'label22.vtk')
-    >>> spectrum_from_file(vtk_file, n_eigenvalues=6)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.shapes.laplace_beltrami import spectrum_from_file  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'labels', 'label22.vtk')  # doctest: +SKIP
+    >>> spectrum_from_file(vtk_file, n_eigenvalues=6)  # doctest: +SKIP
         Load "scalars" scalars from label22.vtk
         Linear FEM Laplace-Beltrami spectrum:
         [6.3469513010430304e-18,
@@ -775,11 +775,11 @@ def spectrum_from_file(vtk_file, n_eigenvalues=6, exclude_labels=[-1],
          0.006309346984678918]
 
     >>> # Loop thru all MB 101 brains
-    >>> from mindboggle.shapes.laplace_beltrami import spectrum_from_file
-    >>> for hemidir in os.listdir(header):
-    >>>     print hemidir
-    >>>     sulci_file = os.path.join(header, hemidir, "sulci.vtk")
-    >>>     spectrum = spectrum_from_file(sulci_file)
+    >>> from mindboggle.shapes.laplace_beltrami import spectrum_from_file  # doctest: +SKIP
+    >>> for hemidir in os.listdir(header):  # doctest: +SKIP
+    >>>     print hemidir  # doctest: +SKIP
+    >>>     sulci_file = os.path.join(header, hemidir, "sulci.vtk")  # doctest: +SKIP
+    >>>     spectrum = spectrum_from_file(sulci_file)  # doctest: +SKIP
 
     """
     from mindboggle.utils.io_vtk import read_vtk, read_scalars
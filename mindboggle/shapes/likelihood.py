@@ -10,6 +10,9 @@ Compute likelihood values for a VTK surface mesh:
     This is run after training on the distributions of depth and curvature
     values across multiple VTK surface mesh files in the functions below.
 
+  load_trained_parameters()
+    Load the trained distribution parameters once per file.
+
 Learn distributions from training data (see Examples below):
 
   estimate_depth_curvature_distributions()
@@ -76,41 +79,40 @@ def compute_likelihood(trained_file, depth_file, curvature_file, folds,
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
-    >>> from mindboggle.shapes.likelihood import compute_likelihood
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> trained_file = os.path.join(path, 'atlases', 'depth_curv_border_nonborder_parameters.pkl')
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.shapes.likelihood import compute_likelihood  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> trained_file = os.path.join(path, 'atlases', 'depth_curv_border_nonborder_parameters.pkl')  # doctest: +SKIP
     >>> #depth_file = os.path.join(path, 'arno', 'shapes', 'travel_depth_rescaled.vtk')
-    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')
-    >>> curvature_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds, name = read_scalars(folds_file)
-    >>> save_file = True
+    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')  # doctest: +SKIP
+    >>> curvature_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')  # doctest: +SKIP
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file)  # doctest: +SKIP
+    >>> save_file = True  # doctest: +SKIP
     >>> #
-    >>> compute_likelihood(trained_file, depth_file, curvature_file, folds, save_file)
+    >>> compute_likelihood(trained_file, depth_file, curvature_file, folds, save_file)  # doctest: +SKIP
     >>> # View:
-    >>> plot_vtk('likelihoods.vtk', folds_file)
+    >>> plot_vtk('likelihoods.vtk', folds_file)  # doctest: +SKIP
 
     """
     import os
     import numpy as np
     from math import pi
-    import cPickle as pickle
 
     from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
+    from mindboggle.shapes.likelihood import load_trained_parameters
 
 
     # Initialize variables:
     tiny = 0.000000001
-    L = np.zeros(len(folds))
     probs_border = np.zeros(len(folds))
     probs_nonborder = np.zeros(len(folds))
 
     # Load estimated depth and curvature distribution parameters:
-    depth_border, curv_border, depth_nonborder, curv_nonborder = pickle.load(
-        open(trained_file, "r"))
+    depth_border, curv_border, depth_nonborder, curv_nonborder = \
+        load_trained_parameters(trained_file)
 
     # Load depths, curvatures:
     depths, name = read_scalars(depth_file, True, True)
@@ -119,37 +121,25 @@ def compute_likelihood(trained_file, depth_file, curvature_file, folds,
     # Prep for below:
     n = 2
     twopiexp = (2*pi)**(n/2)
-    border_sigmas = depth_border['sigmas'] * curv_border['sigmas']
-    nonborder_sigmas = depth_nonborder['sigmas'] * curv_nonborder['sigmas']
-    norm_border = 1 / (twopiexp * border_sigmas + tiny)
-    norm_nonborder = 1 / (twopiexp * nonborder_sigmas + tiny)
-    I = [i for i,x in enumerate(folds) if x != -1]
-
-    N = depth_border['sigmas'].shape[0]
-    for j in range(N):
-
-        # Border:
-        expB = depth_border['weights'][j] * \
-            ((depths[I]-depth_border['means'][j])**2) / \
-            depth_border['sigmas'][j]**2
-        expB += curv_border['weights'][j] * \
-            ((curvatures[I]-curv_border['means'][j])**2) / \
-            curv_border['sigmas'][j]**2
-        expB = -expB / 2
-        probs_border[I] = probs_border[I] + norm_border[j] * np.exp(expB)
-
-        # Non-border:
-        expNB = depth_nonborder['weights'][j] * \
-            ((depths[I]-depth_nonborder['means'][j])**2) / \
-            depth_nonborder['sigmas'][j]**2
-        expNB += curv_nonborder['weights'][j] * \
-            ((curvatures[I]-curv_nonborder['means'][j])**2) / \
-            curv_nonborder['sigmas'][j]**2
-        expNB = -expNB / 2
-        probs_nonborder[I] = probs_nonborder[I] + norm_nonborder[j] * np.exp(expNB)
+    I = np.where(np.asarray(folds) != -1)[0]
+    depths_I = depths[I][:, np.newaxis]
+    curvatures_I = curvatures[I][:, np.newaxis]
+
+    # Mixture densities for all fold vertices (rows) and classes (columns):
+    def mixture_density(depth_params, curv_params):
+        norm = 1 / (twopiexp * depth_params['sigmas'] *
+                    curv_params['sigmas'] + tiny)
+        exps = depth_params['weights'] * \
+            (depths_I - depth_params['means'])**2 / depth_params['sigmas']**2
+        exps += curv_params['weights'] * \
+            (curvatures_I - curv_params['means'])**2 / curv_params['sigmas']**2
+        return np.dot(np.exp(-exps / 2), norm)
+
+    probs_border[I] = mixture_density(depth_border, curv_border)
+    probs_nonborder[I] = mixture_density(depth_nonborder, curv_nonborder)
 
     likelihoods = probs_border / (probs_nonborder + probs_border + tiny)
-    likelihoods.tolist()
+    likelihoods = likelihoods.tolist()
 
     #-------------------------------------------------------------------------
     # Return likelihoods and output file name
@@ -164,6 +154,54 @@ def compute_likelihood(trained_file, depth_file, curvature_file, folds,
 
     return likelihoods, likelihoods_file
 
+# Trained parameters already loaded, by file name:
+trained_parameters = {}
+
+def load_trained_parameters(trained_file):
+    """
+    Load estimated distribution parameters, once per (unchanged) file.
+
+    Parameters
+    ----------
+    trained_file : pickle compressed file
+        contains the dictionaries depth_border, curv_border,
+        depth_nonborder, curv_nonborder (see compute_likelihood())
+
+    Returns
+    -------
+    parameters : list of dictionaries
+        [depth_border, curv_border, depth_nonborder, curv_nonborder],
+        with numpy arrays of 'means', 'sigmas', and 'weights'
+
+    Examples
+    --------
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.shapes.likelihood import load_trained_parameters  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> trained_file = os.path.join(path, 'atlases', 'depth_curv_border_nonborder_parameters.pkl')  # doctest: +SKIP
+    >>> depth_border = load_trained_parameters(trained_file)[0]  # doctest: +SKIP
+    >>> depth_border['means']  # doctest: +SKIP
+
+    """
+    import os
+    import numpy as np
+    import cPickle as pickle
+
+    trained_file = os.path.abspath(trained_file)
+    mtime = os.path.getmtime(trained_file)
+
+    if trained_file in trained_parameters and \
+       trained_parameters[trained_file][0] == mtime:
+        return trained_parameters[trained_file][1]
+
+    parameters = pickle.load(open(trained_file, 'rb'))
+    parameters = [dict([(key, np.asarray(params[key], dtype=float))
+                        for key in ['means', 'sigmas', 'weights']])
+                  for params in parameters]
+    trained_parameters[trained_file] = (mtime, parameters)
+
+    return parameters
+
 #-------------------------------------------------------------------------------
 # Learn distributions from training data (different surface meshes).
 #-------------------------------------------------------------------------------
@@ -198,64 +236,64 @@ def estimate_distribution(scalar_files, scalar_range, fold_files, label_files):
 
     Examples
     --------
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.shapes.likelihood import estimate_distribution
-    >>> from mindboggle.utils.io_table import read_columns
-    >>> do_test = False
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.shapes.likelihood import estimate_distribution  # doctest: +SKIP
+    >>> from mindboggle.utils.io_table import read_columns  # doctest: +SKIP
+    >>> do_test = False  # doctest: +SKIP
     >>> # Train on a single surface mesh:
-    >>> if do_test:
-    >>>     path = os.environ['MINDBOGGLE_DATA']
+    >>> if do_test:  # doctest: +SKIP
+    >>>     path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
     >>>     #depth_file = os.path.join(path, 'arno', 'shapes', 'travel_depth_rescaled.vtk')
-    >>>     depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')
-    >>>     curv_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')
-    >>>     folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>>     labels_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>>     depth_files = [depth_file]
-    >>>     curv_files = [curv_file]
-    >>>     fold_files = [folds_file]
-    >>>     label_files = [labels_file]
+    >>>     depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')  # doctest: +SKIP
+    >>>     curv_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')  # doctest: +SKIP
+    >>>     folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>>     labels_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>>     depth_files = [depth_file]  # doctest: +SKIP
+    >>>     curv_files = [curv_file]  # doctest: +SKIP
+    >>>     fold_files = [folds_file]  # doctest: +SKIP
+    >>>     label_files = [labels_file]  # doctest: +SKIP
     >>> # Train on many Mindboggle-101 surface meshes:
-    >>> else:
-    >>>     mindboggle_path = '../../Mindboggle101_mindboggle_results'
-    >>>     label_path = os.environ['SUBJECTS_DIR']
-    >>>     x_path = os.path.join(os.environ['MINDBOGGLE'], 'x')
-    >>>     atlas_list_file = os.path.join(x_path, 'mindboggle101_atlases.txt')
-    >>>     atlas_list = read_columns(atlas_list_file, 1)[0]
-    >>>     depth_files = []
-    >>>     curv_files = []
-    >>>     fold_files = []
-    >>>     label_files = []
-    >>>     for atlas in atlas_list:
-    >>>      if 'OASIS' in atlas or 'NKI' in atlas or 'MMRR-21' in atlas:
-    >>>       print(atlas)
-    >>>       for h in ['lh','rh']:
+    >>> else:  # doctest: +SKIP
+    >>>     mindboggle_path = '../../Mindboggle101_mindboggle_results'  # doctest: +SKIP
+    >>>     label_path = os.environ['SUBJECTS_DIR']  # doctest: +SKIP
+    >>>     x_path = os.path.join(os.environ['MINDBOGGLE'], 'x')  # doctest: +SKIP
+    >>>     atlas_list_file = os.path.join(x_path, 'mindboggle101_atlases.txt')  # doctest: +SKIP
+    >>>     atlas_list = read_columns(atlas_list_file, 1)[0]  # doctest: +SKIP
+    >>>     depth_files = []  # doctest: +SKIP
+    >>>     curv_files = []  # doctest: +SKIP
+    >>>     fold_files = []  # doctest: +SKIP
+    >>>     label_files = []  # doctest: +SKIP
+    >>>     for atlas in atlas_list:  # doctest: +SKIP
+    >>>      if 'OASIS' in atlas or 'NKI' in atlas or 'MMRR-21' in atlas:  # doctest: +SKIP
+    >>>       print(atlas)  # doctest: +SKIP
+    >>>       for h in ['lh','rh']:  # doctest: +SKIP
     >>>         #depth_file = os.path.join(mindboggle_path, 'shapes',
     >>>         #    '_hemi_'+h+'_subject_'+atlas, 'travel_depth_rescaled.vtk')
-    >>>         depth_file = os.path.join(mindboggle_path, 'shapes',
-    >>>             '_hemi_'+h+'_subject_'+atlas, h+'.pial.travel_depth.vtk')
-    >>>         curv_file = os.path.join(mindboggle_path, 'shapes',
-    >>>             '_hemi_'+h+'_subject_'+atlas, h+'.pial.mean_curvature.vtk')
-    >>>         folds_file = os.path.join(mindboggle_path, 'features',
-    >>>             '_hemi_'+h+'_subject_'+atlas, 'folds.vtk')
-    >>>         labels_file = os.path.join(label_path, atlas, 'label',
-    >>>             h+'.labels.DKT25.manual.vtk')
-    >>>         depth_files.append(depth_file)
-    >>>         curv_files.append(curv_file)
-    >>>         fold_files.append(folds_file)
-    >>>         label_files.append(labels_file)
-    >>> scalar_range1 = np.linspace(0, 1, 51, endpoint=True) # (0 to 1 by 0.02)
-    >>> scalar_range2 = np.linspace(-1, 1, 101, endpoint=True) # (-1 to 1 by 0.02)
+    >>>         depth_file = os.path.join(mindboggle_path, 'shapes',  # doctest: +SKIP
+    >>>             '_hemi_'+h+'_subject_'+atlas, h+'.pial.travel_depth.vtk')  # doctest: +SKIP
+    >>>         curv_file = os.path.join(mindboggle_path, 'shapes',  # doctest: +SKIP
+    >>>             '_hemi_'+h+'_subject_'+atlas, h+'.pial.mean_curvature.vtk')  # doctest: +SKIP
+    >>>         folds_file = os.path.join(mindboggle_path, 'features',  # doctest: +SKIP
+    >>>             '_hemi_'+h+'_subject_'+atlas, 'folds.vtk')  # doctest: +SKIP
+    >>>         labels_file = os.path.join(label_path, atlas, 'label',  # doctest: +SKIP
+    >>>             h+'.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>>         depth_files.append(depth_file)  # doctest: +SKIP
+    >>>         curv_files.append(curv_file)  # doctest: +SKIP
+    >>>         fold_files.append(folds_file)  # doctest: +SKIP
+    >>>         label_files.append(labels_file)  # doctest: +SKIP
+    >>> scalar_range1 = np.linspace(0, 1, 51, endpoint=True) # (0 to 1 by 0.02)  # doctest: +SKIP
+    >>> scalar_range2 = np.linspace(-1, 1, 101, endpoint=True) # (-1 to 1 by 0.02)  # doctest: +SKIP
     >>> #
-    >>> depth_border, depth_nonborder = estimate_distribution(depth_files,
-    >>>     scalar_range1, fold_files, label_files)
+    >>> depth_border, depth_nonborder = estimate_distribution(depth_files,  # doctest: +SKIP
+    >>>     scalar_range1, fold_files, label_files)  # doctest: +SKIP
     >>> #
-    >>> curv_border, curv_nonborder = estimate_distribution(curv_files,
-    >>>     scalar_range2, fold_files, label_files)
+    >>> curv_border, curv_nonborder = estimate_distribution(curv_files,  # doctest: +SKIP
+    >>>     scalar_range2, fold_files, label_files)  # doctest: +SKIP
     >>> #
-    >>> import cPickle as pickle
-    >>> pickle.dump( [depth_border, curv_border, depth_nonborder, curv_nonborder],
-    >>>     open("depth_curv_border_nonborder_parameters.pkl", "wb"))
+    >>> import cPickle as pickle  # doctest: +SKIP
+    >>> pickle.dump( [depth_border, curv_border, depth_nonborder, curv_nonborder],  # doctest: +SKIP
+    >>>     open("depth_curv_border_nonborder_parameters.pkl", "wb"))  # doctest: +SKIP
 
     """
     from mindboggle.shapes.likelihood import concatenate_sulcus_scalars, \
@@ -316,17 +354,17 @@ def concatenate_sulcus_scalars(scalar_files, fold_files, label_files):
     Examples
     --------
     >>> # Concatenate (duplicate) depth scalars:
-    >>> import os
-    >>> from mindboggle.shapes.likelihood import concatenate_sulcus_scalars
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'depth_rescaled.vtk')
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> labels_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> scalar_files = [depth_file, depth_file]
-    >>> fold_files = [folds_file, folds_file]
-    >>> label_files = [labels_file, labels_file]
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.shapes.likelihood import concatenate_sulcus_scalars  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'depth_rescaled.vtk')  # doctest: +SKIP
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> labels_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> scalar_files = [depth_file, depth_file]  # doctest: +SKIP
+    >>> fold_files = [folds_file, folds_file]  # doctest: +SKIP
+    >>> label_files = [labels_file, labels_file]  # doctest: +SKIP
     >>> #
-    >>> S = concatenate_sulcus_scalars(scalar_files, fold_files, label_files)
+    >>> S = concatenate_sulcus_scalars(scalar_files, fold_files, label_files)  # doctest: +SKIP
 
     """
     import numpy as np
@@ -335,6 +373,9 @@ def concatenate_sulcus_scalars(scalar_files, fold_files, label_files):
     from mindboggle.utils.mesh import find_neighbors_from_file
     from mindboggle.labels.labels import extract_borders
     from mindboggle.labels.protocol import dkt_protocol
+    from mindboggle.utils.logs import get_logger
+
+    logger = get_logger('mindboggle.shapes.likelihood')
 
     protocol = 'DKT25'
     sulcus_names, sulcus_label_pair_lists, unique_sulcus_label_pairs, \
@@ -349,7 +390,7 @@ def concatenate_sulcus_scalars(scalar_files, fold_files, label_files):
 
     # Loop through files with the scalar values:
     for ifile, scalar_file in enumerate(scalar_files):
-        print(scalar_file)
+        logger.debug('Load {0}'.format(scalar_file))
 
         # Load scalars, folds, and labels:
         folds_file = fold_files[ifile]
@@ -382,17 +423,40 @@ def concatenate_sulcus_scalars(scalar_files, fold_files, label_files):
 
     return border_scalars, nonborder_scalars
 
-def fit_normals_to_histogram(data, x):
+def fit_normals_to_histogram(data, x, k=3, n_iterations=25, tolerance=1e-6,
+                             n_restarts=1, seed=0, use_histogram=False):
     """
     This Estimation-Maximization method returns estimated means, sigmas
     (standard deviations) and weights, each of length k (number of classes).
 
+    The expectation step computes the (N x k) class responsibilities
+    for all values at once, in log space (with the log-sum-exp trick) so that
+    values far from every class do not underflow.  Iterations stop early
+    when the log likelihood changes by less than the tolerance.
+    The first start is initialized from the range of x; any additional
+    restarts draw random means within that range, from a fixed seed,
+    and the fit with the highest log likelihood is returned.
+
     Parameters
     ----------
     data : list of floats
         data to estimate distribution means, sigmas, and weights
     x : list of floats
         range of values used to initialize distribution means and sigmas
+        (and histogram bin edges if use_histogram)
+    k : integer
+        number of classes
+    n_iterations : integer
+        maximum number of iterations
+    tolerance : float
+        stop when the relative change in log likelihood is smaller
+    n_restarts : integer
+        number of starts (the first is not random)
+    seed : integer
+        seed for the random starts
+    use_histogram : Boolean
+        fit to the histogram of data (counts in bins with edges x,
+        ignoring values outside x) instead of to every value?
 
     Returns
     -------
@@ -405,62 +469,106 @@ def fit_normals_to_histogram(data, x):
 
     Examples
     --------
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.io_vtk import read_scalars
-    >>> from mindboggle.shapes.likelihood import fit_normals_to_histogram
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'depth_rescaled.vtk')
-    >>> scalars, name = read_scalars(depth_file)
-    >>> x = np.linspace(0, 1, 51, endpoint=True)
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars  # doctest: +SKIP
+    >>> from mindboggle.shapes.likelihood import fit_normals_to_histogram  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'depth_rescaled.vtk')  # doctest: +SKIP
+    >>> scalars, name = read_scalars(depth_file)  # doctest: +SKIP
+    >>> x = np.linspace(0, 1, 51, endpoint=True)  # doctest: +SKIP
+    >>> #
+    >>> means, sigmas, weights = fit_normals_to_histogram(scalars, x)  # doctest: +SKIP
     >>> #
-    >>> means, sigmas, weights = fit_normals_to_histogram(scalars, x)
+    >>> # Fit to a histogram, keeping the best of five starts:
+    >>> means, sigmas, weights = fit_normals_to_histogram(scalars, x,  # doctest: +SKIP
+    >>>     n_restarts=5, use_histogram=True)  # doctest: +SKIP
 
     """
     import numpy as np
     from math import pi
+    from time import time
+    from mindboggle.utils.logs import get_logger, log_progress
+
+    logger = get_logger('mindboggle.shapes.likelihood')
 
     # Initialize variables:
-    k = 3
     tiny = 0.000000001
-    probs = np.zeros((len(data), k))
-    W = np.zeros((len(data), k))
-    means = np.zeros(k)
-    sigmas = np.zeros(k)
-    weights = np.zeros(k)
-
-    # Initialize distribution means and sigmas:
-    rangex = max(x) - min(x)
-    for i in range(1, k + 1):
-        means[i-1] = max(x) - rangex/2 - 0.2 * rangex * (i - k/2)
-        sigmas[i-1] = 0.2
-
-    print('Fitting normals to histograms...')
-
-    # Iteratively compute probabilities, weights, means and sigmas:
-    iter = 0
-    while iter < 25:
-        iter += 1
-
-        for i in range(k):
-            m1 = 1 / (sigmas[i] * np.sqrt(2*pi) + tiny)
-            m2 = -((data-means[i])**2) / (2 *(sigmas[i]**2) + tiny)
-            probs[:,i] = m1 * np.exp(m2)
-
-        for i in range(k):
-            W[:,i] = probs[:,i] / (np.sum(probs, axis=1) + tiny)
-
-        for i in range(k):
-            n1 = sum(W[:,i] * (data - means[i])**2)
-            d1 = sum(W[:,i]) + tiny
-            sigmas[i] =  np.sqrt(n1 / d1)
-            means[i] = sum(W[:,i] * data) / d1
-
-        print('    means: {0}; sigmas: {1}'.format(means, sigmas))
-
-    for i in range(k):
-        weights[i] = sum(W[:,i]) / (np.sum(W) + tiny)
-
-    print('    weights: {0}'.format(weights))
+    if use_histogram:
+        counts, edges = np.histogram(data, bins=x)
+        values = (edges[:-1] + edges[1:]) / 2.0
+        counts = counts.astype(float)
+    else:
+        values = np.asarray(data, dtype=float)
+        counts = np.ones(len(values))
+    ncounts = np.sum(counts)
+    random_state = np.random.RandomState(seed)
+
+    logger.info('Fitting normals to histograms...')
+    t0 = time()
+
+    best_log_likelihood = -np.inf
+    for irestart in range(n_restarts):
+
+        # Initialize distribution means and sigmas:
+        rangex = max(x) - min(x)
+        if irestart == 0:
+            means = np.array([max(x) - rangex/2 - 0.2 * rangex * (i - k/2)
+                              for i in range(1, k + 1)])
+        else:
+            means = random_state.uniform(min(x), max(x), k)
+        sigmas = 0.2 * np.ones(k)
+        weights = np.ones(k) / k
+
+        # Iteratively compute probabilities, weights, means and sigmas:
+        log_likelihood = -np.inf
+        for iteration in range(n_iterations):
+
+            # Class responsibilities for all values (N x k), in log space:
+            log_probs = np.log(weights + tiny) - \
+                np.log(sigmas * np.sqrt(2*pi) + tiny) - \
+                (values[:, np.newaxis] - means)**2 / (2 * sigmas**2 + tiny)
+            log_max = np.max(log_probs, axis=1)
+            log_sums = log_max + np.log(np.sum(
+                np.exp(log_probs - log_max[:, np.newaxis]), axis=1))
+            W = np.exp(log_probs - log_sums[:, np.newaxis]) * \
+                counts[:, np.newaxis]
+
+            # Weights, means and sigmas from the responsibilities:
+            d1 = np.sum(W, axis=0) + tiny
+            weights = d1 / (ncounts + tiny)
+            means = np.dot(values, W) / d1
+            sigmas = np.sqrt(np.sum(W * (values[:, np.newaxis] - means)**2,
+                                    axis=0) / d1)
+
+            # Stop if the log likelihood no longer changes:
+            previous_log_likelihood = log_likelihood
+            log_likelihood = np.dot(counts, log_sums)
+            converged = abs(log_likelihood - previous_log_likelihood) < \
+                tolerance * abs(log_likelihood)
+            log_progress(logger, 'fit_normals_to_histogram', interval=10,
+                         restart=irestart, iteration=iteration + 1,
+                         log_likelihood=log_likelihood,
+                         elapsed=round(time() - t0, 3))
+            if converged:
+                break
+
+        logger.debug('    means: {0}; sigmas: {1} ({2} iterations)'.
+                     format(means, sigmas, iteration + 1))
+
+        if log_likelihood > best_log_likelihood or irestart == 0:
+            best_log_likelihood = log_likelihood
+            best = [means, sigmas, weights]
+
+    # Order classes by decreasing mean (as in the first start):
+    means, sigmas, weights = best
+    order = np.argsort(-means, kind='mergesort')
+    means, sigmas, weights = means[order], sigmas[order], weights[order]
+
+    logger.info('    means: {0}; sigmas: {1}; weights: {2}'.
+                format(means, sigmas, weights))
+    log_progress(logger, 'fit_normals_to_histogram', step='done',
+                 n_restarts=n_restarts, log_likelihood=best_log_likelihood,
+                 elapsed=round(time() - t0, 3))
 
     return means, sigmas, weights
@@ -237,27 +237,27 @@ def means_per_label(values, labels, exclude_labels, areas=[]):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import read_scalars, read_vtk
-    >>> from mindboggle.shapes.measure import means_per_label
-    >>> data_path = os.environ['MINDBOGGLE_DATA']
-    >>> values_file = os.path.join(data_path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')
-    >>> area_file = os.path.join(data_path, 'arno', 'shapes', 'lh.pial.area.vtk')
-    >>> labels_file = os.path.join(data_path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> values, name = read_scalars(values_file, True, True)
-    >>> areas, name = read_scalars(area_file, True, True)
-    >>> labels, name = read_scalars(labels_file)
-    >>> exclude_labels = [-1]
-    >>> areas = areas
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, read_vtk  # doctest: +SKIP
+    >>> from mindboggle.shapes.measure import means_per_label  # doctest: +SKIP
+    >>> data_path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> values_file = os.path.join(data_path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')  # doctest: +SKIP
+    >>> area_file = os.path.join(data_path, 'arno', 'shapes', 'lh.pial.area.vtk')  # doctest: +SKIP
+    >>> labels_file = os.path.join(data_path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> values, name = read_scalars(values_file, True, True)  # doctest: +SKIP
+    >>> areas, name = read_scalars(area_file, True, True)  # doctest: +SKIP
+    >>> labels, name = read_scalars(labels_file)  # doctest: +SKIP
+    >>> exclude_labels = [-1]  # doctest: +SKIP
+    >>> areas = areas  # doctest: +SKIP
     >>> #
     >>> # Example 1: compute mean curvature per label:
-    >>> means, sdevs, label_list, label_areas = means_per_label(values, labels,
-    >>>     exclude_labels, areas)
+    >>> means, sdevs, label_list, label_areas = means_per_label(values, labels,  # doctest: +SKIP
+    >>>     exclude_labels, areas)  # doctest: +SKIP
     >>> #
     >>> # Example 2: compute mean coordinates per label:
-    >>> faces, lines, indices, points, npoints, curvs, name, input_vtk = read_vtk(values_file)
-    >>> means, sdevs, label_list, label_areas = means_per_label(points, labels,
-    >>>     exclude_labels, areas)
+    >>> faces, lines, indices, points, npoints, curvs, name, input_vtk = read_vtk(values_file)  # doctest: +SKIP
+    >>> means, sdevs, label_list, label_areas = means_per_label(points, labels,  # doctest: +SKIP
+    >>>     exclude_labels, areas)  # doctest: +SKIP
 
     """
     import numpy as np
@@ -333,17 +333,17 @@ def sum_per_label(values, labels, exclude_labels):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import read_scalars, read_vtk
-    >>> from mindboggle.shapes.measure import sum_per_label
-    >>> data_path = os.environ['MINDBOGGLE_DATA']
-    >>> values_file = os.path.join(data_path, 'arno', 'shapes', 'lh.pial.area.vtk')
-    >>> labels_file = os.path.join(data_path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> values, name = read_scalars(values_file, True, True)
-    >>> labels, name = read_scalars(labels_file)
-    >>> exclude_labels = [-1]
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, read_vtk  # doctest: +SKIP
+    >>> from mindboggle.shapes.measure import sum_per_label  # doctest: +SKIP
+    >>> data_path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> values_file = os.path.join(data_path, 'arno', 'shapes', 'lh.pial.area.vtk')  # doctest: +SKIP
+    >>> labels_file = os.path.join(data_path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> values, name = read_scalars(values_file, True, True)  # doctest: +SKIP
+    >>> labels, name = read_scalars(labels_file)  # doctest: +SKIP
+    >>> exclude_labels = [-1]  # doctest: +SKIP
     >>> # Compute sum area per label:
-    >>> sums, label_list = sum_per_label(values, labels, exclude_labels)
+    >>> sums, label_list = sum_per_label(values, labels, exclude_labels)  # doctest: +SKIP
 
     """
     import numpy as np
@@ -422,20 +422,20 @@ def stats_per_label(values, labels, exclude_labels, weights=[], precision=1):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import read_scalars
-    >>> from mindboggle.shapes.measure import stats_per_label
-    >>> data_path = os.environ['MINDBOGGLE_DATA']
-    >>> values_file = os.path.join(data_path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')
-    >>> area_file = os.path.join(data_path, 'arno', 'shapes', 'lh.pial.area.vtk')
-    >>> labels_file = os.path.join(data_path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> values, name = read_scalars(values_file, True, True)
-    >>> areas, name = read_scalars(area_file, True, True)
-    >>> labels, name = read_scalars(labels_file)
-    >>> exclude_labels = [-1]
-    >>> weights = areas
-    >>> precision = 1
-    >>> stats_per_label(values, labels, exclude_labels, weights, precision)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars  # doctest: +SKIP
+    >>> from mindboggle.shapes.measure import stats_per_label  # doctest: +SKIP
+    >>> data_path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> values_file = os.path.join(data_path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')  # doctest: +SKIP
+    >>> area_file = os.path.join(data_path, 'arno', 'shapes', 'lh.pial.area.vtk')  # doctest: +SKIP
+    >>> labels_file = os.path.join(data_path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> values, name = read_scalars(values_file, True, True)  # doctest: +SKIP
+    >>> areas, name = read_scalars(area_file, True, True)  # doctest: +SKIP
+    >>> labels, name = read_scalars(labels_file)  # doctest: +SKIP
+    >>> exclude_labels = [-1]  # doctest: +SKIP
+    >>> weights = areas  # doctest: +SKIP
+    >>> precision = 1  # doctest: +SKIP
+    >>> stats_per_label(values, labels, exclude_labels, weights, precision)  # doctest: +SKIP
 
     """
     import numpy as np
@@ -513,16 +513,16 @@ def volume_per_label(labels, input_file):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.labels.protocol import dkt_protocol
-    >>> from mindboggle.shapes.measure import volume_per_label
-    >>> path = os.path.join(os.environ['MINDBOGGLE_DATA'])
-    >>> input_file = os.path.join(path, 'arno', 'labels', 'labels.DKT25.manual.nii.gz')
-    >>> sulcus_names, sulcus_label_pair_lists, unique_sulcus_label_pairs,
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.labels.protocol import dkt_protocol  # doctest: +SKIP
+    >>> from mindboggle.shapes.measure import volume_per_label  # doctest: +SKIP
+    >>> path = os.path.join(os.environ['MINDBOGGLE_DATA'])  # doctest: +SKIP
+    >>> input_file = os.path.join(path, 'arno', 'labels', 'labels.DKT25.manual.nii.gz')  # doctest: +SKIP
+    >>> sulcus_names, sulcus_label_pair_lists, unique_sulcus_label_pairs,  # doctest: +SKIP
     ...    label_names, label_numbers, cortex_names, cortex_numbers,
     ...    noncortex_names, noncortex_numbers = dkt_protocol()
-    >>> labels_volumes = volume_per_label(label_numbers, input_file)
-    >>> print(labels_volumes)
+    >>> labels_volumes = volume_per_label(label_numbers, input_file)  # doctest: +SKIP
+    >>> print(labels_volumes)  # doctest: +SKIP
 
     """
     import numpy as np
@@ -583,35 +583,36 @@ def rescale_by_neighborhood(input_vtk, indices=[], nedges=10, p=99,
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.shapes.measure import rescale_by_neighborhood
-    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> input_vtk = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')
-    >>> indices = []
-    >>> nedges = 10
-    >>> p = 99
-    >>> set_max_to_1 = True
-    >>> save_file = True
-    >>> output_filestring = 'rescaled_scalars'
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.shapes.measure import rescale_by_neighborhood  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> input_vtk = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')  # doctest: +SKIP
+    >>> indices = []  # doctest: +SKIP
+    >>> nedges = 10  # doctest: +SKIP
+    >>> p = 99  # doctest: +SKIP
+    >>> set_max_to_1 = True  # doctest: +SKIP
+    >>> save_file = True  # doctest: +SKIP
+    >>> output_filestring = 'rescaled_scalars'  # doctest: +SKIP
     >>> #
-    >>> rescaled_scalars, rescaled_scalars_file = rescale_by_neighborhood(input_vtk,
-    >>>     indices, nedges, p, set_max_to_1, save_file, output_filestring)
+    >>> rescaled_scalars, rescaled_scalars_file = rescale_by_neighborhood(input_vtk,  # doctest: +SKIP
+    >>>     indices, nedges, p, set_max_to_1, save_file, output_filestring)  # doctest: +SKIP
     >>> #
     >>> # View rescaled scalar values per fold:
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds, name = read_scalars(folds_file)
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file)  # doctest: +SKIP
     >>> #
-    >>> rewrite_scalars(rescaled_scalars_file, rescaled_scalars_file,
-    >>>                 rescaled_scalars, 'rescaled_depths', folds)
-    >>> plot_vtk(rescaled_scalars_file)
+    >>> rewrite_scalars(rescaled_scalars_file, rescaled_scalars_file,  # doctest: +SKIP
+    >>>                 rescaled_scalars, 'rescaled_depths', folds)  # doctest: +SKIP
+    >>> plot_vtk(rescaled_scalars_file)  # doctest: +SKIP
 
     """
     import os
     import numpy as np
     from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
-    from mindboggle.utils.mesh import find_neighbors_from_file, find_neighborhood
+    from mindboggle.utils.mesh import find_neighbors_from_file, \
+        find_adjacency_matrix, find_neighborhoods
     from mindboggle.shapes.measure import rescale_by_neighborhood
 
     # Load scalars and vertex neighbor lists:
@@ -620,22 +621,46 @@ def rescale_by_neighborhood(input_vtk, indices=[], nedges=10, p=99,
         indices = [i for i,x in enumerate(scalars) if x != -1]
     print("  Rescaling {0} scalar values by neighborhood...".format(len(indices)))
     neighbor_lists = find_neighbors_from_file(input_vtk)
+    adjacency = find_adjacency_matrix(neighbor_lists)
+    indices = np.asarray(indices, dtype=int)
 
-    # Loop through vertices:
-    rescaled_scalars = scalars.copy()
-    for index in indices:
-
-        # Determine the scalars in the vertex's neighborhood:
-        neighborhood = find_neighborhood(neighbor_lists, [index], nedges)
+    # Rank all scalar values once to sort neighborhood values by integer keys:
+    npoints = len(scalars)
+    sorted_scalars = np.sort(scalars)
+    ranks = np.empty(npoints, dtype=np.int64)
+    ranks[np.argsort(scalars)] = np.arange(npoints)
 
-        # Compute a high neighborhood percentile to normalize vertex's value:
-        normalization_factor = np.percentile(scalars[neighborhood], p)
-        rescaled_scalar = scalars[index] / normalization_factor
-        rescaled_scalars[index] = rescaled_scalar
+    # Loop through blocks of vertices:
+    rescaled_scalars = scalars.copy()
+    block_size = 1000
+    for istart in range(0, len(indices), block_size):
+        block = indices[istart:istart + block_size]
+
+        # Determine the scalars in each vertex's neighborhood (one per row),
+        # sorted within each row:
+        neighborhoods = find_neighborhoods(adjacency, block, nedges)
+        starts = neighborhoods.indptr[:-1]
+        sizes = np.diff(neighborhoods.indptr)
+        rows = np.repeat(np.arange(len(block), dtype=np.int64), sizes)
+        keys = np.sort(rows * npoints + ranks[neighborhoods.indices])
+        values = sorted_scalars[keys % npoints]
+
+        # Compute a high neighborhood percentile to normalize each vertex's
+        # value (linearly interpolated, as in np.percentile):
+        nonempty = np.where(sizes > 0)[0]
+        position = (sizes[nonempty] - 1) * p / 100.0
+        below = np.floor(position).astype(int)
+        above = np.minimum(below + 1, sizes[nonempty] - 1)
+        weights = position - below
+        normalization_factors = \
+            values[starts[nonempty] + below] * (1 - weights) + \
+            values[starts[nonempty] + above] * weights
+        rescaled_scalars[block[nonempty]] = \
+            scalars[block[nonempty]] / normalization_factors
 
     # Make any rescaled value greater than 1 equal to 1:
     if set_max_to_1:
-        rescaled_scalars[[x for x in indices if rescaled_scalars[x] > 1.0]] = 1
+        rescaled_scalars[indices[rescaled_scalars[indices] > 1.0]] = 1
 
     rescaled_scalars = rescaled_scalars.tolist()
 
@@ -692,31 +717,31 @@ def rescale_by_label(input_vtk, labels_or_file, combine_all_labels=False,
     Examples
     --------
     >>> # Rescale depths by neighborhood within each label:
-    >>> import os
-    >>> from mindboggle.shapes.measure import rescale_by_label
-    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> input_vtk = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')
-    >>> labels_or_file = os.path.join(path, 'arno', 'features', 'subfolds.vtk')
-    >>> combine_all_labels = False
-    >>> nedges = 10
-    >>> p = 99
-    >>> set_max_to_1 = True
-    >>> save_file = True
-    >>> output_filestring = 'rescaled_scalars'
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.shapes.measure import rescale_by_label  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> input_vtk = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')  # doctest: +SKIP
+    >>> labels_or_file = os.path.join(path, 'arno', 'features', 'subfolds.vtk')  # doctest: +SKIP
+    >>> combine_all_labels = False  # doctest: +SKIP
+    >>> nedges = 10  # doctest: +SKIP
+    >>> p = 99  # doctest: +SKIP
+    >>> set_max_to_1 = True  # doctest: +SKIP
+    >>> save_file = True  # doctest: +SKIP
+    >>> output_filestring = 'rescaled_scalars'  # doctest: +SKIP
     >>> #
-    >>> rescaled_scalars, rescaled_scalars_file = rescale_by_label(input_vtk,
-    >>>     labels_or_file, combine_all_labels, nedges, p,
-    >>>     set_max_to_1, save_file, output_filestring)
+    >>> rescaled_scalars, rescaled_scalars_file = rescale_by_label(input_vtk,  # doctest: +SKIP
+    >>>     labels_or_file, combine_all_labels, nedges, p,  # doctest: +SKIP
+    >>>     set_max_to_1, save_file, output_filestring)  # doctest: +SKIP
     >>> #
     >>> # View rescaled scalar values per fold:
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds, name = read_scalars(folds_file)
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file)  # doctest: +SKIP
     >>> #
-    >>> rewrite_scalars(rescaled_scalars_file, rescaled_scalars_file,
-    >>>                 rescaled_scalars, 'rescaled_depths', folds)
-    >>> plot_vtk(rescaled_scalars_file)
+    >>> rewrite_scalars(rescaled_scalars_file, rescaled_scalars_file,  # doctest: +SKIP
+    >>>                 rescaled_scalars, 'rescaled_depths', folds)  # doctest: +SKIP
+    >>> plot_vtk(rescaled_scalars_file)  # doctest: +SKIP
 
     """
     import os
@@ -33,14 +33,14 @@ def zernike_moments(points, faces, n_moments=20):
 
     Examples
     --------
-    >>> from mindboggle.shapes.zernike.zernike import zernike_moments
-    >>> from mindboggle.utils.io_vtk import read_vtk
-    >>> vtk_file = '/drop/MB/data/arno/features/folds.vtk'
-    >>> faces, u1,u2, points, u3,u4,u5,u6 = read_vtk(vtk_file)
+    >>> from mindboggle.shapes.zernike.zernike import zernike_moments  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_vtk  # doctest: +SKIP
+    >>> vtk_file = '/drop/MB/data/arno/features/folds.vtk'  # doctest: +SKIP
+    >>> faces, u1,u2, points, u3,u4,u5,u6 = read_vtk(vtk_file)  # doctest: +SKIP
     >>> #points = [[0,0,0], [1,0,0], [0,0,1], [0,1,1], [1,0,1], [0,1,0], [1,1,1], [1,1,0]]
     >>> #faces = [[0,2,4], [0,1,4], [2,3,4], [3,4,5], [3,5,6], [0,1,7]]
-    >>> n_moments = 20
-    >>> zernike_moments(points, faces, n_moments)
+    >>> n_moments = 20  # doctest: +SKIP
+    >>> zernike_moments(points, faces, n_moments)  # doctest: +SKIP
 
     """
     import numpy as np
@@ -52,13 +52,16 @@ def zernike_moments(points, faces, n_moments=20):
     if isinstance(faces, list):
         faces = np.array(faces)
 
+    # The pipeline (ported from MATLAB) indexes vertices from 1,
+    # with 3 vertices per face:
     pl = MultiprocPipeline()
-    n_points = np.size(points)
-    n_faces = np.size(faces)
+    n_faces = len(faces)
+    n_vertices_per_face = 3
 
-    G = pl.geometric_moments_orig(points, faces, n_moments, n_faces, n_points)
-    Z = pl.zernike(G, n_points)
-    moments = pl.feature_extraction(Z, n_points)
+    G = pl.geometric_moments_orig(points, faces + 1, n_moments, n_faces,
+                                  n_vertices_per_face)
+    Z = pl.zernike(G, n_moments)
+    moments = pl.feature_extraction(Z, n_moments)
 
     return moments
 
@@ -85,12 +88,12 @@ def zernike_moments_per_label(vtk_file, n_moments, exclude_labels=[-1]):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.shapes.laplace_beltrami import laplacian_per_label
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> vtk_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> n_moments = 20
-    >>> zernike_moments_per_label(vtk_file, n_moments, exclude_labels=[-1]
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.shapes.laplace_beltrami import laplacian_per_label  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> n_moments = 20  # doctest: +SKIP
+    >>> zernike_moments_per_label(vtk_file, n_moments, exclude_labels=[-1]  # doctest: +SKIP
 
     """
     from mindboggle.utils.io_vtk import read_vtk
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+"""
+Synthetic cortical-like surfaces for offline tests and benchmarks.
+
+A folded surface is a sphere (or torus) from testing/meshes.py pushed
+inward along its normals by procedurally generated grooves, like sulci,
+with the scalars Mindboggle computes from real surfaces:
+rescaled depth (in [0, 1]), mean curvature (positive in groove bottoms),
+and DKT31 cortical labels. Surfaces are generated once per process and
+size, and written to VTK files in a temporary directory, so nothing has
+to be downloaded (as with the sample data in MINDBOGGLE_DATA).
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+
+# Generated surfaces, by (shape, n_subdivisions, hemi):
+surfaces = {}
+
+# Surface files, by (shape, n_subdivisions, hemi):
+surface_files = {}
+
+
+def vertex_normals(points, faces):
+    """
+    Compute unit normal vectors at vertices (area-weighted face normals).
+
+    Parameters
+    ----------
+    points : numpy array of floats
+        x,y,z coordinates for each vertex
+    faces : numpy array of integers
+        indices to three vertices for each triangle
+
+    Returns
+    -------
+    normals : numpy array of floats
+        unit normal vector for each vertex
+
+    Examples
+    --------
+    >>> from mindboggle.testing.meshes import icosphere
+    >>> from mindboggle.testing.fixtures import vertex_normals
+    >>> points, faces = icosphere(2)
+    >>> normals = vertex_normals(points, faces)
+    >>> bool(((normals * points).sum(axis=1) > 0.99).all())
+    True
+
+    """
+    import numpy as np
+
+    face_normals = np.cross(points[faces[:, 1]] - points[faces[:, 0]],
+                            points[faces[:, 2]] - points[faces[:, 0]])
+    normals = np.zeros(points.shape)
+    for i in range(3):
+        for j in range(3):
+            normals[:, j] += np.bincount(faces[:, i], face_normals[:, j],
+                                         minlength=len(points))
+    normals /= np.sqrt((normals**2).sum(axis=1))[:, np.newaxis]
+
+    return normals
+
+
+def folded_surface(shape='sphere', n_subdivisions=5, hemi='lh',
+                   fold_depth=0.2, seed=0):
+    """
+    Generate a folded surface with depth, curvature and label values.
+
+    Parameters
+    ----------
+    shape : string
+        'sphere' (radius 50) or 'torus' (radii 50 and 15)
+    n_subdivisions : integer
+        resolution: 10 * 4**n_subdivisions + 2 vertices for a sphere,
+        and about as many for a torus (a hemisphere has about 130,000
+        vertices, so 6 or 7 for a realistic size; extract_folds() expects
+        more than 10,000 vertices, so at least 5)
+    hemi : string
+        'lh' or 'rh': cortical labels of the left or right hemisphere
+    fold_depth : float
+        depth of the deepest groove, as a fraction of the (minor) radius
+    seed : integer
+        seed for the random grooves and label regions
+
+    Returns
+    -------
+    surface : dictionary
+        'points', 'faces', 'depths', 'curvatures', 'labels' (numpy arrays),
+        'neighbor_lists' and 'npoints'
+
+    Examples
+    --------
+    >>> from mindboggle.testing.fixtures import folded_surface
+    >>> surface = folded_surface('sphere', 3)
+    >>> surface['npoints'], len(surface['faces'])
+    (642, 1280)
+    >>> len(set(surface['labels']))
+    31
+
+    """
+    import sys
+    import numpy as np
+    from mindboggle.testing.meshes import icosphere, torus, depth_field, \
+        curvature_field, label_field
+    from mindboggle.utils.mesh import find_neighbors
+    from mindboggle.labels.protocol import dkt_protocol
+
+    if shape == 'sphere':
+        points, faces = icosphere(n_subdivisions, radius=50.0)
+        radius = 50.0
+    elif shape == 'torus':
+        n_minor = int(round(np.sqrt((10 * 4**n_subdivisions + 2) / 2.0)))
+        points, faces = torus(2 * n_minor, n_minor, 50.0, 15.0)
+        radius = 15.0
+    else:
+        sys.exit('Unknown surface shape: {0}'.format(shape))
+
+    if hemi == 'lh':
+        label_numbers = [x for x in dkt_protocol('DKT31')[6] if x < 2000]
+    elif hemi == 'rh':
+        label_numbers = [x for x in dkt_protocol('DKT31')[6] if x >= 2000]
+    else:
+        sys.exit('Unknown hemisphere: {0}'.format(hemi))
+
+    #-------------------------------------------------------------------------
+    # Fold the surface, pushing vertices inward by their depth:
+    #-------------------------------------------------------------------------
+    depths = depth_field(points, seed=seed)
+    normals = vertex_normals(points, faces)
+    points = points - fold_depth * radius * depths[:, np.newaxis] * normals
+
+    surface = {'points': points,
+               'faces': faces,
+               'npoints': len(points),
+               'depths': depths,
+               'curvatures': curvature_field(depths, faces, len(points)),
+               'labels': label_field(points, label_numbers, seed=seed),
+               'neighbor_lists': find_neighbors(faces.tolist(), len(points))}
+
+    return surface
+
+
+def synthetic_surface(shape='sphere', n_subdivisions=5, hemi='lh'):
+    """
+    Generate a folded surface once per process (see folded_surface()).
+
+    Examples
+    --------
+    >>> from mindboggle.testing.fixtures import synthetic_surface
+    >>> surface = synthetic_surface('torus', 3)
+    >>> surface is synthetic_surface('torus', 3)
+    True
+
+    """
+    from mindboggle.testing.fixtures import surfaces, folded_surface
+
+    key = (shape, n_subdivisions, hemi)
+    if key not in surfaces:
+        surfaces[key] = folded_surface(shape, n_subdivisions, hemi)
+
+    return surfaces[key]
+
+
+def synthetic_surface_files(shape='sphere', n_subdivisions=5, hemi='lh',
+                            output_path=''):
+    """
+    Write a folded surface's depth, curvature and label values to VTK files.
+
+    Parameters
+    ----------
+    shape : string
+        'sphere' or 'torus'
+    n_subdivisions : integer
+        resolution (see folded_surface())
+    hemi : string
+        'lh' or 'rh'
+    output_path : string
+        output directory (default: a temporary directory, and the files
+        are written once per process)
+
+    Returns
+    -------
+    files : dictionary
+        'depth_file', 'curvature_file', 'labels_file'
+
+    Examples
+    --------
+    >>> from mindboggle.testing.fixtures import synthetic_surface_files
+    >>> from mindboggle.utils.io_vtk import read_scalars
+    >>> files = synthetic_surface_files('sphere', 3)
+    >>> depths, name = read_scalars(files['depth_file'], True, True)
+    Load "depths" scalars from lh.sphere.depths.vtk
+    >>> len(depths), name
+    (642, 'depths')
+
+    """
+    import os
+    import tempfile
+    from mindboggle.utils.io_vtk import write_vtk
+    from mindboggle.testing.fixtures import surface_files, synthetic_surface
+
+    key = (shape, n_subdivisions, hemi)
+    if not output_path and key in surface_files:
+        return surface_files[key]
+
+    surface = synthetic_surface(shape, n_subdivisions, hemi)
+    path = output_path or tempfile.mkdtemp(prefix='mindboggle_fixtures_')
+    files = {}
+    for key_file, name in [('depth_file', 'depths'),
+                           ('curvature_file', 'curvatures'),
+                           ('labels_file', 'labels')]:
+        files[key_file] = os.path.join(path, '{0}.{1}.{2}.vtk'.format(
+                                       hemi, shape, name))
+        write_vtk(files[key_file], surface['points'].tolist(), [], [],
+                  surface['faces'].tolist(), [surface[name].tolist()], [name])
+    if not output_path:
+        surface_files[key] = files
+
+    return files
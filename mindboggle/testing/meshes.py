@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+"""
+Synthetic surface meshes and scalar fields for tests and benchmarks.
+
+These are generated locally (no data downloads) at any resolution:
+
+  icosphere()
+    Triangulated sphere from a subdivided icosahedron.
+  torus()
+    Triangulated torus.
+  depth_field()
+    Procedurally generated depth values: elongated grooves like sulci.
+  curvature_field()
+    Curvature-like values from the graph Laplacian of a scalar field.
+  label_field()
+    Contiguous label regions (spherical Voronoi regions).
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+
+
+def icosphere(n_subdivisions=3, radius=1.0):
+    """
+    Triangulate a sphere by subdividing the faces of an icosahedron.
+
+    Parameters
+    ----------
+    n_subdivisions : integer
+        number of times to split each triangle into four
+        (10 * 4**n_subdivisions + 2 vertices)
+    radius : float
+        radius of the sphere
+
+    Returns
+    -------
+    points : numpy array of floats
+        x,y,z coordinates for each vertex
+    faces : numpy array of integers
+        indices to three vertices for each triangle (outward normals)
+
+    Examples
+    --------
+    >>> from mindboggle.testing.meshes import icosphere
+    >>> points, faces = icosphere(2)
+    >>> len(points), len(faces)
+    (162, 320)
+
+    """
+    import numpy as np
+
+    t = (1.0 + np.sqrt(5.0)) / 2.0
+    points = np.array([[-1, t, 0], [1, t, 0], [-1, -t, 0], [1, -t, 0],
+                       [0, -1, t], [0, 1, t], [0, -1, -t], [0, 1, -t],
+                       [t, 0, -1], [t, 0, 1], [-t, 0, -1], [-t, 0, 1]],
+                      dtype=float)
+    faces = np.array([[0, 11, 5], [0, 5, 1], [0, 1, 7], [0, 7, 10],
+                      [0, 10, 11], [1, 5, 9], [5, 11, 4], [11, 10, 2],
+                      [10, 7, 6], [7, 1, 8], [3, 9, 4], [3, 4, 2],
+                      [3, 2, 6], [3, 6, 8], [3, 8, 9], [4, 9, 5],
+                      [2, 4, 11], [6, 2, 10], [8, 6, 7], [9, 8, 1]])
+    points /= np.sqrt((points**2).sum(axis=1))[:, np.newaxis]
+
+    #-------------------------------------------------------------------------
+    # Split each triangle into four, with a new vertex at each edge's middle:
+    #-------------------------------------------------------------------------
+    for isubdivision in range(n_subdivisions):
+        edges = np.vstack((faces[:, [0, 1]], faces[:, [1, 2]],
+                           faces[:, [2, 0]]))
+        edges.sort(axis=1)
+        unique_edges, edge_index = np.unique(
+            edges[:, 0] * len(points) + edges[:, 1], return_inverse=True)
+        middles = np.column_stack((unique_edges // len(points),
+                                   unique_edges % len(points)))
+        new_points = points[middles[:, 0]] + points[middles[:, 1]]
+        new_points /= np.sqrt((new_points**2).sum(axis=1))[:, np.newaxis]
+        m = len(points) + edge_index.reshape(3, len(faces)).T
+        faces = np.vstack(([faces[:, 0], m[:, 0], m[:, 2]],
+                           [faces[:, 1], m[:, 1], m[:, 0]],
+                           [faces[:, 2], m[:, 2], m[:, 1]],
+                           [m[:, 0], m[:, 1], m[:, 2]])).reshape(
+                           4, 3, len(faces)).transpose(0, 2, 1).reshape(-1, 3)
+        points = np.vstack((points, new_points))
+
+    return radius * points, faces
+
+
+def torus(n_major=64, n_minor=32, major_radius=2.0, minor_radius=0.5):
+    """
+    Triangulate a torus around the z axis.
+
+    Parameters
+    ----------
+    n_major : integer
+        number of vertices around the z axis
+    n_minor : integer
+        number of vertices around the tube
+    major_radius : float
+        distance from the z axis to the center of the tube
+    minor_radius : float
+        radius of the tube
+
+    Returns
+    -------
+    points : numpy array of floats
+        x,y,z coordinates for each vertex (n_major * n_minor vertices)
+    faces : numpy array of integers
+        indices to three vertices for each triangle
+
+    Examples
+    --------
+    >>> from mindboggle.testing.meshes import torus
+    >>> points, faces = torus(16, 8)
+    >>> len(points), len(faces)
+    (128, 256)
+
+    """
+    import numpy as np
+
+    u = np.repeat(np.linspace(0, 2*np.pi, n_major, endpoint=False), n_minor)
+    v = np.tile(np.linspace(0, 2*np.pi, n_minor, endpoint=False), n_major)
+    r = major_radius + minor_radius * np.cos(v)
+    points = np.column_stack((r * np.cos(u), r * np.sin(u),
+                              minor_radius * np.sin(v)))
+
+    i = np.repeat(np.arange(n_major), n_minor)
+    j = np.tile(np.arange(n_minor), n_major)
+    a = i * n_minor + j
+    b = ((i + 1) % n_major) * n_minor + j
+    c = ((i + 1) % n_major) * n_minor + (j + 1) % n_minor
+    d = i * n_minor + (j + 1) % n_minor
+    faces = np.vstack((np.column_stack((a, b, c)), np.column_stack((a, c, d))))
+
+    return points, faces
+
+
+def depth_field(points, n_grooves=20, groove_width=0.08, groove_length=0.4,
+                seed=0):
+    """
+    Generate depth values with elongated grooves, like sulci.
+
+    Each groove runs along a random great circle, with depth falling off
+    across the groove (groove_width) and along it from its center
+    (groove_length), both measured on the unit sphere around the centroid
+    of the points, so most grooves are separated by shallow regions.
+
+    Parameters
+    ----------
+    points : numpy array of floats
+        x,y,z coordinates for each vertex
+    n_grooves : integer
+        number of grooves
+    groove_width : float
+        width of each groove
+    groove_length : float
+        length of each groove
+    seed : integer
+        seed for the random groove positions
+
+    Returns
+    -------
+    depths : numpy array of floats
+        depth values in [0, 1] for all vertices
+
+    Examples
+    --------
+    >>> from mindboggle.testing.meshes import icosphere, depth_field
+    >>> points, faces = icosphere(3)
+    >>> depths = depth_field(points)
+    >>> depths.min(), depths.max()
+    (0.0, 1.0)
+
+    """
+    import numpy as np
+
+    random_state = np.random.RandomState(seed)
+    directions = points - points.mean(axis=0)
+    directions /= np.sqrt((directions**2).sum(axis=1))[:, np.newaxis]
+
+    depths = np.zeros(len(points))
+    for igroove in range(n_grooves):
+        center = random_state.normal(size=3)
+        center /= np.sqrt((center**2).sum())
+        normal = np.cross(center, random_state.normal(size=3))
+        normal /= np.sqrt((normal**2).sum())
+        across = np.dot(directions, normal)
+        along = np.arccos(np.clip(np.dot(directions, center), -1, 1))
+        depth = random_state.uniform(0.5, 1.0) * \
+            np.exp(-(across / groove_width)**2 - (along / groove_length)**2)
+        depths = np.maximum(depths, depth)
+
+    depths -= depths.min()
+    depths /= depths.max()
+
+    return depths
+
+
+def curvature_field(values, faces, npoints):
+    """
+    Compute curvature-like values from the graph Laplacian of a field.
+
+    Parameters
+    ----------
+    values : numpy array of floats
+        scalar values for all vertices (such as from depth_field())
+    faces : numpy array of integers
+        indices to three vertices for each triangle
+    npoints : integer
+        number of vertices
+
+    Returns
+    -------
+    curvatures : numpy array of floats
+        values in [-1, 1]: positive where the field is locally higher
+        than the average of its neighbors (such as the bottom of a groove)
+
+    Examples
+    --------
+    >>> from mindboggle.testing.meshes import icosphere, depth_field
+    >>> from mindboggle.testing.meshes import curvature_field
+    >>> points, faces = icosphere(3)
+    >>> curvatures = curvature_field(depth_field(points), faces, len(points))
+
+    """
+    import numpy as np
+    from scipy.sparse import coo_matrix
+
+    edges = np.vstack((faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]))
+    edges = np.vstack((edges, edges[:, ::-1]))
+    A = coo_matrix((np.ones(len(edges)), (edges[:, 0], edges[:, 1])),
+                   shape=(npoints, npoints)).tocsr()
+    A.data[:] = 1
+    degrees = np.asarray(A.sum(axis=1)).ravel()
+
+    curvatures = values - A.dot(values) / degrees
+    curvatures /= np.abs(curvatures).max() or 1
+
+    return curvatures
+
+
+def label_field(points, labels, seed=0):
+    """
+    Assign labels to contiguous regions around random vertices.
+
+    Parameters
+    ----------
+    points : numpy array of floats
+        x,y,z coordinates for each vertex
+    labels : list of integers
+        labels (one region each)
+    seed : integer
+        seed for the random region centers
+
+    Returns
+    -------
+    vertex_labels : numpy array of integers
+        label for each vertex (of the nearest region center,
+        by direction from the centroid of the points)
+
+    Examples
+    --------
+    >>> from mindboggle.testing.meshes import icosphere, label_field
+    >>> points, faces = icosphere(3)
+    >>> vertex_labels = label_field(points, [1002, 1003, 1005])
+
+    """
+    import numpy as np
+
+    random_state = np.random.RandomState(seed)
+    directions = points - points.mean(axis=0)
+    directions /= np.sqrt((directions**2).sum(axis=1))[:, np.newaxis]
+    centers = directions[random_state.permutation(len(points))[:len(labels)]]
+
+    nearest = np.argmax(np.dot(directions, centers.T), axis=1)
+
+    return np.asarray(labels)[nearest]
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""
+Tests of combining the tables of a cohort of subjects.
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+
+
+def test_write_cohort_tables():
+    import os
+    import tempfile
+    from mindboggle.mindboggler import write_cohort_tables
+    from mindboggle.utils.io_table import write_columns
+
+    output_path = tempfile.mkdtemp()
+    tables_path = os.path.join(output_path, 'results', 'tables')
+    subjects = ['s1', 's2']
+    for subject in subjects:
+        for hemi in ['left', 'right']:
+            path = os.path.join(tables_path, hemi, subject)
+            os.makedirs(path)
+            write_columns([[1, 2], [0.5, 0.7]], ['label', 'area'],
+                          os.path.join(path, 'label_shapes.csv'))
+        path = os.path.join(tables_path, 'atlas.nii.gz', subject)
+        os.makedirs(path)
+        write_columns([[4, 5], [10, 20]], ['label', 'volume'],
+                      os.path.join(path, 'volumes.csv'))
+
+    cohort_tables = write_cohort_tables(output_path, subjects)
+
+    assert cohort_tables == [
+        os.path.join(tables_path, 'cohort_atlas.nii.gz_volumes.csv'),
+        os.path.join(tables_path, 'cohort_label_shapes.csv')]
+    lines = open(cohort_tables[1]).read().splitlines()
+    assert lines[0] == '"subject","hemisphere","label","area"'
+    assert len(lines) == 9
+    assert lines[1] == '"s1","lh","1","0.5"'
+    assert lines[-1] == '"s2","rh","2","0.7"'
+    lines = open(cohort_tables[0]).read().splitlines()
+    assert lines[0] == '"subject","hemisphere","label","volume"'
+    assert lines[1:3] == ['"s1","","4","10"', '"s1","","5","20"']
+
+    # A rerun replaces (and does not include) the cohort tables:
+    assert write_cohort_tables(output_path, subjects) == cohort_tables
+    assert len(open(cohort_tables[1]).read().splitlines()) == 9
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Import-time budget for Mindboggle modules.
+
+Each nipype Function node runs in a fresh interpreter, so importing a
+Mindboggle module should not pull in heavy dependencies (vtk, networkx,
+scipy, nipype, ...); those are imported inside the functions that use them.
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+
+# Seconds allowed to import a module (in a fresh interpreter):
+import_budget = 0.5
+
+# Modules that may not be loaded by importing a Mindboggle module:
+heavy_modules = ['vtk', 'networkx', 'scipy', 'nipype', 'nibabel', 'pandas',
+                 'matplotlib', 'mayavi', 'surfer']
+
+
+def mindboggle_modules():
+    """
+    List importable Mindboggle modules.
+
+    Skips the unfinished code in x/, the zernike implementations that
+    are only imported when moments are computed, and test scripts.
+    """
+    import os
+
+    package_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    skip_dirs = ['x', 'tests', 'compat', 'naive', 'multiproc']
+
+    modules = []
+    for root, dirs, files in os.walk(package_path):
+        dirs[:] = sorted([x for x in dirs if x not in skip_dirs])
+        for file in sorted(files):
+            if file.endswith('.py') and file not in ['__init__.py',
+                                                     'test.py']:
+                path = os.path.relpath(os.path.join(root, file[:-3]),
+                                       os.path.dirname(package_path))
+                modules.append(path.replace(os.sep, '.'))
+
+    return modules
+
+
+def import_module(module):
+    """
+    Import a module in a fresh interpreter.
+
+    Returns
+    -------
+    seconds : float
+        time to import the module
+    loaded : list of strings
+        heavy modules loaded by the import
+    """
+    import sys
+    import subprocess
+
+    script = '; '.join([
+        'import sys, time',
+        't0 = time.time()',
+        'import {0}'.format(module),
+        'print(time.time() - t0)',
+        'print(" ".join([x for x in {0!r} if x in sys.modules]))'.format(
+            heavy_modules)])
+    output = subprocess.check_output([sys.executable, '-c', script])
+    lines = output.decode().splitlines()
+
+    return float(lines[-2]), lines[-1].split()
+
+
+def test_import_budget():
+    failures = []
+    for module in mindboggle_modules():
+        seconds, loaded = import_module(module)
+        if loaded:
+            failures.append('{0} imports {1}'.format(module,
+                                                     ', '.join(loaded)))
+        if seconds > import_budget:
+            failures.append('{0} takes {1:.2f} s to import'.format(module,
+                                                                  seconds))
+
+    assert not failures, '\n'.join(failures)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Tests of retrieving data files through a cache.
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+
+
+def test_read_only_mirror():
+    import os
+    import tempfile
+    from mindboggle.utils.io_uri import retrieve_data, get_hash
+
+    path = tempfile.mkdtemp()
+    mirror = os.path.join(path, 'mirror')
+    cache = os.path.join(path, 'cache')
+    os.mkdir(mirror)
+    mirror_file = os.path.join(mirror, 'atlas.txt')
+    open(mirror_file, 'w').write('atlas')
+    hashes = {'atlas.txt': get_hash(mirror_file)}
+    url = 'http://example.invalid/'
+
+    # Read-only: use the verified mirror file, without writing a cache:
+    assert retrieve_data('atlas.txt', url, hashes, 'NO_CACHE_ENV', cache,
+                         read_only=True, mirror=mirror) == mirror_file
+    assert retrieve_data('atlas.txt', url, {}, 'NO_CACHE_ENV', cache,
+                         read_only=True, mirror=mirror) == mirror_file
+    assert not os.path.exists(cache)
+    assert not os.path.exists(mirror_file + '.md5')
+
+    # Read-only: exit if the mirror file's hash does not match, or if
+    # there is nothing to use without downloading:
+    for kwargs in [{'hashes': {'atlas.txt': 'x' * 32}, 'mirror': mirror},
+                   {'hashes': {}, 'mirror': ''},
+                   {'hashes': {}, 'mirror': os.path.join(path, 'none')}]:
+        try:
+            retrieve_data('atlas.txt', url, cache_env='NO_CACHE_ENV',
+                          cache=cache, read_only=True, **kwargs)
+        except SystemExit:
+            pass
+        else:
+            assert False, kwargs
+
+    # Writable: copy the mirror file into the cache:
+    data_path = retrieve_data('atlas.txt', url, hashes, 'NO_CACHE_ENV',
+                              cache, mirror=mirror)
+    assert data_path == os.path.join(cache, hashes['atlas.txt'], 'atlas.txt')
+    assert open(data_path).read() == 'atlas'
+
+
+def test_mirror_fallback():
+    import os
+    import tempfile
+    from mindboggle.utils.io_uri import retrieve_data, get_hash
+
+    path = tempfile.mkdtemp()
+    mirror = os.path.join(path, 'mirror')
+    server = os.path.join(path, 'server')
+    cache = os.path.join(path, 'cache')
+    os.mkdir(mirror)
+    os.mkdir(server)
+    server_file = os.path.join(server, 'labels.txt')
+    open(server_file, 'w').write('labels')
+    url = 'file://' + server + '/'
+
+    # Download a file missing from the mirror:
+    data_path = retrieve_data('labels.txt', url, {}, 'NO_CACHE_ENV', cache,
+                              mirror=mirror)
+    assert open(data_path).read() == 'labels'
+    hashes = {'labels.txt': get_hash(server_file)}
+    data_path = retrieve_data('labels.txt', url, hashes, 'NO_CACHE_ENV',
+                              cache, mirror=mirror)
+    assert data_path == os.path.join(cache, hashes['labels.txt'],
+                                     'labels.txt')
+    assert open(data_path).read() == 'labels'
+
+    # Exit if a copied or downloaded file's hash does not match,
+    # leaving nothing in the cache:
+    open(os.path.join(mirror, 'atlas.txt'), 'w').write('atlas')
+    open(os.path.join(server, 'atlas.txt'), 'w').write('atlas')
+    for mirror_path in [mirror, '']:
+        try:
+            retrieve_data('atlas.txt', url, {'atlas.txt': 'x' * 32},
+                          'NO_CACHE_ENV', cache, mirror=mirror_path)
+        except SystemExit as error:
+            assert 'does not match' in str(error)
+        else:
+            assert False, mirror_path
+        assert os.listdir(os.path.join(cache, 'x' * 32)) == \
+            ['atlas.txt.lock']
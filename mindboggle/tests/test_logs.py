@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Tests of logging progress events from long-running functions.
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+
+# Resolution of the synthetic surfaces (see test_surfaces.py):
+n_subdivisions = 5
+
+
+def test_progress_events():
+    import os
+    import logging
+    import tempfile
+    import numpy as np
+    from mindboggle.features.folds import extract_folds
+    from mindboggle.utils.segment import watershed
+    from mindboggle.utils.logs import setup_logging, read_progress
+    from mindboggle.testing.fixtures import synthetic_surface, \
+        synthetic_surface_files
+
+    surface = synthetic_surface('sphere', n_subdivisions)
+    files = synthetic_surface_files('sphere', n_subdivisions)
+    log_file = os.path.join(tempfile.mkdtemp(), 'mindboggle.log')
+
+    logger = logging.getLogger('mindboggle')
+    handlers, level = logger.handlers[:], logger.level
+    setup_logging('DEBUG', log_file)
+    try:
+        folds, n_folds = extract_folds(files['depth_file'], 50, 0.001,
+                                       False)[0:2]
+        deep = np.where(surface['depths'] > 0.3)[0].tolist()
+        segments, seeds = watershed(surface['depths'], surface['points'],
+            deep, surface['neighbor_lists'], min_size=1, depth_factor=0.25,
+            depth_ratio=0.1, tolerance=0.01, regrow=True)
+    finally:
+        for handler in logger.handlers[:]:
+            handler.close()
+            logger.removeHandler(handler)
+        for handler in handlers:
+            logger.addHandler(handler)
+        logger.setLevel(level)
+
+    events = read_progress(log_file, 'extract_folds')
+    assert [x['step'] for x in events] == ['segment', 'done']
+    assert events[-1]['n_folds'] == n_folds
+    assert events[0]['n_vertices'] == surface['npoints']
+    assert all([x['pid'] == os.getpid() for x in events])
+
+    # Every watershed iteration is logged at DEBUG level:
+    events = read_progress(log_file, 'watershed')
+    steps = [x['step'] for x in events]
+    assert [x for x in steps if x not in ['segment', 'regrow']] == \
+        ['segmented', 'regrown', 'merged']
+    assert steps.count('segment') == len(seeds)
+    assert steps.count('regrow') == len(seeds)
+    assert events[steps.index('segmented')]['n_regions'] == len(seeds)
+    elapsed = [x['elapsed'] for x in events]
+    assert elapsed == sorted(elapsed)
+
+
+def run_fundi(log_file, n_processes):
+    """Extract fundi from the folds of a synthetic surface."""
+    import os
+    import tempfile
+    import numpy as np
+    from mindboggle.features.folds import extract_folds
+    from mindboggle.features.fundi import extract_fundi
+    from mindboggle.utils.logs import setup_logging
+    from mindboggle.testing.fixtures import synthetic_surface_files
+
+    setup_logging('INFO', log_file)
+    files = synthetic_surface_files('sphere', n_subdivisions)
+    folds = extract_folds(files['depth_file'], 50, 0.001, False)[0]
+    os.chdir(tempfile.mkdtemp())
+    extract_fundi(folds, np.asarray(folds), files['curvature_file'],
+                  files['depth_file'], 10, 0.1, 10, False, n_processes)
+
+
+def test_tasks_in_daemonic_process():
+    import os
+    import tempfile
+    import multiprocessing
+    from mindboggle.utils.logs import read_progress
+
+    # As in a MultiProc worker, fundi are extracted from folds in more
+    # than one process:
+    log_file = os.path.join(tempfile.mkdtemp(), 'mindboggle.log')
+    process = multiprocessing.Process(target=run_fundi,
+                                      args=(log_file, 2))
+    process.daemon = True
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+    events = read_progress(log_file, 'extract_fundus_from_fold')
+    pids = set([x['pid'] for x in events])
+    assert len(events) > 1
+    assert len(pids) > 1
+    assert process.pid not in pids
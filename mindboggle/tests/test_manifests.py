@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+"""
+Tests of reusing outputs of workflow nodes with unchanged inputs.
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+
+# A node function that counts its runs (in values_file.runs) and writes
+# an output file in the working directory:
+function_str = '''def scale_values(values_file, factor):
+    import os
+    open(values_file + '.runs', 'a').write('run\\n')
+    values = [float(x) * factor for x in open(values_file).read().split()]
+    output_file = os.path.join(os.getcwd(), 'scaled.txt')
+    open(output_file, 'w').write(' '.join([str(x) for x in values]))
+    return output_file, len(values)
+'''
+
+
+def run_node(working_path, kwargs, manifest_path):
+    import os
+    from mindboggle.utils.manifests import run_cached
+
+    if not os.path.isdir(working_path):
+        os.makedirs(working_path)
+    cwd = os.getcwd()
+    os.chdir(working_path)
+    try:
+        return run_cached(function_str, 'Scale', manifest_path, kwargs)
+    finally:
+        os.chdir(cwd)
+
+
+def test_run_cached():
+    import os
+    import shutil
+    import tempfile
+
+    path = tempfile.mkdtemp()
+    manifest_path = os.path.join(path, 'manifests')
+    values_file = os.path.join(path, 'values.txt')
+    open(values_file, 'w').write('1 2 3')
+    kwargs = {'values_file': values_file, 'factor': 2}
+
+    def n_runs():
+        return len(open(values_file + '.runs').readlines())
+
+    # First run:
+    output_file, n_values = run_node(os.path.join(path, 'work1'), kwargs,
+                                     manifest_path)
+    assert n_runs() == 1
+    assert n_values == 3
+    assert open(output_file).read() == '2.0 4.0 6.0'
+
+    # Same inputs, after the working directory is removed:
+    shutil.rmtree(os.path.join(path, 'work1'))
+    outputs = run_node(os.path.join(path, 'work2'), kwargs, manifest_path)
+    assert n_runs() == 1
+    assert isinstance(outputs, tuple)
+    assert outputs[0] == os.path.join(path, 'work2', 'scaled.txt')
+    assert open(outputs[0]).read() == '2.0 4.0 6.0'
+    assert outputs[1] == 3
+
+    # Same contents with a new time stamp:
+    os.utime(values_file, (0, 0))
+    run_node(os.path.join(path, 'work3'), kwargs, manifest_path)
+    assert n_runs() == 1
+
+    # New parameter:
+    kwargs['factor'] = 3
+    output_file, n_values = run_node(os.path.join(path, 'work4'), kwargs,
+                                     manifest_path)
+    assert n_runs() == 2
+    assert open(output_file).read() == '3.0 6.0 9.0'
+
+    # New input file contents:
+    open(values_file, 'w').write('1 2')
+    output_file, n_values = run_node(os.path.join(path, 'work5'), kwargs,
+                                     manifest_path)
+    assert n_runs() == 3
+    assert n_values == 2
+
+    # Missing copy of an output file:
+    for root, dirs, files in os.walk(manifest_path):
+        for file in files:
+            if file.endswith('scaled.txt'):
+                os.remove(os.path.join(root, file))
+    run_node(os.path.join(path, 'work6'), kwargs, manifest_path)
+    assert n_runs() == 4
+    run_node(os.path.join(path, 'work7'), kwargs, manifest_path)
+    assert n_runs() == 4
+
+
+# Node functions shaped like extract_folds (returning numpy arrays and a
+# file in the working directory) and extract_sulci (returning a list and
+# a file), counting their runs:
+folds_str = '''def find_folds(depth_file, min_fold_size):
+    import os
+    import numpy as np
+    open(depth_file + '.runs', 'a').write('folds\\n')
+    depths = np.array([float(x) for x in open(depth_file).read().split()])
+    folds = np.where(depths > 0.5, 1, -1)
+    n_folds = 1
+    depth_threshold = np.float64(0.5)
+    bins, bin_edges = np.histogram(depths, 4)
+    folds_file = os.path.join(os.getcwd(), 'folds.txt')
+    open(folds_file, 'w').write(' '.join([str(x) for x in folds]))
+    return folds.tolist(), n_folds, depth_threshold, bins, bin_edges, \\
+           folds_file
+'''
+sulci_str = '''def find_sulci(depth_file, folds):
+    import os
+    open(depth_file + '.runs', 'a').write('sulci\\n')
+    sulci = [2 * x for x in folds]
+    sulci_file = os.path.join(os.getcwd(), 'sulci.txt')
+    open(sulci_file, 'w').write(' '.join([str(x) for x in sulci]))
+    return sulci, len(sulci), sulci_file
+'''
+
+
+def test_run_cached_arrays():
+    import os
+    import shutil
+    import tempfile
+    import numpy as np
+    from mindboggle.utils.manifests import run_cached
+
+    path = tempfile.mkdtemp()
+    manifest_path = os.path.join(path, 'manifests')
+    depth_file = os.path.join(path, 'depths.txt')
+    open(depth_file, 'w').write('0.1 0.6 0.9 0.2')
+
+    def run_nodes(working_path):
+        cwd = os.getcwd()
+        outputs = []
+        for name, function_str, kwargs in [
+            ('Folds', folds_str, {'depth_file': depth_file,
+                                  'min_fold_size': 50}),
+            ('Sulci', sulci_str, {'depth_file': depth_file})]:
+            if name == 'Sulci':
+                kwargs['folds'] = outputs[0][0]
+            node_path = os.path.join(working_path, name)
+            os.makedirs(node_path)
+            os.chdir(node_path)
+            try:
+                outputs.append(run_cached(function_str, name,
+                                          manifest_path, kwargs))
+            finally:
+                os.chdir(cwd)
+        return outputs
+
+    first = run_nodes(os.path.join(path, 'work1'))
+    shutil.rmtree(os.path.join(path, 'work1'))
+    second = run_nodes(os.path.join(path, 'work2'))
+
+    # Both nodes are restored instead of run again:
+    assert open(depth_file + '.runs').read().split() == ['folds', 'sulci']
+    folds, n_folds, depth_threshold, bins, bin_edges, folds_file = second[0]
+    assert folds == first[0][0] == [-1, 1, 1, -1]
+    assert depth_threshold == 0.5
+    assert np.array_equal(bins, first[0][3])
+    assert np.array_equal(bin_edges, first[0][4])
+    assert folds_file == os.path.join(path, 'work2', 'Folds', 'folds.txt')
+    assert open(folds_file).read() == '-1 1 1 -1'
+    assert second[1][0:2] == ([-2, 2, 2, -2], 4)
+
+    # Output files are kept as hard links, not copies:
+    if hasattr(os, 'link'):
+        assert os.stat(folds_file).st_nlink == 2
+
+
+def test_run_cached_package_changes():
+    import os
+    import tempfile
+    import mindboggle
+    from mindboggle.utils.manifests import hash_package, package_hashes
+
+    path = tempfile.mkdtemp()
+    manifest_path = os.path.join(path, 'manifests')
+    values_file = os.path.join(path, 'values.txt')
+    open(values_file, 'w').write('1 2 3')
+    kwargs = {'values_file': values_file, 'factor': 2}
+
+    def n_runs():
+        return len(open(values_file + '.runs').readlines())
+
+    # A changed source file changes a package's hash (in a new process):
+    package_path = os.path.join(path, 'package')
+    os.makedirs(package_path)
+    open(os.path.join(package_path, '__init__.py'), 'w').write('')
+    open(os.path.join(package_path, 'segment.py'), 'w').write('x = 1\n')
+    sha1 = hash_package(package_path)
+    open(os.path.join(package_path, 'segment.py'), 'w').write('x = 2\n')
+    assert hash_package(package_path) == sha1
+    del package_hashes[os.path.abspath(package_path)]
+    assert hash_package(package_path) != sha1
+
+    # A node runs again with the same inputs after Mindboggle's code
+    # (which its function may call) changes:
+    run_node(os.path.join(path, 'work1'), kwargs, manifest_path)
+    run_node(os.path.join(path, 'work2'), kwargs, manifest_path)
+    assert n_runs() == 1
+    mindboggle_path = os.path.abspath(os.path.dirname(mindboggle.__file__))
+    mindboggle_sha1 = hash_package()
+    package_hashes[mindboggle_path] = sha1
+    try:
+        run_node(os.path.join(path, 'work3'), kwargs, manifest_path)
+        assert n_runs() == 2
+        run_node(os.path.join(path, 'work4'), kwargs, manifest_path)
+        assert n_runs() == 2
+    finally:
+        package_hashes[mindboggle_path] = mindboggle_sha1
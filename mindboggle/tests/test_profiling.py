@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+Tests of profiling workflow nodes.
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+
+# A node function that holds an array of n_bytes (and a child process
+# that holds child_bytes) for a moment:
+function_str = '''def hold_memory(n_bytes, child_bytes):
+    import sys
+    import time
+    import subprocess
+    import numpy as np
+    array = np.ones(n_bytes // 8)
+    if child_bytes:
+        subprocess.check_call([sys.executable, '-c',
+            'import time; s = " " * {0}; time.sleep(0.3)'.format(child_bytes)])
+    time.sleep(0.2)
+    return len(array)
+'''
+
+
+def test_peak_rss_per_run():
+    import os
+    import glob
+    import json
+    import tempfile
+    from mindboggle.utils.profiling import run_profiled
+
+    if not os.path.isdir('/proc'):
+        return
+    profile_path = tempfile.mkdtemp()
+    MB = 2 ** 20
+
+    # A large run, then a small run in the same process:
+    for name, n_bytes, child_bytes in [('Large', 400 * MB, 200 * MB),
+                                       ('Small', 40 * MB, 0)]:
+        run_profiled(function_str, name, profile_path,
+                     {'n_bytes': n_bytes, 'child_bytes': child_bytes})
+    records = {}
+    for record_file in glob.glob(os.path.join(profile_path, '*.json')):
+        record = json.load(open(record_file))
+        records[record['node']] = record
+
+    large, small = records['Large'], records['Small']
+    assert large['peak_rss'] - large['start_rss'] > 350 * MB
+    assert large['peak_rss_children'] > 200 * MB
+    # The small run's peak does not include the large run's:
+    assert 30 * MB < small['peak_rss'] - small['start_rss'] < 100 * MB
+    assert small['peak_rss'] < large['peak_rss'] - 250 * MB
+    assert small['peak_rss_children'] is None
@@ -0,0 +1,378 @@
+#!/usr/bin/env python
+"""
+Tests of surface functions on synthetic folded surfaces
+(testing/fixtures.py), so they run without the sample data.
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+
+# Resolution of the synthetic surfaces (10,242 vertices; extract_folds()
+# expects more than 10,000 vertices):
+n_subdivisions = 5
+
+
+def test_read_write_vtk():
+    import numpy as np
+    from mindboggle.utils.io_vtk import read_vtk
+    from mindboggle.testing.fixtures import synthetic_surface, \
+        synthetic_surface_files
+
+    surface = synthetic_surface('sphere', n_subdivisions)
+    files = synthetic_surface_files('sphere', n_subdivisions)
+    faces, lines, indices, points, npoints, depths, name, input_vtk = \
+        read_vtk(files['depth_file'], True, True)
+
+    assert npoints == surface['npoints']
+    assert name == 'depths'
+    assert np.array_equal(faces, surface['faces'])
+    assert np.allclose(points, surface['points'], atol=1e-4)
+    assert np.allclose(depths, surface['depths'], atol=1e-4)
+
+
+def test_find_neighbors():
+    from mindboggle.utils.mesh import find_neighbors
+    from mindboggle.testing.fixtures import synthetic_surface
+
+    for shape in ['sphere', 'torus']:
+        surface = synthetic_surface(shape, n_subdivisions)
+        neighbor_lists = find_neighbors(surface['faces'].tolist(),
+                                        surface['npoints'])
+        for index, neighbors in enumerate(neighbor_lists):
+            assert len(neighbors) in [5, 6]
+            assert index not in neighbors
+            for neighbor in neighbors:
+                assert index in neighbor_lists[neighbor]
+
+
+def test_segment():
+    import numpy as np
+    from mindboggle.utils.segment import segment
+    from mindboggle.testing.fixtures import synthetic_surface
+
+    surface = synthetic_surface('sphere', n_subdivisions)
+    deep = np.where(surface['depths'] > 0.3)[0]
+    segments = np.asarray(segment(deep.tolist(), surface['neighbor_lists']))
+
+    # Every deep vertex (and no other) is in a contiguous segment:
+    assert np.array_equal(np.where(segments != -1)[0], deep)
+    for index in deep:
+        same = [x for x in surface['neighbor_lists'][index]
+                if segments[x] == segments[index]]
+        assert same
+
+
+def test_extract_folds_and_sulci():
+    import os
+    import tempfile
+    import numpy as np
+    from mindboggle.features.folds import extract_folds
+    from mindboggle.features.sulci import extract_sulci
+    from mindboggle.labels.protocol import dkt_protocol
+    from mindboggle.testing.fixtures import synthetic_surface, \
+        synthetic_surface_files
+
+    surface = synthetic_surface('sphere', n_subdivisions)
+    files = synthetic_surface_files('sphere', n_subdivisions)
+    folds, n_folds, depth_threshold, bins, bin_edges, folds_file = \
+        extract_folds(files['depth_file'], 50, 0.001, False)
+    folds = np.asarray(folds)
+
+    # The grooves are found as folds, and folds are deeper than the rest:
+    assert n_folds > 1
+    assert np.median(surface['depths'][folds != -1]) > \
+        np.median(surface['depths'][folds == -1])
+
+    sulcus_names, sulcus_label_pair_lists, unique_sulcus_label_pairs = \
+        dkt_protocol('DKT31')[0:3]
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    try:
+        sulci, n_sulci, sulci_file = extract_sulci(files['labels_file'],
+            folds.tolist(), 'lh', sulcus_label_pair_lists,
+            unique_sulcus_label_pairs, 1, sulcus_names)
+    finally:
+        os.chdir(cwd)
+
+    # Sulci are parts of folds:
+    sulci = np.asarray(sulci)
+    assert n_sulci > 0
+    assert np.all(folds[sulci != -1] != -1)
+
+
+def test_stats_per_label():
+    import numpy as np
+    from mindboggle.shapes.measure import stats_per_label
+    from mindboggle.testing.fixtures import synthetic_surface
+
+    surface = synthetic_surface('sphere', n_subdivisions)
+    medians, mads, means, sdevs, skews, kurts, lower_quarts, upper_quarts, \
+        label_list = stats_per_label(surface['depths'], surface['labels'],
+                                     [-1])
+
+    assert sorted(label_list) == sorted(set(surface['labels']))
+    for label, mean, median in zip(label_list, means, medians):
+        depths = surface['depths'][surface['labels'] == label]
+        assert np.allclose(mean, depths.mean())
+        assert np.allclose(median, np.median(depths))
+
+
+def test_memory_budget():
+    import os
+    import tempfile
+    import numpy as np
+    from mindboggle.features.folds import extract_folds
+    from mindboggle.features.sulci import extract_sulci
+    from mindboggle.features.fundi import extract_fundi
+    from mindboggle.utils.io_table import write_shape_stats
+    from mindboggle.labels.protocol import dkt_protocol
+    from mindboggle.testing.fixtures import synthetic_surface_files
+
+    files = synthetic_surface_files('sphere', n_subdivisions)
+    folds = extract_folds(files['depth_file'], 50, 0.001, False)[0]
+    sulcus_names, sulcus_label_pair_lists, unique_sulcus_label_pairs = \
+        dkt_protocol('DKT31')[0:3]
+
+    # The same sulci, fundi and tables with a (1 megabyte) memory budget,
+    # with folds processed in batches, as without:
+    results = []
+    cwd = os.getcwd()
+    for memory_budget in [0, 1]:
+        os.chdir(tempfile.mkdtemp())
+        try:
+            sulci = extract_sulci(files['labels_file'], list(folds), 'lh',
+                sulcus_label_pair_lists, unique_sulcus_label_pairs, 1,
+                sulcus_names, 1, memory_budget)[0]
+            fundi = extract_fundi(folds, np.asarray(sulci),
+                files['curvature_file'], files['depth_file'], 10, 0.1, 10,
+                False, 1, memory_budget)[0]
+            tables = write_shape_stats(files['labels_file'], sulci, fundi,
+                area_file=files['depth_file'],
+                mean_curvature_file=files['curvature_file'],
+                memory_budget=memory_budget)
+            results.append((list(sulci), fundi,
+                            [open(x).read() for x in tables],
+                            sorted(os.listdir(os.getcwd()))))
+        finally:
+            os.chdir(cwd)
+
+    assert max(results[0][0]) > -1
+    assert results[0] == results[1]
+
+    # A failed run leaves no memory-mapped files in the working directory:
+    os.chdir(tempfile.mkdtemp())
+    try:
+        try:
+            extract_fundi(folds, np.asarray(sulci), files['curvature_file'],
+                          'missing_depths.vtk', 10, 0.1, 10, False, 1, 1)
+        except Exception:
+            pass
+        else:
+            assert False
+        assert os.listdir(os.getcwd()) == []
+    finally:
+        os.chdir(cwd)
+
+
+def test_zernike_moments():
+    import numpy as np
+    from mindboggle.shapes.zernike.zernike import zernike_moments
+    from mindboggle.testing.fixtures import synthetic_surface
+
+    # Zernike moments of a (coarse) torus do not change when it is rotated:
+    surface = synthetic_surface('torus', 1)
+    moments = np.ravel(zernike_moments(surface['points'].tolist(),
+                                       surface['faces'].tolist(), 3))
+    angle = 0.7
+    rotation = np.array([[np.cos(angle), -np.sin(angle), 0],
+                         [np.sin(angle), np.cos(angle), 0],
+                         [0, 0, 1]])
+    rotated = np.ravel(zernike_moments(np.dot(surface['points'],
+                                              rotation.T),
+                                       surface['faces'], 3))
+    assert len(moments) == 6
+    assert np.all(np.isfinite(moments))
+    assert np.allclose(moments, rotated)
+
+
+def test_fill_holes():
+    import numpy as np
+    from mindboggle.utils.mesh import find_neighbors
+    from mindboggle.utils.morph import fill_holes
+
+    # A 7x7 grid of vertices (two triangles per square), with region 1
+    # in the inner 5x5 vertices around a one-vertex hole (vertex 24),
+    # and region 2 in two of the hole's six neighbors:
+    faces = [[i*7+j, i*7+j+1, i*7+j+8] for i in range(6) for j in range(6)]
+    faces.extend([[i*7+j, i*7+j+8, i*7+j+7]
+                  for i in range(6) for j in range(6)])
+    neighbor_lists = find_neighbors(faces, 49)
+    assert sorted(neighbor_lists[24]) == [16, 17, 23, 25, 31, 32]
+    regions = -1 * np.ones(49)
+    regions[[i*7+j for i in range(1, 6) for j in range(1, 6)]] = 1
+    regions[[24]] = -1
+    regions[[25, 32]] = 2
+
+    # The hole takes the region of most of its edges (1), not the
+    # largest neighboring region number (2):
+    filled = fill_holes(regions.copy(), neighbor_lists)
+    assert filled[24] == 1
+    assert np.all(filled[[25, 32]] == 2)
+    assert np.all(np.delete(filled, 24) == np.delete(regions, 24))
+
+
+def test_find_neighborhoods():
+    import numpy as np
+    from mindboggle.utils.mesh import find_neighborhood, find_neighborhoods
+    from mindboggle.testing.fixtures import synthetic_surface
+
+    # The batched neighborhoods are the same as one search per vertex:
+    surface = synthetic_surface('torus', 3)
+    indices = range(0, surface['npoints'], 37)
+    for nedges in [1, 2, 3]:
+        neighborhoods = find_neighborhoods(surface['neighbor_lists'],
+                                           indices, nedges)
+        assert neighborhoods.shape == (len(indices), surface['npoints'])
+        for index, row in zip(indices, neighborhoods):
+            assert row.indices.tolist() == sorted(find_neighborhood(
+                surface['neighbor_lists'], [index], nedges))
+
+
+def test_extract_submesh():
+    import numpy as np
+    from mindboggle.utils.mesh import find_neighbors, extract_submesh
+    from mindboggle.testing.fixtures import synthetic_surface
+
+    surface = synthetic_surface('sphere', 3)
+    deep = np.where(surface['depths'] > 0.3)[0].tolist()
+    sub_faces, sub_points, sub_indices = extract_submesh(deep,
+        surface['faces'].tolist(), surface['neighbor_lists'],
+        surface['points'].tolist(), 1)
+    sub_indices = np.asarray(sub_indices)
+
+    # The patch's vertices and faces are those of the whole mesh:
+    assert set(deep) < set(sub_indices)
+    assert np.allclose(sub_points, surface['points'][sub_indices])
+    faces = set([tuple(x) for x in surface['faces'].tolist()])
+    assert all([tuple(sub_indices[x]) in faces for x in sub_faces])
+
+    # The given vertices have the same neighbors in the patch:
+    sub_neighbor_lists = find_neighbors(sub_faces, len(sub_indices))
+    for sub_index, index in enumerate(sub_indices):
+        if index in deep:
+            assert sorted(sub_indices[sub_neighbor_lists[sub_index]]) == \
+                sorted(surface['neighbor_lists'][index])
+
+
+def test_connect_points_hmmf():
+    import numpy as np
+    from mindboggle.utils.segment import segment
+    from mindboggle.utils.paths import connect_points_hmmf
+    from mindboggle.testing.fixtures import synthetic_surface
+
+    # Connect the two farthest vertices of the largest fold, with the
+    # fold's normalized depths as likelihood values:
+    surface = synthetic_surface('sphere', 4)
+    neighbor_lists = surface['neighbor_lists']
+    depths = surface['depths']
+    segments = np.asarray(segment(np.where(depths > 0.3)[0].tolist(),
+                                  neighbor_lists))
+    labels, counts = np.unique(segments[segments != -1],
+                               return_counts=True)
+    fold = np.where(segments == labels[np.argmax(counts)])[0]
+    points = surface['points'][fold]
+    distances = np.sum((points[:, np.newaxis] - points)**2, axis=2)
+    anchors = fold[list(np.unravel_index(np.argmax(distances),
+                                         distances.shape))].tolist()
+    likelihoods = np.zeros(surface['npoints'])
+    likelihoods[fold] = depths[fold] / np.max(depths[fold])
+
+    skeleton = connect_points_hmmf(anchors, fold.tolist(), likelihoods,
+                                   neighbor_lists, 1.0)
+
+    # The skeleton is a thinner part of the fold that connects the anchors:
+    assert set(anchors) <= set(skeleton) <= set(fold)
+    assert len(skeleton) < len(fold)
+    connected = set(anchors[0:1])
+    front = anchors[0:1]
+    while front:
+        front = [x for y in front for x in neighbor_lists[y]
+                 if x in skeleton and x not in connected]
+        connected.update(front)
+    assert connected == set(skeleton)
+
+
+def test_rescale_by_neighborhood():
+    import numpy as np
+    from mindboggle.shapes.measure import rescale_by_neighborhood
+    from mindboggle.utils.io_vtk import read_scalars
+    from mindboggle.utils.mesh import find_neighborhood
+    from mindboggle.testing.fixtures import synthetic_surface, \
+        synthetic_surface_files
+
+    surface = synthetic_surface('sphere', 3)
+    files = synthetic_surface_files('sphere', 3)
+    depths, name = read_scalars(files['depth_file'], True, True)
+    rescaled, rescaled_file = rescale_by_neighborhood(files['depth_file'],
+        [], 2, 99, False, False)
+
+    # Each value is divided by the 99th percentile of its neighborhood:
+    for index in range(surface['npoints']):
+        neighborhood = find_neighborhood(surface['neighbor_lists'],
+                                         [index], 2)
+        assert np.allclose(rescaled[index], depths[index] /
+                           np.percentile(depths[neighborhood], 99))
+
+
+def test_fit_normals_to_histogram():
+    import numpy as np
+    from mindboggle.shapes.likelihood import fit_normals_to_histogram
+
+    # Recover the means, sigmas and weights of two normal distributions:
+    random_state = np.random.RandomState(0)
+    data = np.concatenate([random_state.normal(0.2, 0.05, 2000),
+                           random_state.normal(0.7, 0.1, 1000)])
+    x = np.linspace(0, 1, 51, endpoint=True)
+    for use_histogram in [False, True]:
+        means, sigmas, weights = fit_normals_to_histogram(data, x, k=2,
+            n_iterations=100, use_histogram=use_histogram)
+        order = np.argsort(means)
+        assert np.allclose(np.asarray(means)[order], [0.2, 0.7], atol=0.02)
+        assert np.allclose(np.asarray(sigmas)[order], [0.05, 0.1],
+                           atol=0.02)
+        assert np.allclose(np.asarray(weights)[order], [2/3.0, 1/3.0],
+                           atol=0.02)
+
+
+def test_compute_likelihood():
+    import os
+    import tempfile
+    import cPickle as pickle
+    import numpy as np
+    from mindboggle.shapes.likelihood import compute_likelihood
+    from mindboggle.utils.io_vtk import read_scalars
+    from mindboggle.testing.fixtures import synthetic_surface_files
+
+    # Deep fold vertices are likely to be on sulcus label borders,
+    # and curvatures are distributed the same on and off borders:
+    def parameters(mean, sigma):
+        return {'means': [mean], 'sigmas': [sigma], 'weights': [1.0]}
+    trained_file = os.path.join(tempfile.mkdtemp(), 'parameters.pkl')
+    pickle.dump([parameters(0.8, 0.1), parameters(0.0, 1.0),
+                 parameters(0.2, 0.1), parameters(0.0, 1.0)],
+                open(trained_file, 'wb'))
+
+    files = synthetic_surface_files('sphere', 3)
+    depths, name = read_scalars(files['depth_file'], True, True)
+    folds = np.where(depths > 0.3, 1, -1)
+    likelihoods, likelihoods_file = compute_likelihood(trained_file,
+        files['depth_file'], files['curvature_file'], folds.tolist())
+    likelihoods = np.asarray(likelihoods)
+
+    # The likelihood is the border density over the sum of both densities:
+    border = np.exp(-(depths - 0.8)**2 / 0.02)
+    nonborder = np.exp(-(depths - 0.2)**2 / 0.02)
+    assert np.all(likelihoods[folds == -1] == 0)
+    assert np.allclose(likelihoods[folds == 1],
+                       (border / (border + nonborder))[folds == 1],
+                       atol=1e-6)
@@ -40,15 +40,15 @@ def ANTS(source, target, iterations='30x99x11', output_stem=''):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.ants import register_volume
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> source = os.path.join(path, 'arno', 'mri', 't1weighted_brain.nii.gz')
-    >>> target = os.path.join(path, 'atlases', 'MNI152_T1_1mm_brain.nii.gz')
-    >>> iterations = "0"
-    >>> output_stem = ""
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.ants import register_volume  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> source = os.path.join(path, 'arno', 'mri', 't1weighted_brain.nii.gz')  # doctest: +SKIP
+    >>> target = os.path.join(path, 'atlases', 'MNI152_T1_1mm_brain.nii.gz')  # doctest: +SKIP
+    >>> iterations = "0"  # doctest: +SKIP
+    >>> output_stem = ""  # doctest: +SKIP
     >>> #
-    >>> ANTS(source, target, iterations, output_stem)
+    >>> ANTS(source, target, iterations, output_stem)  # doctest: +SKIP
 
     """
     import os
@@ -188,17 +188,17 @@ def PropagateLabelsThroughMask(mask_volume, label_volume, output_file='',
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.ants import PropagateLabelsThroughMask
-    >>> path = os.path.join(os.environ['MINDBOGGLE_DATA'])
-    >>> label_volume = os.path.join(path, 'arno', 'labels', 'labels.DKT25.manual.nii.gz')
-    >>> mask_volume = os.path.join(path, 'arno', 'mri', 't1weighted_brain.nii.gz')
-    >>> output_file = ''
-    >>> binarize = True
-    >>> output_file = PropagateLabelsThroughMask(mask_volume, label_volume,
-    >>>                                          output_file, binarize)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.ants import PropagateLabelsThroughMask  # doctest: +SKIP
+    >>> path = os.path.join(os.environ['MINDBOGGLE_DATA'])  # doctest: +SKIP
+    >>> label_volume = os.path.join(path, 'arno', 'labels', 'labels.DKT25.manual.nii.gz')  # doctest: +SKIP
+    >>> mask_volume = os.path.join(path, 'arno', 'mri', 't1weighted_brain.nii.gz')  # doctest: +SKIP
+    >>> output_file = ''  # doctest: +SKIP
+    >>> binarize = True  # doctest: +SKIP
+    >>> output_file = PropagateLabelsThroughMask(mask_volume, label_volume,  # doctest: +SKIP
+    >>>                                          output_file, binarize)  # doctest: +SKIP
     >>> # View
-    >>> plot_volumes(output_file)
+    >>> plot_volumes(output_file)  # doctest: +SKIP
 
     """
     import os
@@ -254,17 +254,17 @@ def fill_volume_with_surface_labels(volume_mask, surface_files,
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.ants import fill_volume_with_surface_labels
-    >>> path = os.path.join(os.environ['MINDBOGGLE_DATA'])
-    >>> surface_files = [os.path.join(path, 'arno', 'labels',
-    >>>     'lh.labels.DKT25.manual.vtk'), os.path.join(path, 'arno', 'labels',
-    >>>     'rh.labels.DKT25.manual.vtk')]
-    >>> volume_mask = os.path.join(path, 'arno', 'mri', 't1weighted_brain.nii.gz')
-    >>> output_file = ''
-    >>> binarize = True
-    >>> fill_volume_with_surface_labels(volume_mask, surface_files,
-    >>>                                 output_file, binarize)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.ants import fill_volume_with_surface_labels  # doctest: +SKIP
+    >>> path = os.path.join(os.environ['MINDBOGGLE_DATA'])  # doctest: +SKIP
+    >>> surface_files = [os.path.join(path, 'arno', 'labels',  # doctest: +SKIP
+    >>>     'lh.labels.DKT25.manual.vtk'), os.path.join(path, 'arno', 'labels',  # doctest: +SKIP
+    >>>     'rh.labels.DKT25.manual.vtk')]  # doctest: +SKIP
+    >>> volume_mask = os.path.join(path, 'arno', 'mri', 't1weighted_brain.nii.gz')  # doctest: +SKIP
+    >>> output_file = ''  # doctest: +SKIP
+    >>> binarize = True  # doctest: +SKIP
+    >>> fill_volume_with_surface_labels(volume_mask, surface_files,  # doctest: +SKIP
+    >>>                                 output_file, binarize)  # doctest: +SKIP
 
     """
     import os
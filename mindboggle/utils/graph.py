@@ -12,9 +12,6 @@ Authors:
 Copyright 2012,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
 
 """
-#import numpy as np
-import networkx as nx
-#from scipy.sparse import lil_matrix
 from mindboggle.utils.kernels import rbf_kernel, cotangent_kernel, inverse_distance
 
 ###############################################################################
@@ -64,7 +61,7 @@ def diagonal_degree_matrix(W, inverse=False, square_root=False):
 ###############################################################################
 
 def weight_graph(Nodes, Indices, Meshes, kernel=rbf_kernel, add_to_graph=True,
-                 G=nx.Graph(), sigma=20):
+                 G=None, sigma=20):
     """
     Construct weighted edges of a graph and compute an affinity matrix.
 
@@ -79,7 +76,7 @@ def weight_graph(Nodes, Indices, Meshes, kernel=rbf_kernel, add_to_graph=True,
         - inverse_distance: additional kernel where the weight is the inverse
           of the distance between two nodes
     add_to_graph :  boolean (add to graph?)
-    G :  networkx graph
+    G :  networkx graph (new graph if None)
     sigma :  float (parameter for rbf_kernel)
 
     Returns
@@ -92,6 +89,10 @@ def weight_graph(Nodes, Indices, Meshes, kernel=rbf_kernel, add_to_graph=True,
     from scipy.sparse import lil_matrix
     from mindboggle.utils.kernels import rbf_kernel, cotangent_kernel, inverse_distance
 
+    if add_to_graph and G is None:
+        import networkx as nx
+        G = nx.Graph()
+
     if kernel is rbf_kernel or kernel is inverse_distance:
         if kernel is rbf_kernel:
             print('Compute weights using rbf kernel (sigma={0})'.format(sigma))
@@ -13,32 +13,59 @@ Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
 """
 
 
-def surface_to_vtk(surface_file):
+def freesurfer_to_vtk(surface_file, scalar_files=[], annot_files=[],
+                      output_vtk=''):
     """
-    Convert FreeSurfer surface file to VTK format.
+    Convert FreeSurfer surface and per-vertex data files to one VTK file.
 
-    If a file named orig.mgz exists in '../mri', the surface coordinates
-    are transformed into scanner RAS space during format conversion
-    according to the vox2ras transform in that file.
+    The surface is read with nibabel and, if a file named orig.mgz exists
+    in '../mri', its coordinates are transformed into scanner RAS space
+    according to the vox2ras transform in that file.  The values in any
+    number of curvature-format files (such as curv, thickness, or sulc)
+    and .annot files are written as scalar arrays of the same VTK file
+    in one pass, without reading or rewriting an intermediate VTK file.
+
+    Parameters
+    ----------
+    surface_file : string
+        name of FreeSurfer surface file
+    scalar_files : list of strings
+        names of FreeSurfer curvature, thickness, or convexity files
+    annot_files : list of strings
+        names of FreeSurfer .annot files
+    output_vtk : string
+        name of output VTK file (default: surface file name + '.vtk')
+
+    Returns
+    -------
+    output_vtk : string
+        name of output VTK file, with one scalar array per input file
+        (named after the file, or 'Labels' for a single .annot file)
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.io_free import surface_to_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> surface_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial')
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_free import freesurfer_to_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> surface_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial')  # doctest: +SKIP
+    >>> scalar_files = [os.path.join(path, 'arno', 'freesurfer', 'lh.thickness'),  # doctest: +SKIP
+    >>>                 os.path.join(path, 'arno', 'freesurfer', 'lh.sulc')]  # doctest: +SKIP
+    >>> annot_files = [os.path.join(path, 'arno', 'freesurfer', 'lh.aparc.annot')]  # doctest: +SKIP
     >>> #
-    >>> surface_to_vtk(surface_file)
+    >>> freesurfer_to_vtk(surface_file, scalar_files, annot_files,  # doctest: +SKIP
+    >>>                   'lh.pial.shapes.vtk')  # doctest: +SKIP
     >>> #
     >>> # View:
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> plot_vtk('lh.pial.vtk')
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> plot_vtk('lh.pial.shapes.vtk')  # doctest: +SKIP
 
     """
     import os
+    import numpy as np
     import nibabel as nb
 
-    from mindboggle.utils.io_vtk import write_header, write_points, write_faces
+    from mindboggle.utils.io_vtk import write_header, write_points, \
+        write_vertices, write_faces, write_scalars
 
     surf = nb.freesurfer.read_geometry(surface_file)
     points = surf[0]
@@ -51,7 +78,6 @@ def surface_to_vtk(surface_file):
                              "..", "mri", "orig.mgz")
 
     if os.path.exists(orig_file):
-        import numpy as np
         Norig = nb.load(orig_file).get_affine()
         Torig = np.array([[-1, 0, 0, 128],
                           [0, 0, 1, -128],
@@ -62,25 +88,78 @@ def surface_to_vtk(surface_file):
             np.concatenate((points, np.ones((np.shape(points)[0],1))),
                            axis=1))))[:,0:3]
 
-    output_vtk = os.path.join(os.getcwd(),
-                              os.path.basename(surface_file + '.vtk'))
+    # Load per-vertex values:
+    scalars = []
+    scalar_names = []
+    for scalar_file in scalar_files:
+        scalars.append(nb.freesurfer.read_morph_data(scalar_file))
+        scalar_names.append(os.path.basename(scalar_file))
+    for annot_file in annot_files:
+        labels, colortable, names = nb.freesurfer.read_annot(annot_file)
+        scalars.append(labels)
+        if len(annot_files) == 1:
+            scalar_names.append('Labels')
+        else:
+            scalar_names.append(os.path.basename(annot_file))
+
+    if not output_vtk:
+        output_vtk = os.path.basename(surface_file + '.vtk')
+    output_vtk = os.path.join(os.getcwd(), output_vtk)
     Fp = open(output_vtk, 'w')
     write_header(Fp, Title='vtk output from ' + surface_file)
-    write_points(Fp, points)
-    write_faces(Fp, faces)
+    write_points(Fp, points.tolist())
+    if scalars:
+        # Include all vertices (as rewrite_scalars() does):
+        write_vertices(Fp, range(len(points)))
+    write_faces(Fp, faces.tolist())
+    for iscalar, scalar_list in enumerate(scalars):
+        write_scalars(Fp, scalar_list.tolist(), scalar_names[iscalar],
+                      begin_scalars=(iscalar == 0))
     Fp.close()
 
     return output_vtk
 
 
+def surface_to_vtk(surface_file):
+    """
+    Convert FreeSurfer surface file to VTK format.
+
+    If a file named orig.mgz exists in '../mri', the surface coordinates
+    are transformed into scanner RAS space during format conversion
+    according to the vox2ras transform in that file.
+
+    Examples
+    --------
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_free import surface_to_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> surface_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial')  # doctest: +SKIP
+    >>> #
+    >>> surface_to_vtk(surface_file)  # doctest: +SKIP
+    >>> #
+    >>> # View:
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> plot_vtk('lh.pial.vtk')  # doctest: +SKIP
+
+    """
+    from mindboggle.utils.io_free import freesurfer_to_vtk
+
+    output_vtk = freesurfer_to_vtk(surface_file)
+
+    return output_vtk
+
+
 def curvature_to_vtk(surface_file, vtk_file):
     """
     Convert FreeSurfer curvature, thickness, or convexity file to VTK format.
 
+    If vtk_file is a FreeSurfer surface file (rather than a VTK file),
+    the output is converted directly from it by freesurfer_to_vtk().
+
     Parameters
     ----------
     surface_file : string  (name of FreeSurfer surface file)
-    vtk_file : string  (name of VTK surface file)
+    vtk_file : string  (name of VTK surface file, or FreeSurfer surface file)
 
     Returns
     -------
@@ -90,30 +169,34 @@ def curvature_to_vtk(surface_file, vtk_file):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import curvature_to_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> surface_file = os.path.join(path, 'arno', 'freesurfer', 'lh.thickness')
-    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import curvature_to_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> surface_file = os.path.join(path, 'arno', 'freesurfer', 'lh.thickness')  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')  # doctest: +SKIP
     >>> #
-    >>> curvature_to_vtk(surface_file, vtk_file)
+    >>> curvature_to_vtk(surface_file, vtk_file)  # doctest: +SKIP
     >>> #
     >>> # View:
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> plot_vtk('lh.thickness.vtk')
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> plot_vtk('lh.thickness.vtk')  # doctest: +SKIP
 
     """
     import os
     import nibabel as nb
 
     from mindboggle.utils.io_vtk import rewrite_scalars
+    from mindboggle.utils.io_free import freesurfer_to_vtk
 
     output_vtk = os.path.join(os.getcwd(), os.path.basename(surface_file)+'.vtk')
 
-    curvature_values = nb.freesurfer.read_morph_data(surface_file)
-    scalar_names = os.path.basename(surface_file)
+    if not vtk_file.endswith('.vtk'):
+        freesurfer_to_vtk(vtk_file, [surface_file], [], output_vtk)
+    else:
+        curvature_values = nb.freesurfer.read_morph_data(surface_file)
+        scalar_names = os.path.basename(surface_file)
 
-    rewrite_scalars(vtk_file, output_vtk, curvature_values, scalar_names)
+        rewrite_scalars(vtk_file, output_vtk, curvature_values, scalar_names)
 
     return output_vtk
 
@@ -122,12 +205,15 @@ def annot_to_vtk(annot_file, vtk_file):
     """
     Load a FreeSurfer .annot file and save as a VTK format file.
 
+    If vtk_file is a FreeSurfer surface file (rather than a VTK file),
+    the output is converted directly from it by freesurfer_to_vtk().
+
     Parameters
     ----------
     annot_file : string
         name of FreeSurfer .annot file
     vtk_file : string
-        name of VTK surface file
+        name of VTK surface file (or FreeSurfer surface file)
 
     Returns
     -------
@@ -139,29 +225,33 @@ def annot_to_vtk(annot_file, vtk_file):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import annot_to_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> annot_file = os.path.join(path, 'arno', 'freesurfer', 'lh.aparc.annot')
-    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import annot_to_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> annot_file = os.path.join(path, 'arno', 'freesurfer', 'lh.aparc.annot')  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')  # doctest: +SKIP
     >>> #
-    >>> labels, output_vtk = annot_to_vtk(annot_file, vtk_file)
+    >>> labels, output_vtk = annot_to_vtk(annot_file, vtk_file)  # doctest: +SKIP
     >>> #
     >>> # View:
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> plot_vtk('lh.aparc.vtk')
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> plot_vtk('lh.aparc.vtk')  # doctest: +SKIP
 
     """
     import os
     import nibabel as nb
     from mindboggle.utils.io_vtk import rewrite_scalars
+    from mindboggle.utils.io_free import freesurfer_to_vtk
 
     labels, colortable, names = nb.freesurfer.read_annot(annot_file)
 
     output_vtk = os.path.join(os.getcwd(),
                               os.path.basename(annot_file).strip('.annot') + '.vtk')
 
-    rewrite_scalars(vtk_file, output_vtk, labels, 'Labels')
+    if not vtk_file.endswith('.vtk'):
+        freesurfer_to_vtk(vtk_file, [], [annot_file], output_vtk)
+    else:
+        rewrite_scalars(vtk_file, output_vtk, labels, 'Labels')
 
     return labels, output_vtk
 
@@ -50,15 +50,17 @@ def read_columns(filename, n_columns=1, trail=False):
     return columns
 
 def write_columns(columns, column_names, output_table, delimiter=',',
-                  quote=True, input_table=''):
+                  quote=True, input_table='', output_format='csv'):
     """
     Write table with columns and column names.  Assumes space(s) as delimiter.
 
     If there is an input table file to append to, assume a 1-line header.
+    The table is written in one pass, in blocks of rows, and the rows of
+    an input table are prepended as they are, without parsing their values.
 
     Parameters
     ----------
-    columns :  list of lists of floats or integers
+    columns :  list of lists of floats or integers (or numpy arrays)
         values (each list is a column of values)
     column_names :  list of strings
         names of columns
@@ -70,11 +72,16 @@ def write_columns(columns, column_names, output_table, delimiter=',',
         string bracketing each element, such as '"'
     input_table : string (default is empty string)
         name of table file to which the columns are to be appended
+    output_format : string
+        'csv' for a delimited text table, or 'parquet' or 'feather'
+        for a columnar binary table (requires pandas and pyarrow;
+        otherwise a delimited text table is written)
 
     Returns
     -------
     output_table : string
-        name of output table file
+        name of output table file (with a '.parquet' or '.feather'
+        extension for binary tables)
 
     Examples
     --------
@@ -91,11 +98,15 @@ def write_columns(columns, column_names, output_table, delimiter=',',
     >>> write_columns(columns, column_names, output_table, delimiter, quote, input_table)
     >>> write_columns(values2, 'value 2', output_table, delimiter,
     >>>               quote, input_table=output_table)
+    >>> #
+    >>> # Write a columnar binary table (if pandas and pyarrow are installed):
+    >>> write_columns(columns, column_names, output_table,
+    >>>               output_format='parquet')
 
     """
     import os
     import sys
-    from mindboggle.utils.io_table import read_columns
+    import numpy as np
 
     output_table = os.path.join(os.getcwd(), output_table)
     if quote:
@@ -107,13 +118,12 @@ def write_columns(columns, column_names, output_table, delimiter=',',
     # Check format of inputs
     #-----------------------
     # If the list contains integers or floats, put in a list:
-    if columns:
-        if isinstance(columns[0], int) or isinstance(columns[0], float) or \
-           isinstance(columns[0], str):
+    if len(columns):
+        if np.isscalar(columns[0]):
             columns = [columns]
-        # If the list contains all lists, accept format:
-        elif all([isinstance(x, list) for x in columns]):
-            pass
+        # If the list contains all lists (or arrays), accept format:
+        elif all([isinstance(x, (list, np.ndarray)) for x in columns]):
+            columns = list(columns)
         else:
             print("Error: columns contains unacceptable elements.")
             print("columns type is: {0}".format(type(columns)))
@@ -133,43 +143,87 @@ def write_columns(columns, column_names, output_table, delimiter=',',
             print("Error: column_names is neither a list nor a string")
             sys.exit()
 
-        #-----------------------------------
-        # Read columns from input table file
-        #-----------------------------------
-        if input_table:
-            input_columns = read_columns(input_table, n_columns=1, trail=True)
-            input_names = input_columns[0][0]
-            input_columns = input_columns[0][1::]
-        #else:
-        #    input_names = ''
-        #    input_columns = ['' for x in columns[0]]
-
-        #--------------
-        # Write to file
-        #--------------
-        Fp = open(output_table, 'wa')
-        if column_names:
-            column_names = [q+x+q for x in column_names]
-            if input_table:
-                Fp.write(delimiter.join([input_names,
-                                         delimiter.join(column_names) + "\n"]))
+        #---------------------------------------------------------------------
+        # Check that a library is available to write a columnar binary table:
+        #---------------------------------------------------------------------
+        if output_format in ['parquet', 'feather']:
+            try:
+                import pandas as pd
+                import pyarrow
+            except ImportError:
+                print("NOTE: pandas and pyarrow are needed to write {0} "
+                      "tables; writing text instead.".format(output_format))
+                output_format = 'csv'
+        elif output_format != 'csv':
+            print("Error: output_format should be 'csv', 'parquet', "
+                  "or 'feather'.")
+            sys.exit()
+
+        #------------------------------------------
+        # Write a columnar binary table to file
+        # (appending to the columns of input_table)
+        #------------------------------------------
+        if output_format in ['parquet', 'feather']:
+            output_table = os.path.splitext(output_table)[0] + '.' + \
+                           output_format
+            if input_table and output_format == 'parquet':
+                table = pd.read_parquet(input_table)
+            elif input_table:
+                table = pd.read_feather(input_table)
             else:
-                Fp.write(delimiter.join(column_names) + "\n")
-        #else:
-        #    Fp.write(input_names + "\n")
+                table = pd.DataFrame(index=range(len(columns[0])))
 
-        for irow in range(len(columns[0])):
-            if input_table:
-                Fp.write(input_columns[irow] + delimiter)
+            # Store empty strings (such as missing spectra) as missing values:
             for icolumn, column in enumerate(columns):
-                if icolumn < len(columns)-1:
-                    Fp.write('{0}{1}{2}{3}'.format(
-                        q, column[irow], q, delimiter))
-                else:
-                    Fp.write('{0}{1}{2}'.format(q, column[irow], q))
-            Fp.write("\n")
+                if isinstance(column, np.ndarray):
+                    column = column.tolist()
+                column = [None if isinstance(x, str) and not x else x
+                          for x in column]
+                table[column_names[icolumn]] = pd.Series(column,
+                                                         index=table.index)
+            if output_format == 'parquet':
+                table.to_parquet(output_table)
+            else:
+                table.reset_index(drop=True).to_feather(output_table)
 
-        Fp.close()
+        #--------------------------------------------
+        # Write a delimited text table to file
+        # (prepending the unparsed input table rows)
+        #--------------------------------------------
+        else:
+            if input_table:
+                Fp = open(input_table, 'r')
+                input_lines = [x for x in Fp.read().splitlines() if x.strip()]
+                Fp.close()
+                input_names = input_lines[0]
+                input_rows = input_lines[1::]
+
+            Fp = open(output_table, 'w')
+            if column_names:
+                column_names = [q+x+q for x in column_names]
+                if input_table:
+                    Fp.write(delimiter.join([input_names,
+                                             delimiter.join(column_names)]))
+                else:
+                    Fp.write(delimiter.join(column_names))
+                Fp.write("\n")
+
+            # Write blocks of rows, formatting each block's columns at once
+            # (so that only one block of numpy values is held as text):
+            block_size = 10000
+            for istart in range(0, len(columns[0]), block_size):
+                block = [column[istart:istart + block_size]
+                         for column in columns]
+                block = [x.tolist() if isinstance(x, np.ndarray) else x
+                         for x in block]
+                block = [['{0}{1}{0}'.format(q, x) for x in column]
+                         for column in block]
+                rows = [delimiter.join(x) for x in zip(*block)]
+                if input_table:
+                    rows = [delimiter.join(x) for x in
+                            zip(input_rows[istart:istart + block_size], rows)]
+                Fp.writelines([x + "\n" for x in rows])
+            Fp.close()
 
     else:
         print("NOTE: 'columns' is empty. Nothing written.")
@@ -201,23 +255,132 @@ def write_rows(filename, list_of_lines, header=""):
     if header:
         Fp.write(header + '\n')
 
-    for element in list_of_lines:
-        Fp.write(str(element) + '\n')
+    Fp.writelines([str(element) + '\n' for element in list_of_lines])
 
     Fp.close()
 
     return filename
 
+
+def combine_tables(table_files, column_names, column_values, output_table,
+                   delimiter=',', quote=True):
+    """
+    Combine tables with the same columns into one table, such as the
+    tables of a cohort of subjects, with columns identifying each table.
+
+    Delimited text tables are combined without parsing their values.
+    Columnar binary tables ('.parquet' or '.feather') require pandas
+    (and pyarrow) and are combined into a table of the same format.
+
+    Parameters
+    ----------
+    table_files : list of strings
+        names of table files (each with a 1-line header if text)
+    column_names : list of strings
+        names of columns to prepend, such as ['subject', 'hemisphere']
+    column_values : list of lists of strings
+        values of the prepended columns for each table
+    output_table : string
+        name of output table file
+    delimiter : string
+        delimiter between columns of text tables, such as ','
+    quote : Boolean
+        quote the prepended values (and column names) of text tables?
+
+    Returns
+    -------
+    output_table : string
+        name of output table file
+
+    Examples
+    --------
+    >>> from mindboggle.utils.io_table import write_columns, combine_tables
+    >>> table1 = write_columns([[1, 2], [0.5, 0.7]], ['label', 'area'],
+    ...                        'table1.csv')
+    >>> table2 = write_columns([[1, 3], [0.6, 0.2]], ['label', 'area'],
+    ...                        'table2.csv')
+    >>> output_table = combine_tables([table1, table2], ['subject'],
+    ...                               [['s1'], ['s2']], 'cohort.csv')
+    >>> print(open(output_table).read().strip())
+    "subject","label","area"
+    "s1","1","0.5"
+    "s1","2","0.7"
+    "s2","1","0.6"
+    "s2","3","0.2"
+
+    """
+    import os
+    import sys
+
+    if quote:
+        q = '"'
+    else:
+        q = ''
+
+    #-------------------------------------------------------------------------
+    # Combine columnar binary tables:
+    #-------------------------------------------------------------------------
+    extension = os.path.splitext(output_table)[1]
+    if extension in ['.parquet', '.feather']:
+        import pandas as pd
+
+        tables = []
+        for table_file, values in zip(table_files, column_values):
+            if extension == '.parquet':
+                table = pd.read_parquet(table_file)
+            else:
+                table = pd.read_feather(table_file)
+            for icolumn, name in enumerate(column_names):
+                table.insert(icolumn, name, values[icolumn])
+            tables.append(table)
+        table = pd.concat(tables, ignore_index=True)
+        if extension == '.parquet':
+            table.to_parquet(output_table)
+        else:
+            table.to_feather(output_table)
+
+    #-------------------------------------------------------------------------
+    # Combine delimited text tables, one table at a time:
+    #-------------------------------------------------------------------------
+    else:
+        Fp = open(output_table, 'w')
+        header = ''
+        for table_file, values in zip(table_files, column_values):
+            prefix = delimiter.join([q + x + q for x in values]) + delimiter
+            Fi = open(table_file, 'r')
+            table_header = Fi.readline().rstrip('\r\n')
+            if not header:
+                header = table_header
+                Fp.write(delimiter.join([q + x + q for x in column_names]) +
+                         delimiter + header + '\n')
+            elif table_header != header:
+                Fi.close()
+                Fp.close()
+                sys.exit('Table {0} has different columns: {1}'.format(
+                         table_file, table_header))
+            for line in Fi:
+                if line.strip():
+                    Fp.write(prefix + line.rstrip('\r\n') + '\n')
+            Fi.close()
+        Fp.close()
+
+    return output_table
+
 def write_shape_stats(labels_or_file, sulci=[], fundi=[],
         affine_transform_file='', transform_format='itk',
         area_file='', mean_curvature_file='', travel_depth_file='',
         geodesic_depth_file='', convexity_file='', thickness_file='',
         labels_spectra=[], labels_spectra_IDs=[],
         sulci_spectra=[], sulci_spectra_IDs=[],
-        exclude_labels=[-1], delimiter=','):
+        exclude_labels=[-1], delimiter=',', output_format='csv',
+        memory_budget=0):
     """
     Make tables of shape statistics per label, fundus, and/or sulcus.
 
+    With a memory budget (for high-resolution surfaces), the points and
+    shape values are kept in memory-mapped arrays, and the faces, which
+    are not needed, are not loaded as lists.
+
     Parameters
     ----------
     labels_or_file : list or string
@@ -255,6 +418,11 @@ def write_shape_stats(labels_or_file, sulci=[], fundi=[],
         indices to be excluded (in addition to -1)
     delimiter : string
         delimiter between columns, such as ','
+    output_format : string
+        table format: 'csv', 'parquet' or 'feather' (see write_columns())
+    memory_budget : integer
+        approximate memory (megabytes) to use (0 for no limit; any other
+        value keeps arrays in memory-mapped files)
 
     Returns
     -------
@@ -267,51 +435,55 @@ def write_shape_stats(labels_or_file, sulci=[], fundi=[],
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import read_scalars
-    >>> from mindboggle.utils.io_table import write_shape_stats
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> labels_or_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> sulci_file = os.path.join(path, 'arno', 'features', 'sulci.vtk')
-    >>> fundi_file = os.path.join(path, 'arno', 'features', 'fundi.vtk')
-    >>> sulci, name = read_scalars(sulci_file)
-    >>> fundi, name = read_scalars(fundi_file)
-    >>> affine_transform_file = os.path.join(path, 'arno', 'mri',
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.io_table import write_shape_stats  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> labels_or_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> sulci_file = os.path.join(path, 'arno', 'features', 'sulci.vtk')  # doctest: +SKIP
+    >>> fundi_file = os.path.join(path, 'arno', 'features', 'fundi.vtk')  # doctest: +SKIP
+    >>> sulci, name = read_scalars(sulci_file)  # doctest: +SKIP
+    >>> fundi, name = read_scalars(fundi_file)  # doctest: +SKIP
+    >>> affine_transform_file = os.path.join(path, 'arno', 'mri',  # doctest: +SKIP
     >>> #    'affine_to_template.mat')
-    >>>     't1weighted_brain.MNI152Affine.txt')
+    >>>     't1weighted_brain.MNI152Affine.txt')  # doctest: +SKIP
     >>> #transform_format = 'mat'
-    >>> transform_format = 'itk'
-    >>> area_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.area.vtk')
-    >>> mean_curvature_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')
-    >>> travel_depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')
-    >>> geodesic_depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.geodesic_depth.vtk')
-    >>> convexity_file = ''
-    >>> thickness_file = ''
-    >>> delimiter = ','
+    >>> transform_format = 'itk'  # doctest: +SKIP
+    >>> area_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.area.vtk')  # doctest: +SKIP
+    >>> mean_curvature_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')  # doctest: +SKIP
+    >>> travel_depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')  # doctest: +SKIP
+    >>> geodesic_depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.geodesic_depth.vtk')  # doctest: +SKIP
+    >>> convexity_file = ''  # doctest: +SKIP
+    >>> thickness_file = ''  # doctest: +SKIP
+    >>> delimiter = ','  # doctest: +SKIP
     >>> #
-    >>> import numpy as np
-    >>> labels, name = read_scalars(labels_or_file)
-    >>> labels_spectra = [[1,2,3] for x in labels]
-    >>> labels_spectra_IDs = np.unique(labels).tolist()
-    >>> sulci_spectra = [[1,2,3] for x in sulci]
-    >>> sulci_spectra_IDs = np.unique(sulci).tolist()
-    >>> exclude_labels = [-1]
+    >>> import numpy as np  # doctest: +SKIP
+    >>> labels, name = read_scalars(labels_or_file)  # doctest: +SKIP
+    >>> labels_spectra = [[1,2,3] for x in labels]  # doctest: +SKIP
+    >>> labels_spectra_IDs = np.unique(labels).tolist()  # doctest: +SKIP
+    >>> sulci_spectra = [[1,2,3] for x in sulci]  # doctest: +SKIP
+    >>> sulci_spectra_IDs = np.unique(sulci).tolist()  # doctest: +SKIP
+    >>> exclude_labels = [-1]  # doctest: +SKIP
+    >>> output_format = 'csv'  # doctest: +SKIP
     >>> #
-    >>> write_shape_stats(labels_or_file, sulci, fundi,
-    >>>     affine_transform_file, transform_format, area_file,
-    >>>     mean_curvature_file, travel_depth_file, geodesic_depth_file,
-    >>>     convexity_file, thickness_file, labels_spectra,
-    >>>     labels_spectra_IDs, sulci_spectra,
-    >>>     sulci_spectra_IDs, exclude_labels, delimiter)
+    >>> write_shape_stats(labels_or_file, sulci, fundi,  # doctest: +SKIP
+    >>>     affine_transform_file, transform_format, area_file,  # doctest: +SKIP
+    >>>     mean_curvature_file, travel_depth_file, geodesic_depth_file,  # doctest: +SKIP
+    >>>     convexity_file, thickness_file, labels_spectra,  # doctest: +SKIP
+    >>>     labels_spectra_IDs, sulci_spectra,  # doctest: +SKIP
+    >>>     sulci_spectra_IDs, exclude_labels, delimiter, output_format)  # doctest: +SKIP
 
     """
     import os
+    import shutil
+    import tempfile
     import numpy as np
     from mindboggle.shapes.measure import means_per_label, stats_per_label, \
         sum_per_label
     from mindboggle.utils.io_vtk import read_scalars, read_vtk, \
-        apply_affine_transform
+        read_arrays, apply_affine_transform
     from mindboggle.utils.io_table import write_columns
+    from mindboggle.utils.utils import memory_map
 
     # Make sure inputs are lists:
     if isinstance(labels_or_file, np.ndarray):
@@ -347,159 +519,172 @@ def write_shape_stats(labels_or_file, sulci=[], fundi=[],
     column_names = []
     first_pass = True
     area_array = []
-    for ishape, shape_file in enumerate(shape_files):
-        if os.path.exists(shape_file):
-            if first_pass:
-                faces, lines, indices, points, npoints, scalars_array, name, \
-                    input_vtk = read_vtk(shape_file, True, True)
-                points = np.array(points)
-                first_pass = False
-                if affine_transform_file:
-                    affine_points, \
-                        foo1 = apply_affine_transform(affine_transform_file,
-                                    points, transform_format, save_file=False)
-                    affine_points = np.array(affine_points)
-            else:
-                scalars_array, name = read_scalars(shape_file, True, True)
-            if scalars_array.size:
-                shape_arrays.append(scalars_array)
-
-                # Store area array:
-                if ishape == 0:
-                    area_array = scalars_array.copy()
+    memmap_path = ''
+    if memory_budget:
+        memmap_path = tempfile.mkdtemp(dir=os.getcwd())
+    try:
+        for ishape, shape_file in enumerate(shape_files):
+            if os.path.exists(shape_file):
+                if first_pass:
+                    if memory_budget:
+                        faces, points, npoints, scalars_array, name = \
+                            read_arrays(shape_file, memmap_path)
+                        del faces
+                    else:
+                        faces, lines, indices, points, npoints, scalars_array, \
+                            name, input_vtk = read_vtk(shape_file, True, True)
+                        points = np.array(points)
+                    first_pass = False
+                    if affine_transform_file:
+                        affine_points, \
+                            foo1 = apply_affine_transform(affine_transform_file,
+                                        points, transform_format, save_file=False)
+                        affine_points = np.array(affine_points)
+                else:
+                    scalars_array, name = read_scalars(shape_file, True, True)
+                    if memory_budget:
+                        scalars_array = memory_map(scalars_array,
+                            os.path.join(memmap_path, 'shape{0}.npy'.format(ishape)))
+                if scalars_array.size:
+                    shape_arrays.append(scalars_array)
 
-    # Initialize table file names:
-    sulcus_table = None
-    fundus_table = None
+                    # Store area array:
+                    if ishape == 0:
+                        area_array = scalars_array.copy()
 
-    # Loop through features / tables:
-    for itable, feature_list in enumerate(feature_lists):
-        table_column_names = []
+        # Initialize table file names:
+        sulcus_table = None
+        fundus_table = None
 
-        #---------------------------------------------------------------------
-        # For each feature, construct a table of average shape values:
-        #---------------------------------------------------------------------
-        table_file = os.path.join(os.getcwd(), table_names[itable])
-        if feature_list:
-            feature_name = feature_names[itable]
-            columns = []
+        # Loop through features / tables:
+        for itable, feature_list in enumerate(feature_lists):
+            table_column_names = []
 
             #-----------------------------------------------------------------
-            # Mean positions in the original space:
+            # For each feature, construct a table of average shape values:
             #-----------------------------------------------------------------
-            # Compute mean position per feature:
-            positions, sdevs, label_list, foo = means_per_label(points,
-                feature_list, exclude_labels, area_array)
+            table_file = os.path.join(os.getcwd(), table_names[itable])
+            if feature_list:
+                feature_name = feature_names[itable]
+                columns = []
 
-            # Append mean position per feature to columns:
-            table_column_names.append('mean position')
-            columns.append(positions)
-
-            #-----------------------------------------------------------------
-            # Mean positions in standard space:
-            #-----------------------------------------------------------------
-            if affine_transform_file:
-                # Compute standard space mean position per feature:
-                standard_positions, sdevs, label_list, foo = means_per_label(affine_points,
+                #-------------------------------------------------------------
+                # Mean positions in the original space:
+                #-------------------------------------------------------------
+                # Compute mean position per feature:
+                positions, sdevs, label_list, foo = means_per_label(points,
                     feature_list, exclude_labels, area_array)
 
-                # Append standard space mean position per feature to columns:
-                table_column_names.append('mean position in standard space')
-                columns.append(standard_positions)
+                # Append mean position per feature to columns:
+                table_column_names.append('mean position')
+                columns.append(positions)
 
-            #-----------------------------------------------------------------
-            # Loop through shape measures:
-            #-----------------------------------------------------------------
-            table_column_names.extend(column_names[:])
-            for ishape, shape_array in enumerate(shape_arrays):
-                shape_name = shape_names[ishape]
-                print('  Compute statistics on {0} {1}'.
-                      format(feature_name, shape_name))
-
-                # Append shape names and values per feature to columns:
-                pr = feature_name + ": " + shape_name + ": "
-                if np.size(area_array):
-                    po = " (weighted)"
-                else:
-                    po = ""
                 #-------------------------------------------------------------
-                # Append total feature areas to columns:
+                # Mean positions in standard space:
                 #-------------------------------------------------------------
-                if ishape == 0 and np.size(area_array):
-                    sums, label_list = sum_per_label(shape_array,
-                        feature_list, exclude_labels)
-                    table_column_names.append(pr + 'total')
-                    columns.append(sums)
+                if affine_transform_file:
+                    # Compute standard space mean position per feature:
+                    standard_positions, sdevs, label_list, foo = means_per_label(affine_points,
+                        feature_list, exclude_labels, area_array)
+
+                    # Append standard space mean position per feature to columns:
+                    table_column_names.append('mean position in standard space')
+                    columns.append(standard_positions)
+
                 #-------------------------------------------------------------
-                # Append feature shape statistics to columns:
+                # Loop through shape measures:
                 #-------------------------------------------------------------
-                else:
-                    medians, mads, means, sdevs, skews, kurts, \
-                    lower_quarts, upper_quarts, \
-                    label_list = stats_per_label(shape_array,
-                        feature_list, exclude_labels, area_array, precision=1)
-
-                    table_column_names.append(pr + 'median' + po)
-                    table_column_names.append(pr + 'median absolute deviation' + po)
-                    table_column_names.append(pr + 'mean' + po)
-                    table_column_names.append(pr + 'standard deviation' + po)
-                    table_column_names.append(pr + 'skew' + po)
-                    table_column_names.append(pr + 'kurtosis' + po)
-                    table_column_names.append(pr + 'lower quartile' + po)
-                    table_column_names.append(pr + 'upper quartile' + po)
-                    columns.append(medians)
-                    columns.append(mads)
-                    columns.append(means)
-                    columns.append(sdevs)
-                    columns.append(skews)
-                    columns.append(kurts)
-                    columns.append(lower_quarts)
-                    columns.append(upper_quarts)
-
-            #-----------------------------------------------------------------
-            # Laplace-Beltrami spectra:
-            #-----------------------------------------------------------------
-            if itable in [0,1]:
-                spectra = spectra_lists[itable]
-                spectra_name = spectra_names[itable]
-                spectra_IDs = spectra_ID_lists[itable]
-
-                # Order spectra into a list:
-                spectrum_list = []
-                for label in label_list:
-                    if label in spectra_IDs:
-                        spectrum = spectra[spectra_IDs.index(label)]
-                        spectrum_list.append(spectrum)
+                table_column_names.extend(column_names[:])
+                for ishape, shape_array in enumerate(shape_arrays):
+                    shape_name = shape_names[ishape]
+                    print('  Compute statistics on {0} {1}'.
+                          format(feature_name, shape_name))
+
+                    # Append shape names and values per feature to columns:
+                    pr = feature_name + ": " + shape_name + ": "
+                    if np.size(area_array):
+                        po = " (weighted)"
+                    else:
+                        po = ""
+                    #---------------------------------------------------------
+                    # Append total feature areas to columns:
+                    #---------------------------------------------------------
+                    if ishape == 0 and np.size(area_array):
+                        sums, label_list = sum_per_label(shape_array,
+                            feature_list, exclude_labels)
+                        table_column_names.append(pr + 'total')
+                        columns.append(sums)
+                    #---------------------------------------------------------
+                    # Append feature shape statistics to columns:
+                    #---------------------------------------------------------
                     else:
-                        spectrum_list.append('')
+                        medians, mads, means, sdevs, skews, kurts, \
+                        lower_quarts, upper_quarts, \
+                        label_list = stats_per_label(shape_array,
+                            feature_list, exclude_labels, area_array, precision=1)
+
+                        table_column_names.append(pr + 'median' + po)
+                        table_column_names.append(pr + 'median absolute deviation' + po)
+                        table_column_names.append(pr + 'mean' + po)
+                        table_column_names.append(pr + 'standard deviation' + po)
+                        table_column_names.append(pr + 'skew' + po)
+                        table_column_names.append(pr + 'kurtosis' + po)
+                        table_column_names.append(pr + 'lower quartile' + po)
+                        table_column_names.append(pr + 'upper quartile' + po)
+                        columns.append(medians)
+                        columns.append(mads)
+                        columns.append(means)
+                        columns.append(sdevs)
+                        columns.append(skews)
+                        columns.append(kurts)
+                        columns.append(lower_quarts)
+                        columns.append(upper_quarts)
 
-                # Append spectral shape name and values to relevant columns:
-                columns.append(spectrum_list)
-                table_column_names.append(spectra_name)
+                #-------------------------------------------------------------
+                # Laplace-Beltrami spectra:
+                #-------------------------------------------------------------
+                if itable in [0,1]:
+                    spectra = spectra_lists[itable]
+                    spectra_name = spectra_names[itable]
+                    spectra_IDs = spectra_ID_lists[itable]
+
+                    # Order spectra into a list:
+                    spectrum_list = []
+                    for label in label_list:
+                        if label in spectra_IDs:
+                            spectrum = spectra[spectra_IDs.index(label)]
+                            spectrum_list.append(spectrum)
+                        else:
+                            spectrum_list.append('')
+
+                    # Append spectral shape name and values to relevant columns:
+                    columns.append(spectrum_list)
+                    table_column_names.append(spectra_name)
+
+                #-------------------------------------------------------------
+                # Write labels/IDs and values to table:
+                #-------------------------------------------------------------
+                # Write labels/IDs and columns of shape values to table at once:
+                table_file = write_columns([label_list] + columns,
+                                           [feature_name] + table_column_names,
+                                           table_file, delimiter, quote=True,
+                                           output_format=output_format)
+            else:
+                # Write something to table:
+                write_columns([], '', table_file, delimiter)
 
             #-----------------------------------------------------------------
-            # Write labels/IDs and values to table:
+            # Return correct table file name:
             #-----------------------------------------------------------------
-            # Write labels/IDs to table:
-            write_columns(label_list, feature_name, table_file, delimiter)
-
-            # Append columns of shape values to table:
-            if columns:
-                write_columns(columns, table_column_names, table_file,
-                              delimiter, quote=True, input_table=table_file)
-        else:
-            # Write something to table:
-            write_columns([], '', table_file, delimiter)
-
-        #---------------------------------------------------------------------
-        # Return correct table file name:
-        #---------------------------------------------------------------------
-        if itable == 0:
-            label_table = table_file
-        elif itable == 1:
-            sulcus_table = table_file
-        elif itable == 2:
-            fundus_table = table_file
+            if itable == 0:
+                label_table = table_file
+            elif itable == 1:
+                sulcus_table = table_file
+            elif itable == 2:
+                fundus_table = table_file
+    finally:
+        if memmap_path:
+            shutil.rmtree(memmap_path)
 
     return label_table, sulcus_table, fundus_table
 
@@ -508,10 +693,13 @@ def write_vertex_measures(table_file, labels_or_file, sulci=[], fundi=[],
         affine_transform_file='', transform_format='itk',
         area_file='', mean_curvature_file='', travel_depth_file='',
         geodesic_depth_file='', convexity_file='', thickness_file='',
-        delimiter=','):
+        delimiter=',', output_format='csv'):
     """
     Make a table of shape values per vertex.
 
+    Input files are read in parallel threads, and the table is written
+    in blocks of rows by write_columns().
+
     Parameters
     ----------
     table_file : output filename (without path)
@@ -540,6 +728,8 @@ def write_vertex_measures(table_file, labels_or_file, sulci=[], fundi=[],
         name of VTK file with thickness scalar values
     delimiter : string
         delimiter between columns, such as ','
+    output_format : string
+        table format: 'csv', 'parquet' or 'feather' (see write_columns())
 
     Returns
     -------
@@ -547,54 +737,46 @@ def write_vertex_measures(table_file, labels_or_file, sulci=[], fundi=[],
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import read_scalars
-    >>> from mindboggle.tables.all_shapes import write_vertex_measures
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars  # doctest: +SKIP
+    >>> from mindboggle.tables.all_shapes import write_vertex_measures  # doctest: +SKIP
     >>> #
-    >>> table_file = 'vertex_shapes.csv'
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> labels_or_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> sulci_file = os.path.join(path, 'arno', 'features', 'sulci.vtk')
-    >>> fundi_file = os.path.join(path, 'arno', 'features', 'fundi.vtk')
-    >>> sulci, name = read_scalars(sulci_file)
-    >>> fundi, name = read_scalars(fundi_file)
-    >>> affine_transform_file = os.path.join(path, 'arno', 'mri',
-    >>>     't1weighted_brain.MNI152Affine.txt')
-    >>> transform_format = 'itk'
-    >>> area_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.area.vtk')
-    >>> mean_curvature_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')
-    >>> travel_depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')
-    >>> geodesic_depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.geodesic_depth.vtk')
-    >>> convexity_file = ''
-    >>> thickness_file = ''
-    >>> delimiter = ','
+    >>> table_file = 'vertex_shapes.csv'  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> labels_or_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> sulci_file = os.path.join(path, 'arno', 'features', 'sulci.vtk')  # doctest: +SKIP
+    >>> fundi_file = os.path.join(path, 'arno', 'features', 'fundi.vtk')  # doctest: +SKIP
+    >>> sulci, name = read_scalars(sulci_file)  # doctest: +SKIP
+    >>> fundi, name = read_scalars(fundi_file)  # doctest: +SKIP
+    >>> affine_transform_file = os.path.join(path, 'arno', 'mri',  # doctest: +SKIP
+    >>>     't1weighted_brain.MNI152Affine.txt')  # doctest: +SKIP
+    >>> transform_format = 'itk'  # doctest: +SKIP
+    >>> area_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.area.vtk')  # doctest: +SKIP
+    >>> mean_curvature_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')  # doctest: +SKIP
+    >>> travel_depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')  # doctest: +SKIP
+    >>> geodesic_depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.geodesic_depth.vtk')  # doctest: +SKIP
+    >>> convexity_file = ''  # doctest: +SKIP
+    >>> thickness_file = ''  # doctest: +SKIP
+    >>> delimiter = ','  # doctest: +SKIP
+    >>> output_format = 'csv'  # doctest: +SKIP
     >>> #
-    >>> write_vertex_measures(table_file, labels_or_file, sulci, fundi,
-    >>>     affine_transform_file, transform_format, area_file,
-    >>>     mean_curvature_file, travel_depth_file, geodesic_depth_file,
-    >>>     convexity_file, thickness_file, delimiter)
+    >>> write_vertex_measures(table_file, labels_or_file, sulci, fundi,  # doctest: +SKIP
+    >>>     affine_transform_file, transform_format, area_file,  # doctest: +SKIP
+    >>>     mean_curvature_file, travel_depth_file, geodesic_depth_file,  # doctest: +SKIP
+    >>>     convexity_file, thickness_file, delimiter, output_format)  # doctest: +SKIP
 
     """
     import os
+    import sys
     import numpy as np
-    from mindboggle.utils.io_vtk import read_scalars, read_vtk, apply_affine_transform
+    from multiprocessing.pool import ThreadPool
+    from mindboggle.utils.io_vtk import read_scalars, read_points, \
+        apply_affine_transform
     from mindboggle.utils.io_table import write_columns
 
-    # Make sure inputs are lists:
-    if isinstance(labels_or_file, np.ndarray):
-        labels = labels_or_file.tolist()
-    elif isinstance(labels_or_file, list):
-        labels = labels_or_file
-    elif isinstance(labels_or_file, str):
-        labels, name = read_scalars(labels_or_file)
-    if isinstance(sulci, np.ndarray):
-        sulci = sulci.tolist()
-    if isinstance(fundi, np.ndarray):
-        fundi = fundi.tolist()
-
     # Feature names and corresponding feature lists:
     feature_names = ['label', 'sulcus', 'fundus']
-    feature_lists = [labels, sulci, fundi]
+    feature_lists = [labels_or_file, sulci, fundi]
 
     # Shape names corresponding to shape files below:
     shape_names = ['area', 'mean curvature', 'travel depth', 'geodesic depth',
@@ -603,40 +785,72 @@ def write_vertex_measures(table_file, labels_or_file, sulci=[], fundi=[],
     # Load shape files as a list of numpy arrays of per-vertex shape values:
     shape_files = [area_file, mean_curvature_file, travel_depth_file,
                    geodesic_depth_file, convexity_file, thickness_file]
+    ishapes = [i for i,x in enumerate(shape_files) if os.path.exists(x)]
+
+    #-------------------------------------------------------------------------
+    # Read the label file, the points of the first shape file, and the
+    # shape files at the same time in separate threads (reading is I/O-bound):
+    #-------------------------------------------------------------------------
+    read_tasks = [['scalars', shape_files[i]] for i in ishapes]
+    if ishapes:
+        read_tasks.append(['points', shape_files[ishapes[0]]])
+    if isinstance(labels_or_file, str):
+        read_tasks.append(['scalars', labels_or_file])
+
+    def read_input(read_task):
+        reader, input_file = read_task
+        if reader == 'points':
+            return np.array(read_points(input_file))
+        else:
+            return read_scalars(input_file, True, True)[0]
+
+    read_arrays = []
+    if read_tasks:
+        pool = ThreadPool(len(read_tasks))
+        try:
+            read_arrays = pool.map(read_input, read_tasks)
+        finally:
+            pool.close()
+            pool.join()
+    shape_arrays = read_arrays[:len(ishapes)]
+    if isinstance(labels_or_file, str):
+        feature_lists[0] = read_arrays[-1]
 
     # Append columns of per-vertex scalar values:
     columns = []
     column_names = []
     for ifeature, values in enumerate(feature_lists):
-        if values:
-            columns.append(values)
+        if len(values):
+            columns.append(np.asarray(values))
             column_names.append(feature_names[ifeature])
 
-    first_pass = True
-    for ishape, shape_file in enumerate(shape_files):
-        if os.path.exists(shape_file):
-            if first_pass:
-                u1, u2, u3, points, u4, scalars, u5, u6 = read_vtk(shape_file)
-                columns.append(points)
-                column_names.append('coordinates')
-                first_pass = False
-                if affine_transform_file:
-                    affine_points, \
-                        foo1 = apply_affine_transform(affine_transform_file,
-                                    points, transform_format)
-                    columns.append(affine_points)
-                    column_names.append('coordinates in standard space')
-            else:
-                scalars, name = read_scalars(shape_file)
-            if len(scalars):
-                columns.append(scalars)
-                column_names.append(shape_names[ishape])
+    if ishapes:
+        points = read_arrays[len(ishapes)]
+        columns.append(points)
+        column_names.append('coordinates')
+        if affine_transform_file:
+            affine_points, \
+                foo1 = apply_affine_transform(affine_transform_file,
+                            points, transform_format)
+            columns.append(np.array(affine_points))
+            column_names.append('coordinates in standard space')
+    for ishape, scalars in zip(ishapes, shape_arrays):
+        if len(scalars):
+            columns.append(scalars)
+            column_names.append(shape_names[ishape])
+
+    # Check that there is one value per vertex in every column:
+    lengths = [len(x) for x in columns]
+    if len(set(lengths)) > 1:
+        sys.exit('Numbers of vertices differ among columns {0}: {1}'.
+                 format(column_names, lengths))
 
     # Prepend with column of indices and write table
     shapes_table = os.path.join(os.getcwd(), table_file)
-    write_columns(range(len(columns[0])), 'index', shapes_table, delimiter)
-    write_columns(columns, column_names, shapes_table, delimiter, quote=True,
-                  input_table=shapes_table)
+    shapes_table = write_columns([np.arange(len(columns[0]))] + columns,
+                                 ['index'] + column_names, shapes_table,
+                                 delimiter, quote=True,
+                                 output_format=output_format)
 
     return shapes_table
 
@@ -661,17 +875,17 @@ def write_face_vertex_averages(input_file, area_file='', delimiter=','):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import read_scalars
-    >>> from mindboggle.utils.io_table import write_face_vertex_averages
-    >>> path = os.environ['MINDBOGGLE_DATA']
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.io_table import write_face_vertex_averages  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
     >>> #input_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')
     >>> #input_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')
-    >>> input_file = os.path.join(path, 'arno', 'shapes', 'lh.thickness.vtk')
-    >>> area_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.area.vtk')
-    >>> delimiter = ','
+    >>> input_file = os.path.join(path, 'arno', 'shapes', 'lh.thickness.vtk')  # doctest: +SKIP
+    >>> area_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.area.vtk')  # doctest: +SKIP
+    >>> delimiter = ','  # doctest: +SKIP
     >>> #
-    >>> write_face_vertex_averages(input_file, area_file, delimiter)
+    >>> write_face_vertex_averages(input_file, area_file, delimiter)  # doctest: +SKIP
 
     """
     import os
@@ -686,18 +900,12 @@ def write_face_vertex_averages(input_file, area_file='', delimiter=','):
         area_scalars, name = read_scalars(area_file, True, True)
 
     #---------------------------------------------------------------------
-    # For each face, average vertex values:
+    # For each face, average vertex values (gathered for all faces at once):
     #---------------------------------------------------------------------
     output_table = os.path.join(os.getcwd(), 'average_face_values.csv')
-    columns = []
-    for face in faces:
-        values = []
-        for index in face:
-            if area_file:
-                values.append(scalars[index] / area_scalars[index])
-            else:
-                values.append(scalars[index])
-        columns.append(np.mean(values))
+    if area_file:
+        scalars = scalars / area_scalars
+    columns = scalars[np.asarray(faces)].mean(axis=1)
 
     #-----------------------------------------------------------------
     # Write to table:
@@ -732,18 +940,18 @@ def write_average_face_values_per_label(input_indices_vtk,
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.io_table import write_average_face_values_per_label
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> input_indices_vtk = os.path.join(path, 'allen', 'labels', 'lh.DKTatlas100.gcs.vtk')
-    >>> input_values_vtk = os.path.join(path, 'allen', 'shapes', 'lh.thickness.vtk')
-    >>> area_file = os.path.join(path, 'allen', 'shapes', 'lh.pial.area.vtk')
-    >>> output_stem = 'labels_thickness'
-    >>> exclude_values = [-1]
-    >>> background_value = -1
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_table import write_average_face_values_per_label  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> input_indices_vtk = os.path.join(path, 'allen', 'labels', 'lh.DKTatlas100.gcs.vtk')  # doctest: +SKIP
+    >>> input_values_vtk = os.path.join(path, 'allen', 'shapes', 'lh.thickness.vtk')  # doctest: +SKIP
+    >>> area_file = os.path.join(path, 'allen', 'shapes', 'lh.pial.area.vtk')  # doctest: +SKIP
+    >>> output_stem = 'labels_thickness'  # doctest: +SKIP
+    >>> exclude_values = [-1]  # doctest: +SKIP
+    >>> background_value = -1  # doctest: +SKIP
     >>> #
-    >>> write_average_face_values_per_label(input_indices_vtk,
-    >>>     input_values_vtk, area_file, output_stem, exclude_values, background_value)
+    >>> write_average_face_values_per_label(input_indices_vtk,  # doctest: +SKIP
+    >>>     input_values_vtk, area_file, output_stem, exclude_values, background_value)  # doctest: +SKIP
     >>> #
     >>> # View:
     >>> #example_vtk = os.path.join(os.getcwd(), output_stem + '0.vtk')
@@ -755,7 +963,6 @@ def write_average_face_values_per_label(input_indices_vtk,
     import numpy as np
     from mindboggle.utils.io_vtk import read_scalars, read_vtk, write_vtk
     from mindboggle.utils.io_table import write_columns
-    from mindboggle.utils.mesh import remove_faces
 
     # Load VTK file:
     faces, lines, indices, points, npoints, scalars, scalar_names, \
@@ -773,34 +980,38 @@ def write_average_face_values_per_label(input_indices_vtk,
     else:
         values = np.copy(scalars)
 
-    # Loop through unique (non-excluded) scalar values:
-    unique_scalars = [int(x) for x in np.unique(scalars)
-                      if x not in exclude_values]
-    for scalar in unique_scalars:
-
-        keep_indices = [x for sublst in faces for x in sublst]
-        new_faces = remove_faces(faces, keep_indices)
+    if area_file:
+        values = values / area_scalars
 
-        # Create array and indices for scalar value:
-        select_scalars = np.copy(scalars)
-        select_scalars[scalars != scalar] = background_value
-        scalar_indices = [i for i,x in enumerate(select_scalars) if x == scalar]
-        print("  Scalar {0}: {1} vertices".format(scalar, len(scalar_indices)))
+    #---------------------------------------------------------------------
+    # For each face, average vertex values, and find the faces whose three
+    # vertices share the same (non-excluded) scalar value:
+    #---------------------------------------------------------------------
+    faces = np.asarray(faces)
+    face_values = values[faces].mean(axis=1)
+    face_scalars = scalars[faces[:, 0]]
+    keep = np.all(scalars[faces] == face_scalars[:, np.newaxis], axis=1) & \
+           ~np.in1d(face_scalars, exclude_values)
+    face_values = face_values[keep]
+    face_scalars = face_scalars[keep]
+
+    # Group the face averages by scalar value:
+    unique_scalars, vertex_counts = np.unique(scalars, return_counts=True)
+    group_scalars, groups = np.unique(face_scalars, return_inverse=True)
+    group_values = np.split(face_values[np.argsort(groups, kind='mergesort')],
+                            np.cumsum(np.bincount(groups))[:-1])
+    group_values = dict(zip(group_scalars, group_values))
 
-        #---------------------------------------------------------------------
-        # For each face, average vertex values:
-        #---------------------------------------------------------------------
+    # Loop through unique (non-excluded) scalar values:
+    for iscalar, scalar in enumerate(unique_scalars):
+        if scalar in exclude_values:
+            continue
+        columns = group_values.get(scalar, [])
+        scalar = int(scalar)
+        print("  Scalar {0}: {1} vertices".format(scalar,
+                                                  vertex_counts[iscalar]))
         output_table = os.path.join(os.getcwd(),
                                     output_stem+str(scalar)+'.csv')
-        columns = []
-        for face in new_faces:
-            values = []
-            for index in face:
-                if area_file:
-                    values.append(scalars[index] / area_scalars[index])
-                else:
-                    values.append(scalars[index])
-            columns.append(np.mean(values))
 
         #-----------------------------------------------------------------
         # Write to table:
@@ -13,18 +13,35 @@ Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
 #-----------------------------------------------------------------------------
 # Get data through a URL call:
 #-----------------------------------------------------------------------------
-def retrieve_data(data_file, url, hashes={}, cache_env='', cache=''):
+def retrieve_data(data_file, url, hashes={}, cache_env='', cache='',
+                  read_only=False, mirror=''):
     """
     Get data file through a URL call and check its hash.
 
     Steps ::
         If hashes provided:
             1. Check hash table for data file.
-            2. Check hash subdirectory within cache directory for data file.
-            3. If data file not in cache, download file, compute hash,
-               and verify hash.
-            4. If hash correct, save file.
-        Otherwise, simply download file.
+            2. Check hash subdirectory within cache directory for data file,
+               and verify its hash (stored beside the file, and computed
+               again only if the file's size or modification time changed).
+            3. If data file not in cache, lock the file's cache entry,
+               copy it from a local mirror directory (or download it,
+               if not in the mirror) to a temporary file in the hash
+               subdirectory, compute hash, and verify hash.
+            4. If hash correct, save file by renaming the temporary file;
+               otherwise exit.
+        Otherwise, simply use the mirror's file (or download it, if not
+        in the mirror).
+
+    In read-only mode, nothing is written to the cache or downloaded:
+    a data file missing from the cache is used from the mirror directory
+    (after verifying its hash, if hashes are provided), or else the
+    function exits.
+
+    Many processes (such as MultiProc or cluster jobs sharing a cache
+    directory) can retrieve the same file at the same time: only one
+    process fetches a missing file while the others wait for it, and
+    a partially written file never appears under the data file's name.
 
     Parameters
     ----------
@@ -38,6 +55,11 @@ def retrieve_data(data_file, url, hashes={}, cache_env='', cache=''):
         environment variable name for cache path
     cache : string
         in case cache_env is not set, use as cache directory
+    read_only : Boolean
+        use the cache (or mirror) without writing to it or downloading:
+        exit if the data file is missing from both?
+    mirror : string
+        local directory containing data files to use instead of url
 
     Returns
     -------
@@ -46,19 +68,21 @@ def retrieve_data(data_file, url, hashes={}, cache_env='', cache=''):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.data import hashes_url
-    >>> from mindboggle.utils.io_uri import retrieve_data
-    >>> hashes, url, cache_env, cache = hashes_url()
-    >>> data_file = hashes.keys()[0]
-    >>> retrieve_data(data_file, url, hashes, cache_env, cache)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.data import hashes_url  # doctest: +SKIP
+    >>> from mindboggle.utils.io_uri import retrieve_data  # doctest: +SKIP
+    >>> hashes, url, cache_env, cache = hashes_url()  # doctest: +SKIP
+    >>> data_file = hashes.keys()[0]  # doctest: +SKIP
+    >>> retrieve_data(data_file, url, hashes, cache_env, cache)  # doctest: +SKIP
 
     """
     import os
     import sys
     import shutil
+    import fcntl
+    import tempfile
 
-    from mindboggle.utils.io_uri import get_data, get_hash
+    from mindboggle.utils.io_uri import get_data, get_hash, get_cached_hash
 
     #-------------------------------------------------------------------------
     # If hashes provided, go through steps to check/download file:
@@ -79,51 +103,115 @@ def retrieve_data(data_file, url, hashes={}, cache_env='', cache=''):
             stored_hash = hashes[data_file]
 
         #---------------------------------------------------------------------
-        # Create missing cache and hash directories:
+        # Check hash subdirectory for file:
         #---------------------------------------------------------------------
         if cache_env in os.environ.keys():
             cache = os.environ[cache_env]
-        if not os.path.exists(cache):
-            print("Create missing cache directory: {0}".format(cache))
-            os.mkdir(cache)
         hash_dir = os.path.join(cache, stored_hash)
-        if not os.path.exists(hash_dir):
-            print("Create missing hash directory: {0}".format(hash_dir))
-            os.mkdir(os.path.join(hash_dir))
-
-        #---------------------------------------------------------------------
-        # Check hash subdirectory for file:
-        #---------------------------------------------------------------------
         data_path = os.path.join(hash_dir, data_file)
-        if os.path.exists(data_path):
+        if os.path.exists(data_path) and \
+           get_cached_hash(data_path, save_file=not read_only) == stored_hash:
             return data_path
+        elif read_only:
+            if mirror:
+                mirror_file = os.path.join(mirror, data_file)
+                if os.path.exists(mirror_file) and \
+                   get_cached_hash(mirror_file, save_file=False) == \
+                        stored_hash:
+                    return mirror_file
+                sys.exit("Data file '{0}' not in read-only cache ({1}) "
+                         "or mirror with a matching hash: {2}".
+                         format(data_file, data_path, mirror_file))
+            sys.exit("Data file '{0}' not in read-only cache: {1}".
+                     format(data_file, data_path))
 
         #---------------------------------------------------------------------
-        # If file not in cache, download file, compute hash, and verify:
+        # Create missing cache and hash directories
+        # (which other processes may be creating at the same time):
         #---------------------------------------------------------------------
-        else:
-            print("Retrieve file: {0}".format(url+data_file))
-
-            # Download file as a temporary file:
-            temp_file = get_data(url+data_file)
-
-            # Compute the file's hash:
-            data_hash = get_hash(temp_file)
+        for directory in [cache, hash_dir]:
+            if not os.path.exists(directory):
+                print("Create missing directory: {0}".format(directory))
+                try:
+                    os.mkdir(directory)
+                except OSError:
+                    if not os.path.isdir(directory):
+                        raise
 
-            # If hash matches name of the hash directory, save file:
-            if os.path.join(cache, data_hash) == hash_dir:
-                print("Copy file to cache directory: {0}".format(data_path))
-                shutil.copyfile(temp_file, data_path)
+        #---------------------------------------------------------------------
+        # Lock the file's cache entry, and check for the file again
+        # in case another process retrieved it while we waited:
+        #---------------------------------------------------------------------
+        Lock = open(data_path + '.lock', 'w')
+        fcntl.lockf(Lock, fcntl.LOCK_EX)
+        try:
+            if os.path.exists(data_path) and \
+               get_cached_hash(data_path) == stored_hash:
                 return data_path
-            else:
-                print("Retrieved file's hash does not matched stored hash.")
+            elif os.path.exists(data_path):
+                print("Cached file's hash does not match stored hash: "
+                      "{0}".format(data_path))
+
+            #-----------------------------------------------------------------
+            # If file not in cache, copy file from the mirror (or download
+            # it if the mirror does not have it), compute hash, and verify:
+            #-----------------------------------------------------------------
+            handle, temp_file = tempfile.mkstemp(dir=hash_dir,
+                                                 prefix=data_file + '.')
+            os.close(handle)
+            try:
+                mirror_file = ''
+                if mirror:
+                    mirror_file = os.path.join(mirror, data_file)
+                if mirror_file and os.path.exists(mirror_file):
+                    print("Copy file from mirror: {0}".format(mirror_file))
+                    shutil.copyfile(mirror_file, temp_file)
+                    source = mirror_file
+                else:
+                    print("Retrieve file: {0}".format(url+data_file))
+                    get_data(url+data_file, temp_file)
+                    source = url+data_file
+
+                # Compute the file's hash:
+                data_hash = get_hash(temp_file)
+
+                # If hash matches name of the hash directory, save file
+                # (renaming within a directory replaces the file atomically):
+                if data_hash == stored_hash:
+                    print("Save file to cache directory: {0}".
+                          format(data_path))
+                    os.chmod(temp_file, 0o644)
+                    os.rename(temp_file, data_path)
+                    get_cached_hash(data_path, data_hash)
+                    return data_path
+                else:
+                    sys.exit("Retrieved file's hash does not match stored "
+                             "hash ({0}): {1}".format(stored_hash, source))
+            finally:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+        finally:
+            fcntl.lockf(Lock, fcntl.LOCK_UN)
+            Lock.close()
 
     #-------------------------------------------------------------------------
-    # If hashes not provided, simply download file:
+    # If hashes not provided, simply download file (or use the mirror's):
     #-------------------------------------------------------------------------
     else:
-        # Download file as a temporary file:
-        data_path = get_data(url+data_file)
+        data_path = ''
+        if mirror:
+            data_path = os.path.join(mirror, data_file)
+        if data_path and os.path.exists(data_path):
+            pass
+        elif read_only and mirror:
+            sys.exit("Data file '{0}' not in read-only mirror: {1}".
+                     format(data_file, data_path))
+        elif read_only:
+            sys.exit("Data file '{0}' cannot be downloaded in read-only "
+                     "mode without hashes or a mirror".format(data_file))
+        else:
+            # Download file (missing from any mirror) as a temporary file:
+            data_path = get_data(url+data_file)
         print("Retrieved file: {0}".format(data_path))
         return data_path
 
@@ -146,12 +234,12 @@ def get_data(url, output_file=''):
 
     Examples
     --------
-    >>> from mindboggle.utils.io_uri import get_data
-    >>> from mindboggle.data import hashes_url
-    >>> hashes, url = hashes_url()
-    >>> data_file = hashes.keys()[0]
-    >>> output_file = 'test_output.nii.gz'
-    >>> get_data(url, output_file)
+    >>> from mindboggle.utils.io_uri import get_data  # doctest: +SKIP
+    >>> from mindboggle.data import hashes_url  # doctest: +SKIP
+    >>> hashes, url = hashes_url()  # doctest: +SKIP
+    >>> data_file = hashes.keys()[0]  # doctest: +SKIP
+    >>> output_file = 'test_output.nii.gz'  # doctest: +SKIP
+    >>> get_data(url, output_file)  # doctest: +SKIP
 
     """
     import urllib
@@ -166,14 +254,19 @@ def get_data(url, output_file=''):
     return output_file
 
 
-def get_hash(data_file):
+def get_hash(data_file, block_size=1048576):
     """
     Get hash of data file.
 
+    The file is read in blocks, so that large files are never held
+    in memory at once.
+
     Parameters
     ----------
     data_file : string
         data file name
+    block_size : integer
+        number of bytes to read at a time
 
     Returns
     -------
@@ -182,19 +275,102 @@ def get_hash(data_file):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.data import hashes_url
-    >>> from mindboggle.utils.io_uri import get_hash
-    >>> cache_env = 'MINDBOGGLE_CACHE'
-    >>> hashes, url = hashes_url()
-    >>> data_file = hashes.keys()[0]
-    >>> data_path = os.path.join(os.environ[cache_env], data_file)
-    >>> get_hash(data_path)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.data import hashes_url  # doctest: +SKIP
+    >>> from mindboggle.utils.io_uri import get_hash  # doctest: +SKIP
+    >>> cache_env = 'MINDBOGGLE_CACHE'  # doctest: +SKIP
+    >>> hashes, url = hashes_url()  # doctest: +SKIP
+    >>> data_file = hashes.keys()[0]  # doctest: +SKIP
+    >>> data_path = os.path.join(os.environ[cache_env], data_file)  # doctest: +SKIP
+    >>> get_hash(data_path)  # doctest: +SKIP
 
     """
     import hashlib
 
     # Compute the file's hash:
-    hash = hashlib.md5(open(data_file, 'rb').read()).hexdigest()
+    md5 = hashlib.md5()
+    Fp = open(data_file, 'rb')
+    try:
+        block = Fp.read(block_size)
+        while block:
+            md5.update(block)
+            block = Fp.read(block_size)
+    finally:
+        Fp.close()
+    hash = md5.hexdigest()
+
+    return hash
+
+
+def get_cached_hash(data_file, data_hash='', save_file=True):
+    """
+    Get hash of data file, stored in a file beside the data file.
+
+    The hash is stored with the data file's size and modification time
+    in data_file + '.md5' (replaced atomically, so that concurrent readers
+    never see a partial entry), and is only computed again (by get_hash())
+    if either has changed.
 
-    return hash
\ No newline at end of file
+    Parameters
+    ----------
+    data_file : string
+        data file name
+    data_hash : string
+        hash already computed for the data file, to store without
+        computing it again (such as for a newly verified download)
+    save_file : Boolean
+        store a newly computed hash beside the data file?
+
+    Returns
+    -------
+    hash : string
+        hash of data file
+
+    Examples
+    --------
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.data import hashes_url  # doctest: +SKIP
+    >>> from mindboggle.utils.io_uri import get_cached_hash  # doctest: +SKIP
+    >>> hashes, url, cache_env, cache = hashes_url()  # doctest: +SKIP
+    >>> data_file = hashes.keys()[0]  # doctest: +SKIP
+    >>> data_path = os.path.join(os.environ[cache_env], hashes[data_file],  # doctest: +SKIP
+    >>>                          data_file)  # doctest: +SKIP
+    >>> get_cached_hash(data_path)  # doctest: +SKIP
+
+    """
+    import os
+    import tempfile
+    from mindboggle.utils.io_uri import get_hash
+
+    hash_file = data_file + '.md5'
+    stat = os.stat(data_file)
+    file_stamp = [str(stat.st_size), repr(stat.st_mtime)]
+
+    #-------------------------------------------------------------------------
+    # Return the stored hash if the file has not changed:
+    #-------------------------------------------------------------------------
+    if not data_hash and os.path.exists(hash_file):
+        Fp = open(hash_file, 'r')
+        stored = Fp.read().split()
+        Fp.close()
+        if len(stored) == 3 and stored[1::] == file_stamp:
+            return stored[0]
+
+    #-------------------------------------------------------------------------
+    # Otherwise compute the hash and store it (if the directory is writable):
+    #-------------------------------------------------------------------------
+    if not data_hash:
+        data_hash = get_hash(data_file)
+    if save_file:
+        try:
+            handle, temp_file = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(hash_file)))
+            os.write(handle, ' '.join([data_hash] + file_stamp) + '\n')
+            os.close(handle)
+            os.chmod(temp_file, 0o644)
+            os.rename(temp_file, hash_file)
+        except (IOError, OSError):
+            pass
+    hash = data_hash
+
+    return hash
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""
+Functions for logging messages and progress.
+
+Mindboggle functions log messages to loggers named after their modules
+(such as 'mindboggle.features.folds'), under the 'mindboggle' logger.
+As a library, Mindboggle logs nowhere unless the application configures
+logging.  setup_logging() (called by mindboggler) configures logging for
+a workflow run, to standard output and a log file, with the time, process
+ID and logger name of each message, so that messages from parallel
+processes (such as with nipype's MultiProc plugin) can be told apart.
+
+Long-running loops log progress events with log_progress(), as a line with
+'PROGRESS' followed by a JSON object with the event name, time, process ID,
+and the loop's own fields (such as iteration counts, convergence measures
+and elapsed time).  read_progress() reads the events from a log file,
+such as to find stalled jobs or to tune iteration limits and tolerances.
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+
+# Time each progress event was last logged at INFO level, by (logger, event):
+progress_times = {}
+
+
+def get_logger(name):
+    """
+    Get a logger for a Mindboggle module.
+
+    The 'mindboggle' logger is given a NullHandler, so messages are
+    discarded (without warnings about missing handlers) unless logging
+    is configured, such as by setup_logging().
+
+    Parameters
+    ----------
+    name : string
+        logger name (module name, such as 'mindboggle.features.folds')
+
+    Returns
+    -------
+    logger : logging.Logger
+        logger
+
+    Examples
+    --------
+    >>> from mindboggle.utils.logs import get_logger
+    >>> logger = get_logger('mindboggle.features.folds')
+    >>> logger.name
+    'mindboggle.features.folds'
+
+    """
+    import logging
+
+    package_logger = logging.getLogger('mindboggle')
+    if not package_logger.handlers:
+        package_logger.addHandler(logging.NullHandler())
+
+    return logging.getLogger(name)
+
+
+def setup_logging(level='INFO', log_file=''):
+    """
+    Configure Mindboggle's logging (replacing get_logger()'s NullHandler).
+
+    Each message is written with its time, process ID, logger name and
+    level to standard output and (optionally) a log file.
+
+    Parameters
+    ----------
+    level : string
+        lowest level of messages to log: 'DEBUG' (every progress event),
+        'INFO', 'WARNING' or 'ERROR'
+    log_file : string
+        name of a log file to append messages to ('' for none)
+
+    Returns
+    -------
+    logger : logging.Logger
+        'mindboggle' logger
+
+    Examples
+    --------
+    >>> from mindboggle.utils.logs import setup_logging
+    >>> logger = setup_logging('DEBUG', '/tmp/mindboggle.log')
+
+    """
+    import sys
+    import logging
+
+    logger = logging.getLogger('mindboggle')
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    formatter = logging.Formatter('%(asctime)s %(process)d %(name)s '
+                                  '%(levelname)s: %(message)s')
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    logger.setLevel(getattr(logging, level.upper()))
+    logger.propagate = False
+
+    return logger
+
+
+def log_progress(logger, event, interval=0, **fields):
+    """
+    Log a progress event as 'PROGRESS {"event": event, ...}'.
+
+    With an interval, an event is logged at INFO level at most once per
+    interval (and otherwise at DEBUG level), so a loop can log an event
+    in every iteration, for a regular record of its progress without
+    flooding the log.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        logger (from get_logger())
+    event : string
+        event name, such as the function name
+    interval : float
+        minimum seconds between events logged at INFO level
+        (0 to log every event at INFO level)
+    fields : keyword arguments
+        values to log (JSON-compatible, or numpy numbers)
+
+    Examples
+    --------
+    >>> import sys
+    >>> import logging
+    >>> from mindboggle.utils.logs import log_progress
+    >>> logger = logging.getLogger('example')
+    >>> logger.addHandler(logging.StreamHandler(sys.stdout))
+    >>> logger.setLevel(logging.INFO)
+    >>> logger.propagate = False
+    >>> log_progress(logger, 'connect_points_hmmf', iteration=10,
+    ...              delta_cost=0.5) # doctest: +ELLIPSIS
+    PROGRESS {"delta_cost": 0.5, "event": "connect_points_hmmf", "iteration": 10, "pid": ..., "time": ...}
+
+    """
+    import os
+    import json
+    import logging
+    from time import time
+    from mindboggle.utils.logs import progress_times
+
+    level = logging.INFO
+    if interval:
+        key = (logger.name, event)
+        if time() - progress_times.get(key, 0) < interval:
+            level = logging.DEBUG
+        else:
+            progress_times[key] = time()
+
+    if logger.isEnabledFor(level):
+        fields = dict(fields, event=event, time=round(time(), 3),
+                      pid=os.getpid())
+        logger.log(level, 'PROGRESS %s', json.dumps(fields, sort_keys=True,
+            default=lambda x: x.item() if hasattr(x, 'item') else str(x)))
+
+
+def read_progress(log_file, event=None):
+    """
+    Read progress events from a log file (see log_progress()).
+
+    Parameters
+    ----------
+    log_file : string
+        name of log file
+    event : string
+        name of events to read (None for all events)
+
+    Returns
+    -------
+    events : list of dictionaries
+        fields of each event, in the order logged
+
+    Examples
+    --------
+    >>> import os
+    >>> import tempfile
+    >>> from mindboggle.utils.logs import read_progress
+    >>> log_file = os.path.join(tempfile.mkdtemp(), 'mindboggle.log')
+    >>> f = open(log_file, 'w')
+    >>> f.write('2013-06-01 12:00:00,000 4242 mindboggle.utils.segment '
+    ...         'INFO: PROGRESS {"event": "watershed", "regions": 3}\\n'
+    ...         '2013-06-01 12:00:01,000 4242 mindboggle.utils.segment '
+    ...         'INFO: Regrow segments from watershed seeds\\n')
+    >>> f.close()
+    >>> events = read_progress(log_file)
+    >>> len(events), events[0]['event'], events[0]['regions']
+    (1, u'watershed', 3)
+
+    """
+    import json
+
+    events = []
+    for line in open(log_file):
+        if 'PROGRESS {' in line:
+            fields = json.loads(line[line.index('PROGRESS {') + 9:])
+            if event is None or fields.get('event') == event:
+                events.append(fields)
+
+    return events
@@ -0,0 +1,549 @@
+#!/usr/bin/env python
+"""
+Functions for resuming workflow runs, skipping nodes whose inputs are
+unchanged.
+
+nipype reruns a node if its working directory has been moved or deleted,
+or if an input file's time stamp has changed, even if its contents have
+not.  cache_workflow() makes every Function node of a nipype workflow
+record a manifest of its arguments (with a content hash of each input
+file), and keep its output files (hard links, where the file system
+allows, so they take no extra space) and arrays in a manifest directory
+outside of the working directory.  When a node runs with the same
+function and the same arguments (and input file contents), and the same
+Mindboggle source code (which the function may call), its outputs are
+restored from the manifest directory instead of being computed again.
+
+To force nodes to run again, remove the manifest directory, or a node's
+subdirectory.
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+
+# Content hashes of files, by (path, size, modification time):
+file_hashes = {}
+
+# Hashes of packages' Python source files, by package directory:
+package_hashes = {}
+
+
+#-----------------------------------------------------------------------------
+# Make all Function nodes of a workflow reuse outputs for unchanged inputs:
+#-----------------------------------------------------------------------------
+def cache_workflow(workflow, manifest_path):
+    """
+    Make all Function nodes in a nipype workflow reuse earlier outputs.
+
+    Each node's function is replaced by one that calls run_cached()
+    with the original function's source code.
+
+    Parameters
+    ----------
+    workflow : nipype Workflow
+        workflow (including nested workflows)
+    manifest_path : string
+        directory to save manifests and output files (created if missing)
+
+    Returns
+    -------
+    node_names : list of strings
+        names of nodes with manifests
+
+    Examples
+    --------
+    >>> from mindboggle.mindboggler import build_workflow
+    >>> from mindboggle.utils.manifests import cache_workflow
+    >>> mbFlow = build_workflow({'subjects': ['Twins-2-1']})
+    >>> cache_workflow(mbFlow, '/tmp/mindboggle_manifests')
+    >>> mbFlow.run(plugin='MultiProc')
+
+    """
+    import os
+    from nipype.interfaces.utility import Function
+
+    manifest_path = os.path.abspath(manifest_path)
+    if not os.path.isdir(manifest_path):
+        os.makedirs(manifest_path)
+
+    wrapper = '\n'.join([
+        'def cached_function(**kwargs):',
+        '    from mindboggle.utils.manifests import run_cached',
+        '    return run_cached({0!r}, {1!r}, {2!r}, kwargs)'])
+
+    node_names = []
+    for node in workflow._get_all_nodes():
+        if isinstance(node.interface, Function):
+            function_str = node.interface.inputs.function_str
+            node.interface.inputs.function_str = wrapper.format(
+                function_str, node.fullname, manifest_path)
+            node_names.append(node.fullname)
+
+    return node_names
+
+
+def run_cached(function_str, node_name, manifest_path, kwargs):
+    """
+    Run a function from its source code, or reuse its earlier outputs.
+
+    The manifest (manifest.json in manifest_path/node_name/key/, where key
+    is a hash of the function, its inputs, and Mindboggle's source code
+    (see hash_package())) contains:
+        node : node name
+        function : function name
+        package : hash of Mindboggle's source code
+        inputs : argument values, with the name, path and SHA-1 hash
+                 of each input file (see describe_inputs())
+        outputs : returned values, with the path of each output file
+                  and the name of its link or copy (or its content hash)
+                  and the name of each array's .npy file in the
+                  manifest's directory (see store_outputs())
+
+    Output files in the node's working directory are linked (or copied)
+    back into the (new) working directory.  Output files elsewhere (such
+    as input files passed through) are returned as is if they still exist
+    with the same contents.
+
+    Parameters
+    ----------
+    function_str : string
+        source code of the function
+    node_name : string
+        name of the workflow node
+    manifest_path : string
+        directory with a subdirectory of manifests for each node
+    kwargs : dictionary
+        function arguments
+
+    Returns
+    -------
+    outputs : whatever the function returns
+
+    """
+    import os
+    import re
+    import json
+    import shutil
+    import hashlib
+    import tempfile
+    from mindboggle.utils.manifests import describe_inputs, \
+        store_outputs, restore_outputs, hash_package
+
+    function_name = re.search(r'def\s+(\w+)', function_str).group(1)
+    inputs = describe_inputs(kwargs)
+    package = hash_package()
+    key = hashlib.sha1(json.dumps([function_str,
+                                   describe_inputs(kwargs, False), package],
+                                  sort_keys=True).encode()).hexdigest()
+    node_path = os.path.join(manifest_path, node_name)
+    key_path = os.path.join(node_path, key)
+    manifest_file = os.path.join(key_path, 'manifest.json')
+
+    #-------------------------------------------------------------------------
+    # Reuse earlier outputs:
+    #-------------------------------------------------------------------------
+    if os.path.isfile(manifest_file):
+        manifest = json.load(open(manifest_file))
+        try:
+            outputs = restore_outputs(manifest['outputs'], key_path,
+                                      os.getcwd())
+        except IOError as error:
+            print('Rerun {0}: {1}'.format(node_name, error))
+            shutil.rmtree(key_path, ignore_errors=True)
+        else:
+            print('Reuse outputs of {0} from {1}'.format(node_name, key_path))
+            if manifest['tuple']:
+                outputs = tuple(outputs)
+            return outputs
+
+    #-------------------------------------------------------------------------
+    # Run the function:
+    #-------------------------------------------------------------------------
+    namespace = {}
+    exec(function_str, namespace)
+    outputs = namespace[function_name](**kwargs)
+
+    #-------------------------------------------------------------------------
+    # Save the manifest and output files and arrays (in a temporary directory
+    # renamed when complete, so an interrupted run leaves no manifest):
+    #-------------------------------------------------------------------------
+    if not os.path.isdir(node_path):
+        try:
+            os.makedirs(node_path)
+        except OSError:
+            if not os.path.isdir(node_path):
+                raise
+    temp_path = tempfile.mkdtemp(dir=node_path, prefix='.' + key)
+    try:
+        stored = store_outputs(outputs, temp_path, os.getcwd())
+    except ValueError as error:
+        print('No manifest for {0}: {1}'.format(node_name, error))
+        shutil.rmtree(temp_path)
+    else:
+        manifest = {'node': node_name,
+                    'function': function_name,
+                    'package': package,
+                    'inputs': inputs,
+                    'outputs': stored,
+                    'tuple': isinstance(outputs, tuple)}
+        json.dump(manifest, open(os.path.join(temp_path, 'manifest.json'),
+                                 'w'), indent=1, sort_keys=True)
+        try:
+            os.rename(temp_path, key_path)
+        except OSError:
+            # Saved by another process running the same node and inputs:
+            shutil.rmtree(temp_path)
+
+    return outputs
+
+
+#-----------------------------------------------------------------------------
+# Describe inputs, and save and restore outputs:
+#-----------------------------------------------------------------------------
+def hash_file(path):
+    """
+    Compute the SHA-1 hash of a file's contents (once per process
+    for the same path, size and modification time).
+
+    Parameters
+    ----------
+    path : string
+        file name
+
+    Returns
+    -------
+    sha1 : string
+        hexadecimal SHA-1 hash
+
+    Examples
+    --------
+    >>> import os
+    >>> from mindboggle.utils.manifests import hash_file
+    >>> import mindboggle
+    >>> sha1 = hash_file(os.path.join(os.path.dirname(mindboggle.__file__),
+    ...                               'info.py'))
+    >>> len(sha1)
+    40
+
+    """
+    import os
+    import hashlib
+    from mindboggle.utils.manifests import file_hashes
+
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime)
+    if key not in file_hashes:
+        sha1 = hashlib.sha1()
+        f = open(path, 'rb')
+        chunk = f.read(1 << 20)
+        while chunk:
+            sha1.update(chunk)
+            chunk = f.read(1 << 20)
+        f.close()
+        file_hashes[key] = sha1.hexdigest()
+
+    return file_hashes[key]
+
+
+def hash_package(package_path=''):
+    """
+    Compute a SHA-1 hash of a package's Python source files (once per
+    process for the same package), so that a change to the code a node's
+    function calls makes the node run again.
+
+    Parameters
+    ----------
+    package_path : string
+        package directory ('' for Mindboggle's)
+
+    Returns
+    -------
+    sha1 : string
+        hexadecimal SHA-1 hash of the names and contents of the files
+
+    Examples
+    --------
+    >>> from mindboggle.utils.manifests import hash_package
+    >>> sha1 = hash_package()
+    >>> len(sha1)
+    40
+
+    """
+    import os
+    import hashlib
+    import mindboggle
+    from mindboggle.utils.manifests import package_hashes, hash_file
+
+    if not package_path:
+        package_path = os.path.dirname(mindboggle.__file__)
+    package_path = os.path.abspath(package_path)
+    if package_path not in package_hashes:
+        sha1 = hashlib.sha1()
+        for root, dirs, files in sorted(os.walk(package_path)):
+            for file in sorted(files):
+                if file.endswith('.py'):
+                    path = os.path.join(root, file)
+                    sha1.update(os.path.relpath(path, package_path).encode())
+                    sha1.update(hash_file(path).encode())
+        package_hashes[package_path] = sha1.hexdigest()
+
+    return package_hashes[package_path]
+
+
+def describe_inputs(values, include_paths=True):
+    """
+    Describe function arguments by value, and files by content.
+
+    Input files are described by their names and content hashes,
+    and directories by the names, sizes and modification times of their
+    files.  Without paths (which change when working directories are
+    moved), the description identifies the inputs of a node.
+
+    Parameters
+    ----------
+    values : dictionary, list, tuple, string, number, Boolean or None
+        function arguments
+    include_paths : Boolean
+        include the full path of each file and directory?
+
+    Returns
+    -------
+    description : JSON-compatible object
+        argument values, with {'file': name, 'sha1': hash, 'path': path}
+        for each file and {'directory': name, 'files': [...], 'path': path}
+        for each directory
+
+    Examples
+    --------
+    >>> from mindboggle.utils.manifests import describe_inputs
+    >>> inputs = describe_inputs({'hemi': 'lh', 'min_size': 50,
+    ...                           'labels': [1, 2]})
+    >>> sorted(inputs.items())
+    [('hemi', 'lh'), ('labels', [1, 2]), ('min_size', 50)]
+
+    """
+    import os
+    from mindboggle.utils.manifests import hash_file
+
+    if isinstance(values, dict):
+        return dict([(str(x), describe_inputs(values[x], include_paths))
+                     for x in values])
+    elif isinstance(values, (list, tuple)):
+        return [describe_inputs(x, include_paths) for x in values]
+    elif isinstance(values, (str, type(u''))) and os.path.exists(values):
+        path = os.path.abspath(values)
+        if os.path.isdir(path):
+            files = []
+            for root, dirs, file_names in os.walk(path):
+                dirs.sort()
+                for file_name in sorted(file_names):
+                    stat = os.stat(os.path.join(root, file_name))
+                    files.append([os.path.relpath(os.path.join(root,
+                                                               file_name),
+                                                  path),
+                                  stat.st_size, stat.st_mtime])
+            description = {'directory': os.path.basename(path),
+                           'files': files}
+        else:
+            description = {'file': os.path.basename(path),
+                           'sha1': hash_file(path)}
+        if include_paths:
+            description['path'] = path
+        return description
+    elif values is None or isinstance(values, (bool, int, float, str,
+                                               type(u''))):
+        return values
+    else:
+        return repr(values)
+
+
+def link_or_copy(source, target):
+    """
+    Hard-link a file (or a directory's files) to a new path,
+    or copy if the file system does not support hard links.
+
+    Parameters
+    ----------
+    source : string
+        existing file or directory
+    target : string
+        new file or directory
+
+    Examples
+    --------
+    >>> import os
+    >>> import tempfile
+    >>> from mindboggle.utils.manifests import link_or_copy
+    >>> path = tempfile.mkdtemp()
+    >>> source = os.path.join(path, 'a.txt')
+    >>> open(source, 'w').write('a')
+    >>> link_or_copy(source, os.path.join(path, 'b.txt'))
+    >>> open(os.path.join(path, 'b.txt')).read()
+    'a'
+
+    """
+    import os
+    import shutil
+
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            target_root = os.path.join(target,
+                                       os.path.relpath(root, source))
+            if not os.path.isdir(target_root):
+                os.makedirs(target_root)
+            for file in files:
+                link_or_copy(os.path.join(root, file),
+                             os.path.join(target_root, file))
+    else:
+        try:
+            os.link(source, target)
+        except (OSError, AttributeError):
+            shutil.copy2(source, target)
+
+
+def store_outputs(outputs, store_path, working_path):
+    """
+    Keep output files and arrays in a directory and describe the outputs.
+
+    Output files in the working directory are hard-linked (or copied) to
+    the store directory, since working directories may be removed.
+    Output files elsewhere (such as input files passed through) are not
+    copied: they are described by their content hash, and found again
+    where they are.  numpy arrays are saved as .npy files.
+
+    Parameters
+    ----------
+    outputs : list, tuple, string, number, Boolean, None or numpy array
+        values returned by a function
+    store_path : string
+        directory for output files and arrays
+    working_path : string
+        working directory of the function
+
+    Returns
+    -------
+    description : JSON-compatible object
+        output values, with {'file': path, 'copy': name, 'relative': path}
+        for each output file or directory in the working directory
+        ('relative' is its path in the working directory),
+        {'file': path, 'sha1': hash, 'relative': None} for each output
+        file elsewhere ('files' instead of 'sha1' for a directory, as in
+        describe_inputs()), and {'array': name} for each array
+
+    Raises
+    ------
+    ValueError
+        if the outputs cannot be saved (such as arbitrary objects)
+
+    Examples
+    --------
+    >>> import os
+    >>> import tempfile
+    >>> import numpy as np
+    >>> from mindboggle.utils.manifests import store_outputs, restore_outputs
+    >>> path = tempfile.mkdtemp()
+    >>> stored = store_outputs([np.arange(3), np.float64(0.5), 2], path, path)
+    >>> stored
+    [{'array': '0_array.npy'}, 0.5, 2]
+    >>> restore_outputs(stored, path, path)
+    [array([0, 1, 2]), 0.5, 2]
+
+    """
+    import os
+    import numpy as np
+    from mindboggle.utils.manifests import describe_inputs, link_or_copy
+
+    if isinstance(outputs, (list, tuple)):
+        return [store_outputs(x, store_path, working_path) for x in outputs]
+    elif isinstance(outputs, np.ndarray):
+        if outputs.dtype == object:
+            raise ValueError('Cannot save output array of objects')
+        name = '{0}_array.npy'.format(len(os.listdir(store_path)))
+        np.save(os.path.join(store_path, name), outputs)
+        return {'array': name}
+    elif isinstance(outputs, np.generic):
+        return outputs.item()
+    elif isinstance(outputs, (str, type(u''))) and os.path.exists(outputs):
+        path = os.path.abspath(outputs)
+        if path.startswith(os.path.join(working_path, '')):
+            copy = '{0}_{1}'.format(len(os.listdir(store_path)),
+                                    os.path.basename(path))
+            link_or_copy(path, os.path.join(store_path, copy))
+            return {'file': path, 'copy': copy,
+                    'relative': os.path.relpath(path, working_path)}
+        else:
+            description = describe_inputs(path, False)
+            description.update({'file': path, 'relative': None})
+            return description
+    elif outputs is None or isinstance(outputs, (bool, int, float, str,
+                                                 type(u''))):
+        return outputs
+    else:
+        raise ValueError('Cannot save output of type {0}'.format(
+                         type(outputs).__name__))
+
+
+def restore_outputs(stored, store_path, working_path):
+    """
+    Restore outputs described by store_outputs().
+
+    Output files from the working directory are linked (or copied) to
+    the same place in the new working directory; other output files are
+    returned as is if they still exist with the same contents.
+
+    Parameters
+    ----------
+    stored : JSON-compatible object
+        description of outputs from store_outputs()
+    store_path : string
+        directory with output files and arrays
+    working_path : string
+        new working directory
+
+    Returns
+    -------
+    outputs : list, string, number, Boolean, None or numpy array
+        output values
+
+    Raises
+    ------
+    IOError
+        if a stored output file or array is missing,
+        or an output file elsewhere is missing or has changed
+
+    """
+    import os
+    import shutil
+    import numpy as np
+    from mindboggle.utils.manifests import describe_inputs, link_or_copy
+
+    if isinstance(stored, list):
+        return [restore_outputs(x, store_path, working_path) for x in stored]
+    elif isinstance(stored, dict) and 'array' in stored:
+        array_file = os.path.join(store_path, stored['array'])
+        if not os.path.isfile(array_file):
+            raise IOError('Missing output array: {0}'.format(array_file))
+        return np.load(array_file)
+    elif isinstance(stored, dict) and stored['relative'] is None:
+        path = stored['file']
+        description = dict([(x, stored[x]) for x in stored
+                            if x not in ['file', 'relative']])
+        if not os.path.exists(path) or \
+                describe_inputs(path, False) != description:
+            raise IOError('Missing or changed output: {0}'.format(path))
+        return path
+    elif isinstance(stored, dict):
+        copy = os.path.join(store_path, stored['copy'])
+        if not os.path.exists(copy):
+            raise IOError('Missing copy of output: {0}'.format(copy))
+        path = os.path.join(working_path, stored['relative'])
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        link_or_copy(copy, path)
+        return path
+    else:
+        return stored
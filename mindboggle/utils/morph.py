@@ -17,14 +17,18 @@ def dilate(indices, nedges, neighbor_lists):
     """
     Dilate region on a surface mesh.
 
+    Each of the nedges steps adds the neighbors of all of the vertices
+    at once by multiplying a vertex mask by a sparse adjacency matrix.
+
     Parameters
     ----------
     indices : list of integers
         indices of vertices to dilate
     nedges : integer
         number of edges to dilate across
-    neighbor_lists : list of lists of integers
+    neighbor_lists : list of lists of integers (or sparse matrix)
         each list contains indices to neighboring vertices for each vertex
+        (or adjacency matrix from find_adjacency_matrix(), for repeated calls)
 
     Returns
     -------
@@ -33,38 +37,51 @@ def dilate(indices, nedges, neighbor_lists):
 
     Examples
     --------
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.mesh import find_neighbors_from_file
-    >>> from mindboggle.utils.morph import dilate
-    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')
-    >>> neighbor_lists = find_neighbors_from_file(vtk_file)
-    >>> nedges = 3
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors_from_file  # doctest: +SKIP
+    >>> from mindboggle.utils.morph import dilate  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors_from_file(vtk_file)  # doctest: +SKIP
+    >>> nedges = 3  # doctest: +SKIP
     >>> # Select a single fold:
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds, name = read_scalars(folds_file, True, True)
-    >>> fold_number = 11 #11
-    >>> indices = [i for i,x in enumerate(folds) if x == fold_number]
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file, True, True)  # doctest: +SKIP
+    >>> fold_number = 11 #11  # doctest: +SKIP
+    >>> indices = [i for i,x in enumerate(folds) if x == fold_number]  # doctest: +SKIP
     >>> #
-    >>> dilated_indices = dilate(indices, nedges, neighbor_lists)
+    >>> dilated_indices = dilate(indices, nedges, neighbor_lists)  # doctest: +SKIP
     >>> #
     >>> # Write results to vtk file and view:
-    >>> IDs = -1 * np.ones(len(folds))
-    >>> IDs[dilated_indices] = 2
-    >>> IDs[indices] = 1
-    >>> rewrite_scalars(vtk_file, 'dilate.vtk', IDs, 'dilated_fold', IDs)
-    >>> plot_vtk('dilate.vtk')
+    >>> IDs = -1 * np.ones(len(folds))  # doctest: +SKIP
+    >>> IDs[dilated_indices] = 2  # doctest: +SKIP
+    >>> IDs[indices] = 1  # doctest: +SKIP
+    >>> rewrite_scalars(vtk_file, 'dilate.vtk', IDs, 'dilated_fold', IDs)  # doctest: +SKIP
+    >>> plot_vtk('dilate.vtk')  # doctest: +SKIP
 
     """
-    from mindboggle.utils.mesh import find_neighborhood
+    import numpy as np
+    from scipy.sparse import issparse
+    from mindboggle.utils.mesh import find_adjacency_matrix
+
+    if issparse(neighbor_lists):
+        A = neighbor_lists
+    else:
+        A = find_adjacency_matrix(neighbor_lists)
 
-    N = find_neighborhood(neighbor_lists, indices, nedges)
+    region = np.zeros(A.shape[0], dtype=bool)
+    region[indices] = True
 
-    dilated_indices = indices[:]
-    dilated_indices.extend(N)
+    # Propagate nedges away from indices:
+    dilated = region.copy()
+    for iedge in range(nedges):
+        dilated |= A.dot(dilated) > 0
+
+    dilated_indices = list(indices)
+    dilated_indices.extend(np.where(dilated & ~region)[0].tolist())
 
     return dilated_indices
 
@@ -75,14 +92,18 @@ def erode(indices, nedges, neighbor_lists):
     """
     Erode region on a surface mesh.
 
+    Vertices within nedges edges of the vertices just outside the region
+    are removed, using one sparse adjacency matrix product per edge.
+
     Parameters
     ----------
     indices : list of integers
         indices of vertices to erode
     nedges : integer
         number of edges to erode across
-    neighbor_lists : list of lists of integers
+    neighbor_lists : list of lists of integers (or sparse matrix)
         each list contains indices to neighboring vertices for each vertex
+        (or adjacency matrix from find_adjacency_matrix(), for repeated calls)
 
     Returns
     -------
@@ -91,38 +112,53 @@ def erode(indices, nedges, neighbor_lists):
 
     Examples
     --------
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.mesh import find_neighbors_from_file
-    >>> from mindboggle.utils.morph import erode
-    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')
-    >>> neighbor_lists = find_neighbors_from_file(vtk_file)
-    >>> nedges = 3
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors_from_file  # doctest: +SKIP
+    >>> from mindboggle.utils.morph import erode  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors_from_file(vtk_file)  # doctest: +SKIP
+    >>> nedges = 3  # doctest: +SKIP
     >>> # Select a single fold:
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds, name = read_scalars(folds_file, True, True)
-    >>> fold_number = 11 #11
-    >>> indices = [i for i,x in enumerate(folds) if x == fold_number]
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file, True, True)  # doctest: +SKIP
+    >>> fold_number = 11 #11  # doctest: +SKIP
+    >>> indices = [i for i,x in enumerate(folds) if x == fold_number]  # doctest: +SKIP
     >>> #
-    >>> eroded_indices = erode(indices, nedges, neighbor_lists)
+    >>> eroded_indices = erode(indices, nedges, neighbor_lists)  # doctest: +SKIP
     >>> #
     >>> # Write results to vtk file and view:
-    >>> IDs = -1 * np.ones(len(folds))
-    >>> IDs[indices] = 1
-    >>> IDs[eroded_indices] = 2
-    >>> rewrite_scalars(vtk_file, 'erode.vtk', IDs, 'eroded_fold', IDs)
-    >>> plot_vtk('erode.vtk')
+    >>> IDs = -1 * np.ones(len(folds))  # doctest: +SKIP
+    >>> IDs[indices] = 1  # doctest: +SKIP
+    >>> IDs[eroded_indices] = 2  # doctest: +SKIP
+    >>> rewrite_scalars(vtk_file, 'erode.vtk', IDs, 'eroded_fold', IDs)  # doctest: +SKIP
+    >>> plot_vtk('erode.vtk')  # doctest: +SKIP
 
     """
-    from mindboggle.utils.mesh import find_neighborhood
+    import numpy as np
+    from scipy.sparse import issparse
+    from mindboggle.utils.mesh import find_adjacency_matrix
 
-    N1 = find_neighborhood(neighbor_lists, indices, nedges=1)
-    N2 = find_neighborhood(neighbor_lists, N1, nedges)
+    if issparse(neighbor_lists):
+        A = neighbor_lists
+    else:
+        A = find_adjacency_matrix(neighbor_lists)
+
+    region = np.zeros(A.shape[0], dtype=bool)
+    region[indices] = True
+
+    # Vertices just outside the region:
+    outside = (A.dot(region) > 0) & ~region
 
-    eroded_indices = list(frozenset(indices).difference(N2))
+    # Propagate nedges away from the outside vertices:
+    reached = outside
+    for iedge in range(nedges):
+        reached |= A.dot(reached) > 0
+
+    eroded_indices = np.where(region & ~reached)[0].tolist()
 
     return eroded_indices
 
@@ -133,12 +169,16 @@ def extract_edge(indices, neighbor_lists):
     """
     Erode region on a surface mesh to extract the region's edge.
 
+    The edge consists of region vertices with a neighbor outside
+    the region, found with two sparse adjacency matrix products.
+
     Parameters
     ----------
     indices : list of integers
         indices of vertices to erode
-    neighbor_lists : list of lists of integers
+    neighbor_lists : list of lists of integers (or sparse matrix)
         each list contains indices to neighboring vertices for each vertex
+        (or adjacency matrix from find_adjacency_matrix(), for repeated calls)
 
     Returns
     -------
@@ -147,36 +187,48 @@ def extract_edge(indices, neighbor_lists):
 
     Examples
     --------
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.mesh import find_neighbors_from_file
-    >>> from mindboggle.utils.morph import extract_edge
-    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')
-    >>> neighbor_lists = find_neighbors_from_file(vtk_file)
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors_from_file  # doctest: +SKIP
+    >>> from mindboggle.utils.morph import extract_edge  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors_from_file(vtk_file)  # doctest: +SKIP
     >>> # Select a single fold:
-    >>> fold_number = 11 #11
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds, name = read_scalars(folds_file, True, True)
-    >>> indices = [i for i,x in enumerate(folds) if x == fold_number]
+    >>> fold_number = 11 #11  # doctest: +SKIP
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file, True, True)  # doctest: +SKIP
+    >>> indices = [i for i,x in enumerate(folds) if x == fold_number]  # doctest: +SKIP
     >>> #
-    >>> edge_indices = extract_edge(indices, neighbor_lists)
+    >>> edge_indices = extract_edge(indices, neighbor_lists)  # doctest: +SKIP
     >>> #
     >>> # Write results to vtk file and view:
-    >>> IDs = -1 * np.ones(len(folds))
-    >>> IDs[indices] = 1
-    >>> IDs[edge_indices] = 2
-    >>> rewrite_scalars(vtk_file, 'extract_edge.vtk', IDs, 'edge', IDs)
-    >>> plot_vtk('extract_edge.vtk')
+    >>> IDs = -1 * np.ones(len(folds))  # doctest: +SKIP
+    >>> IDs[indices] = 1  # doctest: +SKIP
+    >>> IDs[edge_indices] = 2  # doctest: +SKIP
+    >>> rewrite_scalars(vtk_file, 'extract_edge.vtk', IDs, 'edge', IDs)  # doctest: +SKIP
+    >>> plot_vtk('extract_edge.vtk')  # doctest: +SKIP
 
     """
-    from mindboggle.utils.mesh import find_neighborhood
+    import numpy as np
+    from scipy.sparse import issparse
+    from mindboggle.utils.mesh import find_adjacency_matrix
+
+    if issparse(neighbor_lists):
+        A = neighbor_lists
+    else:
+        A = find_adjacency_matrix(neighbor_lists)
 
-    N1 = find_neighborhood(neighbor_lists, indices, nedges=1)
-    N2 = find_neighborhood(neighbor_lists, N1, nedges=1)
-    edge_indices = list(set(N2).intersection(indices))
+    region = np.zeros(A.shape[0], dtype=bool)
+    region[indices] = True
+
+    # Vertices just outside the region:
+    outside = (A.dot(region) > 0) & ~region
+
+    # Region vertices neighboring the outside vertices:
+    edge_indices = np.where(region & (A.dot(outside) > 0))[0].tolist()
 
     return edge_indices
 
@@ -191,11 +243,16 @@ def fill_holes(regions, neighbor_lists, values=[], exclude_range=[]):
 
     Steps ::
 
-        1. Segment region vertex neighbors into connected vertices (region boundaries).
-        2. Remove the largest region boundary, presumably the
+        1. Find connected components of the background (vertices with -1)
+           with scipy.sparse.csgraph.connected_components().
+        2. Segment the vertices within two edges of each region
+           into connected vertices (region boundaries).
+        3. Remove the largest region boundary, presumably the
            outer contour of the region, leaving smaller boundaries,
            presumably the contours of holes within the region.
-        3. Call label_holes() to fill holes with surrounding region numbers.
+        4. Fill the background components that contain hole boundary
+           vertices with the region number that most of their edges
+           to surrounding regions lead to.
 
     Parameters
     ----------
@@ -216,205 +273,118 @@ def fill_holes(regions, neighbor_lists, values=[], exclude_range=[]):
 
     Examples
     --------
-    >>> import os
     >>> import numpy as np
-    >>> from mindboggle.utils.mesh import find_neighbors, remove_faces
+    >>> from mindboggle.utils.mesh import find_neighbors
     >>> from mindboggle.utils.morph import fill_holes
-    >>> from mindboggle.utils.segment import segment
-    >>> from mindboggle.utils.io_vtk import read_scalars, read_vtk, write_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> #
-    >>> # Select one fold
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds, name = read_scalars(folds_file, return_first=True, return_array=True)
-    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')
-    >>> faces, lines, indices, points, npoints, scalars, name, input_vtk = read_vtk(vtk_file,
-    >>>     return_first=True, return_array=True)
-    >>> neighbor_lists = find_neighbors(faces, npoints)
-    >>> n_fold = np.unique(folds)[1]
-    >>> folds[folds != n_fold] = -1
-    >>> #
-    >>> # Make two holes in fold (values of -1 and excluded values)
-    >>> # Hole 1:
-    >>> # Find a vertex whose removal (with its neighbors) would create a hole
-    >>> I = np.where(folds==n_fold)[0]
-    >>> for index1 in I:
-    >>>     N1 = neighbor_lists[index1]
-    >>>     stop = True
-    >>>     for n in N1:
-    >>>         if any(folds[neighbor_lists[n]] == -1):
-    >>>             stop = False
-    >>>             break
-    >>>         else:
-    >>>             for f in neighbor_lists[n]:
-    >>>                 if any(folds[neighbor_lists[f]] == -1):
-    >>>                     stop = False
-    >>>                     break
-    >>>     if stop:
-    >>>         break
-    >>> folds[index1] = -1
-    >>> folds[N1] = -1
-    >>> # Hole 2:
-    >>> I = np.where(folds==n_fold)[0]
-    >>> for index2 in I:
-    >>>     N2 = neighbor_lists[index2]
-    >>>     stop = True
-    >>>     for n in N2:
-    >>>         if any(folds[neighbor_lists[n]] == -1):
-    >>>             stop = False
-    >>>             break
-    >>>         else:
-    >>>             for f in neighbor_lists[n]:
-    >>>                 if any(folds[neighbor_lists[f]] == -1):
-    >>>                     stop = False
-    >>>                     break
-    >>>     if stop:
-    >>>         break
-    >>> folds[index2] = -1
-    >>> folds[N2] = -1
-    >>> values = np.zeros(len(folds))
-    >>> values[index2] = 100
-    >>> values[N2] = 200
-    >>> #
-    >>> # Write holes to vtk file and view:
-    >>> holes = folds.copy()
-    >>> holes[index1] = 10
-    >>> holes[N1] = 20
-    >>> holes[index2] = 30
-    >>> holes[N2] = 40
-    >>> indices = [i for i,x in enumerate(holes) if x > -1]
-    >>> write_vtk('holes.vtk', points, indices, lines,
-    >>>           remove_faces(faces, indices), [holes.tolist()], ['holes'])
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> plot_vtk('holes.vtk')
-    >>> #
-    >>> # Fill Hole 1 but not Hole 2:
-    >>> # (because values has an excluded value in the hole)
-    >>> regions = np.copy(folds)
-    >>> regions = fill_holes(regions, neighbor_lists, values, [99,101])
-    >>> #
-    >>> # Write results to vtk file and view:
-    >>> indices = [i for i,x in enumerate(regions) if x > -1]
-    >>> write_vtk('fill_holes.vtk', points, indices, lines,
-    >>>           remove_faces(faces, indices), regions.tolist(), 'regions')
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> plot_vtk('fill_holes.vtk')
+    >>> # A 5x5 grid of vertices (two triangles per square):
+    >>> faces = [[i*5+j, i*5+j+1, i*5+j+6] for i in range(4) for j in range(4)]
+    >>> faces.extend([[i*5+j, i*5+j+6, i*5+j+5] for i in range(4) for j in range(4)])
+    >>> neighbor_lists = find_neighbors(faces, 25)
+    >>> # One region with a single-vertex hole (vertex 12):
+    >>> regions = -1 * np.ones(25)
+    >>> regions[[6,7,8,11,13,16,17,18]] = 1
+    >>> fill_holes(regions, neighbor_lists)[12]
+    1.0
 
     """
     import numpy as np
-    from mindboggle.utils.segment import segment
+    from scipy.sparse.csgraph import connected_components
+    from mindboggle.utils.mesh import find_adjacency_matrix
 
-    # Make sure argument is a numpy array
+    # Make sure arguments are numpy arrays
     if not isinstance(regions, np.ndarray):
         regions = np.array(regions)
+    if len(exclude_range) == 2 and not isinstance(values, np.ndarray):
+        values = np.array(values)
 
-    def label_holes(holes, regions, neighbor_lists):
-        """
-        Fill holes in regions on a surface mesh.
-
-        Parameters
-        ----------
-        holes : list or array of integers
-            hole numbers for all vertices (default -1)
-        regions : numpy array of integers
-            region numbers for all vertices (default -1)
-        neighbor_lists : list of lists of integers
-            each list contains indices to neighboring vertices for each vertex
-
-        Returns
-        -------
-        regions : numpy array of integers
-            region numbers for all vertices (default -1)
-
-        """
-        import numpy as np
-
-        # Make sure argument is a numpy array
-        if not isinstance(regions, np.ndarray):
-            regions = np.array(regions)
-
-        # Identify the vertices for each hole
-        hole_numbers = [x for x in np.unique(holes) if x > -1]
-        for n_hole in hole_numbers:
-            I = [i for i,x in enumerate(holes) if x == n_hole]
-
-            # Identify neighbors to these vertices
-            N=[]; [N.extend(neighbor_lists[i]) for i in I]
-            if N:
-
-                # Assign the hole the maximum region ID number of its neighbors
-                regions[I] = max([regions[x] for x in N])
+    npoints = len(regions)
+    A = find_adjacency_matrix(neighbor_lists)
 
-        return regions
+    #-------------------------------------------------------------------------
+    # Find connected components of the background (candidate holes)
+    #-------------------------------------------------------------------------
+    background = regions == -1
+    Ibackground = np.where(background)[0]
+    n_components, components = connected_components(
+        A[Ibackground][:, Ibackground], directed=False)
+    background_components = -1 * np.ones(npoints, dtype=int)
+    background_components[Ibackground] = components
 
     #-------------------------------------------------------------------------
     # Find boundaries to holes
     #-------------------------------------------------------------------------
-    hole_boundaries = -1 * np.ones(len(regions))
+    # Background components reached by each hole boundary:
+    hole_boundaries = []
 
     # Identify vertices for each region
     region_numbers = [x for x in np.unique(regions) if x > -1]
-    count = 0
     for n_region in region_numbers:
         region_indices = np.where(regions == n_region)[0]
 
         # Identify neighbors to these vertices and their neighbors
-        N = []
-        [N.extend(neighbor_lists[x]) for x in region_indices]
-        N = list(frozenset(N).difference(region_indices))
-        N2 = []
-        [N2.extend(neighbor_lists[x]) for x in N]
-        N.extend(N2)
-        N = list(frozenset(N).difference(region_indices))
-        if N:
+        N = np.setdiff1d(A[region_indices].indices, region_indices)
+        N = np.setdiff1d(np.union1d(N, A[N].indices), region_indices)
+        if len(N):
 
             # Segment the neighbors into connected vertices (region boundaries)
-            boundaries = segment(N, neighbor_lists)
+            n_boundaries, boundaries = connected_components(A[N][:, N],
+                                                            directed=False)
 
             # Remove the largest region boundary, presumably the
             # outer contour of the region, leaving smaller boundaries,
             # presumably the contours of holes within the region
-            boundary_numbers = [x for x in np.unique(boundaries) if x > -1]
-            max_size = 0
-            max_number = 0
-            for n_boundary in boundary_numbers:
-                border_indices = np.where(boundaries == n_boundary)[0]
-                if len(border_indices) > max_size:
-                    max_size = len(border_indices)
-                    max_number = n_boundary
-            boundaries[boundaries == max_number] = -1
-            boundary_numbers = [x for x in boundary_numbers if x != max_number]
-
-            # Add remaining boundaries to holes array
-            for n_boundary in boundary_numbers:
-                indices = [i for i,x in enumerate(boundaries) if x == n_boundary]
-                hole_boundaries[indices] = count
-                count += 1
+            if n_boundaries > 1:
+                max_number = np.argmax(np.bincount(boundaries))
+                seeds = (boundaries != max_number) & background[N]
+
+                # Store background components of remaining boundaries
+                for n_boundary in np.unique(boundaries[seeds]):
+                    seed_list = N[seeds & (boundaries == n_boundary)]
+                    hole_boundaries.append(
+                        np.unique(background_components[seed_list]))
 
     #-------------------------------------------------------------------------
     # Fill holes
     #-------------------------------------------------------------------------
     # If there are any holes
-    if count > 0:
-        hole_numbers = [x for x in np.unique(hole_boundaries) if x > -1]
-        background = [i for i,x in enumerate(regions) if x == -1]
-
-        # Grow seeds from hole boundaries to fill holes (background value -1)
-        for n_hole in hole_numbers:
-            seed_list = np.where(hole_boundaries == n_hole)[0].tolist()
-            seed_lists = [list(frozenset(background).intersection(seed_list))]
-            hole = segment(background, neighbor_lists, 1, seed_lists)
-
-            # Label the vertices for each hole by surrounding region number
-            # if hole does not include values within exclude_range:
-            if len(exclude_range) == 2:
-                Ihole = np.where(hole > -1)[0]
-                #if not len(frozenset(values[Ihole]).intersection(exclude_range)):
-                if not [x for x in values[Ihole]
-                        if x > exclude_range[0] and x < exclude_range[1]]:
-                    regions = label_holes(hole, regions, neighbor_lists)
-            else:
-                regions = label_holes(hole, regions, neighbor_lists)
+    if hole_boundaries:
+
+        # Select background components as holes
+        # if a hole does not include values within exclude_range:
+        is_hole = np.zeros(n_components, dtype=bool)
+        if len(exclude_range) == 2:
+            excluded = (values[Ibackground] > exclude_range[0]) & \
+                       (values[Ibackground] < exclude_range[1])
+            excluded = np.bincount(components, weights=excluded,
+                                   minlength=n_components) > 0
+            for hole_components in hole_boundaries:
+                if not np.any(excluded[hole_components]):
+                    is_hole[hole_components] = True
+        else:
+            for hole_components in hole_boundaries:
+                is_hole[hole_components] = True
+        hole_vertices = np.zeros(npoints, dtype=bool)
+        hole_vertices[Ibackground] = is_hole[components]
+
+        # Label the vertices for each hole by a vote of the edges between
+        # the hole and its surrounding regions: count (hole, region) edge
+        # pairs and take the region with the most edges (ties go to the
+        # larger region number)
+        rows = np.repeat(np.arange(npoints), np.diff(A.indptr))
+        edges = hole_vertices[rows] & ~background[A.indices]
+        holes, edge_holes = np.unique(background_components[rows[edges]],
+                                      return_inverse=True)
+        labels, edge_labels = np.unique(regions[A.indices[edges]],
+                                        return_inverse=True)
+        n_labels = len(labels)
+        votes = np.bincount(edge_holes * n_labels + edge_labels,
+                            minlength=len(holes) * n_labels)
+        votes = votes.reshape(len(holes), n_labels)
+        winners = n_labels - 1 - np.argmax(votes[:, ::-1], axis=1)
+        hole_labels = -1 * np.ones(n_components)
+        hole_labels[holes] = labels[winners]
+        regions[hole_vertices] = hole_labels[
+            background_components[hole_vertices]]
 
     return regions
 
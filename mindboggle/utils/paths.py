@@ -52,67 +52,73 @@ def connect_points_erosion(S, neighbor_lists, outer_anchors, inner_anchors=[],
     Examples
     --------
     >>> # Extract a skeleton to connect endpoints in a fold:
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.io_vtk import read_scalars, read_vtk, rewrite_scalars
-    >>> from mindboggle.utils.compute import median_abs_dev
-    >>> from mindboggle.utils.paths import find_max_values
-    >>> from mindboggle.utils.mesh import find_neighbors_from_file
-    >>> from mindboggle.utils.paths import connect_points_erosion, find_outer_anchors
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, read_vtk, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.compute import median_abs_dev  # doctest: +SKIP
+    >>> from mindboggle.utils.paths import find_max_values  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors_from_file  # doctest: +SKIP
+    >>> from mindboggle.utils.paths import connect_points_erosion, find_outer_anchors  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
     >>> #
-    >>> curv_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')
-    >>> u1,u2,u3, points, u4, curvs, u5,u6 = read_vtk(curv_file, True,True)
-    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'travel_depth_rescaled.vtk')
-    >>> depths, name = read_scalars(depth_file, True, True)
-    >>> values = curvs * depths
-    >>> neighbor_lists = find_neighbors_from_file(curv_file)
+    >>> curv_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')  # doctest: +SKIP
+    >>> u1,u2,u3, points, u4, curvs, u5,u6 = read_vtk(curv_file, True,True)  # doctest: +SKIP
+    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'travel_depth_rescaled.vtk')  # doctest: +SKIP
+    >>> depths, name = read_scalars(depth_file, True, True)  # doctest: +SKIP
+    >>> values = curvs * depths  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors_from_file(curv_file)  # doctest: +SKIP
     >>> #
     >>> # Single fold:
-    >>> fold_number = 1 #11
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds, name = read_scalars(folds_file, True, True)
-    >>> indices = [i for i,x in enumerate(folds) if x == fold_number]
-    >>> S = -1 * np.ones(len(values))
-    >>> S[indices] = 1
+    >>> fold_number = 1 #11  # doctest: +SKIP
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file, True, True)  # doctest: +SKIP
+    >>> indices = [i for i,x in enumerate(folds) if x == fold_number]  # doctest: +SKIP
+    >>> S = -1 * np.ones(len(values))  # doctest: +SKIP
+    >>> S[indices] = 1  # doctest: +SKIP
     >>> #
     >>> # Outer anchors:
-    >>> min_separation = 10
-    >>> outer_anchors, tracks = find_outer_anchors(indices, neighbor_lists,
-    >>>                             values, depths, min_separation)
+    >>> min_separation = 10  # doctest: +SKIP
+    >>> outer_anchors, tracks = find_outer_anchors(indices, neighbor_lists,  # doctest: +SKIP
+    >>>                             values, depths, min_separation)  # doctest: +SKIP
     >>> #
     >>> # Inner anchors:
-    >>> values0 = [x for x in values if x > 0]
-    >>> thr = np.median(values0) + 2 * median_abs_dev(values0)
-    >>> inner_anchors = find_max_values(points, values, min_separation, thr)
+    >>> values0 = [x for x in values if x > 0]  # doctest: +SKIP
+    >>> thr = np.median(values0) + 2 * median_abs_dev(values0)  # doctest: +SKIP
+    >>> inner_anchors = find_max_values(points, values, min_separation, thr)  # doctest: +SKIP
     >>> #
-    >>> erode_ratio = 0.10
-    >>> erode_min_size = 10
-    >>> save_steps = [] #range(0,500,50)
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> save_vtk = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')
-    >>> skeleton = connect_points_erosion(S, neighbor_lists,
-    >>>     outer_anchors, inner_anchors, values, erode_ratio, erode_min_size,
-    >>>     save_steps, save_vtk)
+    >>> erode_ratio = 0.10  # doctest: +SKIP
+    >>> erode_min_size = 10  # doctest: +SKIP
+    >>> save_steps = [] #range(0,500,50)  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> save_vtk = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')  # doctest: +SKIP
+    >>> skeleton = connect_points_erosion(S, neighbor_lists,  # doctest: +SKIP
+    >>>     outer_anchors, inner_anchors, values, erode_ratio, erode_min_size,  # doctest: +SKIP
+    >>>     save_steps, save_vtk)  # doctest: +SKIP
     >>> #if save_steps:  plot_vtk('edge'+str(save_steps[0])+'.vtk')
     >>> #
     >>> # Write out vtk file and view:
-    >>> D = -1 * np.ones(len(values))
-    >>> D[indices] = 1
-    >>> D[skeleton] = 2
-    >>> D[outer_anchors] = 3
-    >>> folds[folds != fold_number] = -1
-    >>> rewrite_scalars(folds_file, 'connect_points_erosion.vtk',
-    >>>                 D, 'skeleton', folds)
-    >>> plot_vtk('connect_points_erosion.vtk')
+    >>> D = -1 * np.ones(len(values))  # doctest: +SKIP
+    >>> D[indices] = 1  # doctest: +SKIP
+    >>> D[skeleton] = 2  # doctest: +SKIP
+    >>> D[outer_anchors] = 3  # doctest: +SKIP
+    >>> folds[folds != fold_number] = -1  # doctest: +SKIP
+    >>> rewrite_scalars(folds_file, 'connect_points_erosion.vtk',  # doctest: +SKIP
+    >>>                 D, 'skeleton', folds)  # doctest: +SKIP
+    >>> plot_vtk('connect_points_erosion.vtk')  # doctest: +SKIP
 
     """
     import numpy as np
+    from time import time
 
     from mindboggle.utils.morph import topo_test, extract_edge
+    from mindboggle.utils.mesh import find_adjacency_matrix
     from mindboggle.utils.segment import segment
     from mindboggle.utils.paths import find_endpoints
+    from mindboggle.utils.logs import get_logger, log_progress
+
+    logger = get_logger('mindboggle.utils.paths')
+    t0 = time()
 
     # Make sure arguments are numpy arrays:
     if not isinstance(S, np.ndarray):
@@ -131,11 +137,14 @@ def connect_points_erosion(S, neighbor_lists, outer_anchors, inner_anchors=[],
         from mindboggle.utils.io_vtk import rewrite_scalars
         S0 = S.copy()
 
+    # Adjacency matrix for extracting edges at each iteration:
+    adjacency = find_adjacency_matrix(neighbor_lists)
+
     #-------------------------------------------------------------------------
     # Iteratively remove simple points:
     #-------------------------------------------------------------------------
-    print('  Remove up to {0} of edge vertices per iteration'.
-          format(erode_ratio))
+    logger.debug('  Remove up to {0} of edge vertices per iteration'.
+                 format(erode_ratio))
     complex = []
     count = -1
     exist_simple = True
@@ -148,9 +157,9 @@ def connect_points_erosion(S, neighbor_lists, outer_anchors, inner_anchors=[],
         # region and are not among the indices to keep or known simple points:
         #---------------------------------------------------------------------
         indices = np.where(S == 1)[0].tolist()
-        edge = extract_edge(indices, neighbor_lists)
+        edge = extract_edge(indices, adjacency)
         if edge:
-            edge = np.array(list(set(edge).difference(complex)))
+            edge = np.array(sorted(set(edge).difference(complex)))
             len_edge = np.shape(edge)[0]
             if len_edge:
 
@@ -161,15 +170,14 @@ def connect_points_erosion(S, neighbor_lists, outer_anchors, inner_anchors=[],
                 edge_seg_numbers = [x for x in np.unique(edge_segs)
                                     if x != -1]
                 len_numbers = len(edge_seg_numbers)
-                if len_numbers > 1:
-                    print('    {0}: {1} edge points in {2} segments'.
-                          format(count, len_edge, len_numbers))
-                else:
-                    print('    {0}: {1} edge points'.format(count, len_edge))
+                log_progress(logger, 'connect_points_erosion', interval=10,
+                             iteration=count, n_edge=len_edge,
+                             n_segments=len_numbers,
+                             elapsed=round(time() - t0, 3))
                 first_seg = True
                 for edge_seg_number in edge_seg_numbers:
                     edge_seg = np.where(edge_segs == edge_seg_number)[0]
-                    edge_seg = np.array(list(set(edge_seg).difference(keep)))
+                    edge_seg = np.array(sorted(set(edge_seg).difference(keep)))
                     len_edge_seg = np.shape(edge_seg)[0]
                     if len_edge_seg:
 
@@ -179,7 +187,8 @@ def connect_points_erosion(S, neighbor_lists, outer_anchors, inner_anchors=[],
                         #-----------------------------------------------------
                         ntests = len_edge_seg
                         if erode_by_value and ntests > erode_min_size:
-                            Isort = np.argsort(values[edge_seg])
+                            Isort = np.argsort(values[edge_seg],
+                                               kind='mergesort')
                             edge_seg = edge_seg[Isort]
                             if erode_ratio > 0:
                                 ntests = int(len_edge_seg * erode_ratio) + 1
@@ -200,7 +209,7 @@ def connect_points_erosion(S, neighbor_lists, outer_anchors, inner_anchors=[],
 
                         # If no simple points, test all of the indices:
                         if not exist_simple and erode_by_value:
-                            print('    No simple points')
+                            logger.debug('    No simple points')
                             for index in edge_seg[ntests::]:
                                 simple, d = topo_test(index, S, neighbor_lists)
                                 # If a simple point, remove and run again:
@@ -258,6 +267,10 @@ def connect_points_hmmf(indices_points, indices, L, neighbor_lists, wN_max=1.0):
     We iteratively update each HMMF value if it is near the likelihood
     threshold such that a H_step makes it cross the threshold,
     and the vertex is a "simple point" (its addition/removal alters topology).
+    Cost gradients are computed for all vertices at once from a sparse
+    adjacency matrix, and only vertices whose values would cross the
+    threshold are tested for topology (in order of their indices).
+    Iterations stop early when the costs or HMMF values stop changing.
 
     Parameters for computing the cost and cost gradients:
 
@@ -286,50 +299,55 @@ def connect_points_hmmf(indices_points, indices, L, neighbor_lists, wN_max=1.0):
     Examples
     --------
     >>> # Connect vertices according to likelihood values in a single fold:
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.io_vtk import read_vtk, read_scalars,
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_vtk, read_scalars,  # doctest: +SKIP
     ...                                     read_faces_points, rewrite_scalars
-    >>> from mindboggle.utils.mesh import find_neighbors
-    >>> from mindboggle.utils.paths import find_outer_anchors, connect_points_hmmf
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')
+    >>> from mindboggle.utils.mesh import find_neighbors  # doctest: +SKIP
+    >>> from mindboggle.utils.paths import find_outer_anchors, connect_points_hmmf  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')  # doctest: +SKIP
     >>> # Get neighbor_lists, scalars
-    >>> faces, points, npoints = read_faces_points(vtk_file)
-    >>> neighbor_lists = find_neighbors(faces, npoints)
+    >>> faces, points, npoints = read_faces_points(vtk_file)  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors(faces, npoints)  # doctest: +SKIP
     >>> # Select a single fold:
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds, name = read_scalars(folds_file, True, True)
-    >>> fold_number = 1 #11
-    >>> folds[folds != fold_number] = -1
-    >>> indices = [i for i,x in enumerate(folds) if x == fold_number]
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file, True, True)  # doctest: +SKIP
+    >>> fold_number = 1 #11  # doctest: +SKIP
+    >>> folds[folds != fold_number] = -1  # doctest: +SKIP
+    >>> indices = [i for i,x in enumerate(folds) if x == fold_number]  # doctest: +SKIP
     >>> # Find endpoints:
-    >>> values_seeding_file = os.path.join(path, 'arno', 'shapes', 'travel_depth_rescaled.vtk')
-    >>> values_seeding, name = read_scalars(values_seeding_file, True, True)
-    >>> values_file = os.path.join(path, 'arno', 'shapes', 'likelihoods.vtk')
-    >>> values, name = read_scalars(values_file, True, True)
-    >>> min_separation = 10
-    >>> keep, tracks = find_outer_anchors(indices,
+    >>> values_seeding_file = os.path.join(path, 'arno', 'shapes', 'travel_depth_rescaled.vtk')  # doctest: +SKIP
+    >>> values_seeding, name = read_scalars(values_seeding_file, True, True)  # doctest: +SKIP
+    >>> values_file = os.path.join(path, 'arno', 'shapes', 'likelihoods.vtk')  # doctest: +SKIP
+    >>> values, name = read_scalars(values_file, True, True)  # doctest: +SKIP
+    >>> min_separation = 10  # doctest: +SKIP
+    >>> keep, tracks = find_outer_anchors(indices,  # doctest: +SKIP
     ...     neighbor_lists, values, values_seeding, min_separation)
-    >>> wN_max = 2.0
+    >>> wN_max = 2.0  # doctest: +SKIP
     >>> #
-    >>> S = connect_points_hmmf(keep, indices, values, neighbor_lists, wN_max)
+    >>> S = connect_points_hmmf(keep, indices, values, neighbor_lists, wN_max)  # doctest: +SKIP
     >>> #S = connect_points_hmmf(keep, indices, values_seeding, neighbor_lists, wN_max)
     >>> #
     >>> # View:
-    >>> skeleton = -1 * np.ones(npoints)
-    >>> skeleton[S] = 1
-    >>> skeleton[keep] = 2
-    >>> rewrite_scalars(folds_file, 'connect_points_hmmf.vtk',
-    >>>                 skeleton, 'skeleton', folds)
-    >>> plot_vtk('connect_points_hmmf.vtk')
+    >>> skeleton = -1 * np.ones(npoints)  # doctest: +SKIP
+    >>> skeleton[S] = 1  # doctest: +SKIP
+    >>> skeleton[keep] = 2  # doctest: +SKIP
+    >>> rewrite_scalars(folds_file, 'connect_points_hmmf.vtk',  # doctest: +SKIP
+    >>>                 skeleton, 'skeleton', folds)  # doctest: +SKIP
+    >>> plot_vtk('connect_points_hmmf.vtk')  # doctest: +SKIP
 
     """
     import numpy as np
+    from time import time
     from mindboggle.utils.morph import topo_test
+    from mindboggle.utils.mesh import find_adjacency_matrix
     from mindboggle.utils.paths import connect_points_erosion
-    from mindboggle.labels.labels import extract_borders
+    from mindboggle.utils.logs import get_logger, log_progress
+
+    logger = get_logger('mindboggle.utils.paths')
+    t0 = time()
 
     # Make sure argument is a numpy array
     if not isinstance(L, np.ndarray):
@@ -349,16 +367,17 @@ def connect_points_hmmf(indices_points, indices, L, neighbor_lists, wN_max=1.0):
     slope_exp = 2
     rate_factor = 0.9
     min_cost_change = 0.0001  # minimum change in the sum of costs
+    min_H_change = 0.00001  # minimum change in any HMMF value (convergence)
     n_tries_no_change = 3  # number of loops without sufficient change
     min_count = 50  # min. iterations (to overcome initial increasing costs)
     max_count = 300  # maximum number of iterations (in case no convergence)
 
     # Miscellaneous parameters:
     do_erode = False
-    print_interval = 10
+    log_interval = 10  # minimum seconds between progress events (INFO level)
 
-    def compute_costs(likelihoods, hmmfs, hmmfs_neighbors, numbers_of_neighbors,
-                      wN, Z=[]):
+    def compute_costs(likelihoods, hmmfs, hmmfs_neighbors, rows,
+                      numbers_of_neighbors, wN):
         """
         Cost function for penalizing unlikely fundus curve vertices.
 
@@ -375,20 +394,23 @@ def connect_points_hmmf(indices_points, indices, L, neighbor_lists, wN_max=1.0):
         Note: 1.1 is used instead of 1 to ensure that there is a cost
               for all points, even for those with likelihoods close to 1.
 
+        The neighbor sums are computed for all vertices at once over
+        the (row, neighbor) entries of a sparse adjacency matrix.
+
         Parameters
         ----------
         likelihoods : numpy array of floats
             likelihood values in interval [0,1]
-        hmmf : numpy array of floats
+        hmmfs : numpy array of floats
             HMMF values
-        hmmf_neighbors : numpy array of floats
-            HMMF values of neighboring vertices for each vertex
+        hmmfs_neighbors : numpy array of floats
+            HMMF values of the neighbor in each (row, neighbor) entry
+        rows : numpy array of integers (same shape as hmmfs_neighbors)
+            index into hmmfs of the vertex in each (row, neighbor) entry
         numbers_of_neighbors : numpy array of integers
             number of neighbors for each vertex
         wN : float
             weight influence of neighbors on cost (term 2)
-        Z : numpy array of integers in {0,1} (same shape as hmmf_neighbors)
-            to remove zero-padded neighborhood elements after hmmf subtraction
 
         Returns
         -------
@@ -400,16 +422,14 @@ def connect_points_hmmf(indices_points, indices, L, neighbor_lists, wN_max=1.0):
 
         if all(numbers_of_neighbors):
 
-            # Subtract each HMMF value from its neighbors:
-            diff = abs(hmmfs - hmmfs_neighbors)
-
-            # Since the above neighbors may have been padded,
-            # remove the extra differences by multiplying them times zero:
-            diff = diff * Z
+            # Subtract each HMMF value from its neighbors
+            # and sum the absolute differences for each vertex:
+            diff = np.abs(hmmfs[rows] - hmmfs_neighbors)
+            sum_diff = np.bincount(rows, weights=diff, minlength=len(hmmfs))
 
             # Compute the cost for each vertex:
             costs = hmmfs * (1.1 - likelihoods) + \
-                    wN * np.sum(diff, axis=0) / numbers_of_neighbors
+                    wN * sum_diff / numbers_of_neighbors
         else:
             import sys
             sys.exit('ERROR: No HMMF neighbors to compute cost.')
@@ -428,32 +448,30 @@ def connect_points_hmmf(indices_points, indices, L, neighbor_lists, wN_max=1.0):
     H_new[H_new > 1.0] = 1
     H[H_new > 0.5] = H_new[H_new > 0.5]
     H[indices_points] = 1
-    H_new = H.copy()
-    H_tests = H.copy()
 
-    # Find the HMMF values for the neighbors of each vertex:
+    # Sparse adjacency rows for the vertices to update
+    # (one entry per vertex-neighbor pair):
     N = neighbor_lists
-    N_sizes = np.array([len(x) for x in N])
-    max_num_neighbors = max(N_sizes[indices])
-    N_array = np.zeros((max_num_neighbors, len(L)))
-    for index in indices:
-        N_array[0:N_sizes[index], index] = N[index]
-    N_array_shape = np.shape(N_array)
-    N_flat = np.ravel(N_array)
-    N_flat_list = N_flat.tolist()
-    H_N = np.reshape(H[N_flat_list], N_array_shape)
-    ind_flat = [i for i,x in enumerate(N_flat_list) if x > 0]
-    len_flat = len(N_flat_list)
-
-    # A zero in N calls H[0], so remove zero-padded neighborhood elements:
-    Z = np.zeros((max_num_neighbors, len(L)))
-    for index in indices:
-        Z[0:N_sizes[index], index] = 1
+    indices = np.asarray(indices, dtype=int)
+    A = find_adjacency_matrix(N)[indices]
+    N_sizes = np.diff(A.indptr)
+    rows = np.repeat(np.arange(len(indices)), N_sizes)
+    cols = A.indices
+
+    # Anchor points are never updated:
+    is_anchor = np.zeros(len(L), dtype=bool)
+    is_anchor[indices_points] = True
+    is_anchor = is_anchor[indices]
+
+    # Binary "inside" (> 0.5) and "outside" arrays for topology tests:
+    inside = np.zeros(len(L))
+    inside[H > 0.5] = 1.0
+    outside = 1.0 - inside
 
     # Assign cost values to each vertex (for indices):
-    C = np.zeros(len(L))
-    C[indices] = compute_costs(L[indices], H[indices], H_N[:,indices],
-                               N_sizes[indices], wN_max, Z[:,indices])
+    L_I = L[indices]
+    H_I = H[indices]
+    C_I = compute_costs(L_I, H_I, H[cols], rows, N_sizes, wN_max)
     npoints = len(indices)
 
     # Loop until count reaches max_count or until end_flag equals zero
@@ -465,64 +483,72 @@ def connect_points_hmmf(indices_points, indices, L, neighbor_lists, wN_max=1.0):
     while end_flag < n_tries_no_change and count < max_count:
 
         # Select indices with a positive HMMF value:
-        V = [indices[i] for i,x in enumerate(H[indices]) if x > 0.0]
+        V = H_I > 0.0
 
         # Update neighborhood H values:
-        #H_N = np.reshape(H[N_flat_list], N_array_shape)
-        H_N = np.zeros(len_flat)
-        H_N[ind_flat] = H[N_flat[ind_flat].tolist()]
-        H_N = np.reshape(H_N, N_array_shape)
+        H_N = H[cols]
 
         # Compute the cost gradient for the HMMF values:
-        H_decr = H - H_step
+        H_decr = H_I - H_step
         H_decr[H_decr < 0] = 0.0
-        C_decr = compute_costs(L[V], H_decr[V], H_N[:,V], N_sizes[V], wN, Z[:,V])
-        H_tests[V] = H[V] - gradient_factor * (C[V] - C_decr)
+        C_decr = compute_costs(L_I, H_decr, H_N, rows, N_sizes, wN)
+        H_tests = H_I - gradient_factor * (C_I - C_decr)
         H_tests[H_tests < 0] = 0.0
         H_tests[H_tests > 1] = 1.0
 
-        # For each index:
-        for index in V:
-
-                # Do not update anchor point costs:
-                if index not in indices_points:
-
-                    # Update a vertex HMMF value if it is away from the threshold:
-                    update = True
-                    # Or if it crosses the threshold and is a topologically
-                    # "simple point" (0.5 not considered part of the fundus):
-                    if H[index] > 0.5 >= H_tests[index]:
-                        update, n_in = topo_test(index, H_new, N)
-                    elif H[index] <= 0.5 < H_tests[index]:
-                        update, n_in = topo_test(index, 1 - H_new, N)
-                    if update:
-                        H_new[index] = H_tests[index]
+        # Do not update anchor point costs:
+        update = V & ~is_anchor
+
+        # Update all vertex HMMF values that stay on the same side of
+        # the threshold at once (0.5 not considered part of the fundus):
+        was_inside = H_I > 0.5
+        crosses = update & (was_inside != (H_tests > 0.5))
+        stays = update & ~crosses
+        H_new_I = H_I.copy()
+        H_new_I[stays] = H_tests[stays]
+
+        # Update a vertex HMMF value that crosses the threshold
+        # only if it is a topologically "simple point":
+        for i in np.where(crosses)[0]:
+            index = indices[i]
+            if was_inside[i]:
+                simple, n_in = topo_test(index, inside, N)
+            else:
+                simple, n_in = topo_test(index, outside, N)
+            if simple:
+                H_new_I[i] = H_tests[i]
+                inside[index] = 1.0 - inside[index]
+                outside[index] = 1.0 - outside[index]
 
         # Update the cost values:
-        C[V] = compute_costs(L[V], H_new[V], H_N[:,V], N_sizes[V], wN, Z[:,V])
+        C_I = compute_costs(L_I, H_new_I, H_N, rows, N_sizes, wN)
 
         # Sum the cost values across all vertices and tally the number
         # of HMMF values greater than the threshold.
         # After iteration 1, compare current and previous values.
-        # If the values are similar, increment end_flag:
-        costs = sum(C[V].tolist())
-        npoints_thr = len([x for x in H[V].tolist() if x > 0.5])
+        # If the values are similar, or if no HMMF value changes,
+        # increment end_flag:
+        costs = np.sum(C_I[V])
+        npoints_thr = np.sum(H_new_I[V] > 0.5)
+        max_H_change = np.max(np.abs(H_new_I - H_I))
 
         # Terminate the loop if there are insufficient changes:
         if count > 0:
             delta_cost = (costs_previous - costs) / npoints
             delta_points = npoints_thr_previous - npoints_thr
             if delta_points == 0:
-                if delta_cost < min_cost_change and count > min_count:
+                if (delta_cost < min_cost_change and count > min_count) or \
+                        max_H_change < min_H_change:
                     end_flag += 1
             else:
                 end_flag = 0
 
-            # Display information every n_mod iterations:
-            if not np.mod(count, print_interval):
-                print('      Iteration {0}: {1} crossing threshold '
-                      '(wN={2:0.3f}, grad={3:0.3f}, cost={4:0.3f})'.
-                      format(count, delta_points, wN, gradient_factor, delta_cost))
+            # Log information (at INFO level every log_interval seconds):
+            log_progress(logger, 'connect_points_hmmf', interval=log_interval,
+                         iteration=count, crossing=delta_points, wN=wN,
+                         gradient_factor=gradient_factor,
+                         delta_cost=delta_cost, max_H_change=max_H_change,
+                         end_flag=end_flag, elapsed=round(time() - t0, 3))
 
             # Increment the gradient factor and decrement the neighborhood factor
             # so that spacing is close in early iterations and far apart later:
@@ -535,11 +561,16 @@ def connect_points_hmmf(indices_points, indices, L, neighbor_lists, wN_max=1.0):
         # Reset for next iteration:
         costs_previous = costs
         npoints_thr_previous = npoints_thr
-        H = H_new
+        H_I = H_new_I
+        H[indices] = H_I
 
         count += 1
 
-    print('      Updated hidden Markov measure field (HMMF) values')
+    logger.info('      Updated hidden Markov measure field (HMMF) values')
+    log_progress(logger, 'connect_points_hmmf', step='done', iterations=count,
+                 converged=end_flag >= n_tries_no_change,
+                 max_count=max_count, n_vertices=npoints,
+                 elapsed=round(time() - t0, 3))
 
     # Threshold the resulting array:
     S = np.zeros(len(L))
@@ -552,8 +583,8 @@ def connect_points_hmmf(indices_points, indices, L, neighbor_lists, wN_max=1.0):
     if do_erode:
         skeleton = connect_points_erosion(S, indices_points, N,
                                           values=H, erode_ratio=0.5)
-        print('      Removed {0} points to create one-vertex-thin skeletons'.
-              format(int(npoints_thr - len(skeleton))))
+        logger.info('      Removed {0} points to create one-vertex-thin skeletons'.
+                    format(int(npoints_thr - len(skeleton))))
     else:
         skeleton = [i for i,x in enumerate(S.tolist()) if x == 1]
 
@@ -601,30 +632,30 @@ def smooth_skeleton(skeletons, bounds, vtk_file, likelihoods,
     Examples
     --------
     >>> # Extract fundus from one or more folds:
-    >>> single_fold = True
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import read_scalars
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> from mindboggle.utils.paths import smooth_skeleton
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> likelihoods_file = os.path.join(path, 'arno', 'shapes', 'likelihoods.vtk')
-    >>> likelihoods, name = read_scalars(likelihoods_file, True, True)
-    >>> vtk_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')
-    >>> skeletons_file = os.path.join(path, 'arno', 'features', 'fundi.vtk')
-    >>> skeletons, name = read_scalars(skeletons_file, True, True)
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> bounds, name = read_scalars(folds_file, True, True)
-    >>> if single_fold:
-    >>>     fold_number = 1 #11
-    >>>     bounds[bounds != fold_number] = -1
-    >>> wN_max = 1.0
-    >>> erode_again = False
-    >>> save_file = True
-    >>> smooth_skeletons, n_skeletons, skeletons_file = smooth_skeleton(skeletons,
-    >>>     bounds, vtk_file, likelihoods, wN_max, erode_again, save_file)
+    >>> single_fold = True  # doctest: +SKIP
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> from mindboggle.utils.paths import smooth_skeleton  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> likelihoods_file = os.path.join(path, 'arno', 'shapes', 'likelihoods.vtk')  # doctest: +SKIP
+    >>> likelihoods, name = read_scalars(likelihoods_file, True, True)  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')  # doctest: +SKIP
+    >>> skeletons_file = os.path.join(path, 'arno', 'features', 'fundi.vtk')  # doctest: +SKIP
+    >>> skeletons, name = read_scalars(skeletons_file, True, True)  # doctest: +SKIP
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> bounds, name = read_scalars(folds_file, True, True)  # doctest: +SKIP
+    >>> if single_fold:  # doctest: +SKIP
+    >>>     fold_number = 1 #11  # doctest: +SKIP
+    >>>     bounds[bounds != fold_number] = -1  # doctest: +SKIP
+    >>> wN_max = 1.0  # doctest: +SKIP
+    >>> erode_again = False  # doctest: +SKIP
+    >>> save_file = True  # doctest: +SKIP
+    >>> smooth_skeletons, n_skeletons, skeletons_file = smooth_skeleton(skeletons,  # doctest: +SKIP
+    >>>     bounds, vtk_file, likelihoods, wN_max, erode_again, save_file)  # doctest: +SKIP
     >>> #
     >>> # View:
-    >>> plot_vtk(skeletons_file)
+    >>> plot_vtk(skeletons_file)  # doctest: +SKIP
 
     """
 
@@ -633,15 +664,20 @@ def smooth_skeleton(skeletons, bounds, vtk_file, likelihoods,
     from time import time
 
     from mindboggle.utils.io_vtk import rewrite_scalars
-    from mindboggle.utils.mesh import find_neighbors_from_file
+    from mindboggle.utils.mesh import find_neighbors_from_file, \
+        find_adjacency_matrix
     from mindboggle.utils.segment import segment
     from mindboggle.utils.morph import dilate
     from mindboggle.utils.paths import find_endpoints, \
         connect_points_erosion, connect_points_hmmf
+    from mindboggle.utils.logs import get_logger, log_progress
+
+    logger = get_logger('mindboggle.utils.paths')
 
     t0 = time()
 
     neighbor_lists = find_neighbors_from_file(vtk_file)
+    adjacency = find_adjacency_matrix(neighbor_lists)
     indices = np.where(bounds != -1)[0]
     npoints = len(bounds)
 
@@ -654,12 +690,14 @@ def smooth_skeleton(skeletons, bounds, vtk_file, likelihoods,
         sdum = ''
     else:
         sdum = 's'
-    print("Smooth {0} skeleton{1}...".format(n_skeletons, sdum))
+    logger.info("Smooth {0} skeleton{1}...".format(n_skeletons, sdum))
     Z = -1 * np.ones(npoints)
     smooth_skeletons = Z.copy()
     for ID in unique_IDs:
         skeleton = [i for i,x in enumerate(skeletons) if x == ID]
-        print('  Skeleton {0}:'.format(int(ID)))
+        log_progress(logger, 'smooth_skeleton', interval=10,
+                     skeleton=int(ID), n_skeletons=n_skeletons,
+                     elapsed=round(time() - t0, 3))
 
         #---------------------------------------------------------------------
         # Segment skeleton vertices into separate connected groups:
@@ -668,7 +706,7 @@ def smooth_skeleton(skeletons, bounds, vtk_file, likelihoods,
         skel_seg_numbers = [x for x in np.unique(skel_segs) if x != -1]
         len_numbers = len(skel_seg_numbers)
         if len_numbers > 1:
-            print('    {0} segments'.format(len_numbers))
+            logger.debug('    {0} segments'.format(len_numbers))
         for skel_seg_number in skel_seg_numbers:
             skel_seg = np.where(skel_segs == skel_seg_number)[0].tolist()
 
@@ -681,8 +719,8 @@ def smooth_skeleton(skeletons, bounds, vtk_file, likelihoods,
             # Dilate the skeleton within the bounds:
             #-----------------------------------------------------------------
             nedges = 2
-            print('    Dilate skeleton within bounds...')
-            dilated = dilate(skel_seg, nedges, neighbor_lists)
+            logger.debug('    Dilate skeleton within bounds...')
+            dilated = dilate(skel_seg, nedges, adjacency)
             dilated = list(set(dilated).intersection(indices))
             if dilated:
     
@@ -691,7 +729,8 @@ def smooth_skeleton(skeletons, bounds, vtk_file, likelihoods,
                 # erode the fold again to the dilated skeleton (SLOW):
                 #-------------------------------------------------------------
                 if erode_again:
-                    print('    Erode fold again to dilated skeleton...')
+                    logger.debug('    Erode fold again to dilated '
+                                 'skeleton...')
                     S = Z.copy()
                     S[indices] = 1
                     dilated = connect_points_erosion(S, neighbor_lists,
@@ -706,7 +745,8 @@ def smooth_skeleton(skeletons, bounds, vtk_file, likelihoods,
                 #-------------------------------------------------------------
                 # Smoothly re-skeletonize the dilated skeleton:
                 #-------------------------------------------------------------
-                print('    Smoothly re-skeletonize dilated skeleton...')
+                logger.debug('    Smoothly re-skeletonize dilated '
+                             'skeleton...')
                 new_skeleton = connect_points_hmmf(endpoints, dilated, L,
                     neighbor_lists, wN_max)
     
@@ -722,8 +762,10 @@ def smooth_skeleton(skeletons, bounds, vtk_file, likelihoods,
                 #-------------------------------------------------------------
                 smooth_skeletons[new_skeleton] = ID
 
-    print('  ...Smoothed {0} skeleton{1} ({2:.2f} seconds)'.
-          format(n_skeletons, sdum, time() - t0))
+    logger.info('  ...Smoothed {0} skeleton{1} ({2:.2f} seconds)'.
+                format(n_skeletons, sdum, time() - t0))
+    log_progress(logger, 'smooth_skeleton', step='done',
+                 n_skeletons=n_skeletons, elapsed=round(time() - t0, 3))
 
     #-------------------------------------------------------------------------
     # Return skeletons, number of skeletons, and file name:
@@ -771,32 +813,32 @@ def track_values(seed, indices, neighbor_lists, values, sink=[]):
     Examples
     --------
     >>> # Track from deepest point in a fold to its boundary:
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
-    >>> from mindboggle.utils.mesh import find_neighbors_from_file
-    >>> from mindboggle.utils.paths import track_values
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> values_file = os.path.join(path, 'arno', 'shapes', 'likelihoods.vtk')
-    >>> vtk_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')
-    >>> fold_file = os.path.join(path, 'arno', 'features', 'fold11.vtk')
-    >>> values, name = read_scalars(values_file, True, True)
-    >>> neighbor_lists = find_neighbors_from_file(vtk_file)
-    >>> fold, name = read_scalars(fold_file)
-    >>> indices = [i for i,x in enumerate(fold) if x != -1]
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors_from_file  # doctest: +SKIP
+    >>> from mindboggle.utils.paths import track_values  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> values_file = os.path.join(path, 'arno', 'shapes', 'likelihoods.vtk')  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')  # doctest: +SKIP
+    >>> fold_file = os.path.join(path, 'arno', 'features', 'fold11.vtk')  # doctest: +SKIP
+    >>> values, name = read_scalars(values_file, True, True)  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors_from_file(vtk_file)  # doctest: +SKIP
+    >>> fold, name = read_scalars(fold_file)  # doctest: +SKIP
+    >>> indices = [i for i,x in enumerate(fold) if x != -1]  # doctest: +SKIP
     >>> # Start from initial track points on boundary of a thresholded indices:
-    >>> seeds = [18267, 38339, 39689]
-    >>> seed = seeds[0]
+    >>> seeds = [18267, 38339, 39689]  # doctest: +SKIP
+    >>> seed = seeds[0]  # doctest: +SKIP
     >>> #
-    >>> track = track_values(seed, indices, neighbor_lists, values, sink=[])
+    >>> track = track_values(seed, indices, neighbor_lists, values, sink=[])  # doctest: +SKIP
     >>> #
     >>> # View:
-    >>> T = -1 * np.ones(len(values))
-    >>> T[track] = 1
-    >>> T[seed] = 2
-    >>> rewrite_scalars(vtk_file, 'track.vtk', T, 'track', fold)
-    >>> plot_vtk('track.vtk')
+    >>> T = -1 * np.ones(len(values))  # doctest: +SKIP
+    >>> T[track] = 1  # doctest: +SKIP
+    >>> T[seed] = 2  # doctest: +SKIP
+    >>> rewrite_scalars(vtk_file, 'track.vtk', T, 'track', fold)  # doctest: +SKIP
+    >>> plot_vtk('track.vtk')  # doctest: +SKIP
 
     """
     import numpy as np
@@ -864,40 +906,40 @@ def track_segments(seed, segments, neighbor_lists, values, sink):
     Examples
     --------
     >>> # Track from deepest point in a fold to its boundary:
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
-    >>> from mindboggle.utils.mesh import find_neighbors_from_file
-    >>> from mindboggle.labels.labels import extract_borders
-    >>> from mindboggle.utils.segment import segment_rings
-    >>> from mindboggle.utils.paths import track_segments
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> values_file = os.path.join(path, 'arno', 'shapes', 'likelihoods.vtk')
-    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> values, name = read_scalars(values_file, True, True)
-    >>> neighbor_lists = find_neighbors_from_file(vtk_file)
-    >>> folds, name = read_scalars(folds_file, True, True)
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors_from_file  # doctest: +SKIP
+    >>> from mindboggle.labels.labels import extract_borders  # doctest: +SKIP
+    >>> from mindboggle.utils.segment import segment_rings  # doctest: +SKIP
+    >>> from mindboggle.utils.paths import track_segments  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> values_file = os.path.join(path, 'arno', 'shapes', 'likelihoods.vtk')  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')  # doctest: +SKIP
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> values, name = read_scalars(values_file, True, True)  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors_from_file(vtk_file)  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file, True, True)  # doctest: +SKIP
     >>> # Select a single fold:
-    >>> fold_number = 11
-    >>> folds[folds != fold_number] = -1
-    >>> indices = [i for i,x in enumerate(folds) if x == fold_number]
-    >>> seeds = [x for x in indices if values[x] > np.median(values[indices])]
-    >>> segments = segment_rings(indices, seeds, neighbor_lists, step=1)
-    >>> seed = segments[0][np.argmax(values[segments[0]])]
+    >>> fold_number = 11  # doctest: +SKIP
+    >>> folds[folds != fold_number] = -1  # doctest: +SKIP
+    >>> indices = [i for i,x in enumerate(folds) if x == fold_number]  # doctest: +SKIP
+    >>> seeds = [x for x in indices if values[x] > np.median(values[indices])]  # doctest: +SKIP
+    >>> segments = segment_rings(indices, seeds, neighbor_lists, step=1)  # doctest: +SKIP
+    >>> seed = segments[0][np.argmax(values[segments[0]])]  # doctest: +SKIP
     >>> # Extract boundary:
-    >>> D = np.ones(len(values))
-    >>> D[indices] = 2
-    >>> borders, foo1, foo2 = extract_borders(range(len(values)), D, neighbor_lists)
+    >>> D = np.ones(len(values))  # doctest: +SKIP
+    >>> D[indices] = 2  # doctest: +SKIP
+    >>> borders, foo1, foo2 = extract_borders(range(len(values)), D, neighbor_lists)  # doctest: +SKIP
     >>> #
-    >>> track = track_segments(seed, segments, neighbor_lists, values, borders)
+    >>> track = track_segments(seed, segments, neighbor_lists, values, borders)  # doctest: +SKIP
     >>> #
     >>> # View:
-    >>> T = -1 * np.ones(len(values))
-    >>> T[track] = 1
-    >>> rewrite_scalars(vtk_file, 'track.vtk', T, 'track', folds)
-    >>> plot_vtk('track.vtk')
+    >>> T = -1 * np.ones(len(values))  # doctest: +SKIP
+    >>> T[track] = 1  # doctest: +SKIP
+    >>> rewrite_scalars(vtk_file, 'track.vtk', T, 'track', folds)  # doctest: +SKIP
+    >>> plot_vtk('track.vtk')  # doctest: +SKIP
 
     """
     import numpy as np
@@ -992,66 +1034,66 @@ def find_outer_anchors(indices, neighbor_lists, values, values_seeding,
     Examples
     --------
     >>> # Setup:
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
-    >>> from mindboggle.utils.mesh import find_neighbors_from_file
-    >>> from mindboggle.utils.paths import find_outer_anchors
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> values_seeding_file = os.path.join(path, 'arno', 'shapes', 'travel_depth_rescaled.vtk')
-    >>> values_seeding, name = read_scalars(values_seeding_file, True, True)
-    >>> values_file = os.path.join(path, 'arno', 'shapes', 'likelihoods.vtk')
-    >>> values, name = read_scalars(values_file, True, True)
-    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')
-    >>> neighbor_lists = find_neighbors_from_file(vtk_file)
-    >>> min_separation = 10
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors_from_file  # doctest: +SKIP
+    >>> from mindboggle.utils.paths import find_outer_anchors  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> values_seeding_file = os.path.join(path, 'arno', 'shapes', 'travel_depth_rescaled.vtk')  # doctest: +SKIP
+    >>> values_seeding, name = read_scalars(values_seeding_file, True, True)  # doctest: +SKIP
+    >>> values_file = os.path.join(path, 'arno', 'shapes', 'likelihoods.vtk')  # doctest: +SKIP
+    >>> values, name = read_scalars(values_file, True, True)  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors_from_file(vtk_file)  # doctest: +SKIP
+    >>> min_separation = 10  # doctest: +SKIP
     >>> #
     >>> #---------------------------------------------------------------------
     >>> # Extract endpoints and their tracks from a single fold:
     >>> #---------------------------------------------------------------------
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds, name = read_scalars(folds_file, True, True)
-    >>> fold_number = 11
-    >>> folds[folds != fold_number] = -1
-    >>> indices = [i for i,x in enumerate(folds) if x == fold_number]
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file, True, True)  # doctest: +SKIP
+    >>> fold_number = 11  # doctest: +SKIP
+    >>> folds[folds != fold_number] = -1  # doctest: +SKIP
+    >>> indices = [i for i,x in enumerate(folds) if x == fold_number]  # doctest: +SKIP
     >>> #
-    >>> endpoints, endtracks = find_outer_anchors(indices, neighbor_lists,
+    >>> endpoints, endtracks = find_outer_anchors(indices, neighbor_lists,  # doctest: +SKIP
     ...   values, values_seeding, min_separation)
     >>> #
     >>> # View results atop values:
-    >>> all_tracks = [x for lst in endtracks for x in lst]
-    >>> values[all_tracks] = max(values) + 0.03
-    >>> values[all_tracks] = max(values) + 0.1
-    >>> rewrite_scalars(vtk_file, 'endpoints.vtk',
+    >>> all_tracks = [x for lst in endtracks for x in lst]  # doctest: +SKIP
+    >>> values[all_tracks] = max(values) + 0.03  # doctest: +SKIP
+    >>> values[all_tracks] = max(values) + 0.1  # doctest: +SKIP
+    >>> rewrite_scalars(vtk_file, 'endpoints.vtk',  # doctest: +SKIP
     ...                 values, 'endpoints_on_values_in_fold', folds)
-    >>> plot_vtk('endpoints.vtk')
+    >>> plot_vtk('endpoints.vtk')  # doctest: +SKIP
     >>> #---------------------------------------------------------------------
     >>> # Extract endpoints and their tracks on every fold in a hemisphere:
     >>> #---------------------------------------------------------------------
-    >>> min_size = 50
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'subfolds.vtk')
-    >>> folds, name = read_scalars(folds_file)
-    >>> fold_numbers = [x for x in np.unique(folds) if x != -1]
-    >>> nfolds = len(fold_numbers)
-    >>> all_endpoints = []
-    >>> all_tracks = []
-    >>> for ifold, fold_number in enumerate(fold_numbers):
-    >>>     print('Fold {0} ({1} of {2})'.format(int(fold_number), ifold+1, nfolds))
-    >>>     indices = [i for i,x in enumerate(folds) if x == fold_number]
-    >>>     if len(indices) > min_size:
-    >>>         endpoints, endtracks = find_outer_anchors(indices, neighbor_lists,
-    >>>             values, values_seeding, min_separation)
-    >>>         all_endpoints.extend(endpoints)
-    >>>         all_tracks.extend([x for lst in endtracks for x in lst])
-    >>> P = -1 * np.ones(len(values))
-    >>> P[all_tracks] = 1
-    >>> P[all_endpoints] = 2
+    >>> min_size = 50  # doctest: +SKIP
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'subfolds.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file)  # doctest: +SKIP
+    >>> fold_numbers = [x for x in np.unique(folds) if x != -1]  # doctest: +SKIP
+    >>> nfolds = len(fold_numbers)  # doctest: +SKIP
+    >>> all_endpoints = []  # doctest: +SKIP
+    >>> all_tracks = []  # doctest: +SKIP
+    >>> for ifold, fold_number in enumerate(fold_numbers):  # doctest: +SKIP
+    >>>     print('Fold {0} ({1} of {2})'.format(int(fold_number), ifold+1, nfolds))  # doctest: +SKIP
+    >>>     indices = [i for i,x in enumerate(folds) if x == fold_number]  # doctest: +SKIP
+    >>>     if len(indices) > min_size:  # doctest: +SKIP
+    >>>         endpoints, endtracks = find_outer_anchors(indices, neighbor_lists,  # doctest: +SKIP
+    >>>             values, values_seeding, min_separation)  # doctest: +SKIP
+    >>>         all_endpoints.extend(endpoints)  # doctest: +SKIP
+    >>>         all_tracks.extend([x for lst in endtracks for x in lst])  # doctest: +SKIP
+    >>> P = -1 * np.ones(len(values))  # doctest: +SKIP
+    >>> P[all_tracks] = 1  # doctest: +SKIP
+    >>> P[all_endpoints] = 2  # doctest: +SKIP
     >>> #
     >>> # Write results to VTK file and view:
-    >>> rewrite_scalars(folds_file, 'find_outer_anchors.vtk',
-    >>>                 P, 'tracks_endpoints_on_folds', folds)
-    >>> plot_vtk('find_outer_anchors.vtk')
+    >>> rewrite_scalars(folds_file, 'find_outer_anchors.vtk',  # doctest: +SKIP
+    >>>                 P, 'tracks_endpoints_on_folds', folds)  # doctest: +SKIP
+    >>> plot_vtk('find_outer_anchors.vtk')  # doctest: +SKIP
 
     """
     import numpy as np
@@ -1060,6 +1102,9 @@ def find_outer_anchors(indices, neighbor_lists, values, values_seeding,
     from mindboggle.utils.segment import segment_rings
     from mindboggle.utils.paths import track_segments
     from mindboggle.utils.mesh import find_neighborhood
+    from mindboggle.utils.logs import get_logger
+
+    logger = get_logger('mindboggle.utils.paths')
 
     #-------------------------------------------------------------------------
     # Settings:
@@ -1092,15 +1137,15 @@ def find_outer_anchors(indices, neighbor_lists, values, values_seeding,
         if list(frozenset(indices_high).intersection(borders)):
             do_threshold = False
         else:
-            print('  Initialize seeds at {0:.2f} (median of fold depth)'.
-                  format(thresholdS))
+            logger.debug('  Initialize seeds at {0:.2f} (median of fold depth)'.
+                         format(thresholdS))
     #-------------------------------------------------------------------------
     # Or initialize seeds with vertices at the shrunken region boundary:
     #-------------------------------------------------------------------------
     if not do_threshold:
         thresholdS = remove_fraction * np.max(S[indices])
-        print('  Initialize seeds at {0:.2f} of fold depth'.
-              format(1-remove_fraction))
+        logger.debug('  Initialize seeds at {0:.2f} of fold depth'.
+                     format(1-remove_fraction))
 
     # Extract threshold boundary vertices as seeds:
     indices_high = [x for x in indices if S[x] >= thresholdS]
@@ -1116,8 +1161,8 @@ def find_outer_anchors(indices, neighbor_lists, values, values_seeding,
     segments = segment_rings(R, seeds, neighbor_lists, step=1)
 
     # Run tracks from the seeds through the segments toward the boundary:
-    print('    Track through {0} concentric segments ({1} vertices) '
-          'from threshold {2:0.2f}'.format(len(segments), len(R), thresholdS))
+    logger.debug('    Track through {0} concentric segments ({1} vertices) '
+                 'from threshold {2:0.2f}'.format(len(segments), len(R), thresholdS))
     for seed in seeds:
         track = track_segments(seed, segments, neighbor_lists, V, borders)
         if track:
@@ -1132,7 +1177,7 @@ def find_outer_anchors(indices, neighbor_lists, values, values_seeding,
     #-------------------------------------------------------------------------
     if do_filter_tracks and T:
 
-        print('    Filter {0} tracks'.format(len(T)))
+        logger.debug('    Filter {0} tracks'.format(len(T)))
 
         # Compute median track values:
         Tvalues = [np.median(V[x]) for x in T]
@@ -1182,7 +1227,7 @@ def find_outer_anchors(indices, neighbor_lists, values, values_seeding,
         endpoints = E2
         endtracks = T2
 
-        print('    Retain {0} tracks'.format(len(T2)))
+        logger.debug('    Retain {0} tracks'.format(len(T2)))
 
     else:
         # Gather endpoint vertex indices:
@@ -1227,42 +1272,42 @@ def find_max_values(points, values, min_separation=10, thr=0.5):
 
     Examples
     --------
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.compute import median_abs_dev
-    >>> from mindboggle.utils.io_vtk import read_vtk, read_scalars, rewrite_scalars
-    >>> from mindboggle.utils.paths import find_max_values
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds, name = read_scalars(folds_file)
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.compute import median_abs_dev  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_vtk, read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.paths import find_max_values  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file)  # doctest: +SKIP
     >>> #
-    >>> likelihood_file = os.path.join(path, 'arno', 'shapes', 'likelihoods.vtk')
-    >>> u1, u2, u3, points, u4, values, u5, u6 = read_vtk(likelihood_file,
-    >>>     return_first=True, return_array=True)
+    >>> likelihood_file = os.path.join(path, 'arno', 'shapes', 'likelihoods.vtk')  # doctest: +SKIP
+    >>> u1, u2, u3, points, u4, values, u5, u6 = read_vtk(likelihood_file,  # doctest: +SKIP
+    >>>     return_first=True, return_array=True)  # doctest: +SKIP
     >>> # Select a single fold
-    >>> plot_single_fold = True
-    >>> if plot_single_fold:
-    >>>   fold_ID = 1
-    >>>   indices_fold = [i for i,x in enumerate(folds) if x == fold_ID]
-    >>>   indices_not_fold = [i for i,x in enumerate(folds) if x != fold_ID]
-    >>>   values[indices_not_fold] = 0
-    >>>   fold_array = -1 * np.ones(len(folds))
-    >>>   fold_array[indices_fold] = 1
-    >>>   folds = fold_array.tolist()
+    >>> plot_single_fold = True  # doctest: +SKIP
+    >>> if plot_single_fold:  # doctest: +SKIP
+    >>>   fold_ID = 1  # doctest: +SKIP
+    >>>   indices_fold = [i for i,x in enumerate(folds) if x == fold_ID]  # doctest: +SKIP
+    >>>   indices_not_fold = [i for i,x in enumerate(folds) if x != fold_ID]  # doctest: +SKIP
+    >>>   values[indices_not_fold] = 0  # doctest: +SKIP
+    >>>   fold_array = -1 * np.ones(len(folds))  # doctest: +SKIP
+    >>>   fold_array[indices_fold] = 1  # doctest: +SKIP
+    >>>   folds = fold_array.tolist()  # doctest: +SKIP
     >>> #
-    >>> min_separation = 10
-    >>> values0 = [x for x in values if x > 0]
-    >>> thr = np.median(values0) + median_abs_dev(values0)
-    >>> print(thr)
+    >>> min_separation = 10  # doctest: +SKIP
+    >>> values0 = [x for x in values if x > 0]  # doctest: +SKIP
+    >>> thr = np.median(values0) + median_abs_dev(values0)  # doctest: +SKIP
+    >>> print(thr)  # doctest: +SKIP
     >>> #
-    >>> highest = find_max_values(points, values, min_separation, thr)
+    >>> highest = find_max_values(points, values, min_separation, thr)  # doctest: +SKIP
     >>> #
     >>> # Write results to vtk file and view:
-    >>> values[highest] = np.max(values) + 0.1
-    >>> rewrite_scalars(likelihood_file, 'find_max_values.vtk',
-    >>>                 values, 'find_max_values_in_folds', folds)
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> plot_vtk('find_max_values.vtk')
+    >>> values[highest] = np.max(values) + 0.1  # doctest: +SKIP
+    >>> rewrite_scalars(likelihood_file, 'find_max_values.vtk',  # doctest: +SKIP
+    >>>                 values, 'find_max_values_in_folds', folds)  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> plot_vtk('find_max_values.vtk')  # doctest: +SKIP
 
     """
     import numpy as np
@@ -1331,36 +1376,36 @@ def find_endpoints(indices, neighbor_lists):
     Examples
     --------
     >>> # Extract endpoints from a track in a fold:
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
-    >>> from mindboggle.utils.mesh import find_neighbors_from_file
-    >>> from mindboggle.utils.paths import track_values, find_endpoints
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors_from_file  # doctest: +SKIP
+    >>> from mindboggle.utils.paths import track_values, find_endpoints  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
     >>> # Select a single fold:
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> folds, name = read_scalars(folds_file, True, True)
-    >>> fold_number = 11
-    >>> indices_fold = [i for i,x in enumerate(folds) if x == fold_number]
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file, True, True)  # doctest: +SKIP
+    >>> fold_number = 11  # doctest: +SKIP
+    >>> indices_fold = [i for i,x in enumerate(folds) if x == fold_number]  # doctest: +SKIP
     >>> # Create a track from the minimum-depth vertex:
-    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')
-    >>> values, name = read_scalars(vtk_file, True, True)
-    >>> neighbor_lists = find_neighbors_from_file(vtk_file)
-    >>> seed = indices_fold[np.argmin(values[indices_fold])]
-    >>> indices = track_values(seed, indices_fold, neighbor_lists, values, sink=[])
+    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')  # doctest: +SKIP
+    >>> values, name = read_scalars(vtk_file, True, True)  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors_from_file(vtk_file)  # doctest: +SKIP
+    >>> seed = indices_fold[np.argmin(values[indices_fold])]  # doctest: +SKIP
+    >>> indices = track_values(seed, indices_fold, neighbor_lists, values, sink=[])  # doctest: +SKIP
     >>> #
     >>> # Extract endpoints:
-    >>> indices_endpoints = find_endpoints(indices, neighbor_lists)
+    >>> indices_endpoints = find_endpoints(indices, neighbor_lists)  # doctest: +SKIP
     >>> #
     >>> # Write results to vtk file and view:
-    >>> IDs = -1 * np.ones(len(values))
-    >>> IDs[indices_fold] = 1
-    >>> IDs[indices] = 2
-    >>> IDs[indices_endpoints] = 3
-    >>> rewrite_scalars(vtk_file, 'find_endpoints.vtk',
-    >>>                 IDs, 'endpoints', IDs)
-    >>> plot_vtk('find_endpoints.vtk')
+    >>> IDs = -1 * np.ones(len(values))  # doctest: +SKIP
+    >>> IDs[indices_fold] = 1  # doctest: +SKIP
+    >>> IDs[indices] = 2  # doctest: +SKIP
+    >>> IDs[indices_endpoints] = 3  # doctest: +SKIP
+    >>> rewrite_scalars(vtk_file, 'find_endpoints.vtk',  # doctest: +SKIP
+    >>>                 IDs, 'endpoints', IDs)  # doctest: +SKIP
+    >>> plot_vtk('find_endpoints.vtk')  # doctest: +SKIP
 
     """
 
@@ -39,13 +39,13 @@ def plot_vtk(vtk_file, mask_file='', masked_output=''):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> vtk_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')
-    >>> mask_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> masked_output = ''
-    >>> plot_vtk(vtk_file, mask_file, masked_output)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')  # doctest: +SKIP
+    >>> mask_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> masked_output = ''  # doctest: +SKIP
+    >>> plot_vtk(vtk_file, mask_file, masked_output)  # doctest: +SKIP
 
     """
     import os
@@ -90,13 +90,13 @@ def plot_volumes(volume_files):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.plots import plot_volumes
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> volume_file1 = os.path.join(path, 'arno', 'mri', 't1weighted.nii.gz')
-    >>> volume_file2 = os.path.join(path, 'arno', 'mri', 't1weighted_brain.nii.gz')
-    >>> volume_files = [volume_file1, volume_file2]
-    >>> plot_volumes(volume_files)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_volumes  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> volume_file1 = os.path.join(path, 'arno', 'mri', 't1weighted.nii.gz')  # doctest: +SKIP
+    >>> volume_file2 = os.path.join(path, 'arno', 'mri', 't1weighted_brain.nii.gz')  # doctest: +SKIP
+    >>> volume_files = [volume_file1, volume_file2]  # doctest: +SKIP
+    >>> plot_volumes(volume_files)  # doctest: +SKIP
 
     """
     import os
@@ -127,11 +127,11 @@ def plot_scalar_histogram(vtk_file, nbins=100):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.plots import plot_scalar_histogram
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> vtk_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')
-    >>> plot_scalar_histogram(vtk_file, nbins=500)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_scalar_histogram  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.mean_curvature.vtk')  # doctest: +SKIP
+    >>> plot_scalar_histogram(vtk_file, nbins=500)  # doctest: +SKIP
 
     """
     import matplotlib.pyplot as plt
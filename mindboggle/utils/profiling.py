@@ -0,0 +1,413 @@
+#!/usr/bin/env python
+"""
+Functions for timing and memory profiling of workflow nodes.
+
+profile_workflow() makes every Function node of a nipype workflow record
+its wall time, CPU time, peak memory (resident set size) during the run,
+and input and output file sizes each time it runs (per subject, hemisphere, etc.), in a
+small JSON file per run in a profile directory.  This works with any nipype
+plugin (Linear, MultiProc, CondorDAGMan) as long as the profile directory
+is shared by the processes running the nodes.
+
+profile_summary() collects these records into a summary file, and
+compare_profiles() compares two summaries, such as from two runs.
+
+Copyright 2013,  Mindboggle team (http://mindboggle.info), Apache v2.0 License
+
+"""
+
+
+#-----------------------------------------------------------------------------
+# Make all Function nodes of a workflow record profiles:
+#-----------------------------------------------------------------------------
+def profile_workflow(workflow, profile_path):
+    """
+    Make all Function nodes in a nipype workflow record profiles.
+
+    Each node's function is replaced by one that calls run_profiled()
+    with the original function's source code.  (Since this changes the
+    nodes' inputs, nipype reruns the nodes instead of using cached results
+    from runs without profiling.)
+
+    Parameters
+    ----------
+    workflow : nipype Workflow
+        workflow (including nested workflows)
+    profile_path : string
+        directory to save profile records (created if missing)
+
+    Returns
+    -------
+    node_names : list of strings
+        names of profiled nodes
+
+    Examples
+    --------
+    >>> from mindboggle.mindboggler import build_workflow
+    >>> from mindboggle.utils.profiling import profile_workflow
+    >>> mbFlow = build_workflow({'subjects': ['Twins-2-1']})
+    >>> profile_workflow(mbFlow, '/tmp/mindboggle_profile')
+    >>> mbFlow.run(plugin='MultiProc')
+
+    """
+    import os
+    from nipype.interfaces.utility import Function
+
+    profile_path = os.path.abspath(profile_path)
+    if not os.path.isdir(profile_path):
+        os.makedirs(profile_path)
+
+    wrapper = '\n'.join([
+        'def profiled_function(**kwargs):',
+        '    from mindboggle.utils.profiling import run_profiled',
+        '    return run_profiled({0!r}, {1!r}, {2!r}, kwargs)'])
+
+    node_names = []
+    for node in workflow._get_all_nodes():
+        if isinstance(node.interface, Function):
+            function_str = node.interface.inputs.function_str
+            node.interface.inputs.function_str = wrapper.format(
+                function_str, node.fullname, profile_path)
+            node_names.append(node.fullname)
+
+    return node_names
+
+
+def run_profiled(function_str, node_name, profile_path, kwargs):
+    """
+    Run a function from its source code and save a profile record.
+
+    The record (a JSON file in profile_path) contains:
+        node : node name
+        function : function name
+        iterables : iterable values (such as '_hemi_lh' and
+                    '_subject_Twins-2-1') taken from the node's directory
+        host, pid : where the node ran
+        start : time stamp
+        wall_time, cpu_time : seconds, including child processes
+                              (such as Mindboggle's C++ tools)
+        start_rss : resident set size in bytes of the process when the
+                    node started (such as imported modules of a MultiProc
+                    worker process)
+        peak_rss, peak_rss_children : maximum resident set sizes in bytes
+            of the process and of its child processes during the node's
+            run (see MemorySampler), or None if they cannot be measured
+        input_bytes, output_bytes : total size of input and output files
+
+    Parameters
+    ----------
+    function_str : string
+        source code of the function
+    node_name : string
+        name of the workflow node
+    profile_path : string
+        directory to save the profile record
+    kwargs : dictionary
+        function arguments
+
+    Returns
+    -------
+    outputs : whatever the function returns
+
+    """
+    import os
+    import re
+    import sys
+    import json
+    import time
+    import socket
+    import resource
+    from mindboggle.utils.profiling import MemorySampler
+
+    def file_bytes(values):
+        if isinstance(values, (list, tuple)):
+            return sum([file_bytes(x) for x in values])
+        elif isinstance(values, (str, type(u''))) and os.path.isfile(values):
+            return os.path.getsize(values)
+        else:
+            return 0
+
+    def peak_bytes(usage):
+        if sys.platform == 'darwin':
+            return usage.ru_maxrss
+        else:
+            return usage.ru_maxrss * 1024
+
+    namespace = {}
+    exec(function_str, namespace)
+    function_name = re.search(r'def\s+(\w+)', function_str).group(1)
+    function = namespace[function_name]
+
+    #-------------------------------------------------------------------------
+    # Run the function:
+    #-------------------------------------------------------------------------
+    start = time.time()
+    self0 = resource.getrusage(resource.RUSAGE_SELF)
+    children0 = resource.getrusage(resource.RUSAGE_CHILDREN)
+    sampler = MemorySampler()
+    sampler.start()
+
+    try:
+        outputs = function(**kwargs)
+    finally:
+        sampler.stop()
+
+    wall_time = time.time() - start
+    self1 = resource.getrusage(resource.RUSAGE_SELF)
+    children1 = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    #-------------------------------------------------------------------------
+    # Peak memory during the run: ru_maxrss is a high-water mark over the
+    # life of the process (and over all of its finished child processes),
+    # so it measures this run only if it rose during the run; otherwise
+    # take the peak of the sampled resident set sizes:
+    #-------------------------------------------------------------------------
+    peak_rss = sampler.peak_rss
+    if self1.ru_maxrss > self0.ru_maxrss:
+        peak_rss = max(peak_rss or 0, peak_bytes(self1))
+    peak_rss_children = sampler.peak_rss_children
+    if children1.ru_maxrss > children0.ru_maxrss:
+        peak_rss_children = max(peak_rss_children or 0,
+                                peak_bytes(children1))
+
+    #-------------------------------------------------------------------------
+    # Save the profile record:
+    #-------------------------------------------------------------------------
+    cpu_time = (self1.ru_utime - self0.ru_utime) + \
+               (self1.ru_stime - self0.ru_stime) + \
+               (children1.ru_utime - children0.ru_utime) + \
+               (children1.ru_stime - children0.ru_stime)
+    iterables = [x for x in os.getcwd().split(os.sep) if x.startswith('_')]
+    record = {'node': node_name,
+              'function': function_name,
+              'iterables': iterables,
+              'host': socket.gethostname(),
+              'pid': os.getpid(),
+              'start': start,
+              'wall_time': wall_time,
+              'cpu_time': cpu_time,
+              'start_rss': sampler.start_rss,
+              'peak_rss': peak_rss,
+              'peak_rss_children': peak_rss_children,
+              'input_bytes': file_bytes(list(kwargs.values())),
+              'output_bytes': file_bytes(outputs)}
+
+    record_file = os.path.join(profile_path, '{0}.{1}.{2}.{3}.json'.format(
+        node_name, socket.gethostname(), os.getpid(), int(start * 1000)))
+    json.dump(record, open(record_file, 'w'))
+
+    return outputs
+
+
+class MemorySampler(object):
+    """
+    Sample the resident set sizes of the current process and of its
+    child processes (and their children) in a background thread.
+
+    The resident set sizes are read from Linux's /proc file system
+    every interval seconds (or as soon after as the thread gets Python's
+    global interpreter lock).  Where /proc is not available, start_rss,
+    peak_rss and peak_rss_children are None.
+
+    Parameters
+    ----------
+    interval : float
+        seconds between samples
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from mindboggle.utils.profiling import MemorySampler
+    >>> sampler = MemorySampler(0.01)
+    >>> sampler.start()
+    >>> array = np.ones(10 ** 7)
+    >>> sampler.stop()
+    >>> sampler.peak_rss - sampler.start_rss > 8 * 10 ** 7
+    True
+
+    """
+    def __init__(self, interval=0.05):
+        import threading
+
+        self.interval = interval
+        self.start_rss = None
+        self.peak_rss = None
+        self.peak_rss_children = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+
+    def start(self):
+        self.start_rss = self.rss([self.pid()])
+        self.peak_rss = self.start_rss
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        pid = self.pid()
+        rss = self.rss([pid])
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss, rss)
+            children = self.descendants(pid)
+            if children:
+                self.peak_rss_children = max(self.peak_rss_children or 0,
+                                             self.rss(children))
+
+    @staticmethod
+    def pid():
+        import os
+        return os.getpid()
+
+    @staticmethod
+    def rss(pids):
+        """Total resident set size in bytes of processes (or None)."""
+        import os
+        total = 0
+        for pid in pids:
+            try:
+                statm = open('/proc/{0}/statm'.format(pid)).read()
+            except IOError:
+                if pid == os.getpid():
+                    return None
+                continue  # (finished child process)
+            total += int(statm.split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        return total
+
+    @staticmethod
+    def descendants(pid):
+        """IDs of the child processes of a process, and their children."""
+        import os
+        parents = {}
+        for name in os.listdir('/proc'):
+            if name.isdigit():
+                try:
+                    stat = open('/proc/{0}/stat'.format(name)).read()
+                except IOError:
+                    continue
+                # (the parent ID follows the state, after the command name)
+                parent = int(stat[stat.rindex(')') + 2:].split()[1])
+                parents.setdefault(parent, []).append(int(name))
+        pids = []
+        new = parents.get(pid, [])
+        while new:
+            pids.extend(new)
+            new = [x for y in new for x in parents.get(y, [])]
+        return pids
+
+
+#-----------------------------------------------------------------------------
+# Summarize and compare profiles:
+#-----------------------------------------------------------------------------
+def profile_summary(profile_path, summary_file=''):
+    """
+    Summarize profile records saved by nodes of a profiled workflow.
+
+    Parameters
+    ----------
+    profile_path : string
+        directory with profile records (from profile_workflow())
+    summary_file : string
+        output JSON file (default: profile_summary.json in profile_path)
+
+    Returns
+    -------
+    summary : dictionary
+        'runs': list of all profile records, sorted by start time;
+        'nodes': for each node name, the number of runs and the total
+        and maximum wall_time and cpu_time, and the maximum peak_rss,
+        peak_rss_children, input_bytes and output_bytes over all runs
+    summary_file : string
+        output JSON file
+
+    Examples
+    --------
+    >>> from mindboggle.utils.profiling import profile_summary
+    >>> summary, summary_file = profile_summary('/tmp/mindboggle_profile')
+    >>> summary['nodes']['Mindboggle_workflow.Surface_feature_workflow.Folds']
+
+    """
+    import os
+    import json
+    from glob import glob
+
+    runs = []
+    for record_file in glob(os.path.join(profile_path, '*.json')):
+        record = json.load(open(record_file))
+        if isinstance(record, dict) and 'node' in record:
+            runs.append(record)
+    runs.sort(key=lambda x: x['start'])
+
+    nodes = {}
+    for record in runs:
+        if record['node'] not in nodes:
+            nodes[record['node']] = {'runs': 0}
+        node = nodes[record['node']]
+        node['runs'] += 1
+        for key in ['wall_time', 'cpu_time']:
+            node[key] = node.get(key, 0) + record[key]
+            node['max_' + key] = max(node.get('max_' + key, 0), record[key])
+        for key in ['peak_rss', 'peak_rss_children', 'input_bytes',
+                    'output_bytes']:
+            node['max_' + key] = max(node.get('max_' + key, 0), record[key])
+
+    summary = {'runs': runs, 'nodes': nodes}
+    if not summary_file:
+        summary_file = os.path.join(profile_path, 'profile_summary.json')
+    json.dump(summary, open(summary_file, 'w'), indent=1, sort_keys=True)
+    print('Profiled {0} runs of {1} nodes: {2}'.format(len(runs), len(nodes),
+                                                       summary_file))
+
+    return summary, summary_file
+
+
+def compare_profiles(summary_file1, summary_file2,
+                     keys=['max_wall_time', 'max_cpu_time', 'max_peak_rss']):
+    """
+    Compare per-node profile summaries, such as from two runs.
+
+    Parameters
+    ----------
+    summary_file1 : string
+        JSON summary file from profile_summary() (e.g., earlier run)
+    summary_file2 : string
+        JSON summary file from profile_summary() (e.g., later run)
+    keys : list of strings
+        per-node summary values to compare
+
+    Returns
+    -------
+    ratios : dictionary
+        for each node in both summaries, a dictionary with the ratio of
+        each value in the second summary to that in the first
+
+    Examples
+    --------
+    >>> from mindboggle.utils.profiling import compare_profiles
+    >>> ratios = compare_profiles('run1/profile_summary.json',
+    >>>                           'run2/profile_summary.json')
+
+    """
+    import json
+
+    nodes1 = json.load(open(summary_file1))['nodes']
+    nodes2 = json.load(open(summary_file2))['nodes']
+
+    ratios = {}
+    for name in sorted(set(nodes1).intersection(nodes2)):
+        ratios[name] = {}
+        for key in keys:
+            if nodes1[name].get(key):
+                ratios[name][key] = nodes2[name].get(key, 0) / \
+                                    float(nodes1[name][key])
+        print('{0}: {1}'.format(name, ', '.join(['{0} x{1:.2f}'.format(
+            key, ratios[name][key]) for key in keys if key in ratios[name]])))
+
+    return ratios
@@ -48,55 +48,58 @@ def propagate(points, faces, region, seeds, labels,
     Examples
     --------
     >>> # Propagate labels between label boundary segments in a single fold:
-    >>> import os
-    >>> import numpy as np
-    >>> import mindboggle.labels.rebound as rb
-    >>> from mindboggle.utils.mesh import find_neighbors
-    >>> from mindboggle.labels.labels import extract_borders
-    >>> from mindboggle.utils.segment import propagate
-    >>> from mindboggle.utils.io_vtk import read_scalars, read_vtk, rewrite_scalars
-    >>> from mindboggle.labels.protocol import dkt_protocol
-    >>> protocol = 'DKT25'
-    >>> sulcus_names, sulcus_label_pair_lists, unique_sulcus_label_pairs,
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> import mindboggle.labels.rebound as rb  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors  # doctest: +SKIP
+    >>> from mindboggle.labels.labels import extract_borders  # doctest: +SKIP
+    >>> from mindboggle.utils.segment import propagate  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, read_vtk, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.labels.protocol import dkt_protocol  # doctest: +SKIP
+    >>> protocol = 'DKT25'  # doctest: +SKIP
+    >>> sulcus_names, sulcus_label_pair_lists, unique_sulcus_label_pairs,  # doctest: +SKIP
     ...     label_names, label_numbers, cortex_names, cortex_numbers,
     ...     noncortex_names, noncortex_numbers = dkt_protocol(protocol)
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')
-    >>> labels_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> folds, name = read_scalars(folds_file, return_first=True, return_array=True)
-    >>> faces, lines, indices, points, npoints, labels, name, input_vtk = read_vtk(labels_file,
-    >>>     return_first=True, return_array=True)
-    >>> neighbor_lists = find_neighbors(faces, npoints)
-    >>> indices_borders, label_pairs, foo = extract_borders(range(npoints),
-    >>>     labels, neighbor_lists)
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> folds_file = os.path.join(path, 'arno', 'features', 'folds.vtk')  # doctest: +SKIP
+    >>> labels_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> folds, name = read_scalars(folds_file, return_first=True, return_array=True)  # doctest: +SKIP
+    >>> faces, lines, indices, points, npoints, labels, name, input_vtk = read_vtk(labels_file,  # doctest: +SKIP
+    >>>     return_first=True, return_array=True)  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors(faces, npoints)  # doctest: +SKIP
+    >>> indices_borders, label_pairs, foo = extract_borders(range(npoints),  # doctest: +SKIP
+    >>>     labels, neighbor_lists)  # doctest: +SKIP
     >>> # Select a single fold
-    >>> fold_ID = 2
-    >>> indices_fold = [i for i,x in enumerate(folds) if x == fold_ID]
-    >>> fold_array = -1 * np.ones(npoints)
-    >>> fold_array[indices_fold] = 1
+    >>> fold_ID = 2  # doctest: +SKIP
+    >>> indices_fold = [i for i,x in enumerate(folds) if x == fold_ID]  # doctest: +SKIP
+    >>> fold_array = -1 * np.ones(npoints)  # doctest: +SKIP
+    >>> fold_array[indices_fold] = 1  # doctest: +SKIP
     >>> # Extract the boundary for this fold
-    >>> indices_borders, label_pairs, foo = extract_borders(indices_fold,
-    >>>     labels, neighbor_lists)
+    >>> indices_borders, label_pairs, foo = extract_borders(indices_fold,  # doctest: +SKIP
+    >>>     labels, neighbor_lists)  # doctest: +SKIP
     >>> # Select boundary segments in the sulcus labeling protocol
-    >>> seeds = -1 * np.ones(npoints)
-    >>> for ilist,label_pair_list in enumerate(sulcus_label_pair_lists):
-    >>>     I = [x for i,x in enumerate(indices_borders)
-    >>>          if np.sort(label_pairs[i]).tolist() in label_pair_list]
-    >>>     seeds[I] = ilist
+    >>> seeds = -1 * np.ones(npoints)  # doctest: +SKIP
+    >>> for ilist,label_pair_list in enumerate(sulcus_label_pair_lists):  # doctest: +SKIP
+    >>>     I = [x for i,x in enumerate(indices_borders)  # doctest: +SKIP
+    >>>          if np.sort(label_pairs[i]).tolist() in label_pair_list]  # doctest: +SKIP
+    >>>     seeds[I] = ilist  # doctest: +SKIP
     >>> #
-    >>> segments = propagate(points, faces, fold_array, seeds, labels)
+    >>> segments = propagate(points, faces, fold_array, seeds, labels)  # doctest: +SKIP
     >>> #
     >>> # Write results to vtk file and view:
-    >>> rewrite_scalars(labels_file, 'propagate.vtk',
-    >>>                 segments, 'segments', segments)
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> plot_vtk('propagate.vtk')
+    >>> rewrite_scalars(labels_file, 'propagate.vtk',  # doctest: +SKIP
+    >>>                 segments, 'segments', segments)  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> plot_vtk('propagate.vtk')  # doctest: +SKIP
 
     """
     import numpy as np
     from mindboggle.utils.mesh import remove_faces
     import mindboggle.utils.kernels as kernels
     import mindboggle.labels.rebound as rb
+    from mindboggle.utils.logs import get_logger
+
+    logger = get_logger('mindboggle.utils.segment')
 
     # Make sure arguments are numpy arrays
     if not isinstance(seeds, np.ndarray):
@@ -115,11 +118,11 @@ def propagate(points, faces, region, seeds, labels,
 
             n_sets = len(np.unique([x for x in seeds if x > -1]))
             if n_sets == 1:
-                print('Segment {0} vertices from 1 set of seed vertices'.
-                      format(len(indices_region)))
+                logger.debug('Segment {0} vertices from 1 set of seed vertices'.
+                             format(len(indices_region)))
             else:
-                print('Segment {0} vertices from {1} sets of seed vertices'.
-                      format(len(indices_region), n_sets))
+                logger.debug('Segment {0} vertices from {1} sets of seed '
+                             'vertices'.format(len(indices_region), n_sets))
 
             # Remove faces whose three vertices are not among specified indices:
             refaces = remove_faces(faces, indices_region)
@@ -139,7 +142,7 @@ def propagate(points, faces, region, seeds, labels,
                                        kernel=kernels.rbf_kernel, sigma=sigma,
                                        max_iters=max_iters, tol=tol, vis=False)
             else:
-                print("  No faces")
+                logger.debug("  No faces")
 
             # Assign maximum probability seed IDs to each point of region
             max_prob_labels = B.assign_max_prob_label()
@@ -187,7 +190,8 @@ def segment(vertices_to_segment, neighbor_lists, min_region_size=1,
     max_steps : integer (or empty string for infinity)
         maximum number of segmentation steps to take for each seed list
     verbose : Boolean
-        print out text?
+        unused (messages are logged at DEBUG level, with a progress event
+        per region)
 
     Returns
     -------
@@ -197,52 +201,53 @@ def segment(vertices_to_segment, neighbor_lists, min_region_size=1,
     Examples
     --------
     >>> # Segment deep regions with or without seeds:
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.mesh import find_neighbors
-    >>> from mindboggle.utils.segment import segment
-    >>> from mindboggle.labels.labels import extract_borders
-    >>> from mindboggle.utils.io_vtk import read_vtk, rewrite_scalars
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')
-    >>> faces, lines, indices, points, npoints, depths, name, input_vtk = read_vtk(depth_file,
-    >>>     return_first=True, return_array=True)
-    >>> vertices_to_segment = np.where(depths > 0.50)[0].tolist()  # higher to speed up
-    >>> neighbor_lists = find_neighbors(faces, npoints)
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors  # doctest: +SKIP
+    >>> from mindboggle.utils.segment import segment  # doctest: +SKIP
+    >>> from mindboggle.labels.labels import extract_borders  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_vtk, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')  # doctest: +SKIP
+    >>> faces, lines, indices, points, npoints, depths, name, input_vtk = read_vtk(depth_file,  # doctest: +SKIP
+    >>>     return_first=True, return_array=True)  # doctest: +SKIP
+    >>> vertices_to_segment = np.where(depths > 0.50)[0].tolist()  # higher to speed up  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors(faces, npoints)  # doctest: +SKIP
     >>> #
     >>> # Example 1: without seed lists
-    >>> folds = segment(vertices_to_segment, neighbor_lists)
+    >>> folds = segment(vertices_to_segment, neighbor_lists)  # doctest: +SKIP
     >>> # Write results to vtk file and view:
-    >>> rewrite_scalars(depth_file, 'segment.vtk', folds, 'folds', folds)
-    >>> plot_vtk('segment.vtk')
+    >>> rewrite_scalars(depth_file, 'segment.vtk', folds, 'folds', folds)  # doctest: +SKIP
+    >>> plot_vtk('segment.vtk')  # doctest: +SKIP
     >>> #
     >>> # Example 2: with seed lists
-    >>> from mindboggle.labels.protocol import dkt_protocol
-    >>> protocol = 'DKT25'
-    >>> sulcus_names, sulcus_label_pair_lists, unique_sulcus_label_pairs,
+    >>> from mindboggle.labels.protocol import dkt_protocol  # doctest: +SKIP
+    >>> protocol = 'DKT25'  # doctest: +SKIP
+    >>> sulcus_names, sulcus_label_pair_lists, unique_sulcus_label_pairs,  # doctest: +SKIP
     ...     label_names, label_numbers, cortex_names, cortex_numbers,
     ...     noncortex_names, noncortex_numbers = dkt_protocol(protocol)
-    >>> label_lists = [np.unique(np.ravel(x)) for x in sulcus_label_pair_lists]
-    >>> labels_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')
-    >>> faces, lines, indices, points, npoints, labels, name, input_vtk = read_vtk(labels_file)
-    >>> indices_borders, label_pairs, foo = extract_borders(vertices_to_segment,
-    >>>     labels, neighbor_lists, ignore_values=[], return_label_pairs=True)
-    >>> seed_lists = []
-    >>> for label_pair_list in sulcus_label_pair_lists:
-    >>>     seed_lists.append([x for i,x in enumerate(indices_borders) if np.sort(label_pairs[i]).tolist() in label_pair_list])
+    >>> label_lists = [np.unique(np.ravel(x)) for x in sulcus_label_pair_lists]  # doctest: +SKIP
+    >>> labels_file = os.path.join(path, 'arno', 'labels', 'lh.labels.DKT25.manual.vtk')  # doctest: +SKIP
+    >>> faces, lines, indices, points, npoints, labels, name, input_vtk = read_vtk(labels_file)  # doctest: +SKIP
+    >>> indices_borders, label_pairs, foo = extract_borders(vertices_to_segment,  # doctest: +SKIP
+    >>>     labels, neighbor_lists, ignore_values=[], return_label_pairs=True)  # doctest: +SKIP
+    >>> seed_lists = []  # doctest: +SKIP
+    >>> for label_pair_list in sulcus_label_pair_lists:  # doctest: +SKIP
+    >>>     seed_lists.append([x for i,x in enumerate(indices_borders) if np.sort(label_pairs[i]).tolist() in label_pair_list])  # doctest: +SKIP
     >>> #
-    >>> sulci = segment(vertices_to_segment, neighbor_lists, 1,
-    >>>                 seed_lists, True, True, labels, label_lists, values=[])
+    >>> sulci = segment(vertices_to_segment, neighbor_lists, 1,  # doctest: +SKIP
+    >>>                 seed_lists, True, True, labels, label_lists, values=[])  # doctest: +SKIP
     >>> #
     >>> # Write results to vtk file and view:
-    >>> rewrite_scalars(depth_file, 'segment_seeds.vtk', sulci, 'sulci', sulci)
-    >>> plot_vtk('segment_seeds.vtk')
+    >>> rewrite_scalars(depth_file, 'segment_seeds.vtk', sulci, 'sulci', sulci)  # doctest: +SKIP
+    >>> plot_vtk('segment_seeds.vtk')  # doctest: +SKIP
 
     """
     import numpy as np
+    from mindboggle.utils.logs import get_logger, log_progress
 
-    verbose = False
+    logger = get_logger('mindboggle.utils.segment')
 
     # Make sure arguments are lists:
     if isinstance(vertices_to_segment, np.ndarray):
@@ -258,19 +263,18 @@ def segment(vertices_to_segment, neighbor_lists, min_region_size=1,
     #-------------------------------------------------------------------------
     if seed_lists:
         select_single_seed = False
-        if verbose:
-            if len(seed_lists) == 1:
-                print('    Segment {0} vertices from seed vertices'.
-                      format(len(vertices_to_segment)))
-            else:
-                print('    Segment {0} vertices from {1} sets of seed vertices'.
-                      format(len(vertices_to_segment), len(seed_lists)))
+        if len(seed_lists) == 1:
+            logger.debug('    Segment {0} vertices from seed vertices'.
+                         format(len(vertices_to_segment)))
+        else:
+            logger.debug('    Segment {0} vertices from {1} sets of seed '
+                         'vertices'.format(len(vertices_to_segment),
+                                           len(seed_lists)))
     else:
         select_single_seed = True
         seed_lists = [[vertices_to_segment[0]]]
-        if verbose:
-            print('    Segment {0} vertices from first vertex as initial seed'.
-                  format(len(vertices_to_segment)))
+        logger.debug('    Segment {0} vertices from first vertex as initial '
+                     'seed'.format(len(vertices_to_segment)))
 
     #-------------------------------------------------------------------------
     # Initialize variables, including the list of vertex indices for each region,
@@ -371,15 +375,11 @@ def segment(vertices_to_segment, neighbor_lists, min_region_size=1,
                             new_segment_index = ilist
                         segments[region_lists[ilist]] = new_segment_index
 
-                        # Display current number and size of region:
-                        if verbose and size_region > 1:
-                            if len(seed_lists) == 1 and vertices_to_segment:
-                                print("      {0} vertices remain".
-                                      format(len(vertices_to_segment)))
-                            else:
-                                print("      Region {0}: {1} vertices ({2} remain)".
-                                      format(int(new_segment_index), size_region,
-                                             len(vertices_to_segment)))
+                        # Log current number and size of region:
+                        log_progress(logger, 'segment', interval=10,
+                                     region=int(new_segment_index),
+                                     n_vertices=size_region,
+                                     n_remaining=len(vertices_to_segment))
 
                     # If selecting a single seed, continue growing
                     # if there are more vertices to segment:
@@ -393,9 +393,8 @@ def segment(vertices_to_segment, neighbor_lists, min_region_size=1,
     # Keep growing from new seeds even after all seed lists have fully grown:
     #-------------------------------------------------------------------------
     if keep_seeding and len(vertices_to_segment) >= min_region_size:
-        if verbose:
-            print('    Keep seeding to segment {0} remaining vertices'.
-                  format(len(vertices_to_segment)))
+        logger.debug('    Keep seeding to segment {0} remaining vertices'.
+                     format(len(vertices_to_segment)))
 
         # Select first unsegmented vertex as new seed:
         seed_list = [vertices_to_segment[0]]
@@ -436,10 +435,11 @@ def segment(vertices_to_segment, neighbor_lists, min_region_size=1,
                     segments[region] = new_segment_index
                     new_segment_index += 1
 
-                    # Display current number and size of region:
-                    if verbose and size_region > 1:
-                        print("      {0} vertices remain".
-                              format(len(vertices_to_segment)))
+                    # Log current number and size of region:
+                    log_progress(logger, 'segment', interval=10,
+                                 region=new_segment_index - 1,
+                                 n_vertices=size_region,
+                                 n_remaining=len(vertices_to_segment))
 
                 # Select first unsegmented vertex as new seed:
                 if len(vertices_to_segment) >= min_region_size:
@@ -480,30 +480,33 @@ def segment_by_filling_borders(regions, neighbor_lists):
     Examples
     --------
     >>> # Segment folds by extracting their borders and filling them in separately:
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.mesh import find_neighbors
-    >>> from mindboggle.utils.segment import segment_by_filling_borders
-    >>> from mindboggle.utils.io_vtk import read_vtk, rewrite_scalars
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')
-    >>> faces, lines, indices, points, npoints, depths, name, input_vtk = read_vtk(depth_file,
-    >>>     return_first=True, return_array=True)
-    >>> regions = -1 * np.ones(npoints)
-    >>> regions[depths > 0.50] = 1
-    >>> neighbor_lists = find_neighbors(faces, npoints)
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors  # doctest: +SKIP
+    >>> from mindboggle.utils.segment import segment_by_filling_borders  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_vtk, rewrite_scalars  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')  # doctest: +SKIP
+    >>> faces, lines, indices, points, npoints, depths, name, input_vtk = read_vtk(depth_file,  # doctest: +SKIP
+    >>>     return_first=True, return_array=True)  # doctest: +SKIP
+    >>> regions = -1 * np.ones(npoints)  # doctest: +SKIP
+    >>> regions[depths > 0.50] = 1  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors(faces, npoints)  # doctest: +SKIP
     >>> #
-    >>> folds = segment_by_filling_borders(regions, neighbor_lists)
+    >>> folds = segment_by_filling_borders(regions, neighbor_lists)  # doctest: +SKIP
     >>> #
     >>> # Write results to vtk file and view:
-    >>> rewrite_scalars(depth_file, 'segment_by_filling_borders.vtk', folds, 'folds', folds)
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> plot_vtk('segment_by_filling_borders.vtk')
+    >>> rewrite_scalars(depth_file, 'segment_by_filling_borders.vtk', folds, 'folds', folds)  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> plot_vtk('segment_by_filling_borders.vtk')  # doctest: +SKIP
 
     """
     import numpy as np
     from mindboggle.labels.labels import extract_borders
     from mindboggle.utils.segment import segment
+    from mindboggle.utils.logs import get_logger, log_progress
+
+    logger = get_logger('mindboggle.utils.segment')
 
     include_boundary = False
 
@@ -511,10 +514,10 @@ def segment_by_filling_borders(regions, neighbor_lists):
     if not isinstance(regions, np.ndarray):
         regions = np.array(regions)
 
-    print('Segment vertices using region borders')
+    logger.info('Segment vertices using region borders')
 
     # Extract region borders (assumed to be closed contours)
-    print('  Extract region borders (assumed to be closed contours)')
+    logger.debug('  Extract region borders (assumed to be closed contours)')
     indices_borders, foo1, foo2 = extract_borders(range(len(regions)),
                                         regions, neighbor_lists)
     # Extract background
@@ -522,7 +525,7 @@ def segment_by_filling_borders(regions, neighbor_lists):
     difference(indices_borders))
 
     # Segment borders into separate, contiguous borders
-    print('  Segment borders into separate, contiguous borders')
+    logger.debug('  Segment borders into separate, contiguous borders')
     borders = segment(indices_borders, neighbor_lists, 1)
 
     # For each boundary
@@ -530,8 +533,9 @@ def segment_by_filling_borders(regions, neighbor_lists):
     segments = -1 * np.ones(len(regions))
     for boundary_number in unique_borders:
 
-        print('  Boundary {0} of {1}:'.format(int(boundary_number),
-                                              len(unique_borders)))
+        log_progress(logger, 'segment_by_filling_borders', interval=10,
+                     boundary=int(boundary_number),
+                     n_borders=len(unique_borders))
         border_indices = [i for i,x in enumerate(borders)
                           if x == boundary_number]
         # Find the neighbors to either side of the boundary
@@ -543,11 +547,12 @@ def segment_by_filling_borders(regions, neighbor_lists):
         difference(indices_borders))
 
         # Segment the neighbors into exterior and interior sets of neighbors
-        print('    Segment the neighbors into exterior and interior sets of neighbors')
+        logger.debug('    Segment the neighbors into exterior and interior '
+                     'sets of neighbors')
         neighbors = segment(indices_neighbors, neighbor_lists, 1)
 
         # Find the interior (smaller) sets of neighbors
-        print('    Find the interior (smaller) sets of neighbors')
+        logger.debug('    Find the interior (smaller) sets of neighbors')
         seed_lists = []
         unique_neighbors = [x for x in np.unique(neighbors) if x > -1]
         max_neighbor = 0
@@ -564,7 +569,7 @@ def segment_by_filling_borders(regions, neighbor_lists):
         [seed_list.extend(x) for x in seed_lists if len(x) > 2]
 
         # Fill the contours formed by the interior neighbors
-        print('    Fill the contour formed by the interior neighbors')
+        logger.debug('    Fill the contour formed by the interior neighbors')
         vertices_to_segment = list(frozenset(indices_background).
         difference(indices_borders))
         segment_region = segment(vertices_to_segment, neighbor_lists, 1, [seed_list])
@@ -598,54 +603,54 @@ def segment_rings(region, seeds, neighbor_lists, step=1):
 
     Examples
     --------
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars
-    >>> from mindboggle.utils.mesh import find_neighbors_from_file
-    >>> from mindboggle.labels.labels import extract_borders
-    >>> from mindboggle.utils.segment import segment_rings
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> values_file = os.path.join(path, 'arno', 'shapes', 'depth_rescaled.vtk')
-    >>> values, name = read_scalars(values_file, True, True)
-    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')
-    >>> neighbor_lists = find_neighbors_from_file(vtk_file)
-    >>> fold_file = os.path.join(path, 'arno', 'features', 'fold11.vtk')
-    >>> fold, name = read_scalars(fold_file)
-    >>> indices = [i for i,x in enumerate(fold) if x != -1]
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors_from_file  # doctest: +SKIP
+    >>> from mindboggle.labels.labels import extract_borders  # doctest: +SKIP
+    >>> from mindboggle.utils.segment import segment_rings  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> values_file = os.path.join(path, 'arno', 'shapes', 'depth_rescaled.vtk')  # doctest: +SKIP
+    >>> values, name = read_scalars(values_file, True, True)  # doctest: +SKIP
+    >>> vtk_file = os.path.join(path, 'arno', 'freesurfer', 'lh.pial.vtk')  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors_from_file(vtk_file)  # doctest: +SKIP
+    >>> fold_file = os.path.join(path, 'arno', 'features', 'fold11.vtk')  # doctest: +SKIP
+    >>> fold, name = read_scalars(fold_file)  # doctest: +SKIP
+    >>> indices = [i for i,x in enumerate(fold) if x != -1]  # doctest: +SKIP
     >>> # Initialize seeds with the boundary of thresholded indices:
-    >>> use_threshold = True
-    >>> if use_threshold:
+    >>> use_threshold = True  # doctest: +SKIP
+    >>> if use_threshold:  # doctest: +SKIP
     >>>     # Threshold at the median depth or within maximum values in boundary:
-    >>>     threshold = np.median(values[indices]) #+ np.std(values[indices])
-    >>>     indices_high = [x for x in indices if values[x] >= threshold]
+    >>>     threshold = np.median(values[indices]) #+ np.std(values[indices])  # doctest: +SKIP
+    >>>     indices_high = [x for x in indices if values[x] >= threshold]  # doctest: +SKIP
     >>>     # Make sure threshold is within the maximum values of the boundary:
-    >>>     B = np.ones(len(values))
-    >>>     B[indices] = 2
-    >>>     borders, foo1, foo2 = extract_borders(range(len(B)), B, neighbor_lists)
-    >>>     borders = [x for x in borders if values[x] != -1]
-    >>>     if list(frozenset(indices_high).intersection(borders)):
-    >>>         threshold = np.max(values[borders]) + np.std(values[borders])
-    >>>         indices_high = [x for x in indices if values[x] >= threshold]
+    >>>     B = np.ones(len(values))  # doctest: +SKIP
+    >>>     B[indices] = 2  # doctest: +SKIP
+    >>>     borders, foo1, foo2 = extract_borders(range(len(B)), B, neighbor_lists)  # doctest: +SKIP
+    >>>     borders = [x for x in borders if values[x] != -1]  # doctest: +SKIP
+    >>>     if list(frozenset(indices_high).intersection(borders)):  # doctest: +SKIP
+    >>>         threshold = np.max(values[borders]) + np.std(values[borders])  # doctest: +SKIP
+    >>>         indices_high = [x for x in indices if values[x] >= threshold]  # doctest: +SKIP
     >>>     # Extract threshold boundary vertices as seeds:
-    >>>     B = -1 * np.ones(len(values))
-    >>>     B[indices_high] = 2
-    >>>     seeds, foo1, foo2 = extract_borders(range(len(values)), B, neighbor_lists)
+    >>>     B = -1 * np.ones(len(values))  # doctest: +SKIP
+    >>>     B[indices_high] = 2  # doctest: +SKIP
+    >>>     seeds, foo1, foo2 = extract_borders(range(len(values)), B, neighbor_lists)  # doctest: +SKIP
     >>> # Or initialize P with the maximum value point:
-    >>> else:
-    >>>     seeds = [indices[np.argmax(values[indices])]]
-    >>>     indices_high = []
+    >>> else:  # doctest: +SKIP
+    >>>     seeds = [indices[np.argmax(values[indices])]]  # doctest: +SKIP
+    >>>     indices_high = []  # doctest: +SKIP
     >>> #
-    >>> indices = list(frozenset(indices).difference(indices_high))
-    >>> indices = list(frozenset(indices).difference(seeds))
-    >>> segments = segment_rings(indices, seeds, neighbor_lists, step=1)
+    >>> indices = list(frozenset(indices).difference(indices_high))  # doctest: +SKIP
+    >>> indices = list(frozenset(indices).difference(seeds))  # doctest: +SKIP
+    >>> segments = segment_rings(indices, seeds, neighbor_lists, step=1)  # doctest: +SKIP
     >>> #
     >>> # View:
-    >>> S = -1 * np.ones(len(values))
-    >>> for i, segment in enumerate(segments):
-    >>>     S[segment] = i
-    >>> rewrite_scalars(vtk_file, 'segment_rings.vtk', S, 'segment_rings', fold)
-    >>> plot_vtk('segment_rings.vtk')
+    >>> S = -1 * np.ones(len(values))  # doctest: +SKIP
+    >>> for i, segment in enumerate(segments):  # doctest: +SKIP
+    >>>     S[segment] = i  # doctest: +SKIP
+    >>> rewrite_scalars(vtk_file, 'segment_rings.vtk', S, 'segment_rings', fold)  # doctest: +SKIP
+    >>> plot_vtk('segment_rings.vtk')  # doctest: +SKIP
     >>> # Store:
     >>> #import pickle
     >>> #output_file = os.path.join(path, 'tests', 'segments_fold11.pkl')
@@ -735,39 +740,39 @@ def watershed(depths, points, indices, neighbor_lists, min_size=1,
     Examples
     --------
     >>> # Perform watershed segmentation on the deeper portions of a surface:
-    >>> import os
-    >>> import numpy as np
-    >>> from mindboggle.utils.mesh import find_neighbors
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> from mindboggle.utils.segment import watershed, segment
-    >>> from mindboggle.utils.io_vtk import read_vtk, read_scalars, rewrite_scalars
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')
-    >>> faces, lines, indices, points, npoints, depths, name, input_vtk = read_vtk(depth_file,
-    >>>     return_first=True, return_array=True)
-    >>> indices = np.where(depths > 0.01)[0]  # high to speed up
-    >>> neighbor_lists = find_neighbors(faces, npoints)
-    >>> min_size = 50
-    >>> depth_factor = 0.25
-    >>> depth_ratio = 0.1
-    >>> tolerance = 0.01
-    >>> regrow = True
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> from mindboggle.utils.segment import watershed, segment  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_vtk, read_scalars, rewrite_scalars  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> depth_file = os.path.join(path, 'arno', 'shapes', 'lh.pial.travel_depth.vtk')  # doctest: +SKIP
+    >>> faces, lines, indices, points, npoints, depths, name, input_vtk = read_vtk(depth_file,  # doctest: +SKIP
+    >>>     return_first=True, return_array=True)  # doctest: +SKIP
+    >>> indices = np.where(depths > 0.01)[0]  # high to speed up  # doctest: +SKIP
+    >>> neighbor_lists = find_neighbors(faces, npoints)  # doctest: +SKIP
+    >>> min_size = 50  # doctest: +SKIP
+    >>> depth_factor = 0.25  # doctest: +SKIP
+    >>> depth_ratio = 0.1  # doctest: +SKIP
+    >>> tolerance = 0.01  # doctest: +SKIP
+    >>> regrow = True  # doctest: +SKIP
     >>> #
-    >>> segments, seed_indices = watershed(depths, points,
-    >>>     indices, neighbor_lists, min_size, depth_factor, depth_ratio,
-    >>>     tolerance, regrow)
+    >>> segments, seed_indices = watershed(depths, points,  # doctest: +SKIP
+    >>>     indices, neighbor_lists, min_size, depth_factor, depth_ratio,  # doctest: +SKIP
+    >>>     tolerance, regrow)  # doctest: +SKIP
     >>> #
     >>> # Write results to vtk file and view:
-    >>> rewrite_scalars(depth_file, 'watershed.vtk',
-    >>>                 segments, 'segments', segments)
-    >>> plot_vtk('watershed.vtk')
+    >>> rewrite_scalars(depth_file, 'watershed.vtk',  # doctest: +SKIP
+    >>>                 segments, 'segments', segments)  # doctest: +SKIP
+    >>> plot_vtk('watershed.vtk')  # doctest: +SKIP
     >>> # View watershed seeds:
-    >>> seeds = -1 * np.ones(len(depths))
-    >>> for i, s in enumerate(seed_indices):
-    >>>     seeds[s] = i
-    >>> rewrite_scalars(depth_file, 'watershed_seeds.vtk',
-    >>>                 seeds, 'seeds', seeds)
-    >>> plot_vtk('watershed_seeds.vtk')
+    >>> seeds = -1 * np.ones(len(depths))  # doctest: +SKIP
+    >>> for i, s in enumerate(seed_indices):  # doctest: +SKIP
+    >>>     seeds[s] = i  # doctest: +SKIP
+    >>> rewrite_scalars(depth_file, 'watershed_seeds.vtk',  # doctest: +SKIP
+    >>>                 seeds, 'seeds', seeds)  # doctest: +SKIP
+    >>> plot_vtk('watershed_seeds.vtk')  # doctest: +SKIP
 
     """
     import numpy as np
@@ -775,14 +780,16 @@ def watershed(depths, points, indices, neighbor_lists, min_size=1,
     from mindboggle.labels.labels import extract_borders
     from mindboggle.utils.segment import segment
     from mindboggle.utils.compute import point_distance
+    from mindboggle.utils.logs import get_logger, log_progress
+
+    logger = get_logger('mindboggle.utils.segment')
 
     # Make sure argument is a list
     if isinstance(indices, np.ndarray):
         indices.tolist()
 
-    print('Segment {0} vertices by a surface watershed algorithm'.
-          format(len(indices)))
-    verbose = False
+    logger.info('Segment {0} vertices by a surface watershed algorithm'.
+                format(len(indices)))
     merge = True
     t0 = time()
     tiny = 0.000001
@@ -878,19 +885,23 @@ def watershed(depths, points, indices, neighbor_lists, min_size=1,
             if not len(indices):
                 terminate = True
 
-            # Display current number and size of region:
-            if verbose:
-                print("    {0} vertices remain".format(len(indices)))
+            # Log current number of regions and vertices remaining:
+            log_progress(logger, 'watershed', interval=10, step='segment',
+                         n_regions=counter, n_remaining=len(indices),
+                         elapsed=round(time() - t0, 3))
 
-    print('  ...Segmented {0} initial watershed regions ({1:.2f} seconds)'.
-          format(counter, time() - t0))
+    logger.info('  ...Segmented {0} initial watershed regions ({1:.2f} seconds)'.
+                format(counter, time() - t0))
+    log_progress(logger, 'watershed', step='segmented', n_regions=counter,
+                 n_vertices=len(original_indices),
+                 elapsed=round(time() - t0, 3))
 
     #-------------------------------------------------------------------------
     # Regrow from (deep) watershed seeds, stopping at borders:
     #-------------------------------------------------------------------------
     if regrow:
 
-        print('  Regrow segments from watershed seeds, stopping at borders')
+        logger.info('  Regrow segments from watershed seeds, stopping at borders')
         indices = original_indices[:]
         segments = -1 * np.ones(len(depths))
         all_regions = []
@@ -940,9 +951,12 @@ def watershed(depths, points, indices, neighbor_lists, min_size=1,
                     if len(region) >= min_size:
                         segments[region] = iseed
 
-                    # Display current number and size of region:
-                    if verbose:
-                        print("    {0} vertices remain".format(len(indices)))
+                    # Log current seed and number of vertices remaining:
+                    log_progress(logger, 'watershed', interval=10,
+                                 step='regrow', seed=iseed,
+                                 n_seeds=len(seed_indices),
+                                 n_remaining=len(indices),
+                                 elapsed=round(time() - t0, 3))
 
         #---------------------------------------------------------------------
         # Continue growth until there are no more vertices to segment:
@@ -955,8 +969,11 @@ def watershed(depths, points, indices, neighbor_lists, min_size=1,
             seed_lists=seed_lists, keep_seeding=False, spread_within_labels=False,
             labels=[], label_lists=[], values=[], max_steps='', verbose=False)
 
-        print('  ...Regrew {0} watershed regions from seeds ({1:.2f} seconds)'.
-              format(iseed+1, time() - t0))
+        logger.info('  ...Regrew {0} watershed regions from seeds ({1:.2f} seconds)'.
+                    format(iseed+1, time() - t0))
+        log_progress(logger, 'watershed', step='regrown',
+                     n_regions=len(seed_indices),
+                     elapsed=round(time() - t0, 3))
 
     #-------------------------------------------------------------------------
     # Merge watershed catchment basins:
@@ -964,9 +981,8 @@ def watershed(depths, points, indices, neighbor_lists, min_size=1,
     if merge:
 
         # Extract segments pairs at borders between watershed basins:
-        print('  Merge watershed catchment basins with deeper neighboring basins')
-        if verbose:
-            print('    Extract basin borders')
+        logger.info('  Merge watershed catchment basins with deeper neighboring basins')
+        logger.debug('    Extract basin borders')
         foo1, foo2, pairs = extract_borders(original_indices, segments,
                                             neighbor_lists, ignore_values=[-1],
                                             return_label_pairs=True)
@@ -975,8 +991,7 @@ def watershed(depths, points, indices, neighbor_lists, min_size=1,
         Isort.reverse()
 
         # Find neighboring basins to each of the sorted basins:
-        if verbose:
-            print("    Find neighboring basins")
+        logger.debug("    Find neighboring basins")
         basin_pairs = []
         for index in Isort:
             index_neighbors = [int(list(frozenset(x).difference([index]))[0])
@@ -1000,8 +1015,7 @@ def watershed(depths, points, indices, neighbor_lists, min_size=1,
 
         # Merge shallow watershed catchment basins:
         if basin_pairs:
-            if verbose:
-                print('    Merge basins with deeper neighboring basins')
+            logger.debug('    Merge basins with deeper neighboring basins')
             for basin_pair in basin_pairs:
                 segments[np.where(segments == basin_pair[0])] = basin_pair[1]
 
@@ -1013,8 +1027,12 @@ def watershed(depths, points, indices, neighbor_lists, min_size=1,
             renumber_segments[segment] = i_segment
         segments = renumber_segments
 
-        # Print statement:
-        print('  ...Merged segments to form {0} watershed regions ({1:.2f} seconds)'.
-              format(i_segment + 1, time() - t0))
+        # Log statement:
+        logger.info('  ...Merged segments to form {0} watershed regions ({1:.2f} seconds)'.
+                    format(i_segment + 1, time() - t0))
+        log_progress(logger, 'watershed', step='merged',
+                     n_basin_pairs=len(basin_pairs),
+                     n_regions=len(segment_numbers),
+                     elapsed=round(time() - t0, 3))
 
     return segments.tolist(), seed_indices
@@ -32,3 +32,349 @@ def os_system(cmd):
         system(cmd)
     except OSError, e:
         print >>stderr, "Execution failed:", e
+
+#-----------------------------------------------------------------------------
+# Run independent tasks on a local pool of processes:
+#-----------------------------------------------------------------------------
+def run_tasks(function, tasks, n_processes=1, sizes=[]):
+    """
+    Apply a function to each of a list of independent tasks,
+    optionally distributed over a local pool of processes.
+
+    Tasks are started in order of decreasing size (if sizes are given)
+    to balance the load across processes, and results are returned
+    in the order of the tasks, so that the output does not depend
+    on the number of processes.
+
+    Within a daemonic process (such as a worker of Nipype's MultiProc
+    plugin, or of a cohort run with more than one process), which cannot
+    start a process pool, the tasks are run in new Python processes
+    instead (see run_task_subprocesses()).
+
+    Parameters
+    ----------
+    function : function
+        module-level function that takes a single (task) argument
+    tasks : list
+        argument to function for each task
+    n_processes : integer
+        number of processes (1 to run the tasks serially in this process)
+    sizes : list of integers (optional)
+        size of each task, to start the largest tasks first
+
+    Returns
+    -------
+    results : list
+        output of function for each task, in the order of tasks
+
+    Examples
+    --------
+    >>> from mindboggle.utils.utils import run_tasks
+    >>> run_tasks(abs, [-3, 1, -2], n_processes=2, sizes=[1, 3, 2])
+    [3, 1, 2]
+
+    """
+    import multiprocessing
+    from mindboggle.utils.utils import run_task_subprocesses
+
+    ntasks = len(tasks)
+    if n_processes > 1 and ntasks > 1:
+
+        # Start the largest tasks first:
+        order = range(ntasks)
+        if len(sizes) == ntasks:
+            order = sorted(order, key=lambda i: -sizes[i])
+        ordered_tasks = [tasks[i] for i in order]
+
+        if multiprocessing.current_process().daemon:
+            ordered_results = run_task_subprocesses(function, ordered_tasks,
+                                                    n_processes)
+        else:
+            pool = multiprocessing.Pool(min(n_processes, ntasks))
+            try:
+                ordered_results = pool.map(function, ordered_tasks,
+                                           chunksize=1)
+            except:
+                pool.terminate()
+                raise
+            else:
+                pool.close()
+            finally:
+                pool.join()
+
+        # Return results in the order of the tasks:
+        results = [None] * ntasks
+        for i, result in zip(order, ordered_results):
+            results[i] = result
+    else:
+        results = [function(task) for task in tasks]
+
+    return results
+
+
+def run_task_subprocesses(function, tasks, n_processes=1):
+    """
+    Apply a function to each of a list of tasks in new Python processes.
+
+    Unlike a multiprocessing pool, this works from within a daemonic
+    process.  Each worker process (serve_tasks()) reads pickled tasks from
+    its standard input and writes pickled results to its standard output,
+    and is given the next task when it returns a result.  Workers log at
+    the level of the 'mindboggle' logger, to standard error and to the
+    logger's log file (if any).
+
+    Parameters
+    ----------
+    function : function
+        module-level function that takes a single (task) argument
+    tasks : list
+        argument to function for each task
+    n_processes : integer
+        number of worker processes
+
+    Returns
+    -------
+    results : list
+        output of function for each task, in the order of tasks
+
+    Examples
+    --------
+    >>> from mindboggle.utils.utils import run_task_subprocesses
+    >>> run_task_subprocesses(abs, [-3, 1, -2], n_processes=2)
+    [3, 1, 2]
+
+    """
+    import os
+    import sys
+    import logging
+    import threading
+    import subprocess
+    import cPickle as pickle
+    import mindboggle
+
+    logger = logging.getLogger('mindboggle')
+    level = logging.getLevelName(logger.getEffectiveLevel())
+    log_files = [x.baseFilename for x in logger.handlers
+                 if isinstance(x, logging.FileHandler)]
+
+    # Workers import this copy of mindboggle:
+    env = dict(os.environ)
+    package_path = os.path.dirname(os.path.dirname(
+        os.path.abspath(mindboggle.__file__)))
+    env['PYTHONPATH'] = os.pathsep.join([package_path] +
+        [x for x in [env.get('PYTHONPATH')] if x])
+    command = [sys.executable, '-c', 'import sys; '
+               'from mindboggle.utils.utils import serve_tasks; '
+               'serve_tasks(*sys.argv[1:])', level] + log_files[0:1]
+
+    ntasks = len(tasks)
+    results = [None] * ntasks
+    errors = []
+    indices = iter(range(ntasks))
+    lock = threading.Lock()
+
+    #-------------------------------------------------------------------------
+    # Give each worker the next task until none are left (or one fails):
+    #-------------------------------------------------------------------------
+    def feed(worker):
+        while not errors:
+            with lock:
+                index = next(indices, None)
+            if index is None:
+                break
+            try:
+                pickle.dump((function, tasks[index]), worker.stdin, 2)
+                worker.stdin.flush()
+                failed, result = pickle.load(worker.stdout)
+            except (IOError, EOFError):
+                failed, result = True, 'Worker process {0} exited'.\
+                    format(worker.pid)
+            if failed:
+                errors.append(result)
+            else:
+                results[index] = result
+        worker.stdin.close()
+
+    workers = [subprocess.Popen(command, stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, env=env)
+               for i in range(min(n_processes, ntasks))]
+    threads = [threading.Thread(target=feed, args=(x,)) for x in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for worker in workers:
+        worker.wait()
+
+    if errors:
+        raise RuntimeError('A task failed in a worker process:\n' +
+                           errors[0])
+
+    return results
+
+
+def serve_tasks(level='INFO', log_file=''):
+    """
+    Run tasks for run_task_subprocesses() in a worker process.
+
+    Reads pickled (function, task) pairs from standard input until it is
+    closed, and writes a pickled (failed, result) pair to standard output
+    for each, where result is the traceback if the function failed.
+    Anything else written to standard output is sent to standard error.
+
+    Parameters
+    ----------
+    level : string
+        lowest level of messages to log
+    log_file : string
+        name of a log file to append messages to ('' for none)
+
+    """
+    import os
+    import sys
+    import traceback
+    import cPickle as pickle
+    from mindboggle.utils.logs import setup_logging
+
+    output = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    setup_logging(level, log_file)
+
+    while True:
+        try:
+            function, task = pickle.load(sys.stdin)
+        except EOFError:
+            break
+        try:
+            result = (False, function(task))
+        except Exception:
+            result = (True, traceback.format_exc())
+        pickle.dump(result, output, 2)
+        output.flush()
+
+
+def run_task_batches(function, tasks, n_processes=1, max_size=0):
+    """
+    Apply a function to tasks made one at a time, in batches of
+    limited total size, to bound the memory taken by tasks.
+
+    Each batch is run with run_tasks() before the next batch's tasks
+    are made, so only one batch of tasks is held in memory at a time.
+
+    Parameters
+    ----------
+    function : function
+        module-level function that takes a single (task) argument
+    tasks : iterable (such as a generator)
+        (task, size) for each task
+    n_processes : integer
+        number of processes (1 to run the tasks serially in this process)
+    max_size : integer
+        maximum total size of a batch of tasks (0 for a single batch);
+        a task larger than max_size forms a batch by itself
+
+    Returns
+    -------
+    results : list
+        output of function for each task, in the order of tasks
+
+    Examples
+    --------
+    >>> from mindboggle.utils.utils import run_task_batches
+    >>> tasks = ((x, abs(x)) for x in [-3, 1, -2, 4])
+    >>> run_task_batches(abs, tasks, n_processes=2, max_size=4)
+    [3, 1, 2, 4]
+
+    """
+    from mindboggle.utils.utils import run_tasks
+    from mindboggle.utils.logs import get_logger
+
+    logger = get_logger('mindboggle.utils.utils')
+
+    results = []
+    batch = []
+    sizes = []
+    for task, size in tasks:
+        if max_size and batch and sum(sizes) + size > max_size:
+            logger.debug('Run a batch of {0} tasks (size {1})'.
+                         format(len(batch), sum(sizes)))
+            results.extend(run_tasks(function, batch, n_processes, sizes))
+            batch = []
+            sizes = []
+        batch.append(task)
+        sizes.append(size)
+    if batch:
+        if max_size:
+            logger.debug('Run a batch of {0} tasks (size {1})'.
+                         format(len(batch), sum(sizes)))
+        results.extend(run_tasks(function, batch, n_processes, sizes))
+
+    return results
+
+#-----------------------------------------------------------------------------
+# Keep arrays on disk instead of in memory:
+#-----------------------------------------------------------------------------
+def memory_map(array, npy_file):
+    """
+    Save an array to a .npy file and return it as a read-only
+    memory-mapped array, so the operating system can page it out of
+    memory instead of holding it in memory.
+
+    Parameters
+    ----------
+    array : numpy array
+        array to save
+    npy_file : string
+        name of output .npy file
+
+    Returns
+    -------
+    mapped_array : numpy memmap
+        read-only memory-mapped array with the values of array
+
+    Examples
+    --------
+    >>> import os
+    >>> import tempfile
+    >>> import numpy as np
+    >>> from mindboggle.utils.utils import memory_map
+    >>> npy_file = os.path.join(tempfile.mkdtemp(), 'values.npy')
+    >>> mapped_array = memory_map(np.arange(4) * 0.5, npy_file)
+    >>> mapped_array.tolist()
+    [0.0, 0.5, 1.0, 1.5]
+
+    """
+    import numpy as np
+
+    np.save(npy_file, array)
+
+    return np.load(npy_file, mmap_mode='r')
+
+#-----------------------------------------------------------------------------
+# Select data for a workflow node:
+#-----------------------------------------------------------------------------
+def select_path(name, paths):
+    """
+    Select the full path of a file by name (such as for a workflow node
+    iterating over file names, with paths retrieved once for all nodes).
+
+    Parameters
+    ----------
+    name : string
+        file name
+    paths : dictionary
+        full path of each file, by file name
+
+    Returns
+    -------
+    path : string
+        full path of the file
+
+    Examples
+    --------
+    >>> from mindboggle.utils.utils import select_path
+    >>> select_path('atlas.nii.gz', {'atlas.nii.gz': '/cache/atlas.nii.gz'})
+    '/cache/atlas.nii.gz'
+
+    """
+    return paths[name]
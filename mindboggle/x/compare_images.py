@@ -31,11 +31,11 @@ def compute_image_histogram(infile, nbins=100, threshold=0.0):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.evaluate.compare_images import compute_image_histogram
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> infile = os.path.join(path, 'arno', 'mri', 't1weighted.nii.gz')
-    >>> compute_image_histogram(infile, nbins=100, threshold=0.1)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.evaluate.compare_images import compute_image_histogram  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> infile = os.path.join(path, 'arno', 'mri', 't1weighted.nii.gz')  # doctest: +SKIP
+    >>> compute_image_histogram(infile, nbins=100, threshold=0.1)  # doctest: +SKIP
 
     """
     import numpy as np
@@ -82,12 +82,12 @@ def compute_image_histograms(infiles, nbins=100, threshold=0.0):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.evaluate.compare_images import compute_image_histograms
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> infiles = [os.path.join(path, 'arno', 'mri', 't1weighted.nii.gz'),
-    >>>            os.path.join(path, 'arno', 'labels', 'labels.DKT25.manual.nii.gz')]
-    >>> compute_image_histograms(infiles, nbins=100, threshold=0.1)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.evaluate.compare_images import compute_image_histograms  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> infiles = [os.path.join(path, 'arno', 'mri', 't1weighted.nii.gz'),  # doctest: +SKIP
+    >>>            os.path.join(path, 'arno', 'labels', 'labels.DKT25.manual.nii.gz')]  # doctest: +SKIP
+    >>> compute_image_histograms(infiles, nbins=100, threshold=0.1)  # doctest: +SKIP
 
     """
     import os
@@ -286,12 +286,12 @@ def compute_image_similarities(files, intersect_masks=False,
 
     Examples
     --------
-    >>> from mindboggle.evaluate.compare_images import compute_image_similarities
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> file1 = os.path.join(path, 'arno', 'mri', 't1weighted.nii.gz')
+    >>> from mindboggle.evaluate.compare_images import compute_image_similarities  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> file1 = os.path.join(path, 'arno', 'mri', 't1weighted.nii.gz')  # doctest: +SKIP
     >>> #file2 = os.path.join(path, 'arno', 'mri', 't1weighted.nii.gz')
-    >>> file2 = os.path.join(path, 'arno', 'labels', 'labels.DKT25.manual.nii.gz')
-    >>> compute_image_similarities([file1,file2], False, 'cc', False)
+    >>> file2 = os.path.join(path, 'arno', 'labels', 'labels.DKT25.manual.nii.gz')  # doctest: +SKIP
+    >>> compute_image_similarities([file1,file2], False, 'cc', False)  # doctest: +SKIP
 
     """
     import os
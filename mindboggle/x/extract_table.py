@@ -32,25 +32,25 @@ def write_shape_stats(label_files, shape_files,
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.io_vtk import read_scalars
-    >>> from mindboggle.utils.io_table import write_shape_stats
-    >>> path = os.environ['MINDBOGGLE_DATA']
-    >>> label_file = 
-    >>> shape_file = 
-    >>> label_file = 
-    >>> label_name = 'labels'
-    >>> shape_name = 'thickness'
-    >>> exclude_labels = [-1]
-    >>> area_file = ''
-    >>> delimiter = ','
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.io_table import write_shape_stats  # doctest: +SKIP
+    >>> path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> label_file =  # doctest: +SKIP
+    >>> shape_file =  # doctest: +SKIP
+    >>> label_file =  # doctest: +SKIP
+    >>> label_name = 'labels'  # doctest: +SKIP
+    >>> shape_name = 'thickness'  # doctest: +SKIP
+    >>> exclude_labels = [-1]  # doctest: +SKIP
+    >>> area_file = ''  # doctest: +SKIP
+    >>> delimiter = ','  # doctest: +SKIP
     >>> #
-    >>> write_shape_stats(labels_or_file, sulci, fundi,
-    >>>     affine_transform_file, transform_format, area_file,
-    >>>     mean_curvature_file, travel_depth_file, geodesic_depth_file,
-    >>>     convexity_file, thickness_file, labels_spectra,
-    >>>     labels_spectra_norm, labels_spectra_IDs, sulci_spectra,
-    >>>     sulci_spectra_norm, sulci_spectra_IDs, exclude_labels, delimiter)
+    >>> write_shape_stats(labels_or_file, sulci, fundi,  # doctest: +SKIP
+    >>>     affine_transform_file, transform_format, area_file,  # doctest: +SKIP
+    >>>     mean_curvature_file, travel_depth_file, geodesic_depth_file,  # doctest: +SKIP
+    >>>     convexity_file, thickness_file, labels_spectra,  # doctest: +SKIP
+    >>>     labels_spectra_norm, labels_spectra_IDs, sulci_spectra,  # doctest: +SKIP
+    >>>     sulci_spectra_norm, sulci_spectra_IDs, exclude_labels, delimiter)  # doctest: +SKIP
 
     ""
     import os
@@ -278,17 +278,17 @@ def crop_to_match_volume(source, target, output=''):
 
     Examples
     --------
-    >>> import os
-    >>> from mindboggle.utils.matrix import crop_to_match_volume
-    >>> from mindboggle.utils.plots import plot_volumes
-    >>> data_path = os.environ['MINDBOGGLE_DATA']
-    >>> source = os.path.join(data_path, 'arno', 'labels', 'labels.DKT31.manual.nii.gz')
-    >>> target = os.path.join(data_path, 'atlases', 'MNI152_T1_1mm_brain.nii.gz')
-    >>> output = ''
-    >>> ignore_labels = [0]
-    >>> output = crop_source_to_match_target_volume(source, target, output)
+    >>> import os  # doctest: +SKIP
+    >>> from mindboggle.utils.matrix import crop_to_match_volume  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_volumes  # doctest: +SKIP
+    >>> data_path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> source = os.path.join(data_path, 'arno', 'labels', 'labels.DKT31.manual.nii.gz')  # doctest: +SKIP
+    >>> target = os.path.join(data_path, 'atlases', 'MNI152_T1_1mm_brain.nii.gz')  # doctest: +SKIP
+    >>> output = ''  # doctest: +SKIP
+    >>> ignore_labels = [0]  # doctest: +SKIP
+    >>> output = crop_source_to_match_target_volume(source, target, output)  # doctest: +SKIP
     >>> # View
-    >>> plot_volumes(output)
+    >>> plot_volumes(output)  # doctest: +SKIP
 
     """
     import os
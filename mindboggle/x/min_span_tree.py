@@ -181,32 +181,32 @@ def min_span_tree(adjacency_matrix, indices_to_connect):
 
     Examples
     --------
-    >>> import os
-    >>> import numpy as np
-    >>> import networkx as nx
-    >>> from mindboggle.utils.io_vtk import read_vtk, rewrite_scalars
-    >>> from mindboggle.utils.mesh import find_neighbors, remove_faces
-    >>> from mindboggle.utils.min_span_tree import min_span_tree
-    >>> data_path = os.environ['MINDBOGGLE_DATA']
-    >>> sulci_file = os.path.join(data_path, 'arno', 'features', 'sulci.vtk')
-    >>> faces, lines, indices, points, npoints, sulci, name, input_vtk = read_vtk(sulci_file)
-    >>> sulcus_ID = 1
-    >>> sulcus_indices = [i for i,x in enumerate(sulci) if x == sulcus_ID]
-    >>> sulcus_faces = remove_faces(faces, sulcus_indices)
-    >>> sulcus_neighbor_lists = find_neighbors(sulcus_faces, npoints)
-    >>> G=nx.Graph()
-    >>> G.add_nodes_from(sulcus_indices)
-    >>> for i, sulcus_neighbor_list in enumerate(sulcus_neighbor_lists):
-    >>>     G.add_edges_from([[i,x] for x in sulcus_neighbor_list])
-    >>> adjacency_matrix = nx.adjacency_matrix(G, nodelist=None, weight='weight')
-    >>> indices_to_connect = [0, len(sulcus_indices)-1]
-    >>> adjacency_matrix2, W, Path, Degree, TreeNbr = min_span_tree(adjacency_matrix, indices_to_connect)
+    >>> import os  # doctest: +SKIP
+    >>> import numpy as np  # doctest: +SKIP
+    >>> import networkx as nx  # doctest: +SKIP
+    >>> from mindboggle.utils.io_vtk import read_vtk, rewrite_scalars  # doctest: +SKIP
+    >>> from mindboggle.utils.mesh import find_neighbors, remove_faces  # doctest: +SKIP
+    >>> from mindboggle.utils.min_span_tree import min_span_tree  # doctest: +SKIP
+    >>> data_path = os.environ['MINDBOGGLE_DATA']  # doctest: +SKIP
+    >>> sulci_file = os.path.join(data_path, 'arno', 'features', 'sulci.vtk')  # doctest: +SKIP
+    >>> faces, lines, indices, points, npoints, sulci, name, input_vtk = read_vtk(sulci_file)  # doctest: +SKIP
+    >>> sulcus_ID = 1  # doctest: +SKIP
+    >>> sulcus_indices = [i for i,x in enumerate(sulci) if x == sulcus_ID]  # doctest: +SKIP
+    >>> sulcus_faces = remove_faces(faces, sulcus_indices)  # doctest: +SKIP
+    >>> sulcus_neighbor_lists = find_neighbors(sulcus_faces, npoints)  # doctest: +SKIP
+    >>> G=nx.Graph()  # doctest: +SKIP
+    >>> G.add_nodes_from(sulcus_indices)  # doctest: +SKIP
+    >>> for i, sulcus_neighbor_list in enumerate(sulcus_neighbor_lists):  # doctest: +SKIP
+    >>>     G.add_edges_from([[i,x] for x in sulcus_neighbor_list])  # doctest: +SKIP
+    >>> adjacency_matrix = nx.adjacency_matrix(G, nodelist=None, weight='weight')  # doctest: +SKIP
+    >>> indices_to_connect = [0, len(sulcus_indices)-1]  # doctest: +SKIP
+    >>> adjacency_matrix2, W, Path, Degree, TreeNbr = min_span_tree(adjacency_matrix, indices_to_connect)  # doctest: +SKIP
     >>> # Write results to vtk file and view:
-    >>> MST = np.zeros(len(points))
-    >>> MST[W] = 1
-    >>> rewrite_scalars(sulci_file, 'test_min_span_tree.vtk', MST, 'MST', MST)
-    >>> from mindboggle.utils.plots import plot_vtk
-    >>> plot_vtk('test_min_span_tree.vtk')
+    >>> MST = np.zeros(len(points))  # doctest: +SKIP
+    >>> MST[W] = 1  # doctest: +SKIP
+    >>> rewrite_scalars(sulci_file, 'test_min_span_tree.vtk', MST, 'MST', MST)  # doctest: +SKIP
+    >>> from mindboggle.utils.plots import plot_vtk  # doctest: +SKIP
+    >>> plot_vtk('test_min_span_tree.vtk')  # doctest: +SKIP
 
     """
 
@@ -72,10 +72,10 @@ def main(**extra_args):
                           #'mindboggle.shapes.zernike.compat',
                           #'mindboggle.shapes.zernike.naive',
                           'mindboggle.shapes.zernike.multiproc',
+                          'mindboggle.tests',
+                          'mindboggle.testing',
+                          'mindboggle.benchmarks',
                           'mindboggle.utils'],
-          #                'mindboggle.testing',
-          #                'mindboggle.tests',
-          #                'mindboggle.benchmarks',
           # The package_data spec has no effect for me (on python 2.6) -- even
           # changing to data_files doesn't get this stuff included in the source
           # distribution -- not sure if it has something to do with the magic